@@ -0,0 +1,12 @@
+"""
+Benchmark suite for the analysis pipeline; see benchmarks/run.py.
+
+Backend/src is put on sys.path so the benchmarks import project packages
+(agents, services, utils …) the same unqualified way production code does.
+"""
+import os
+import sys
+
+_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+if os.path.abspath(_SRC) not in map(os.path.abspath, sys.path):
+    sys.path.insert(0, _SRC)
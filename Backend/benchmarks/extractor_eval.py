@@ -0,0 +1,163 @@
+"""
+Side-by-side evaluation of the skill extractors on annotated documents:
+SkillNER (services/optimized_job_analyzer.py) against the custom NER model
+in models/model-best (services/ner_extractor.py).
+
+    cd Backend
+    python -m benchmarks.extractor_eval                        # all of data/dev.json
+    python -m benchmarks.extractor_eval --limit 100 --output extractors.json
+    python -m benchmarks.extractor_eval --extractors ner       # skip SkillNER
+
+The corpus is data/dev.json: a JSON list of {"text", "ents": [{start, end,
+label}]} with character offsets of the SKILL spans. Every document is run
+through each extractor's analyze_resume, which extracts without weighting,
+and the skills it returns are compared with the document's gold skills.
+Skills are compared as lower-cased, whitespace-collapsed strings, once per
+document.
+
+The report holds, per extractor:
+
+    load_seconds  time to load its models
+    timing        latency per document (p50/p95/p99)
+    scores        micro precision / recall / F1 against the gold skills,
+                  mean per-document Jaccard and identical documents
+    missing       gold skills it missed most often
+    extra         skills it found most often that are not gold
+
+SkillNER reports lemmatised SKILL_DB names ("node js" for "Node.js"), so
+its string-level scores understate what it actually finds. model-best
+was trained with data/dev.spacy as its dev set, so its scores on the same
+documents are optimistic; use held-out documents for a fair comparison.
+SKILLBRIDGE_SKILL_MATCHER picks the matcher behind "skillner" as usual.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from benchmarks.matcher_parity import compare_skill_sets
+from benchmarks.timing import summarize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "dev.json")
+
+EXTRACTORS = ("skillner", "ner")
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(skill.lower().split())
+
+
+def load_annotated(path: str, limit: int = 0, label: str = "SKILL") -> list:
+    """
+    (text, gold skill set) per document of a data/dev.json-style corpus.
+
+    Args:
+        path:  JSON list of {"text", "ents": [{start, end, label}]}
+        limit: documents to keep (0: all)
+        label: entity label that marks a skill
+
+    Returns:
+        list of (text, set of normalised skills)
+    """
+    with open(path, encoding="utf-8") as f:
+        records = json.load(f)
+    documents = []
+    for record in records:
+        text = record.get("text")
+        if not text:
+            continue
+        gold = {normalize_skill(text[e["start"]:e["end"]]) for e in record.get("ents", [])
+                if e.get("label") == label}
+        documents.append((text, gold - {""}))
+    return documents[:limit] if limit else documents
+
+
+def _load(name: str):
+    """Load an extractor; (analyze_resume, seconds to load)."""
+    started = time.perf_counter()
+    if name == "skillner":
+        from services.optimized_job_analyzer import SkillExtractorSingleton
+
+        extractor = SkillExtractorSingleton()
+    else:
+        from services.ner_extractor import NerSkillExtractor, load_ner
+
+        extractor = NerSkillExtractor(load_ner(), int(os.getenv("SKILLBRIDGE_NER_BATCH_SIZE", "64")))
+    return extractor.analyze_resume, time.perf_counter() - started
+
+
+def evaluate(analyze, documents: list, top: int = 25) -> dict:
+    """
+    Run analyze on every document and score it against the gold skills.
+
+    Args:
+        analyze:   text -> {skill: weight}
+        documents: (text, gold skill set) pairs from load_annotated()
+
+    Returns:
+        dict: skills, errors, timing, scores, missing, extra
+    """
+    predicted, samples, errors = [], [], 0
+    for text, _ in documents:
+        started = time.perf_counter()
+        try:
+            skills = {normalize_skill(s) for s in analyze(text)}
+        except Exception as exc:
+            logger.warning("Extraction failed: %s", exc)
+            skills, errors = set(), errors + 1
+        samples.append(time.perf_counter() - started)
+        predicted.append(skills)
+
+    comparison = compare_skill_sets([gold for _, gold in documents], predicted, top)
+    return {
+        "skills": sum(map(len, predicted)),
+        "errors": errors,
+        "timing": summarize(samples),
+        "scores": comparison["parity"],
+        "missing": comparison["missing"],
+        "extra": comparison["extra"],
+    }
+
+
+def run(documents: list, extractors=EXTRACTORS, top: int = 25) -> dict:
+    os.environ["SKILLBRIDGE_PRELOAD_MODELS"] = "false"
+    os.environ["SKILLBRIDGE_SENTENCE_CACHE_SIZE"] = "0"
+
+    report = {
+        "documents": len(documents),
+        "gold_skills": sum(len(gold) for _, gold in documents),
+        "extractors": {},
+    }
+    for name in extractors:
+        analyze, load_seconds = _load(name)
+        result = evaluate(analyze, documents, top)
+        report["extractors"][name] = {"load_seconds": round(load_seconds, 3), **result}
+        logger.info("%s: F1 %.3f, p50 %.1f ms", name, result["scores"]["f1"], result["timing"]["p50_ms"])
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the skill extractors on annotated documents.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="data/dev.json-style annotated corpus")
+    parser.add_argument("--limit", type=int, default=0, help="documents to use (0: all)")
+    parser.add_argument("--extractors", nargs="+", choices=EXTRACTORS, default=list(EXTRACTORS))
+    parser.add_argument("--top", type=int, default=25, help="missing / extra skills listed")
+    parser.add_argument("--output", default=None, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    documents = load_annotated(args.corpus, args.limit)
+    text = json.dumps(run(documents, args.extractors, args.top), indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Parity report: the skill automaton (services/skill_automaton.py) against
+SkillNER on a sample corpus.
+
+    cd Backend
+    python -m benchmarks.matcher_parity                          # first 200 documents of data/dev.json
+    python -m benchmarks.matcher_parity --limit 0 --output parity.json
+    python -m benchmarks.matcher_parity --corpus resumes.jsonl --top 50
+    python -m benchmarks.matcher_parity --synthetic 100          # benchmarks/synthetic.py documents
+
+The corpus is a JSON list or a JSON-lines file of {"text": ...} objects.
+Each document is normalised, split and tagged once, exactly as
+SkillExtractorSingleton does it. Both matchers then run on the same
+tagged sentences, so the timings cover matching alone.
+
+SkillNER is taken as the reference. The report holds:
+
+    matchers  per matcher: skills found, sentences that raised, latency per
+              document (p50/p95/p99) and, for the automaton, build time and size
+    parity    micro precision / recall / F1 of the automaton's skills, mean
+              per-document Jaccard and the share of identical documents
+    missing   the skills SkillNER found most often that the automaton did not
+    extra     the reverse, e.g. data/skills.json terms SKILL_DB lacks
+
+Needs SpaCy's en_core_web_lg and SkillNER's SKILL_DB.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+from benchmarks import synthetic
+from benchmarks.timing import summarize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "dev.json")
+
+
+def load_corpus(path: str, limit: int = 0) -> list:
+    """Texts from a JSON list or JSON-lines file of {"text": ...} objects; limit 0 keeps all."""
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    try:
+        records = json.loads(content)
+    except json.JSONDecodeError:
+        records = [json.loads(line) for line in content.splitlines() if line.strip()]
+    texts = [r["text"] for r in records if isinstance(r, dict) and r.get("text")]
+    return texts[:limit] if limit else texts
+
+
+def compare_skill_sets(reference: list, candidate: list, top: int = 25) -> dict:
+    """
+    Agreement of candidate with reference, one skill set per document.
+
+    Returns:
+        dict: parity (precision, recall, f1, mean_jaccard, identical_documents),
+              missing and extra ({skill: documents}, most frequent first)
+    """
+    true_positives = found = expected = identical = 0
+    jaccards = []
+    missing, extra = Counter(), Counter()
+    for want, got in zip(reference, candidate):
+        both = want & got
+        true_positives += len(both)
+        found += len(got)
+        expected += len(want)
+        identical += want == got
+        union = want | got
+        jaccards.append(len(both) / len(union) if union else 1.0)
+        missing.update(want - got)
+        extra.update(got - want)
+
+    precision = true_positives / found if found else 1.0
+    recall = true_positives / expected if expected else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "parity": {
+            "precision": round(precision, 4),
+            "recall": round(recall, 4),
+            "f1": round(f1, 4),
+            "mean_jaccard": round(sum(jaccards) / len(jaccards), 4) if jaccards else 1.0,
+            "identical_documents": round(identical / len(jaccards), 4) if jaccards else 1.0,
+        },
+        "missing": dict(missing.most_common(top)),
+        "extra": dict(extra.most_common(top)),
+    }
+
+
+def _match_documents(tagged: list, match) -> tuple:
+    """Run match(key, doc) on every tagged sentence; (skill sets, seconds per document, errors)."""
+    skill_sets, samples, errors = [], [], 0
+    for sentences in tagged:
+        skills = set()
+        started = time.perf_counter()
+        for key, doc in sentences:
+            try:
+                skills.update(text.lower() for text, _ in match(key, doc))
+            except Exception:
+                errors += 1
+        samples.append(time.perf_counter() - started)
+        skill_sets.append(skills)
+    return skill_sets, samples, errors
+
+
+def run(texts: list, top: int = 25) -> dict:
+    os.environ["SKILLBRIDGE_PRELOAD_MODELS"] = "false"
+    os.environ["SKILLBRIDGE_SENTENCE_CACHE_SIZE"] = "0"
+    os.environ["SKILLBRIDGE_SKILL_MATCHER"] = "skillner"
+
+    from services.optimized_job_analyzer import SKILL_DB, SkillExtractorSingleton, _ParsedText, _skillner_cleaner
+    from services.skill_automaton import build_automaton
+
+    extractor = SkillExtractorSingleton()
+    started = time.perf_counter()
+    automaton = build_automaton(SKILL_DB, extractor.nlp.make_doc, clean=_skillner_cleaner)
+    build_seconds = time.perf_counter() - started
+
+    tagged = []
+    for text in texts:
+        sentences = extractor._split_sentences(extractor._normalize_text(text))
+        keys = [_skillner_cleaner(s) for s in sentences]
+        tagged.append(list(zip(keys, extractor.nlp.pipe(k.lower() for k in keys))))
+
+    reference, skillner_samples, skillner_errors = _match_documents(
+        tagged, lambda key, doc: extractor._annotate_sentence(_ParsedText(key, doc))
+    )
+    candidate, automaton_samples, automaton_errors = _match_documents(
+        tagged, lambda key, doc: automaton.match(doc)
+    )
+
+    skillner_timing, automaton_timing = summarize(skillner_samples), summarize(automaton_samples)
+    report = {
+        "documents": len(texts),
+        "sentences": sum(len(s) for s in tagged),
+        "matchers": {
+            "skillner": {"skills": sum(map(len, reference)), "errors": skillner_errors,
+                         "timing": skillner_timing},
+            "automaton": {"skills": sum(map(len, candidate)), "errors": automaton_errors,
+                          "timing": automaton_timing, "build_seconds": round(build_seconds, 3),
+                          "patterns": len(automaton), "states": automaton.states},
+        },
+        "speedup": round(skillner_timing["mean_ms"] / automaton_timing["mean_ms"], 2)
+        if automaton_timing["mean_ms"] else None,
+    }
+    report.update(compare_skill_sets(reference, candidate, top))
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the skill automaton with SkillNER.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSON / JSON-lines {\"text\"} corpus")
+    parser.add_argument("--limit", type=int, default=200, help="documents to use (0: all)")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="use this many synthetic resume / job description pairs instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=25, help="missing / extra skills listed")
+    parser.add_argument("--output", default=None, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.synthetic:
+        texts = [doc.text for seed in range(args.seed, args.seed + args.synthetic)
+                 for doc in synthetic.make_pair(seed)]
+    else:
+        texts = load_corpus(args.corpus, args.limit)
+
+    text = json.dumps(run(texts, args.top), indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Benchmark the analysis pipeline stage by stage and end to end.
+
+    cd Backend
+    python -m benchmarks.run                               # medium documents, 30 iterations
+    python -m benchmarks.run --size large --iterations 100 --output results.json
+    python -m benchmarks.run --save-baseline               # record benchmarks/baseline.json
+    python -m benchmarks.run --fail-on-regression          # exit 1 when >10% worse
+
+Every iteration gets its own synthetic resume / job description pair
+(benchmarks/synthetic.py), generated from --seed, so two runs with the same
+arguments see the same documents. The result cache and the sentence cache
+are off unless --caches is given, so repeated runs measure the work rather
+than cache lookups. --embeddings stub (the default) replaces the
+sentence-transformer with benchmarks/stubs.py; --embeddings real loads the
+model. The learning-resource step never calls the OpenAI API.
+
+Benchmarks, selectable with --stages:
+
+    extract_text_from_pdf         synthetic resume PDF -> text
+    analyze_job_description       SkillNER extraction and weighting
+    analyze_resume                SkillNER extraction
+    identify_semantic_skill_gaps  embedding and matching of the planted skills
+    convert_numpy_to_python       response serialisation
+    endpoint                      POST /jobs/jobAnalyzer through an ASGI client
+
+Stages whose dependencies are missing (e.g. SpaCy for the analyze_* stages
+and the endpoint) are reported as skipped, with the reason. A stage that
+raises is reported as an error and makes the run exit with status 1.
+
+The JSON report holds per-benchmark ops/sec and p50/p95/p99 latencies and,
+when a baseline from the same --size and --embeddings exists, the relative
+change of each against it.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import synthetic
+from benchmarks.timing import compare, measure, measure_async
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+STAGES = (
+    "extract_text_from_pdf",
+    "analyze_job_description",
+    "analyze_resume",
+    "identify_semantic_skill_gaps",
+    "convert_numpy_to_python",
+    "endpoint",
+)
+
+SEMANTIC_THRESHOLD = 0.7
+
+
+def _configure_environment(caches: bool):
+    """Settings the src modules read at import time, so call before importing them."""
+    os.environ["SKILLBRIDGE_PRELOAD_MODELS"] = "false"
+    os.environ["OPENAI_API_KEY"] = ""
+    if not caches:
+        os.environ["SKILLBRIDGE_RESULT_CACHE"] = "off"
+        os.environ["SKILLBRIDGE_SENTENCE_CACHE_SIZE"] = "0"
+
+
+def _make_analyzer(embeddings: str):
+    from agents.enhanced_gap_agent import EnhancedGapAnalyzer
+
+    if embeddings == "stub":
+        from benchmarks.stubs import StubEmbeddingService
+
+        return EnhancedGapAnalyzer(SEMANTIC_THRESHOLD, embedding_service=StubEmbeddingService())
+    return EnhancedGapAnalyzer(SEMANTIC_THRESHOLD)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR,
+            capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks — each returns a summary, or raises ImportError to be skipped
+# ---------------------------------------------------------------------------
+
+def bench_extract_text_from_pdf(pairs, args) -> dict:
+    from utils.pdf_utils import extract_text_from_pdf
+
+    pdfs = [synthetic.render_pdf(resume.text) for resume, _ in pairs]
+    return measure(extract_text_from_pdf, pdfs, warmup=args.warmup)
+
+
+def bench_analyze_job_description(pairs, args) -> dict:
+    from services.optimized_job_analyzer import analyze_job_description
+
+    # The first call loads SpaCy and SkillNER; keep it out of the timings
+    analyze_job_description(pairs[0][1].text)
+    return measure(analyze_job_description, [jd.text for _, jd in pairs], warmup=args.warmup)
+
+
+def bench_analyze_resume(pairs, args) -> dict:
+    from services.optimized_job_analyzer import analyze_resume
+
+    analyze_resume(pairs[0][0].text)
+    return measure(analyze_resume, [resume.text for resume, _ in pairs], warmup=args.warmup)
+
+
+def bench_identify_semantic_skill_gaps(pairs, args) -> dict:
+    analyzer = _make_analyzer(args.embeddings)
+    return measure(
+        lambda pair: analyzer.identify_semantic_skill_gaps(pair[1].skills, pair[0].skills),
+        pairs, warmup=args.warmup,
+    )
+
+
+def bench_convert_numpy_to_python(pairs, args) -> dict:
+    from agents.gap_agent import identify_skill_gaps
+    from utils.numpy_converter import convert_numpy_to_python
+
+    # Response-shaped payloads with the NumPy scalars the analyzers can emit
+    payloads = []
+    for resume, jd in pairs:
+        job_skills = {skill: np.float64(w) for skill, w in jd.skills.items()}
+        resume_skills = {skill: np.float32(w) for skill, w in resume.skills.items()}
+        gaps = identify_skill_gaps(job_skills, resume_skills)
+        payloads.append({
+            "status": "success",
+            "analysis_type": "exact",
+            "analysis": {"job_skills": job_skills, "resume_skills": resume_skills, **gaps},
+            "llm_output": "Skills to develop: " + ", ".join(gaps.get("missing_skills", {})),
+        })
+    return measure(convert_numpy_to_python, payloads, warmup=args.warmup)
+
+
+def bench_endpoint(pairs, args) -> dict:
+    import httpx
+
+    from main import app
+    from services.model_lifecycle import models
+
+    if args.embeddings == "stub":
+        # Replaces the job_routes loader; allowed because nothing loaded it yet
+        models.register("embeddings", lambda: _make_analyzer("stub"))
+    logging.getLogger().setLevel(logging.WARNING)
+
+    requests = [
+        (synthetic.render_pdf(resume.text), jd.text, f"resume-{i}.pdf")
+        for i, (resume, jd) in enumerate(pairs)
+    ]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def post(request):
+                pdf, jd, name = request
+                response = await client.post(
+                    "/jobs/jobAnalyzer",
+                    files={"file": (name, pdf, "application/pdf")},
+                    data={"job_description": jd, "use_semantic": "true"},
+                )
+                if response.status_code != 200 or response.json().get("status") != "success":
+                    raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:200]}")
+
+            # Load the models outside the timed requests
+            await post(requests[0])
+            return await measure_async(post, requests, concurrency=args.concurrency,
+                                       warmup=args.warmup)
+
+    summary = asyncio.run(scenario())
+    summary["concurrency"] = args.concurrency
+    return summary
+
+
+BENCHMARKS = {name: globals()[f"bench_{name}"] for name in STAGES}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def run(args) -> dict:
+    """Run the selected benchmarks and return the report (without comparison)."""
+    _configure_environment(args.caches)
+    pairs = [
+        synthetic.make_pair(args.seed + i, args.size, args.resume_sentences, args.jd_sentences)
+        for i in range(args.iterations)
+    ]
+
+    results = {}
+    for name in args.stages:
+        logger.info("Running %s (%d iterations)…", name, args.iterations)
+        try:
+            results[name] = BENCHMARKS[name](pairs, args)
+        except ImportError as e:
+            logger.warning("Skipping %s: %s", name, e)
+            results[name] = {"skipped": str(e)}
+        except Exception as e:
+            logger.exception("Benchmark %s failed", name)
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+
+    from services.model_lifecycle import models
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "size": args.size,
+            "resume_sentences": args.resume_sentences or synthetic.SIZES[args.size]["resume_sentences"],
+            "jd_sentences": args.jd_sentences or synthetic.SIZES[args.size]["jd_sentences"],
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "embeddings": args.embeddings,
+            "caches": args.caches,
+            "model_load_seconds": {
+                name: status["load_seconds"] for name, status in models.status().items()
+                if status["load_seconds"] is not None
+            },
+        },
+        "results": results,
+    }
+
+
+def _comparable(report: dict, baseline: dict) -> bool:
+    keys = ("size", "resume_sentences", "jd_sentences", "embeddings", "caches")
+    return all(report["meta"].get(k) == baseline.get("meta", {}).get(k) for k in keys)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the SkillBridge analysis pipeline.")
+    parser.add_argument("--size", choices=sorted(synthetic.SIZES), default="medium",
+                        help="synthetic document size preset (default: medium)")
+    parser.add_argument("--resume-sentences", type=int, default=None, help="override the preset")
+    parser.add_argument("--jd-sentences", type=int, default=None, help="override the preset")
+    parser.add_argument("--iterations", type=int, default=30, help="timed calls per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed calls before timing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument("--embeddings", choices=("stub", "real"), default="stub",
+                        help="stub: deterministic hashed vectors; real: the sentence-transformer")
+    parser.add_argument("--caches", action="store_true",
+                        help="keep the result and sentence caches on")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="requests in flight for the endpoint benchmark")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative slowdown tolerated before a regression (default 0.10)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 if any benchmark regressed")
+    parser.add_argument("--output", default=None, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    args.stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in args.stages if s not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    report = run(args)
+
+    regressed = False
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if _comparable(report, baseline):
+            report["comparison"] = compare(report["results"], baseline["results"], args.tolerance)
+            regressed = any(entry["regression"] for entry in report["comparison"].values())
+        else:
+            logger.warning("Baseline %s was recorded with different settings; not comparing",
+                           args.baseline)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        logger.info("Saved baseline to %s", args.baseline)
+
+    failed = any("error" in result for result in report["results"].values())
+    return 1 if failed or (regressed and args.fail_on_regression) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
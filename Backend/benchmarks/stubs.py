@@ -0,0 +1,56 @@
+"""
+Deterministic stand-in for the sentence-transformer, used by --embeddings stub.
+
+Every distinct normalized text gets a fixed pseudo-random unit vector
+seeded from its hash, so runs are repeatable across processes and
+machines, and no model is downloaded or loaded. Identical skills match
+(cosine 1.0) and different skills almost never do, like the fake used in
+tests/test_enhanced_gap_agent.py. That keeps the matching work realistic
+while removing model inference, the largest source of noise.
+"""
+import hashlib
+import time
+
+import numpy as np
+
+from services.embedding_cache import normalize_text
+
+DIMENSION = 384   # all-MiniLM-L6-v2
+
+
+class StubEmbeddingService:
+    """
+    Drop-in for EmbeddingService.get_embeddings / get_embedding / cache_stats.
+
+    Args:
+        dimension:     vector size
+        seconds_per_text: simulated encoding cost, slept once per batch,
+                       to model a slower encoder without loading one
+    """
+
+    def __init__(self, dimension: int = DIMENSION, seconds_per_text: float = 0.0):
+        self.dimension = dimension
+        self.seconds_per_text = seconds_per_text
+        self.encoded = 0
+
+    def get_embeddings(self, texts):
+        texts = [t for t in texts if t and isinstance(t, str)]
+        if not texts:
+            return np.array([])
+        if self.seconds_per_text:
+            time.sleep(self.seconds_per_text * len(texts))
+        self.encoded += len(texts)
+        return np.stack([self._vector(text) for text in texts])
+
+    def get_embedding(self, text):
+        vectors = self.get_embeddings([text])
+        return vectors[0] if len(vectors) else None
+
+    def cache_stats(self) -> dict:
+        return {"hits": 0, "misses": self.encoded}
+
+    def _vector(self, text: str) -> np.ndarray:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+        rng = np.random.default_rng(int.from_bytes(digest[:8], "little"))
+        vector = rng.standard_normal(self.dimension).astype(np.float32)
+        return vector / np.linalg.norm(vector)
@@ -0,0 +1,191 @@
+"""
+Synthetic resumes and job descriptions for benchmarking.
+
+Documents are assembled from sentence templates filled with skills from
+data/skills.json (canonical names and related terms), mixed with filler
+sentences that mention no skill. Everything is drawn from a seeded
+random.Random, so the same seed and size always give the same documents.
+
+Each document also records the skills planted in it, so the gap stages
+can be benchmarked with realistic inputs without running SkillNER.
+"""
+import json
+import os
+import random
+import textwrap
+from dataclasses import dataclass, field
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILLS_JSON = os.path.join(_BACKEND_DIR, "data", "skills.json")
+
+# Sentences per document for each --size preset
+SIZES = {
+    "small": {"resume_sentences": 15, "jd_sentences": 10},
+    "medium": {"resume_sentences": 40, "jd_sentences": 25},
+    "large": {"resume_sentences": 120, "jd_sentences": 60},
+}
+
+REQUIRED_WEIGHT = 3.0
+PREFERRED_WEIGHT = 1.0
+
+_RESUME_TEMPLATES = (
+    "Built and maintained production services using {0} and {1}.",
+    "Led a team of four engineers migrating legacy workloads to {0}.",
+    "Designed reporting pipelines with {0}, cutting turnaround time by 30%.",
+    "Mentored junior colleagues on {0} best practices and code review.",
+    "Automated deployment of {0} applications, improving release frequency.",
+    "Completed certification in {0} and {1}.",
+    "Developed internal tooling in {0} used by over 200 staff.",
+)
+_JD_REQUIRED_TEMPLATES = (
+    "Strong experience with {0} is required.",
+    "You must have at least three years of hands-on {0} experience.",
+    "Proficiency in {0} and {1} is essential for this role.",
+    "Candidates need a solid background in {0}.",
+)
+_JD_PREFERRED_TEMPLATES = (
+    "Familiarity with {0} is a plus.",
+    "Exposure to {0} would be nice to have.",
+    "Bonus points for experience with {0}.",
+)
+_FILLER = (
+    "Collaborated closely with product managers and designers.",
+    "Presented quarterly results to senior leadership.",
+    "We offer flexible working hours and a generous learning budget.",
+    "Our team values clear communication and ownership.",
+    "Organised the office volunteering programme.",
+    "The position is based in our London office with hybrid options.",
+    "Received the employee of the year award in 2021.",
+    "Join a fast-growing company with a friendly culture.",
+)
+
+
+@dataclass
+class SyntheticDocument:
+    """A generated document and the skills written into it."""
+
+    text: str
+    skills: dict = field(default_factory=dict)   # {skill: weight}
+
+
+def skill_vocabulary(path: str = SKILLS_JSON) -> list:
+    """Canonical skill names and related terms from data/skills.json, de-duplicated."""
+    with open(path, encoding="utf-8") as f:
+        skills = json.load(f)["skills"]
+    vocabulary = []
+    for skill in skills:
+        for term in [skill["name"], *skill.get("related_terms", [])]:
+            term = term.lower()
+            if term not in vocabulary:
+                vocabulary.append(term)
+    return vocabulary
+
+
+def _fill(rng: random.Random, template: str, pool: list, skills: dict, weight: float) -> str:
+    picked = rng.sample(pool, template.count("{"))
+    for skill in picked:
+        skills[skill] = max(skills.get(skill, 0.0), weight)
+    return template.format(*picked)
+
+
+def make_resume(rng: random.Random, vocabulary: list, sentences: int,
+                filler_ratio: float = 0.3) -> SyntheticDocument:
+    """A resume of the given number of sentences; planted skills weigh 1.0."""
+    pool = rng.sample(vocabulary, min(len(vocabulary), max(4, sentences // 2)))
+    skills: dict = {}
+    lines = []
+    for _ in range(sentences):
+        if rng.random() < filler_ratio:
+            lines.append(rng.choice(_FILLER))
+        else:
+            lines.append(_fill(rng, rng.choice(_RESUME_TEMPLATES), pool, skills, 1.0))
+    return SyntheticDocument("\n".join(lines), skills)
+
+
+def make_job_description(rng: random.Random, vocabulary: list, sentences: int,
+                         filler_ratio: float = 0.3) -> SyntheticDocument:
+    """
+    A job description of the given number of sentences. Skills from
+    "required" sentences weigh REQUIRED_WEIGHT, "nice to have" ones
+    PREFERRED_WEIGHT.
+    """
+    pool = rng.sample(vocabulary, min(len(vocabulary), max(4, sentences // 2)))
+    skills: dict = {}
+    lines = ["Senior Engineer - job description."]
+    for _ in range(sentences - 1):
+        roll = rng.random()
+        if roll < filler_ratio:
+            lines.append(rng.choice(_FILLER))
+        elif roll < filler_ratio + (1 - filler_ratio) * 0.6:
+            lines.append(_fill(rng, rng.choice(_JD_REQUIRED_TEMPLATES), pool, skills, REQUIRED_WEIGHT))
+        else:
+            lines.append(_fill(rng, rng.choice(_JD_PREFERRED_TEMPLATES), pool, skills, PREFERRED_WEIGHT))
+    return SyntheticDocument("\n".join(lines), skills)
+
+
+def make_pair(seed: int, size: str = "medium", resume_sentences: int | None = None,
+              jd_sentences: int | None = None) -> tuple:
+    """
+    A (resume, job description) pair for seed. The two share part of their
+    vocabulary, so the gap stages see both matches and gaps.
+    """
+    preset = SIZES[size]
+    rng = random.Random(seed)
+    vocabulary = skill_vocabulary()
+    shared = rng.sample(vocabulary, len(vocabulary) * 2 // 3)
+    resume = make_resume(rng, shared, resume_sentences or preset["resume_sentences"])
+    jd = make_job_description(rng, vocabulary, jd_sentences or preset["jd_sentences"])
+    return resume, jd
+
+
+# ---------------------------------------------------------------------------
+# PDF rendering
+# ---------------------------------------------------------------------------
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(text: str, lines_per_page: int = 48, width: int = 90) -> bytes:
+    """
+    Render text as a minimal multi-page Helvetica PDF that pdfminer reads
+    back line by line. Characters outside Latin-1 are replaced.
+    """
+    lines = []
+    for paragraph in text.split("\n"):
+        lines.extend(textwrap.wrap(paragraph, width) or [""])
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page_lines in pages:
+        ops = ["BT /F1 10 Tf 50 750 Td 14 TL"]
+        ops += [f"({_pdf_escape(line)}) Tj T*" for line in page_lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids),
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref,
+    )
+    return bytes(out)
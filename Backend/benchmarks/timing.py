@@ -0,0 +1,106 @@
+"""
+Timing loops, latency summaries and baseline comparison.
+
+A summary is a plain dict so results serialise straight to JSON:
+
+    {"iterations": 50, "ops_per_sec": 812.4, "mean_ms": 1.23,
+     "p50_ms": 1.19, "p95_ms": 1.41, "p99_ms": 1.62, "max_ms": 1.80}
+"""
+import asyncio
+import time
+
+import numpy as np
+
+# Summary fields compared against a baseline and the direction that is better
+COMPARED = {"ops_per_sec": "higher", "p50_ms": "lower", "p95_ms": "lower", "p99_ms": "lower"}
+
+
+def summarize(samples: list, wall_seconds: float | None = None) -> dict:
+    """
+    Latency percentiles of samples (seconds per operation).
+
+    Args:
+        samples:      one duration per operation
+        wall_seconds: elapsed time of the whole run, for throughput when
+                      operations overlapped; defaults to sum(samples)
+    """
+    seconds = np.asarray(samples, dtype=np.float64)
+    wall = wall_seconds if wall_seconds is not None else float(seconds.sum())
+    p50, p95, p99 = np.percentile(seconds, [50, 95, 99]) * 1000
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": round(len(samples) / wall, 3) if wall > 0 else None,
+        "mean_ms": round(float(seconds.mean()) * 1000, 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(seconds.max()) * 1000, 4),
+    }
+
+
+def measure(fn, inputs: list, warmup: int = 1) -> dict:
+    """
+    Call fn(item) once per item, after warmup untimed calls on the first
+    items, and summarise the per-call latency.
+    """
+    for item in inputs[:warmup]:
+        fn(item)
+    samples = []
+    for item in inputs:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+async def measure_async(fn, inputs: list, concurrency: int = 1, warmup: int = 1) -> dict:
+    """
+    Await fn(item) once per item with up to concurrency calls in flight.
+    Throughput is completed calls over wall time, so it reflects overlap.
+    """
+    for item in inputs[:warmup]:
+        await fn(item)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def timed(item):
+        async with semaphore:
+            started = time.perf_counter()
+            await fn(item)
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(item) for item in inputs))
+    return summarize(samples, wall_seconds=time.perf_counter() - started)
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.10) -> dict:
+    """
+    Compare two {benchmark: summary} maps.
+
+    A benchmark regresses when any COMPARED field is worse than the baseline
+    by more than tolerance (a fraction). Benchmarks missing, skipped or
+    failed on either side are left out.
+
+    Returns:
+        {benchmark: {field: {"baseline", "current", "change"}, "regression": bool}}
+        where change is the relative difference (current / baseline - 1)
+    """
+    report = {}
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before or "ops_per_sec" not in result or "ops_per_sec" not in before:
+            continue
+        entry, regressed = {}, False
+        for field, better in COMPARED.items():
+            old, new = before.get(field), result.get(field)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            entry[field] = {"baseline": old, "current": new, "change": round(change, 4)}
+            if (change < -tolerance) if better == "higher" else (change > tolerance):
+                regressed = True
+        entry["regression"] = regressed
+        report[name] = entry
+    return report
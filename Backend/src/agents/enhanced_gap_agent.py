@@ -1,5 +1,6 @@
 import logging
 import numpy as np
+from services import metrics, skill_matcher
 from services.embedding_service import EmbeddingService
 
 logger = logging.getLogger(__name__)
@@ -10,24 +11,61 @@ _ZERO_VEC_DIM = 384  # dimension of all-MiniLM-L6-v2
 class EnhancedGapAnalyzer:
     """Semantic skill-gap analyzer using sentence embeddings and cosine similarity."""
 
-    def __init__(self, similarity_threshold: float = 0.7):
-        self.embedding_service = EmbeddingService()
+    def __init__(
+        self,
+        similarity_threshold: float = 0.7,
+        match_mode: str = "best",
+        top_k: int = 3,
+        embedding_service=None,
+    ):
+        """
+        Args:
+            similarity_threshold: minimum cosine similarity for a match
+            match_mode: "best"       — each job skill takes its most similar resume skill
+                        "top_k"      — as "best", plus up to top_k alternatives per job skill
+                        "one_to_one" — each resume skill covers at most one job skill
+            top_k: alternatives kept per job skill in "top_k" mode
+            embedding_service: anything with EmbeddingService.get_embeddings;
+                        defaults to a new EmbeddingService (loads the model)
+        """
+        if match_mode not in skill_matcher.MATCH_MODES:
+            raise ValueError(
+                f"Unknown match_mode: {match_mode!r} (expected one of {skill_matcher.MATCH_MODES})"
+            )
+        self.embedding_service = embedding_service if embedding_service is not None else EmbeddingService()
         self.similarity_threshold = similarity_threshold
-        logger.info("EnhancedGapAnalyzer ready (threshold=%.2f)", similarity_threshold)
+        self.match_mode = match_mode
+        self.top_k = top_k
+        logger.info(
+            "EnhancedGapAnalyzer ready (threshold=%.2f, mode=%s)", similarity_threshold, match_mode
+        )
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
+    def embed_skills(self, skill_texts: list) -> np.ndarray:
+        """
+        Embed skills once so they can be reused across many comparisons.
+
+        Returns:
+            (n, d) matrix, one row per skill text, suitable for the
+            job_embeddings argument of identify_semantic_skill_gaps
+        """
+        return self._get_embeddings(list(skill_texts))
+
     def identify_semantic_skill_gaps(
-        self, job_skills: dict, resume_skills: dict
+        self, job_skills: dict, resume_skills: dict, job_embeddings=None, resume_embeddings=None
     ) -> dict:
         """
         Compare job and resume skills using vector-embedding cosine similarity.
 
         Args:
-            job_skills:    {skill_text: weight}  extracted from job description
-            resume_skills: {skill_text: weight}  extracted from resume
+            job_skills:     {skill_text: weight}  extracted from job description
+            resume_skills:  {skill_text: weight}  extracted from resume
+            job_embeddings: optional embed_skills(job_skills) result, in
+                            job_skills key order, to skip re-embedding the job
+            resume_embeddings: the same for resume_skills
 
         Returns:
             {
@@ -62,38 +100,50 @@ class EnhancedGapAnalyzer:
                 "similarity_threshold": self.similarity_threshold,
             }
 
-        job_embeddings = self._get_embeddings(job_texts)
-        resume_embeddings = self._get_embeddings(resume_texts) if resume_texts else []
+        if job_embeddings is None or len(job_embeddings) != len(job_texts):
+            job_embeddings = self._get_embeddings(job_texts)
+        if resume_embeddings is None or len(resume_embeddings) != len(resume_texts):
+            resume_embeddings = self._get_embeddings(resume_texts) if resume_texts else []
+
+        # One matrix product over all job × resume pairs instead of a
+        # per-pair similarity call
+        with metrics.stage_timer("matching"):
+            matches = skill_matcher.match(
+                job_embeddings,
+                resume_embeddings,
+                self.similarity_threshold,
+                mode=self.match_mode,
+                k=self.top_k,
+            )
 
         missing_skills: dict = {}
         matching_skills: dict = {}
         matched_resume_skills: set = set()
 
         for i, job_skill in enumerate(job_texts):
-            job_emb = job_embeddings[i] if i < len(job_embeddings) else np.zeros(_ZERO_VEC_DIM)
             job_weight = job_skills[job_skill]
+            ranked = matches.get(i)
 
-            best_resume_skill = None
-            best_score = 0.0
-
-            for j, resume_skill in enumerate(resume_texts):
-                if j >= len(resume_embeddings):
-                    continue
-                score = self.embedding_service.calculate_similarity(job_emb, resume_embeddings[j])
-                if score > best_score:
-                    best_score = score
-                    best_resume_skill = resume_skill
-
-            if best_resume_skill is not None and best_score >= self.similarity_threshold:
-                matching_skills[job_skill] = {
-                    "job_weight": job_weight,
-                    "resume_match": best_resume_skill,
-                    "similarity_score": float(best_score),
-                    "resume_weight": resume_skills[best_resume_skill],
-                }
-                matched_resume_skills.add(best_resume_skill)
-            else:
+            if not ranked:
                 missing_skills[job_skill] = job_weight
+                continue
+
+            best_col, best_score = ranked[0]
+            best_resume_skill = resume_texts[best_col]
+            matching_skills[job_skill] = {
+                "job_weight": job_weight,
+                "resume_match": best_resume_skill,
+                "similarity_score": best_score,
+                "resume_weight": resume_skills[best_resume_skill],
+            }
+            if self.match_mode == "top_k":
+                matching_skills[job_skill]["top_matches"] = [
+                    {"resume_match": resume_texts[col], "similarity_score": score}
+                    for col, score in ranked
+                ]
+            # Alternatives are only listed; like "best", a job skill uses up
+            # just the resume skill it matched
+            matched_resume_skills.add(best_resume_skill)
 
         resume_only_skills = {
             skill: resume_skills[skill]
@@ -121,16 +171,17 @@ class EnhancedGapAnalyzer:
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _get_embeddings(self, skill_texts: list) -> list:
+    def _get_embeddings(self, skill_texts: list) -> np.ndarray:
         """
-        Return a list of numpy embedding arrays, one per skill text.
-        Falls back to zero vectors on encoding failure so the caller never
-        receives None values.
+        Return an (n, d) embedding matrix, one row per skill text.
+        Falls back to zero rows on encoding failure so the caller never
+        receives None values; zero rows never match anything.
         """
         if not skill_texts:
-            return []
+            return np.zeros((0, _ZERO_VEC_DIM))
 
-        embeddings = self.embedding_service.get_embeddings(skill_texts)
+        with metrics.stage_timer("embedding"):
+            embeddings = self.embedding_service.get_embeddings(skill_texts)
 
         # get_embeddings returns np.array([]) on total failure
         if embeddings is None or len(embeddings) == 0:
@@ -138,15 +189,15 @@ class EnhancedGapAnalyzer:
                 "Embedding generation failed for %d skills; substituting zero vectors",
                 len(skill_texts),
             )
-            return [np.zeros(_ZERO_VEC_DIM) for _ in skill_texts]
+            return np.zeros((len(skill_texts), _ZERO_VEC_DIM))
 
-        result = list(embeddings)
+        result = np.atleast_2d(np.asarray(embeddings))
 
         # Pad if the encoder silently dropped some inputs
         if len(result) < len(skill_texts):
             shortfall = len(skill_texts) - len(result)
             logger.warning("Got %d embeddings for %d skills; padding %d with zeros",
                            len(result), len(skill_texts), shortfall)
-            result.extend([np.zeros(_ZERO_VEC_DIM)] * shortfall)
+            result = np.vstack([result, np.zeros((shortfall, result.shape[1]))])
 
         return result
@@ -1,78 +1,286 @@
-import os
+"""
+Learning-resource recommendations for missing skills.
+
+Answers come straight from the offline resource catalog
+(services/resource_catalog.py), so the LLM is never on the request's
+critical path. When OPENAI_API_KEY is set, a per-skill plan from the OpenAI
+API overrides the catalog entry once it exists: plans are requested in the
+background, cached per skill, and served from the cache on later requests.
+SKILLBRIDGE_LLM_WAIT lets a request wait briefly for plans that are not
+cached yet.
+
+A learning plan for "kubernetes" does not depend on the job it is missing
+from, so each skill is requested on its own, without the job description.
+One AsyncOpenAI client with a bounded connection pool and timeouts is shared
+by every request, and concurrent requests for the same skill wait on a
+single API call. OPENAI_BASE_URL points the client at any OpenAI-compatible
+server, such as the stub used in the tests.
+"""
+import asyncio
 import logging
+import os
+
+import httpx
 from dotenv import load_dotenv
 
+from services import metrics
+from services.embedding_cache import normalize_text
+from services.model_lifecycle import models
+from services.resource_catalog import catalog_from_env
+from services.result_cache import ResultCache, make_key, result_cache_from_env
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+LLM_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+LLM_TIMEOUT = float(os.getenv("SKILLBRIDGE_LLM_TIMEOUT", "30"))
+LLM_MAX_CONNECTIONS = int(os.getenv("SKILLBRIDGE_LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_RETRIES = int(os.getenv("SKILLBRIDGE_LLM_MAX_RETRIES", "2"))
+# Seconds a request waits for LLM plans that are not cached yet (0: never wait)
+LLM_WAIT = float(os.getenv("SKILLBRIDGE_LLM_WAIT", "0"))
+
+# Only the highest-weighted missing skills get a plan
+TOP_SKILLS = 5
+
+# Bump when the prompt changes, so plans written for the old one are not served
+PROMPT_VERSION = 1
+
+SYSTEM_PROMPT = "You are a career coach who gives concise, practical skill-development advice."
 
-def get_learning_resources(missing_skills: dict, job_description: str) -> str:
+SKILL_PROMPT = """I want to develop this skill for the jobs I am applying to: {skill}.
+
+Please provide:
+1. One sentence explaining why it matters to employers
+2. Two online courses (free or paid) with URLs if possible
+3. One book recommendation
+4. One small project idea to practise the skill
+
+Keep the response concise and practical."""
+
+
+def plan_cache_from_env() -> ResultCache:
     """
-    Generate learning resource recommendations for the top missing skills.
+    Build the plan cache from SKILLBRIDGE_LEARNING_CACHE* environment variables.
 
-    Calls OpenAI GPT-3.5-turbo when OPENAI_API_KEY is available.
-    Returns a plain-text fallback message when the key is absent or the
-    API call fails, so the rest of the analysis is always returned to the
-    caller regardless.
+    Plans cost an API call each and stay valid far longer than an analysis
+    result, so they get their own mode, size, TTL (a week by default) and
+    directory rather than sharing the result cache's: turning that off must
+    not throw away paid-for plans, and two disk caches in one directory
+    would evict each other's entries.
+    """
+    return result_cache_from_env(
+        "SKILLBRIDGE_LEARNING_CACHE",
+        default_ttl=7 * 24 * 3600,
+        default_dir=os.path.join("workspace", "learning_cache"),
+    )
 
-    Args:
-        missing_skills:  {skill_text: weight} sorted high→low — only the
-                         top 5 are sent to the model
-        job_description: original job description text for context
 
-    Returns:
-        str  —  formatted recommendations, or a graceful fallback string
+plan_cache = plan_cache_from_env()
+
+# Loaded with the other models at startup; it only reads two small JSON files
+models.register("resource_catalog", catalog_from_env)
+metrics.watch_cache("learning_plans", plan_cache.stats)
+
+
+class LearningResourceClient:
     """
-    top_skills = list(missing_skills.keys())[:5]
+    Per-skill learning plans over one pooled AsyncOpenAI client.
 
-    if not top_skills:
-        return "No skill gaps identified — your resume already matches the job requirements well!"
+    Plans are read from and written to ``cache`` (a ResultCache). A skill
+    that is already being requested is not requested again: later callers
+    share the running task. Failed calls are not cached.
+    """
 
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        logger.warning("OPENAI_API_KEY not set; returning skill list without LLM recommendations")
-        return (
-            "Skills to develop: " + ", ".join(top_skills) + ".\n\n"
-            "Tip: set OPENAI_API_KEY in your .env file to receive personalised course, "
-            "book, and project recommendations for each skill."
+    def __init__(self, api_key: str, base_url: str | None = None, model: str = LLM_MODEL,
+                 cache=None, timeout: float = LLM_TIMEOUT,
+                 max_connections: int = LLM_MAX_CONNECTIONS, max_retries: int = LLM_MAX_RETRIES):
+        from openai import AsyncOpenAI
+
+        self.model = model
+        self.cache = cache if cache is not None else plan_cache
+        self.api_calls = 0
+        self._inflight: dict = {}   # cache key -> task fetching that plan
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            max_retries=max_retries,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections, max_keepalive_connections=max_connections
+                ),
+            ),
         )
 
-    prompt = f"""I am applying for a role with the following description:
+    async def available_plans(self, skills: list, wait: float = 0.0) -> dict:
+        """
+        LLM plans for skills that are cached or arrive within wait seconds.
 
-{job_description}
+        Every other skill is requested in the background, so a later call
+        finds its plan in the cache.
 
-The skills most missing from my resume are: {", ".join(top_skills)}.
+        Returns:
+            {skill: plan} for the skills that have one now
+        """
+        plans, pending = {}, {}
+        for skill in skills:
+            key = make_key("learning", self.model, PROMPT_VERSION, normalize_text(skill))
+            plan = self.cache.get("learning", key)
+            if plan is not None:
+                plans[skill] = plan
+            else:
+                pending[skill] = self._task_for(skill, key)
 
-For each skill please provide:
-1. One sentence explaining why it matters for this role
-2. Two online courses (free or paid) with URLs if possible
-3. One book recommendation
-4. One small project idea to practise the skill
+        if pending and wait > 0:
+            # Wait on shields: a timeout, or this request being cancelled,
+            # must not cancel a call other requests and the cache rely on
+            waiters = [asyncio.shield(task) for task in pending.values()]
+            try:
+                await asyncio.wait(waiters, timeout=wait)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+        for skill, task in pending.items():
+            if task.done() and not task.cancelled() and task.exception() is None and task.result():
+                plans[skill] = task.result()
+        return plans
 
-Keep the response concise and practical."""
+    async def close(self):
+        await self._client.close()
 
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a career coach who gives concise, practical skill-development advice.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=1200,
-        )
-        recommendations = response.choices[0].message.content
-        logger.info("OpenAI recommendations retrieved successfully")
-        return recommendations
+    async def _fetch(self, skill: str, key: str) -> str:
+        self.api_calls += 1
+        with metrics.stage_timer("llm"):
+            response = await self._client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": SKILL_PROMPT.format(skill=skill)},
+                ],
+                temperature=0.7,
+                max_tokens=400,
+            )
+        metrics.count_llm_tokens(response.usage)
+        plan = (response.choices[0].message.content or "").strip()
+        if plan:
+            self.cache.set("learning", key, plan)
+        logger.info("OpenAI learning plan retrieved for %r", skill)
+        return plan
+
+    def _task_for(self, skill: str, key: str) -> asyncio.Future:
+        """The running request for this plan, started if there is none."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(skill, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(skill, key, done))
+        return task
+
+    def _forget(self, skill: str, key: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("OpenAI API call failed for %r: %s", skill, task.exception())
+
+
+# ---------------------------------------------------------------------------
+# Shared client
+# ---------------------------------------------------------------------------
+
+_client: LearningResourceClient | None = None
+_client_config: tuple | None = None
+_retiring: set = set()   # close() tasks of replaced clients, referenced until they finish
+
+
+def _shared_client(api_key: str) -> LearningResourceClient:
+    """
+    The process-wide client, rebuilt if the key, base URL or event loop
+    changed (pooled connections belong to the loop that opened them). The
+    client it replaces is closed.
+    """
+    global _client, _client_config
+    config = (api_key, os.getenv("OPENAI_BASE_URL") or None, asyncio.get_running_loop())
+    if _client is None or _client_config != config:
+        if _client is not None:
+            _retire(_client, _client_config[2])
+        _client = LearningResourceClient(api_key, base_url=config[1])
+        _client_config = config
+    return _client
+
+
+def _retire(client: LearningResourceClient, loop: asyncio.AbstractEventLoop):
+    """Close a replaced client, on the loop that opened it while that loop still runs."""
+    current = asyncio.get_running_loop()
+    if loop is not current and loop.is_running():
+        asyncio.run_coroutine_threadsafe(_close_quietly(client), loop)
+        return
+    task = current.create_task(_close_quietly(client))
+    _retiring.add(task)
+    task.add_done_callback(_retiring.discard)
 
+
+async def _close_quietly(client: LearningResourceClient):
+    try:
+        await client.close()
     except Exception as exc:
-        logger.error("OpenAI API call failed: %s", exc)
+        # Connections opened on a loop that has since closed went with it
+        logger.debug("Closing a replaced learning-resource client failed: %s", exc)
+
+
+async def close_learning_client():
+    """Close the shared client's connection pool. Called at shutdown."""
+    global _client, _client_config
+    if _client is not None:
+        await _client.close()
+        _client = _client_config = None
+
+
+async def get_learning_resources(missing_skills: dict) -> str:
+    """
+    Generate learning resource recommendations for the top missing skills.
+
+    Each skill gets its cached LLM plan if there is one, otherwise its
+    catalog entry. Nothing waits on the OpenAI API unless SKILLBRIDGE_LLM_WAIT
+    is set; the plans not yet cached are requested in the background.
+
+    Args:
+        missing_skills: {skill_text: weight} sorted high→low — only the
+                        top 5 get recommendations
+
+    Returns:
+        str  —  one section per skill, or a graceful fallback string when
+                neither the catalog nor the LLM has anything
+    """
+    top_skills = list(missing_skills.keys())[:TOP_SKILLS]
+
+    if not top_skills:
+        return "No skill gaps identified — your resume already matches the job requirements well!"
+
+    catalog = await asyncio.to_thread(models.get, "resource_catalog")
+    api_key = os.getenv("OPENAI_API_KEY")
+    llm_plans = await _shared_client(api_key).available_plans(top_skills, LLM_WAIT) if api_key else {}
+
+    sections, uncovered = [], []
+    for skill in top_skills:
+        plan = llm_plans.get(skill) or catalog.plan(skill)
+        if plan:
+            sections.append(f"{skill}:\n{plan}")
+        else:
+            uncovered.append(skill)
+
+    if not sections:
+        if not api_key:
+            logger.warning("OPENAI_API_KEY not set and no catalog entries for %s", top_skills)
+            return (
+                "Skills to develop: " + ", ".join(top_skills) + ".\n\n"
+                "Tip: set OPENAI_API_KEY in your .env file to receive personalised course, "
+                "book, and project recommendations for each skill."
+            )
         return (
-            f"Learning resources temporarily unavailable ({type(exc).__name__}). "
-            f"Skills to develop: {', '.join(top_skills)}."
+            "Skills to develop: " + ", ".join(top_skills) + ".\n\n"
+            "Personalised recommendations are being prepared — analyse again shortly to see them."
         )
+
+    text = "\n\n".join(sections)
+    if uncovered:
+        text += "\n\nAlso worth developing: " + ", ".join(uncovered) + "."
+    return text
@@ -0,0 +1,32 @@
+"""
+Pre-fork deployment: gunicorn loads the models once in the master and
+forks uvicorn workers that share them copy-on-write (services/prefork.py).
+
+    cd Backend/src
+    SKILLBRIDGE_WORKERS=8 gunicorn main:app
+
+gunicorn reads this file from the working directory on its own.
+"""
+import os
+
+bind = os.getenv("SKILLBRIDGE_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("SKILLBRIDGE_WORKERS", "1"))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Import main:app in the master, so the forked workers inherit it
+preload_app = True
+
+
+def when_ready(server):
+    """Master hook, after the app is imported and before any worker forks."""
+    if os.getenv("SKILLBRIDGE_PRELOAD_MODELS", "true").lower() in ("0", "false", "no"):
+        return
+    from services import prefork
+
+    prefork.preload()
+
+
+def child_exit(server, worker):
+    from services import metrics
+
+    metrics.mark_process_dead(worker.pid)
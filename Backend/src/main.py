@@ -1,9 +1,16 @@
 import logging
 import os
-from fastapi import FastAPI, Request
+import time
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from agents.resource_agent import close_learning_client
+from routers import health_routes as health
 from routers import job_routes as jobs
-from services.optimized_job_analyzer import skill_extractor_instance
+from routers import profile_routes as profiles
+from services import metrics, profiling
+from services.model_lifecycle import models
+from services.optimized_job_analyzer import persist_sentence_cache
+from utils.pdf_utils import shutdown_page_pool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,12 +35,63 @@ app.add_middleware(
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     logger.info("→ %s %s", request.method, request.url.path)
+    started = time.perf_counter()
     response = await call_next(request)
-    logger.info("← %d", response.status_code)
+    elapsed = time.perf_counter() - started
+    # Label by route template rather than raw path so unknown URLs can't grow
+    # the label set; streamed responses are timed to their headers only
+    route = request.scope.get("route")
+    metrics.REQUEST_SECONDS.labels(
+        request.method, route.path if route is not None else "unmatched", response.status_code
+    ).observe(elapsed)
+    logger.info("← %d %s %s in %.3fs", response.status_code, request.method, request.url.path, elapsed)
+    return response
+
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """
+    Profile requests that present an allowlisted token or are picked by the
+    sample rate. Sampling stops once the body has been sent, so streamed
+    responses are profiled to their last event.
+    """
+    profiler = profiles.profiler
+    if not profiler.enabled:
+        return await call_next(request)
+    trigger = profiler.trigger(
+        request.headers.get(profiling.PROFILE_HEADER) or request.query_params.get(profiling.PROFILE_QUERY)
+    )
+    if trigger is None:
+        return await call_next(request)
+
+    profile = profiler.start(trigger, request.method, request.url.path)
+    token = profiling.activate(profile)
+    try:
+        response = await call_next(request)
+    except Exception:
+        profiler.finish(profile, 500)
+        raise
+    finally:
+        profiling.deactivate(token)
+
+    body = response.body_iterator
+
+    async def profiled_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            profiler.finish(profile, response.status_code)
+
+    response.body_iterator = profiled_body()
+    if trigger == "requested":
+        response.headers["X-Profile-Id"] = profile.id
     return response
 
 
 app.include_router(jobs.router)
+app.include_router(health.router)
+app.include_router(profiles.router)
 
 
 @app.get("/")
@@ -41,11 +99,33 @@ async def root():
     return {"message": "SkillBridge API is running", "version": "0.2.0"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint: stage latency histograms, cache, model and queue stats."""
+    payload, content_type = metrics.render()
+    return Response(content=payload, media_type=content_type)
+
+
 @app.on_event("startup")
 async def startup_event():
-    logger.info("Startup: loading SkillNER + SpaCy model (this may take a moment)…")
-    _ = skill_extractor_instance
-    logger.info("Startup complete — ready to accept requests.")
+    if os.getenv("SKILLBRIDGE_PRELOAD_MODELS", "true").lower() in ("0", "false", "no"):
+        logger.info("Startup complete — models will load on first use.")
+        return
+    if models.is_ready():
+        # Pre-fork mode: the gunicorn master loaded them before forking this worker
+        logger.info("Startup complete — models were loaded before the fork.")
+        return
+    # Returns immediately; /health/ready reports 200 once everything is warm
+    logger.info("Startup: loading SpaCy, SkillNER and the embedding model in the background…")
+    models.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    jobs.stage_executor.shutdown()
+    shutdown_page_pool()
+    persist_sentence_cache()
+    await close_learning_client()
 
 
 if __name__ == "__main__":
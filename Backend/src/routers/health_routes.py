@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from services.model_lifecycle import FAILED, models
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+
+@router.get("/live")
+async def liveness():
+    """Liveness probe: the process is up and serving HTTP, models or not."""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness probe: 200 once every preloaded model has loaded, 503 until
+    then. Models loaded only on first use (preload=False) don't count.
+
+    The body reports each model's state and load time either way, so a
+    failed load is visible without reading the logs.
+    """
+    model_status = models.status()
+    if models.is_ready():
+        status = "ready"
+    elif any(m["state"] == FAILED for m in model_status.values() if m["preload"]):
+        status = "failed"
+    else:
+        status = "loading"
+    return JSONResponse(
+        status_code=200 if status == "ready" else 503,
+        content={"status": status, "models": model_status},
+    )
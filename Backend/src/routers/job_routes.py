@@ -1,16 +1,41 @@
+import asyncio
+import json
 import logging
 import os
-import tempfile
+import time
 import traceback
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, Response, UploadFile
+from fastapi.responses import StreamingResponse
 
 from agents.enhanced_gap_agent import EnhancedGapAnalyzer
 from agents.gap_agent import identify_skill_gaps
 from agents.resource_agent import get_learning_resources
-from services.optimized_job_analyzer import analyze_job_description, analyze_resume
+from services.candidate_ranking import rank_candidates, summarize_match, weighted_coverage
+from services.embedding_cache import normalize_text
+from services.embedding_service import embedding_vectors_id
+from services.job_store import store_from_env
+from services import ner_extractor
+from services import metrics, profiling
+from services.model_lifecycle import READY, models
+from services.optimized_job_analyzer import (
+    analyze_job_description,
+    analyze_resume,
+    extractor_version,
+    sentence_cache_stats,
+)
+from services.ner_extractor import EXTRACTORS, default_extractor
+from services.result_cache import content_hash, make_key, result_cache_from_env
+from services.skill_matcher import MATCH_MODES
+from services.stage_executor import StageBusyError, executor_from_env
 from utils.numpy_converter import convert_numpy_to_python
-from utils.pdf_utils import extract_text_from_pdf
+from utils.pdf_utils import (
+    LAYOUT_MODES,
+    PDFExtractionError,
+    PDFTooLargeError,
+    extract_text_from_bytes,
+    read_pdfs_from_zip,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,16 +45,365 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-# Lazy singleton — loaded on first semantic request so startup stays fast
-_semantic_analyzer: EnhancedGapAnalyzer | None = None
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# Distinguishes int8 ONNX vectors from fp32 ones wherever vectors or
+# scores computed from them are stored
+EMBEDDING_VECTORS_ID = embedding_vectors_id(EMBEDDING_MODEL)
+SEMANTIC_THRESHOLD = 0.7
+
+# How semantic matching pairs skills: "best", "top_k" (also lists up to
+# MATCH_TOP_K alternatives per job skill) or "one_to_one"
+MATCH_MODE = os.getenv("SKILLBRIDGE_MATCH_MODE", "best").lower()
+MATCH_TOP_K = int(os.getenv("SKILLBRIDGE_MATCH_TOP_K", "3"))
+if MATCH_MODE not in MATCH_MODES:
+    raise ValueError(f"SKILLBRIDGE_MATCH_MODE must be one of {MATCH_MODES}, got {MATCH_MODE!r}")
+
+# The sentence-transformer loads through the model lifecycle manager — in
+# the background at startup, or on the first semantic request otherwise
+models.register("embeddings", lambda: EnhancedGapAnalyzer(
+    similarity_threshold=SEMANTIC_THRESHOLD, match_mode=MATCH_MODE, top_k=MATCH_TOP_K,
+))
+# Local job-posting corpus for /jobs/matchJobs; empty until postings are added
+models.register("job_store", lambda: store_from_env(EMBEDDING_VECTORS_ID))
+
+# Upload guards for resume PDFs
+PDF_MAX_BYTES = int(os.getenv("SKILLBRIDGE_PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("SKILLBRIDGE_PDF_MAX_PAGES", "20"))
+# "exact" matches pdfminer's extract_text(); "fast" skips box ordering
+PDF_LAYOUT = os.getenv("SKILLBRIDGE_PDF_LAYOUT", "exact")
+PDF_WORKERS = int(os.getenv("SKILLBRIDGE_PDF_WORKERS", "1"))
+if PDF_LAYOUT not in LAYOUT_MODES:
+    raise ValueError(f"SKILLBRIDGE_PDF_LAYOUT must be one of {LAYOUT_MODES}, got {PDF_LAYOUT!r}")
+
+# Batch screening: resumes per request, and how many are in flight at once
+BATCH_MAX_FILES = int(os.getenv("SKILLBRIDGE_BATCH_MAX_FILES", "200"))
+BATCH_CONCURRENCY = int(os.getenv("SKILLBRIDGE_BATCH_CONCURRENCY", "4"))
+
+# Reverse matching: postings re-ranked per query, and IVF clusters scanned
+MATCH_SHORTLIST = int(os.getenv("SKILLBRIDGE_MATCH_SHORTLIST", "50"))
+MATCH_NPROBE = int(os.getenv("SKILLBRIDGE_MATCH_NPROBE", "16"))
+
+# Skill extractors a request can choose: (job analyzer, resume analyzer,
+# version fingerprint). "skillner" is SkillNER or the skill automaton,
+# whichever SKILLBRIDGE_SKILL_MATCHER selects; "ner" is models/model-best
+SKILL_EXTRACTORS = {
+    "skillner": (analyze_job_description, analyze_resume, extractor_version),
+    "ner": (ner_extractor.analyze_job_description, ner_extractor.analyze_resume,
+            ner_extractor.extractor_version),
+}
+DEFAULT_EXTRACTOR = default_extractor()
+# Batch screening and reverse matching always use the default
+_default_job_analyzer, _default_resume_analyzer, _ = SKILL_EXTRACTORS[DEFAULT_EXTRACTOR]
+
+# Bounded worker pools that keep the blocking pipeline stages off the event loop
+stage_executor = executor_from_env()
+
+# Finished responses and per-document skill extractions, keyed by content
+# hashes and the versions of everything that produced them
+result_cache = result_cache_from_env()
+
+
+def _embedding_cache_stats():
+    """Embedding cache counters, or None until the embedding model has loaded."""
+    if models.status()["embeddings"]["state"] != READY:
+        return None
+    return models.get("embeddings").embedding_service.cache_stats()
+
+
+# Read on every /metrics scrape
+metrics.watch_cache("results", result_cache.stats)
+metrics.watch_cache("sentences", sentence_cache_stats)
+metrics.watch_cache("embeddings", _embedding_cache_stats)
+metrics.watch_queues(stage_executor.queue_depths)
 
 
 def _get_semantic_analyzer() -> EnhancedGapAnalyzer:
-    global _semantic_analyzer
-    if _semantic_analyzer is None:
-        logger.info("Loading sentence-transformer model for semantic analysis…")
-        _semantic_analyzer = EnhancedGapAnalyzer(similarity_threshold=0.7)
-    return _semantic_analyzer
+    return models.get("embeddings")
+
+
+def _identify_semantic_gaps(job_skills: dict, resume_skills: dict, job_embeddings=None) -> dict:
+    """Module-level wrapper so the semantic stage can be sent to a worker process."""
+    return _get_semantic_analyzer().identify_semantic_skill_gaps(
+        job_skills, resume_skills, job_embeddings=job_embeddings
+    )
+
+
+def _embed_skills(skills: list):
+    """Module-level wrapper so job skills can be embedded once in a worker process."""
+    return _get_semantic_analyzer().embed_skills(skills)
+
+
+def _match_postings(resume_skills: dict, top_n: int) -> list:
+    """Module-level wrapper so reverse matching can be sent to a worker process."""
+    return models.get("job_store").match_resume(
+        resume_skills, _get_semantic_analyzer(), top_n=top_n,
+        shortlist_size=max(MATCH_SHORTLIST, top_n), nprobe=MATCH_NPROBE,
+    )
+
+
+def _extractor_version(extractor: str) -> list:
+    return [extractor, SKILL_EXTRACTORS[extractor][2]()]
+
+
+def _resume_key(pdf_hash: str, extractor: str = DEFAULT_EXTRACTOR) -> str:
+    return make_key("resume", _extractor_version(extractor), PDF_LAYOUT, pdf_hash)
+
+
+def _job_key(jd: str, extractor: str = DEFAULT_EXTRACTOR) -> str:
+    return make_key("job", _extractor_version(extractor), normalize_text(jd))
+
+
+def _response_key(pdf_hash: str, jd: str, use_semantic: bool, extractor: str = DEFAULT_EXTRACTOR) -> str:
+    return make_key(
+        "response", _extractor_version(extractor), PDF_LAYOUT, pdf_hash, normalize_text(jd), use_semantic,
+        [EMBEDDING_VECTORS_ID, SEMANTIC_THRESHOLD, MATCH_MODE, MATCH_TOP_K] if use_semantic else None,
+    )
+
+
+async def _cached_stage(kind: str, key: str, stage: str, fn, *args):
+    """Return a cached result, or run fn on stage and cache what it returns."""
+    value = result_cache.get(kind, key)
+    if value is None:
+        value = convert_numpy_to_python(await stage_executor.run(stage, fn, *args))
+        result_cache.set(kind, key, value)
+    return value
+
+
+async def _resolved(value):
+    return value
+
+
+async def _extract_resume_text(pdf_bytes: bytes, name: str) -> str:
+    """PDF stage for a single upload; "" when the PDF can't be parsed."""
+    try:
+        return await stage_executor.run(
+            "pdf", extract_text_from_bytes, pdf_bytes,
+            max_pages=PDF_MAX_PAGES, max_bytes=PDF_MAX_BYTES,
+            layout=PDF_LAYOUT, workers=PDF_WORKERS,
+        )
+    except PDFTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=f"Resume PDF is too large: {exc}")
+    except PDFExtractionError as exc:
+        logger.warning("PDF extraction failed for %s: %s", name, exc)
+        return ""
+
+
+def _validate_job_description(job_description: str) -> str:
+    jd = (job_description or "").strip()
+    if not jd:
+        raise HTTPException(status_code=422, detail="job_description cannot be empty.")
+    if len(jd) < 50:
+        raise HTTPException(
+            status_code=422,
+            detail="job_description is too short — please provide a full job posting (≥50 characters).",
+        )
+    return jd
+
+
+# ---------------------------------------------------------------------------
+# Analysis pipeline
+# ---------------------------------------------------------------------------
+
+# /jobs/jobAnalyzer "stream" values and the media type each is served as
+STREAM_FORMATS = {
+    "off": "application/json",
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _busy_error(exc: StageBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=f"Server is busy ({exc.stage} queue full) — please retry shortly.",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _error_result(message: str) -> dict:
+    return {"status": "error", "message": message, "llm_output": None}
+
+
+async def _timed(event: str, awaitable):
+    """Await awaitable and return (event, value, elapsed seconds)."""
+    start = time.perf_counter()
+    value = await awaitable
+    return event, value, round(time.perf_counter() - start, 3)
+
+
+async def _cached_events(cached: dict, file_name: str):
+    """
+    A cached analysis as a single "result" event. Learning resources are
+    looked up again rather than cached with it: LLM plans replace the
+    catalog entries as they arrive, so an earlier answer may be out of date.
+    """
+    learning_resources = await get_learning_resources(cached["analysis"]["missing_skills"])
+    yield "result", dict(cached, file_name=file_name, llm_output=learning_resources)
+
+
+async def _analysis_events(raw_bytes: bytes, pdf_hash: str, file_name: str, jd: str,
+                           use_semantic: bool, response_key: str, extractor: str = DEFAULT_EXTRACTOR):
+    """
+    Run the analysis for one resume, yielding (event, data) as each stage
+    finishes: pdf_extracted, job_skills and resume_skills (in whichever order
+    they complete), gap_analysis, learning_resources, and finally "result"
+    with the full response. Input problems end the sequence early with an
+    error result. Every stage's data carries its elapsed_seconds. Skills
+    come from the named entry of SKILL_EXTRACTORS.
+    """
+    analyze_job, analyze_cv, _ = SKILL_EXTRACTORS[extractor]
+    # ----------------------------------------------------------------
+    # 1. Extract text from PDF (parsed in memory, never written to disk),
+    #    unless this resume's skills are already cached
+    # ----------------------------------------------------------------
+    resume_key = _resume_key(pdf_hash, extractor)
+    resume_skills = result_cache.get("resume", resume_key)
+    if resume_skills is None:
+        _, resume_text, elapsed = await _timed(
+            "pdf_extracted", _extract_resume_text(raw_bytes, file_name)
+        )
+        yield "pdf_extracted", {"cached": False, "characters": len(resume_text),
+                                "elapsed_seconds": elapsed}
+    else:
+        resume_text = None
+        yield "pdf_extracted", {"cached": True, "characters": None, "elapsed_seconds": 0.0}
+
+    if resume_text is not None and not resume_text.strip():
+        yield "result", _error_result(
+            "Could not extract text from the uploaded PDF. "
+            "Please make sure it is a text-based (not scanned/image) PDF."
+        )
+        return
+
+    if resume_text is not None and len(resume_text.strip()) < 50:
+        yield "result", _error_result(
+            "The extracted resume text is too short to analyse. "
+            "Check that your PDF contains selectable text rather than scanned images."
+        )
+        return
+
+    # ----------------------------------------------------------------
+    # 2. Extract skills from both documents, reporting each as it lands
+    # ----------------------------------------------------------------
+    tasks = [
+        asyncio.ensure_future(_timed(
+            "job_skills", _cached_stage("job", _job_key(jd, extractor), "skills", analyze_job, jd)
+        )),
+        asyncio.ensure_future(_timed(
+            "resume_skills",
+            _cached_stage("resume", resume_key, "skills", analyze_cv, resume_text)
+            if resume_skills is None else _resolved(resume_skills),
+        )),
+    ]
+    skills = {}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            event, value, elapsed = await next_done
+            skills[event] = value
+            yield event, {event: value, "elapsed_seconds": elapsed}
+    finally:
+        # A failed stage or a disconnected client abandons the other one
+        for task in tasks:
+            task.cancel()
+    job_skills, resume_skills = skills["job_skills"], skills["resume_skills"]
+
+    if not job_skills:
+        yield "result", _error_result(
+            "No recognisable technical skills were found in the job description. "
+            "Please provide a more detailed posting."
+        )
+        return
+
+    logger.info(
+        "Extracted %d job skills and %d resume skills",
+        len(job_skills), len(resume_skills),
+    )
+
+    # ----------------------------------------------------------------
+    # 3. Gap analysis — streamed before the slow LLM call starts
+    # ----------------------------------------------------------------
+    start = time.perf_counter()
+    if use_semantic:
+        gap_analysis = await stage_executor.run(
+            "gaps", _identify_semantic_gaps, job_skills, resume_skills
+        )
+        analysis_type = "semantic"
+    else:
+        gap_analysis = identify_skill_gaps(job_skills, resume_skills)
+        analysis_type = "exact"
+
+    analysis = {
+        "job_skills": job_skills,
+        "resume_skills": resume_skills,
+        "matching_skills": gap_analysis.get("matching_skills", {}),
+        "missing_skills": gap_analysis.get("missing_skills", {}),
+        "resume_only_skills": gap_analysis.get("resume_only_skills", {}),
+        "similarity_threshold": gap_analysis.get("similarity_threshold"),
+    }
+    yield "gap_analysis", {
+        "analysis_type": analysis_type,
+        "matching_skills": analysis["matching_skills"],
+        "missing_skills": analysis["missing_skills"],
+        "resume_only_skills": analysis["resume_only_skills"],
+        "similarity_threshold": analysis["similarity_threshold"],
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+
+    # ----------------------------------------------------------------
+    # 4. Learning resources (best-effort — never blocks the response)
+    # ----------------------------------------------------------------
+    _, learning_resources, elapsed = await _timed(
+        "learning_resources", get_learning_resources(gap_analysis.get("missing_skills", {}))
+    )
+    yield "learning_resources", {"llm_output": learning_resources, "elapsed_seconds": elapsed}
+
+    # ----------------------------------------------------------------
+    # 5. Build the response
+    # ----------------------------------------------------------------
+    with metrics.stage_timer("serialization"):
+        response_data = convert_numpy_to_python({
+            "status": "success",
+            "file_name": file_name,
+            "analysis_type": analysis_type,
+            "analysis": analysis,
+            "llm_output": learning_resources,
+        })
+    result_cache.set(
+        "response", response_key, {k: v for k, v in response_data.items() if k != "llm_output"}
+    )
+    yield "result", response_data
+
+
+def _ndjson(record: dict) -> bytes:
+    return (json.dumps(convert_numpy_to_python(record)) + "\n").encode("utf-8")
+
+
+def _format_event(fmt: str, event: str, data: dict) -> bytes:
+    """One stream record: an NDJSON line tagged with "type", or an SSE event."""
+    if fmt == "sse":
+        payload = json.dumps(convert_numpy_to_python(data))
+        return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+    return _ndjson({"type": event, **data})
+
+
+async def _stream_events(events, fmt: str):
+    """
+    Serialise pipeline events. The status code is already sent by the time a
+    stage fails, so failures arrive as a final "error" event instead.
+    """
+    try:
+        async for event, data in events:
+            yield _format_event(fmt, event, data)
+    except HTTPException as exc:
+        yield _format_event(fmt, "error", {"status_code": exc.status_code, "detail": exc.detail})
+    except StageBusyError as exc:
+        error = _busy_error(exc)
+        yield _format_event(fmt, "error", {"status_code": error.status_code, "detail": error.detail,
+                                           "retry_after": exc.retry_after})
+    except Exception as exc:
+        logger.error("Unexpected error in streamed job_analyzer:\n%s", traceback.format_exc())
+        yield _format_event(fmt, "error", {"status_code": 500,
+                                           "detail": f"Internal server error: {exc}"})
 
 
 # ---------------------------------------------------------------------------
@@ -42,146 +416,342 @@ async def test_endpoint():
     return {"message": "Jobs API is working!"}
 
 
+@router.get("/cacheStats")
+async def cache_stats():
+    """
+    Hit/miss counters for the result cache and the sentence-level SkillNER
+    annotation cache (null until the extractor has loaded), including the
+    sentence cache's hit ratio and approximate memory footprint.
+    """
+    return {"results": result_cache.stats(), "sentences": sentence_cache_stats()}
+
+
 @router.post("/jobAnalyzer")
 async def job_analyzer(
+    response: Response,
     file: UploadFile = File(...),
     job_description: str = Form(...),
     use_semantic: bool = Form(True),
+    stream: str = Form("off"),
+    extractor: str = Form(DEFAULT_EXTRACTOR),
 ):
     """
     Analyse a resume against a job description and return a skill-gap breakdown.
 
+    Repeat submissions are served from the result cache; the X-Cache header
+    says whether this one was. A new job description still reuses the
+    cached skill extraction of an already-seen resume, and vice versa.
+
     Multipart form fields:
       file            — PDF resume
       job_description — raw job-description text
       use_semantic    — true (default): cosine-similarity matching;
                         false: exact string matching only
+      stream          — off (default): one JSON response;
+                        ndjson / sse: a progress event as each stage
+                        finishes, then the full response as "result"
+      extractor       — skillner: SkillNER (or the skill automaton);
+                        ner: the custom NER model in models/model-best.
+                        Defaults to SKILLBRIDGE_EXTRACTOR
     """
-    temp_path: str | None = None
-
     try:
         # ----------------------------------------------------------------
         # 1. Validate inputs before touching the file
         # ----------------------------------------------------------------
-        jd = (job_description or "").strip()
-        if not jd:
-            raise HTTPException(status_code=422, detail="job_description cannot be empty.")
-        if len(jd) < 50:
+        jd = _validate_job_description(job_description)
+        stream = stream.lower()
+        if stream not in STREAM_FORMATS:
             raise HTTPException(
-                status_code=422,
-                detail="job_description is too short — please provide a full job posting (≥50 characters).",
+                status_code=422, detail=f"stream must be one of {', '.join(STREAM_FORMATS)}."
+            )
+        extractor = extractor.strip().lower()
+        if extractor not in EXTRACTORS:
+            raise HTTPException(
+                status_code=422, detail=f"extractor must be one of {', '.join(EXTRACTORS)}."
             )
 
         logger.info(
-            "Analysis request: file=%s  jd_chars=%d  semantic=%s",
-            file.filename, len(jd), use_semantic,
+            "Analysis request: file=%s  jd_chars=%d  semantic=%s  stream=%s  extractor=%s",
+            file.filename, len(jd), use_semantic, stream, extractor,
         )
 
         # ----------------------------------------------------------------
-        # 2. Save the uploaded PDF to a temp file
+        # 2. Read the uploaded PDF
         # ----------------------------------------------------------------
         raw_bytes = await file.read()
         if not raw_bytes:
             raise HTTPException(status_code=422, detail="Uploaded file is empty.")
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(raw_bytes)
-            temp_path = tmp.name
+        pdf_hash = content_hash(raw_bytes)
+        response_key = _response_key(pdf_hash, jd, use_semantic, extractor)
+        cached = result_cache.get("response", response_key)
+        cache_status = "hit" if cached is not None else "miss"
+        profiling.annotate("request", pdf_bytes=len(raw_bytes), job_description_characters=len(jd),
+                           cache=cache_status, extractor=extractor)
 
-        # ----------------------------------------------------------------
-        # 3. Extract text from PDF
-        # ----------------------------------------------------------------
-        resume_text = extract_text_from_pdf(temp_path)
-
-        if resume_text.startswith("Error") or resume_text.startswith("No text"):
-            return convert_numpy_to_python({
-                "status": "error",
-                "message": (
-                    "Could not extract text from the uploaded PDF. "
-                    "Please make sure it is a text-based (not scanned/image) PDF."
-                ),
-                "llm_output": None,
-            })
-
-        if len(resume_text.strip()) < 50:
-            return convert_numpy_to_python({
-                "status": "error",
-                "message": (
-                    "The extracted resume text is too short to analyse. "
-                    "Check that your PDF contains selectable text rather than scanned images."
-                ),
-                "llm_output": None,
-            })
+        if cached is not None:
+            logger.info("Serving cached analysis for %s", file.filename)
+            events = _cached_events(cached, file.filename)
+        else:
+            events = _analysis_events(
+                raw_bytes, pdf_hash, file.filename, jd, use_semantic, response_key, extractor
+            )
 
-        # ----------------------------------------------------------------
-        # 4. Extract skills from both documents
-        # ----------------------------------------------------------------
-        job_skills = analyze_job_description(jd)
-        resume_skills = analyze_resume(resume_text)
+        if stream != "off":
+            return StreamingResponse(
+                _stream_events(events, stream),
+                media_type=STREAM_FORMATS[stream],
+                headers={"X-Cache": cache_status, "Cache-Control": "no-cache",
+                         "X-Accel-Buffering": "no"},
+            )
 
-        if not job_skills:
-            return convert_numpy_to_python({
-                "status": "error",
-                "message": (
-                    "No recognisable technical skills were found in the job description. "
-                    "Please provide a more detailed posting."
-                ),
-                "llm_output": None,
-            })
+        response.headers["X-Cache"] = cache_status
+        async for _, data in events:
+            result = data
+        return result
 
-        logger.info(
-            "Extracted %d job skills and %d resume skills",
-            len(job_skills), len(resume_skills),
-        )
+    except HTTPException:
+        raise  # pass validation errors straight through
+
+    except StageBusyError as exc:
+        raise _busy_error(exc)
+
+    except Exception as exc:
+        logger.error("Unexpected error in job_analyzer:\n%s", traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Internal server error: {exc}")
+
+
+# ---------------------------------------------------------------------------
+# Batch screening
+# ---------------------------------------------------------------------------
+
+async def _screen_resume(
+    name: str,
+    pdf_bytes: bytes,
+    job_skills: dict,
+    job_embeddings,
+    use_semantic: bool,
+) -> dict:
+    """Run one resume through the pdf → skills → gaps stages of a batch."""
+    try:
+        resume_key = _resume_key(content_hash(pdf_bytes))
+        resume_skills = result_cache.get("resume", resume_key)
+        if resume_skills is None:
+            resume_text = await stage_executor.run(
+                "pdf", extract_text_from_bytes, pdf_bytes,
+                max_pages=PDF_MAX_PAGES, max_bytes=PDF_MAX_BYTES,
+                layout=PDF_LAYOUT, workers=PDF_WORKERS,
+            )
+            if len(resume_text.strip()) < 50:
+                return {"file_name": name, "status": "error",
+                        "message": "Could not extract enough text from this PDF."}
+            resume_skills = await _cached_stage("resume", resume_key, "skills", _default_resume_analyzer, resume_text)
 
-        # ----------------------------------------------------------------
-        # 5. Gap analysis
-        # ----------------------------------------------------------------
         if use_semantic:
-            gap_analysis = _get_semantic_analyzer().identify_semantic_skill_gaps(
-                job_skills, resume_skills
+            gap_analysis = await stage_executor.run(
+                "gaps", _identify_semantic_gaps, job_skills, resume_skills, job_embeddings
             )
-            analysis_type = "semantic"
         else:
             gap_analysis = identify_skill_gaps(job_skills, resume_skills)
-            analysis_type = "exact"
 
-        # ----------------------------------------------------------------
-        # 6. Learning resources (best-effort — never blocks the response)
-        # ----------------------------------------------------------------
-        learning_resources = get_learning_resources(
-            gap_analysis.get("missing_skills", {}), jd
+    except PDFTooLargeError as exc:
+        return {"file_name": name, "status": "error", "message": f"Resume PDF is too large: {exc}"}
+    except PDFExtractionError as exc:
+        logger.warning("PDF extraction failed for %s: %s", name, exc)
+        return {"file_name": name, "status": "error",
+                "message": "Could not extract text from this PDF."}
+    except StageBusyError as exc:
+        return {"file_name": name, "status": "error",
+                "message": f"Server is busy ({exc.stage} queue full) — please retry shortly."}
+    except Exception as exc:
+        logger.error("Batch analysis failed for %s:\n%s", name, traceback.format_exc())
+        return {"file_name": name, "status": "error", "message": f"Internal error: {exc}"}
+
+    return {
+        "file_name": name,
+        "status": "success",
+        "coverage": round(weighted_coverage(job_skills, gap_analysis.get("matching_skills", {})), 4),
+        "resume_skills": resume_skills,
+        "matching_skills": gap_analysis.get("matching_skills", {}),
+        "missing_skills": gap_analysis.get("missing_skills", {}),
+        "resume_only_skills": gap_analysis.get("resume_only_skills", {}),
+    }
+
+
+@router.post("/batchAnalyzer")
+async def batch_analyzer(
+    job_description: str = Form(...),
+    files: list[UploadFile] | None = File(None),
+    archive: UploadFile | None = File(None),
+    use_semantic: bool = Form(True),
+):
+    """
+    Screen many resumes against one job description.
+
+    The job description is analysed (and, in semantic mode, embedded) once;
+    resumes then run through the pipeline concurrently. The response is
+    NDJSON, one object per line:
+
+      {"type": "job", ...}     — job skills and the number of resumes
+      {"type": "result", ...}  — one per resume, in completion order
+      {"type": "ranking", ...} — candidates ranked by weighted skill coverage
+
+    Multipart form fields:
+      job_description — raw job-description text
+      files           — PDF resumes (repeat the field), and/or
+      archive         — a .zip of PDF resumes
+      use_semantic    — true (default): cosine-similarity matching;
+                        false: exact string matching only
+    """
+    jd = _validate_job_description(job_description)
+
+    # Uploads are read up front: they are closed once the endpoint returns
+    resumes = []
+    for upload in files or []:
+        resumes.append((upload.filename, await upload.read()))
+    if archive is not None:
+        try:
+            resumes.extend(read_pdfs_from_zip(
+                await archive.read(), max_files=BATCH_MAX_FILES, max_bytes=PDF_MAX_BYTES,
+            ))
+        except PDFTooLargeError as exc:
+            raise HTTPException(status_code=413, detail=f"Resume archive is too large: {exc}")
+        except PDFExtractionError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+
+    resumes = [(name, data) for name, data in resumes if data]
+    if not resumes:
+        raise HTTPException(status_code=422, detail="Upload at least one PDF resume.")
+    if len(resumes) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many resumes ({len(resumes)}); the limit is {BATCH_MAX_FILES}.",
         )
 
-        # ----------------------------------------------------------------
-        # 7. Build and return response
-        # ----------------------------------------------------------------
-        response_data = {
+    logger.info(
+        "Batch request: %d resumes  jd_chars=%d  semantic=%s", len(resumes), len(jd), use_semantic,
+    )
+
+    try:
+        job_skills = await _cached_stage("job", _job_key(jd), "skills", _default_job_analyzer, jd)
+        if not job_skills:
+            raise HTTPException(
+                status_code=422,
+                detail="No recognisable technical skills were found in the job description.",
+            )
+        job_embeddings = None
+        if use_semantic:
+            job_embeddings = await stage_executor.run("gaps", _embed_skills, list(job_skills))
+    except StageBusyError as exc:
+        raise _busy_error(exc)
+
+    async def stream():
+        yield _ndjson({
+            "type": "job",
+            "analysis_type": "semantic" if use_semantic else "exact",
+            "job_skills": job_skills,
+            "resume_count": len(resumes),
+        })
+
+        # Keep the batch inside the stage queues instead of flooding them
+        slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def screen(name, data):
+            async with slots:
+                return await _screen_resume(name, data, job_skills, job_embeddings, use_semantic)
+
+        tasks = [asyncio.create_task(screen(name, data)) for name, data in resumes]
+        summaries = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result["status"] == "success":
+                    summaries.append(summarize_match(result["file_name"], job_skills, result))
+                yield _ndjson({"type": "result", **result})
+        finally:
+            # Client went away — stop the resumes still queued
+            for task in tasks:
+                task.cancel()
+
+        yield _ndjson({
+            "type": "ranking",
+            "candidates": [
+                {"rank": entry["rank"], "file_name": entry["name"], "coverage": entry["coverage"],
+                 "matched": entry["matched"], "missing": entry["missing"]}
+                for entry in rank_candidates(summaries)
+            ],
+            "failed": len(resumes) - len(summaries),
+        })
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+# ---------------------------------------------------------------------------
+# Reverse matching
+# ---------------------------------------------------------------------------
+
+@router.post("/matchJobs")
+async def match_jobs(
+    file: UploadFile = File(...),
+    top_n: int = Form(10),
+):
+    """
+    Find the stored job postings that best fit a resume.
+
+    Postings are shortlisted by profile-vector similarity through the ANN
+    index, then re-ranked by semantic weighted skill coverage.
+
+    Multipart form fields:
+      file  — PDF resume
+      top_n — number of postings to return (1–100, default 10)
+    """
+    if not 1 <= top_n <= 100:
+        raise HTTPException(status_code=422, detail="top_n must be between 1 and 100.")
+
+    try:
+        store = await asyncio.to_thread(models.get, "job_store")
+        if not len(store):
+            raise HTTPException(
+                status_code=503,
+                detail="No job postings have been indexed — add some with `python -m services.job_store add`.",
+            )
+
+        raw_bytes = await file.read()
+        if not raw_bytes:
+            raise HTTPException(status_code=422, detail="Uploaded file is empty.")
+
+        resume_key = _resume_key(content_hash(raw_bytes))
+        resume_skills = result_cache.get("resume", resume_key)
+        if resume_skills is None:
+            resume_text = await _extract_resume_text(raw_bytes, file.filename)
+            if len(resume_text.strip()) < 50:
+                return {
+                    "status": "error",
+                    "message": (
+                        "Could not extract enough text from the uploaded PDF. "
+                        "Please make sure it is a text-based (not scanned/image) PDF."
+                    ),
+                }
+            resume_skills = await _cached_stage("resume", resume_key, "skills", _default_resume_analyzer, resume_text)
+
+        if not resume_skills:
+            return {"status": "error", "message": "No recognisable technical skills were found in the resume."}
+
+        matches = await stage_executor.run("gaps", _match_postings, resume_skills, top_n)
+        return convert_numpy_to_python({
             "status": "success",
             "file_name": file.filename,
-            "analysis_type": analysis_type,
-            "analysis": {
-                "job_skills": job_skills,
-                "resume_skills": resume_skills,
-                "matching_skills": gap_analysis.get("matching_skills", {}),
-                "missing_skills": gap_analysis.get("missing_skills", {}),
-                "resume_only_skills": gap_analysis.get("resume_only_skills", {}),
-                "similarity_threshold": gap_analysis.get("similarity_threshold"),
-            },
-            "llm_output": learning_resources,
-        }
-        return convert_numpy_to_python(response_data)
+            "resume_skills": resume_skills,
+            "postings_searched": len(store),
+            "matches": matches,
+        })
 
     except HTTPException:
-        raise  # pass validation errors straight through
+        raise
+
+    except StageBusyError as exc:
+        raise _busy_error(exc)
 
     except Exception as exc:
-        logger.error("Unexpected error in job_analyzer:\n%s", traceback.format_exc())
+        logger.error("Unexpected error in match_jobs:\n%s", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Internal server error: {exc}")
-
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from services.profiling import FORMATS, PROFILE_HEADER, profiler_from_env, to_collapsed, to_speedscope
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["profiles"],
+)
+
+# Which requests are profiled, and where their profiles are kept
+profiler = profiler_from_env()
+
+
+def _require_token(header_token: str | None, query_token: str | None):
+    """Profiles expose code paths and input sizes, so they need an allowlisted token too."""
+    if not profiler.is_allowed(header_token or query_token):
+        raise HTTPException(status_code=403, detail=f"A valid {PROFILE_HEADER} token is required.")
+
+
+@router.get("")
+async def list_profiles(
+    token: str | None = Header(None, alias=PROFILE_HEADER),
+    profile: str | None = Query(None),
+):
+    """Stored profiles, newest first, without their stacks."""
+    _require_token(token, profile)
+    return {"profiles": profiler.summaries()}
+
+
+@router.get("/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("speedscope"),
+    token: str | None = Header(None, alias=PROFILE_HEADER),
+    profile: str | None = Query(None),
+):
+    """
+    One stored profile.
+
+    Query parameters:
+      format — speedscope (default): JSON for https://www.speedscope.app;
+               collapsed: "frame;frame count" lines for flamegraph.pl
+    """
+    _require_token(token, profile)
+    if format not in FORMATS:
+        raise HTTPException(status_code=422, detail=f"format must be one of {', '.join(FORMATS)}.")
+    record = profiler.load(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+
+    if format == "collapsed":
+        return PlainTextResponse(
+            to_collapsed(record),
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed.txt"'},
+        )
+    return JSONResponse(
+        to_speedscope(record),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'},
+    )
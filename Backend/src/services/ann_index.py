@@ -0,0 +1,163 @@
+"""
+Approximate nearest-neighbour search over unit vectors, in pure NumPy.
+
+An inverted-file (IVF) index: spherical k-means splits the vectors into
+``nlist`` clusters, and the vectors are stored contiguously by cluster.
+A query scores the centroids, then scores exactly only the members of its
+``nprobe`` nearest clusters. Every step is a matrix product, so it stays
+fast without a compiled extension. Collections smaller than
+``EXACT_SEARCH_BELOW`` skip clustering and are searched exhaustively.
+"""
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EXACT_SEARCH_BELOW = 2048
+
+_FILES = ("centroids", "vectors", "ids", "offsets")
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def save_array(path: str, array: np.ndarray):
+    """
+    np.save via a temporary file, so readers that memory-mapped the old
+    file keep a valid mapping.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.asarray(array))
+    os.replace(tmp_path, path)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    """Index of the most similar centroid for each row, computed in chunks."""
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk):
+        labels[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10,
+                     seed: int = 0) -> np.ndarray:
+    """
+    Cluster unit vectors by cosine similarity.
+
+    Returns:
+        (k, d) matrix of unit centroids
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        empty = np.bincount(labels, minlength=k) == 0
+        # Re-seed empty clusters from random points so none go to waste
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file cosine index; see the module docstring."""
+
+    def __init__(self, centroids: np.ndarray, vectors: np.ndarray, ids: np.ndarray,
+                 offsets: np.ndarray):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, vectors, nlist: int | None = None, iterations: int = 10,
+              train_size: int = 100_000, seed: int = 0) -> "IVFIndex":
+        """
+        Cluster vectors and lay them out by cluster.
+
+        Args:
+            vectors:    (n, d) matrix; rows are normalised here
+            nlist:      number of clusters (default: about sqrt(n));
+                        1 means exhaustive search
+            iterations: k-means iterations
+            train_size: k-means runs on a random sample of at most this many rows
+        """
+        vectors = normalize_rows(vectors)
+        n = len(vectors)
+        if nlist is None:
+            nlist = 1 if n < EXACT_SEARCH_BELOW else int(np.sqrt(n))
+        nlist = max(1, min(nlist, n))
+
+        if nlist == 1:
+            centroids = normalize_rows(vectors.mean(axis=0, keepdims=True)) if n else \
+                np.zeros((1, vectors.shape[1]), dtype=np.float32)
+            labels = np.zeros(n, dtype=np.int64)
+        else:
+            rng = np.random.default_rng(seed)
+            sample = vectors if n <= train_size else vectors[rng.choice(n, train_size, replace=False)]
+            centroids = spherical_kmeans(sample, nlist, iterations=iterations, seed=seed)
+            labels = _assign(vectors, centroids)
+
+        order = np.argsort(labels, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=nlist))])
+        logger.info("Built IVF index: %d vectors in %d lists", n, nlist)
+        return cls(centroids, vectors[order], order.astype(np.int64), offsets.astype(np.int64))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def search(self, query, k: int = 10, nprobe: int = 16) -> list:
+        """
+        Return up to k (row, cosine similarity) pairs, most similar first.
+
+        Args:
+            query:  (d,) vector; normalised here
+            k:      number of neighbours
+            nprobe: clusters to scan; nprobe >= nlist is an exact search
+        """
+        if not len(self.ids) or k <= 0:
+            return []
+        query = normalize_rows(query)[0]
+
+        if nprobe >= self.nlist:
+            candidates = np.arange(len(self.ids))
+        else:
+            probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.concatenate([
+                np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes
+            ])
+        if not len(candidates):
+            return []
+
+        scores = self.vectors[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.ids[candidates[i]]), float(scores[i])) for i in top]
+
+    def save(self, path: str) -> str:
+        """Write the index as .npy files into directory path."""
+        os.makedirs(path, exist_ok=True)
+        for name in _FILES:
+            save_array(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "IVFIndex":
+        """Load an index written by save(); vectors are memory-mapped by default."""
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in _FILES
+        }
+        return cls(**arrays)
@@ -0,0 +1,54 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def weighted_coverage(job_skills: dict, matching_skills: dict) -> float:
+    """
+    Share of the job's skill weight that a resume covers.
+
+    Args:
+        job_skills:      {skill: weight} from analyze_job_description
+        matching_skills: the "matching_skills" of a gap analysis (exact or semantic)
+
+    Returns:
+        float in [0, 1]; 0.0 when the job has no skills
+    """
+    total = sum(job_skills.values())
+    if total <= 0:
+        return 0.0
+    covered = sum(weight for skill, weight in job_skills.items() if skill in matching_skills)
+    return covered / total
+
+
+def summarize_match(name: str, job_skills: dict, gap_analysis: dict) -> dict:
+    """
+    Condense one gap analysis into a ranking entry.
+
+    Returns:
+        {name, coverage, matched, missing, missing_skills}
+    """
+    matching = gap_analysis.get("matching_skills", {})
+    missing = gap_analysis.get("missing_skills", {})
+    return {
+        "name": name,
+        "coverage": round(weighted_coverage(job_skills, matching), 4),
+        "matched": len(matching),
+        "missing": len(missing),
+        "missing_skills": list(missing),
+    }
+
+
+def rank_candidates(entries: list) -> list:
+    """
+    Order ranking entries by coverage, then matched-skill count, then name,
+    and number them from 1.
+
+    Args:
+        entries: summarize_match() dicts
+
+    Returns:
+        new list of entries, each with a "rank" key
+    """
+    ordered = sorted(entries, key=lambda e: (-e["coverage"], -e["matched"], e["name"]))
+    return [dict(entry, rank=position) for position, entry in enumerate(ordered, start=1)]
@@ -0,0 +1,334 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows — fall back to unlocked single-writer use
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# current.json names the live generation; each generation is an append-only
+# float32 matrix plus a JSON-lines log of the keys each append added
+_CURRENT_FILE = "current.json"
+_VECTORS_FILE = "vectors.{}.f32"
+_KEYS_FILE = "keys.{}.jsonl"
+_LOCK_FILE = ".lock"
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used both as the cache key and as the text sent to the model."""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def cache_key(model_id: str, text: str) -> str:
+    """Content address of an embedding: hash of (model id, normalized text)."""
+    return hashlib.sha1(f"{model_id}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of text embeddings for one model.
+
+    Tier 1 is an in-process LRU of recently used vectors. Tier 2 (optional)
+    lives in ``cache_dir``: an append-only float32 matrix that is read through
+    a read-only memory map, plus an append-only log with one JSON line of
+    keys per stored batch. The directory survives restarts, and any number
+    of uvicorn workers can map it at once; the OS shares the pages between
+    them. Writers serialise appends with a lock file, and readers pick up
+    new rows by reading the log from where they left off, so neither side
+    ever re-reads or rewrites the whole index.
+
+    The disk tier holds at most ``max_disk_rows`` vectors. An append that
+    would pass the limit first compacts the cache into a new generation
+    that keeps the most recently added rows (half the limit, less the
+    batch being added), and current.json switches readers over to it.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        capacity: int = 4096,
+        cache_dir: str | None = None,
+        read_only: bool = False,
+        max_disk_rows: int = 100_000,
+    ):
+        if max_disk_rows < 1:
+            raise ValueError("max_disk_rows must be at least 1")
+        self.model_id = model_id
+        self.capacity = capacity
+        self.read_only = read_only
+        self.max_disk_rows = max_disk_rows
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._dir = None
+        if cache_dir:
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id).strip("_")
+            self._dir = os.path.join(cache_dir, slug)
+            if not read_only:
+                os.makedirs(self._dir, exist_ok=True)
+        self._dim: int | None = None
+        self._generation: int | None = None
+        self._current_signature: tuple | None = None
+        self._log_offset = 0
+        self._disk_rows = 0
+        self._rows: dict = {}
+        self._matrix: np.ndarray | None = None
+
+        with self._lock:
+            self._refresh_disk_index()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def lookup(self, texts: list) -> tuple[dict, list]:
+        """
+        Look up each text in memory, then on disk.
+
+        Returns:
+            (found, missing) — found maps position in ``texts`` to its vector;
+            missing lists the positions that need encoding
+        """
+        found: dict = {}
+        missing: list = []
+        with self._lock:
+            refreshed = False
+            for pos, text in enumerate(texts):
+                key = cache_key(self.model_id, text)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[pos] = vector
+                    continue
+
+                if not refreshed and key not in self._rows:
+                    # Another worker may have appended since we last looked
+                    self._refresh_disk_index()
+                    refreshed = True
+                row = self._rows.get(key)
+                if row is not None:
+                    vector = np.array(self._matrix[row])
+                    self._remember(key, vector)
+                    found[pos] = vector
+                    self.disk_hits += 1
+                    continue
+
+                missing.append(pos)
+
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def store(self, texts: list, vectors) -> None:
+        """Add freshly encoded vectors to the memory tier and, if writable, to disk."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        keys = [cache_key(self.model_id, t) for t in texts]
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+            if self._dir and not self.read_only:
+                self._append_to_disk(keys, vectors)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._rows),
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers (caller holds self._lock)
+    # ------------------------------------------------------------------
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def _path(self, name: str, generation: int | None = None) -> str:
+        return os.path.join(self._dir, name.format(generation))
+
+    def _refresh_disk_index(self):
+        """Follow current.json to the live generation and read any new log lines."""
+        if not self._dir:
+            return
+        current_path = self._path(_CURRENT_FILE)
+        try:
+            st = os.stat(current_path)
+        except FileNotFoundError:
+            return
+        # current.json is only ever replaced, so a new inode means a new generation
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature != self._current_signature:
+            try:
+                with open(current_path, encoding="utf-8") as f:
+                    current = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error("Could not read %s: %s", current_path, e)
+                return
+            if current.get("model_id") != self.model_id:
+                logger.warning(
+                    "Embedding cache at %s belongs to %r, not %r — ignoring it",
+                    self._dir, current.get("model_id"), self.model_id,
+                )
+                self._dir = None
+                return
+            if current["generation"] != self._generation:
+                self._generation = current["generation"]
+                self._dim = current["dim"]
+                self._rows, self._log_offset, self._disk_rows = {}, 0, 0
+                self._matrix = np.zeros((0, self._dim), dtype=np.float32)
+            self._current_signature = signature
+        self._read_log()
+
+    def _read_log(self):
+        """Apply the log lines appended since the last read, and remap the vectors."""
+        try:
+            with open(self._path(_KEYS_FILE, self._generation), "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            # Compacted away since current.json was read; the next refresh follows it
+            return
+        # A line still being written is picked up on a later refresh
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        for line in data[:end].splitlines():
+            entry = json.loads(line)
+            for offset, key in enumerate(entry["keys"]):
+                self._rows[key] = entry["row"] + offset
+            self._disk_rows = max(self._disk_rows, entry["row"] + len(entry["keys"]))
+        self._log_offset += end
+        try:
+            self._matrix = np.memmap(
+                self._path(_VECTORS_FILE, self._generation),
+                dtype=np.float32,
+                mode="r",
+                shape=(self._disk_rows, self._dim),
+            ) if self._disk_rows else np.zeros((0, self._dim), dtype=np.float32)
+        except (OSError, ValueError) as e:
+            logger.error("Could not map embedding cache vectors in %s: %s", self._dir, e)
+            self._rows, self._disk_rows = {}, 0
+            self._matrix = np.zeros((0, self._dim), dtype=np.float32)
+            return
+        logger.debug("Embedding cache: %d vectors mapped from %s", self._disk_rows, self._dir)
+
+    def _start_generation(self, generation: int, dim: int, keys: list, vectors: np.ndarray):
+        """Write a generation holding keys/vectors, point current.json at it and drop the old one."""
+        with open(self._path(_VECTORS_FILE, generation), "wb") as f:
+            f.write(vectors.astype(np.float32).tobytes())
+        with open(self._path(_KEYS_FILE, generation), "w", encoding="utf-8") as f:
+            if keys:
+                f.write(json.dumps({"row": 0, "keys": keys}) + "\n")
+
+        tmp_path = self._path(_CURRENT_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model_id": self.model_id, "dim": int(dim), "generation": generation}, f)
+        os.replace(tmp_path, self._path(_CURRENT_FILE))
+
+        previous = self._generation
+        if previous is not None and previous != generation:
+            # Readers still mapping the old files keep their pages until they switch
+            for name in (_VECTORS_FILE, _KEYS_FILE):
+                try:
+                    os.remove(self._path(name, previous))
+                except FileNotFoundError:
+                    pass
+        self._refresh_disk_index()
+
+    def _compact(self, keep: int):
+        """Start a new generation holding only the keep most recently added rows."""
+        kept = sorted(self._rows.items(), key=lambda item: item[1])[-keep:] if keep else []
+        vectors = (
+            np.asarray(self._matrix[[row for _, row in kept]])
+            if kept else np.zeros((0, self._dim), dtype=np.float32)
+        )
+        logger.info(
+            "Compacting embedding cache in %s: keeping %d of %d vectors",
+            self._dir, len(kept), self._disk_rows,
+        )
+        self._start_generation(self._generation + 1, self._dim, [key for key, _ in kept], vectors)
+
+    def _append_to_disk(self, keys: list, vectors: np.ndarray):
+        lock_file = open(self._path(_LOCK_FILE), "a")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._refresh_disk_index()
+            if not self._dir:
+                return
+
+            if self._dim is not None and vectors.shape[1] != self._dim:
+                logger.error(
+                    "Embedding width %d does not match cache width %d; not persisting",
+                    vectors.shape[1], self._dim,
+                )
+                return
+
+            new = {}
+            for key, vector in zip(keys, vectors):
+                if key not in self._rows:
+                    new[key] = vector
+            if not new:
+                return
+            new_keys = list(new)[-self.max_disk_rows:]
+
+            dim = vectors.shape[1]
+            if self._generation is None:
+                self._start_generation(1, dim, [], np.zeros((0, dim), dtype=np.float32))
+            elif self._disk_rows + len(new_keys) > self.max_disk_rows:
+                self._compact(min(self.max_disk_rows // 2, self.max_disk_rows - len(new_keys)))
+
+            row_bytes = dim * np.dtype(np.float32).itemsize
+            with open(self._path(_VECTORS_FILE, self._generation), "ab") as f:
+                # Rows are numbered from the file size, not the log, so an
+                # append that died before its log line can't shift them.
+                # Vectors land before the line that points at them, so a
+                # reader never sees a row that isn't on disk yet.
+                end = f.tell()
+                if end % row_bytes:
+                    f.write(b"\0" * (row_bytes - end % row_bytes))
+                first_row = -(-end // row_bytes)
+                f.write(np.stack([new[key] for key in new_keys]).astype(np.float32).tobytes())
+            with open(self._path(_KEYS_FILE, self._generation), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"row": first_row, "keys": new_keys}) + "\n")
+            self._refresh_disk_index()
+        except OSError as e:
+            logger.error("Could not persist embeddings to %s: %s", self._dir, e)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+
+def cache_from_env(model_id: str) -> EmbeddingCache:
+    """Build an EmbeddingCache from SKILLBRIDGE_EMBEDDING_CACHE_* environment variables."""
+    return EmbeddingCache(
+        model_id,
+        capacity=int(os.getenv("SKILLBRIDGE_EMBEDDING_CACHE_SIZE", "4096")),
+        cache_dir=os.getenv("SKILLBRIDGE_EMBEDDING_CACHE_DIR") or None,
+        read_only=os.getenv("SKILLBRIDGE_EMBEDDING_CACHE_READONLY", "").lower() in ("1", "true", "yes"),
+        max_disk_rows=int(os.getenv("SKILLBRIDGE_EMBEDDING_CACHE_MAX_ROWS", "100000")),
+    )
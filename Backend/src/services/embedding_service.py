@@ -1,9 +1,12 @@
 import os
 import logging
-from sentence_transformers import SentenceTransformer
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 from dotenv import load_dotenv
+from services.embedding_cache import cache_from_env, normalize_text
+from services.encode_batcher import encode_batcher_from_env
+from services.skill_index import load_index
+from services import onnx_embedding
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -11,28 +14,77 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+BACKENDS = ("torch", "onnx")
+
+
+def embedding_vectors_id(model_name: str, backend: str | None = None, quantized: bool | None = None) -> str:
+    """
+    Id of the vectors a model produces on a backend, for keying anything
+    that stores or depends on them.
+
+    int8 vectors differ slightly from fp32 ones, so the quantized ONNX model
+    gets its own id. backend and quantized default to the
+    SKILLBRIDGE_EMBEDDING_BACKEND / SKILLBRIDGE_ONNX_QUANTIZED settings
+    EmbeddingService loads with, so the id is known without loading the model.
+    """
+    backend = (backend or os.getenv("SKILLBRIDGE_EMBEDDING_BACKEND", "torch")).lower()
+    if backend != "onnx":
+        return model_name
+    if quantized is None:
+        quantized = onnx_embedding.quantized_from_env()
+    return f"{model_name}:int8" if quantized else model_name
+
+
 class EmbeddingService:
     """Service for generating and comparing text embeddings."""
     
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
+    def __init__(self, model_name='all-MiniLM-L6-v2', cache=None, skill_index=None, backend=None):
         """
         Initialize the embedding service with a specific model.
         
         Args:
             model_name (str): Name of the sentence-transformers model to use
+            cache (EmbeddingCache): Embedding cache to use; defaults to one
+                configured from SKILLBRIDGE_EMBEDDING_CACHE_* variables
+            skill_index (SkillEmbeddingIndex): Precomputed skill vectors to
+                consult first; defaults to the built index for model_name, if any
+            backend (str): "torch" (PyTorch) or "onnx" (onnxruntime export of
+                model_name); defaults to SKILLBRIDGE_EMBEDDING_BACKEND or "torch"
         """
+        self.backend = (backend or os.getenv("SKILLBRIDGE_EMBEDDING_BACKEND", "torch")).lower()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Embedding backend must be one of {', '.join(BACKENDS)}, got {self.backend!r}")
+
         try:
-            logger.info(f"Loading embedding model: {model_name}")
+            logger.info(f"Loading embedding model: {model_name} ({self.backend})")
             
-            # Force CPU usage to avoid CUDA/GPU memory issues
-            os.environ["CUDA_VISIBLE_DEVICES"] = "-1"  
-            self.model = SentenceTransformer(model_name, device="cpu")
+            if self.backend == "onnx":
+                # No torch import at all: onnxruntime + tokenizers only
+                self.model = onnx_embedding.encoder_from_env(model_name)
+            else:
+                from sentence_transformers import SentenceTransformer
+
+                # Force CPU usage to avoid CUDA/GPU memory issues
+                os.environ["CUDA_VISIBLE_DEVICES"] = "-1"  
+                self.model = SentenceTransformer(model_name, device="cpu")
             
             logger.info("Embedding model loaded successfully on CPU")
         except Exception as e:
             logger.error(f"Error loading embedding model: {str(e)}")
             raise
 
+        # Cache misses from concurrent requests are encoded together
+        self.encoder = encode_batcher_from_env(self.model)
+
+        # int8 vectors are cached apart from fp32 ones, and an index built
+        # with the fp32 model is not used for them
+        self.vectors_id = embedding_vectors_id(
+            model_name, self.backend, quantized=self.backend == "onnx" and self.model.quantized
+        )
+        self.cache = cache if cache is not None else cache_from_env(self.vectors_id)
+        self.skill_index = skill_index if skill_index is not None else load_index(self.vectors_id)
+        self.index_hits = 0
+
     def get_embedding(self, text):
         """
         Generate embeddings for a single text string.
@@ -47,11 +99,8 @@ class EmbeddingService:
             logger.warning(f"Invalid text for embedding: {type(text)}")
             return None
             
-        try:
-            return self.model.encode(text, show_progress_bar=False)
-        except Exception as e:
-            logger.error(f"Error generating embedding: {str(e)}")
-            return None
+        embeddings = self.get_embeddings([text])
+        return embeddings[0] if len(embeddings) else None
     
     def get_embeddings(self, texts):
         """
@@ -74,12 +123,48 @@ class EmbeddingService:
             logger.warning("No valid texts for embeddings")
             return np.array([])
             
-        try:
-            # Use smaller batch size and disable progress bar to reduce memory usage
-            return self.model.encode(valid_texts, batch_size=8, show_progress_bar=False)
-        except Exception as e:
-            logger.error(f"Error generating embeddings: {str(e)}")
-            return np.array([])
+        # Precomputed index first, then the cache, then the model
+        if self.skill_index is not None:
+            found, not_indexed = self.skill_index.lookup(valid_texts)
+            self.index_hits += len(found)
+        else:
+            found, not_indexed = {}, list(range(len(valid_texts)))
+
+        if not_indexed:
+            cached, still_missing = self.cache.lookup([valid_texts[i] for i in not_indexed])
+            found.update({not_indexed[j]: vector for j, vector in cached.items()})
+            missing = [not_indexed[j] for j in still_missing]
+        else:
+            missing = []
+
+        if missing:
+            # Encode each distinct cache miss once, batched with other callers' misses
+            to_encode = list(dict.fromkeys(normalize_text(valid_texts[i]) for i in missing))
+            try:
+                encoded = self.encoder.encode(to_encode)
+            except Exception as e:
+                logger.error(f"Error generating embeddings: {str(e)}")
+                return np.array([])
+
+            self.cache.store(to_encode, encoded)
+            by_text = dict(zip(to_encode, encoded))
+            for i in missing:
+                found[i] = by_text[normalize_text(valid_texts[i])]
+
+        return np.array([found[i] for i in range(len(valid_texts))], dtype=np.float32)
+
+    def cache_stats(self):
+        """
+        Hit/miss counters for the skill index and embedding cache.
+
+        Returns:
+            dict: index_hits, index_entries, plus the cache's hits, misses,
+                  disk_hits, hit_ratio, memory_entries, disk_entries
+        """
+        stats = self.cache.stats()
+        stats["index_hits"] = self.index_hits
+        stats["index_entries"] = len(self.skill_index) if self.skill_index is not None else 0
+        return stats
     
     def calculate_similarity(self, embedding1, embedding2):
         """
@@ -0,0 +1,146 @@
+"""
+Dynamic batching for embedding inference.
+
+After the skill index and the embedding cache, each request is left with
+a few short skill strings to encode. Encoding them per request wastes
+most of the model's throughput, because a batch of 5 costs nearly as much
+as a batch of 64. EncodeBatcher sits in front of the model (a
+SentenceTransformer or OnnxSentenceEncoder) and gives every concurrent
+caller one shared encode call:
+
+    - callers queue their texts and block on a future
+    - a batch is flushed once it holds max_batch distinct texts, or
+      max_wait_ms after its first caller arrived
+    - identical texts from different callers are encoded once
+    - each caller gets its own rows back, in its own order
+
+Batch sizes and the time callers wait for their flush are exported as
+skillbridge_embedding_batch_texts and skillbridge_embedding_queue_seconds.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from services.metrics import EMBEDDING_BATCH_TEXTS, EMBEDDING_QUEUE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class EncodeBatcher:
+    """Encodes texts from concurrent callers in shared, deduplicated model.encode calls."""
+
+    def __init__(self, model, max_batch: int = 64, max_wait_ms: float = 5.0, batch_size: int = 32):
+        """
+        Args:
+            model:       anything with encode(texts, batch_size=..., show_progress_bar=...)
+            max_batch:   distinct texts that trigger an immediate flush
+            max_wait_ms: longest a batch waits for more callers after the first arrives
+            batch_size:  model.encode batch size within a flush
+        """
+        if max_batch < 1 or batch_size < 1:
+            raise ValueError("max_batch and batch_size must be at least 1")
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def encode(self, texts: list) -> np.ndarray:
+        """
+        Encode texts in the next shared batch.
+
+        Returns:
+            one row per text, in order
+
+        Raises:
+            whatever model.encode raised on that batch
+        """
+        texts = list(texts)
+        if not texts:
+            return np.array([])
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EncodeBatcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+                self._thread.start()
+            self._queue.put((texts, future, time.perf_counter()))
+        return future.result()
+
+    def close(self):
+        """Flush the queued calls and stop the batching thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    # ------------------------------------------------------------------
+    # Batching thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            calls, distinct, stop = [first], set(first[0]), False
+            deadline = first[2] + self.max_wait
+            while len(distinct) < self.max_batch:
+                # Past the deadline, still take whatever is already queued
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                calls.append(item)
+                distinct.update(item[0])
+            self._flush(calls)
+            if stop:
+                return
+
+    def _flush(self, calls: list):
+        flushed = time.perf_counter()
+        for _, _, queued in calls:
+            EMBEDDING_QUEUE_SECONDS.observe(flushed - queued)
+
+        unique = list(dict.fromkeys(text for texts, _, _ in calls for text in texts))
+        EMBEDDING_BATCH_TEXTS.observe(len(unique))
+        try:
+            encoded = np.asarray(
+                self.model.encode(unique, batch_size=self.batch_size, show_progress_bar=False)
+            )
+        except Exception as exc:
+            for _, future, _ in calls:
+                future.set_exception(exc)
+            return
+
+        row = {text: i for i, text in enumerate(unique)}
+        for texts, future, _ in calls:
+            future.set_result(encoded[[row[text] for text in texts]])
+        logger.debug("Encoded %d distinct texts for %d calls", len(unique), len(calls))
+
+
+def encode_batcher_from_env(model) -> EncodeBatcher:
+    """Build an EncodeBatcher for model from SKILLBRIDGE_EMBEDDING_* environment variables."""
+    return EncodeBatcher(
+        model,
+        max_batch=int(os.getenv("SKILLBRIDGE_EMBEDDING_MAX_BATCH", "64")),
+        max_wait_ms=float(os.getenv("SKILLBRIDGE_EMBEDDING_MAX_WAIT_MS", "5")),
+        batch_size=int(os.getenv("SKILLBRIDGE_EMBEDDING_BATCH_SIZE", "32")),
+    )
@@ -0,0 +1,338 @@
+"""
+Local corpus of job postings for matching one resume against many jobs.
+
+Each posting is analysed once when it is added: its analyze_job_description
+output is stored, and its skills are embedded into a vocabulary that all
+postings share. A posting's profile vector is the weight-averaged unit
+embedding of its skills. An IVF index (services.ann_index) over those
+profiles shortlists postings for a resume in milliseconds, and the
+shortlist is re-ranked with EnhancedGapAnalyzer using the stored skill
+embeddings.
+
+On disk (default: models/job_store):
+
+    postings.jsonl   — one {id, title, meta, job_skills, skill_ids} per line
+    vocab.json       — model id and the skill strings, in row order
+    vocab.npy        — (n_skills, d) float32 skill embeddings
+    profiles.npy     — (n_postings, d) float32 profile vectors
+    ann/             — the IVF index over profiles
+
+Add postings (one JSON object per line with id, title and text):
+
+    cd Backend/src
+    python -m services.job_store add postings.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import time
+import numpy as np
+from services.ann_index import IVFIndex, normalize_rows, save_array
+from services.candidate_ranking import rank_candidates, summarize_match
+from services.embedding_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE_DIR = os.path.join(_SRC_DIR, "models", "job_store")
+
+_POSTINGS_FILE = "postings.jsonl"
+_VOCAB_FILE = "vocab.json"
+_VOCAB_VECTORS_FILE = "vocab.npy"
+_PROFILES_FILE = "profiles.npy"
+_ANN_DIR = "ann"
+
+
+def profile_vector(weights: list, vectors: np.ndarray) -> np.ndarray:
+    """
+    Weight-averaged unit embedding of a skill set.
+
+    Args:
+        weights: one weight per row of vectors
+        vectors: (n, d) skill embeddings
+
+    Returns:
+        (d,) unit vector; zeros when there are no skills
+    """
+    if not len(weights):
+        return np.zeros(vectors.shape[1] if vectors.ndim == 2 else 0, dtype=np.float32)
+    combined = np.asarray(weights, dtype=np.float32) @ normalize_rows(vectors)
+    return normalize_rows(combined)[0]
+
+
+class JobPostingStore:
+    """Job postings with cached skills, skill embeddings and an ANN index."""
+
+    def __init__(self, model_id: str, path: str | None = None):
+        """
+        Args:
+            model_id: embedding model the vectors come from; a store built
+                      with another model is ignored rather than mixed
+            path:     store directory (default: models/job_store)
+        """
+        self.model_id = model_id
+        self.path = path or DEFAULT_STORE_DIR
+        self.postings: list = []
+        self._rows: dict = {}
+        self.vocab: list = []
+        self._vocab_rows: dict = {}
+        self.vocab_vectors: np.ndarray | None = None
+        self.profiles: np.ndarray | None = None
+        self.index: IVFIndex | None = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def add(self, postings: list, analyze, embed) -> int:
+        """
+        Analyse, embed and store postings; an existing id is replaced.
+
+        Args:
+            postings: dicts with "id", "text" and optionally "title" and "meta"
+            analyze:  text -> {skill: weight}, e.g. analyze_job_description
+            embed:    list of skill strings -> (n, d) embeddings
+
+        Returns:
+            number of postings stored
+        """
+        analysed = []
+        for posting in postings:
+            job_skills = analyze(posting.get("text", ""))
+            if not job_skills:
+                logger.warning("Posting %s has no recognisable skills; skipping", posting.get("id"))
+                continue
+            analysed.append((posting, job_skills))
+        if not analysed:
+            return 0
+
+        # One embedding call for every skill the corpus hasn't seen yet
+        self._extend_vocab([skill for _, job_skills in analysed for skill in job_skills], embed)
+
+        base = np.zeros((0, self.vocab_vectors.shape[1]), dtype=np.float32) \
+            if self.profiles is None else np.array(self.profiles, dtype=np.float32)
+        appended = []
+        for posting, job_skills in analysed:
+            posting_id = str(posting["id"])
+            skill_ids = self._vocab_ids(list(job_skills))
+            record = {
+                "id": posting_id,
+                "title": posting.get("title", ""),
+                "meta": posting.get("meta", {}),
+                "job_skills": job_skills,
+                "skill_ids": skill_ids,
+            }
+            vector = profile_vector(list(job_skills.values()), self.vocab_vectors[skill_ids])
+
+            row = self._rows.get(posting_id)
+            if row is None:
+                self._rows[posting_id] = len(self.postings)
+                self.postings.append(record)
+                appended.append(vector)
+            else:
+                self.postings[row] = record
+                if row < len(base):
+                    base[row] = vector
+                else:
+                    appended[row - len(base)] = vector
+
+        self.profiles = np.vstack([base] + appended) if appended else base
+        self.rebuild_index()
+        return len(analysed)
+
+    def rebuild_index(self, nlist: int | None = None):
+        """Recluster the profile vectors (call after bulk changes)."""
+        if self.profiles is None or not len(self.profiles):
+            self.index = None
+            return
+        started = time.perf_counter()
+        self.index = IVFIndex.build(self.profiles, nlist=nlist)
+        logger.info("Indexed %d postings in %.2fs", len(self.postings), time.perf_counter() - started)
+
+    def save(self) -> str:
+        """Write the store to its directory."""
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = os.path.join(self.path, _POSTINGS_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self.postings:
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, os.path.join(self.path, _POSTINGS_FILE))
+        with open(os.path.join(self.path, _VOCAB_FILE), "w", encoding="utf-8") as f:
+            json.dump({"model_id": self.model_id, "skills": self.vocab}, f)
+        save_array(os.path.join(self.path, _VOCAB_VECTORS_FILE), self.vocab_vectors)
+        save_array(os.path.join(self.path, _PROFILES_FILE), self.profiles)
+        if self.index is not None:
+            self.index.save(os.path.join(self.path, _ANN_DIR))
+        logger.info("Saved %d postings to %s", len(self.postings), self.path)
+        return self.path
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def skill_embeddings(self, row: int) -> np.ndarray:
+        """Stored embeddings of a posting's skills, in job_skills order."""
+        return np.asarray(self.vocab_vectors[self.postings[row]["skill_ids"]], dtype=np.float32)
+
+    def shortlist(self, query: np.ndarray, k: int, nprobe: int = 16) -> list:
+        """(row, cosine similarity) of the k postings whose profiles are closest to query."""
+        if self.index is None:
+            return []
+        return self.index.search(query, k=k, nprobe=nprobe)
+
+    def match_resume(self, resume_skills: dict, analyzer, top_n: int = 10,
+                     shortlist_size: int | None = None, nprobe: int = 16) -> list:
+        """
+        Rank stored postings by how well a resume covers them.
+
+        The resume's profile vector shortlists postings through the ANN
+        index; each shortlisted posting is then compared skill by skill
+        with analyzer (an EnhancedGapAnalyzer) and ranked by weighted
+        coverage.
+
+        Args:
+            resume_skills:  {skill: weight} from analyze_resume
+            analyzer:       EnhancedGapAnalyzer using this store's model
+            top_n:          postings to return
+            shortlist_size: postings re-ranked (default: max(5 * top_n, 50))
+            nprobe:         IVF clusters scanned
+
+        Returns:
+            list of {rank, id, title, meta, coverage, matched, missing,
+            missing_skills, profile_similarity}, best first
+        """
+        if not resume_skills or not self.postings:
+            return []
+
+        resume_texts = list(resume_skills)
+        resume_vectors = analyzer.embed_skills(resume_texts)
+        query = profile_vector(list(resume_skills.values()), resume_vectors)
+        candidates = self.shortlist(query, shortlist_size or max(5 * top_n, 50), nprobe=nprobe)
+
+        entries = []
+        similarity = {}
+        for row, score in candidates:
+            posting = self.postings[row]
+            gaps = analyzer.identify_semantic_skill_gaps(
+                posting["job_skills"], resume_skills,
+                job_embeddings=self.skill_embeddings(row),
+                resume_embeddings=resume_vectors,
+            )
+            entries.append(summarize_match(posting["id"], posting["job_skills"], gaps))
+            similarity[posting["id"]] = score
+
+        results = []
+        for entry in rank_candidates(entries)[:top_n]:
+            posting_id = entry.pop("name")
+            posting = self.postings[self._rows[posting_id]]
+            results.append({
+                "id": posting_id,
+                "title": posting["title"],
+                "meta": posting["meta"],
+                **entry,
+                "profile_similarity": round(similarity[posting_id], 4),
+            })
+        return results
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _extend_vocab(self, skills: list, embed):
+        """Embed and add the skills that aren't in the vocabulary yet."""
+        new = [s for s in dict.fromkeys(normalize_text(s) for s in skills) if s not in self._vocab_rows]
+        if not new:
+            return
+        vectors = np.asarray(embed(new), dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(new):
+            raise RuntimeError(f"Embedding {len(new)} skills returned shape {vectors.shape}")
+        for skill in new:
+            self._vocab_rows[skill] = len(self.vocab)
+            self.vocab.append(skill)
+        self.vocab_vectors = vectors if self.vocab_vectors is None else \
+            np.vstack([self.vocab_vectors, vectors])
+
+    def _vocab_ids(self, skills: list) -> list:
+        return [self._vocab_rows[normalize_text(s)] for s in skills]
+
+    def _load(self):
+        vocab_path = os.path.join(self.path, _VOCAB_FILE)
+        if not os.path.exists(vocab_path):
+            logger.info("No job posting store at %s", self.path)
+            return
+        with open(vocab_path, encoding="utf-8") as f:
+            vocab = json.load(f)
+        if vocab.get("model_id") != self.model_id:
+            logger.warning(
+                "Job posting store at %s was built for %r, not %r — ignoring it",
+                self.path, vocab.get("model_id"), self.model_id,
+            )
+            return
+
+        self.vocab = vocab["skills"]
+        self._vocab_rows = {skill: row for row, skill in enumerate(self.vocab)}
+        self.vocab_vectors = np.load(os.path.join(self.path, _VOCAB_VECTORS_FILE), mmap_mode="r")
+        self.profiles = np.load(os.path.join(self.path, _PROFILES_FILE), mmap_mode="r")
+        with open(os.path.join(self.path, _POSTINGS_FILE), encoding="utf-8") as f:
+            self.postings = [json.loads(line) for line in f if line.strip()]
+        self._rows = {record["id"]: row for row, record in enumerate(self.postings)}
+
+        ann_path = os.path.join(self.path, _ANN_DIR)
+        if os.path.isdir(ann_path):
+            self.index = IVFIndex.load(ann_path)
+        else:
+            self.rebuild_index()
+        logger.info(
+            "Loaded job posting store: %d postings, %d skills from %s",
+            len(self.postings), len(self.vocab), self.path,
+        )
+
+
+def store_from_env(model_id: str) -> JobPostingStore:
+    """Open the store at SKILLBRIDGE_JOB_STORE (default: models/job_store)."""
+    return JobPostingStore(model_id, os.getenv("SKILLBRIDGE_JOB_STORE") or None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local job posting store.")
+    parser.add_argument("--store", default=None, help="store directory (default: models/job_store)")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="analyse and add postings from a JSON-lines file")
+    add.add_argument("input", help="file with one {id, title, text, meta} object per line")
+    commands.add_parser("info", help="print store statistics")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    from services.embedding_service import EmbeddingService, embedding_vectors_id
+
+    # Keyed like the API's store, so int8 ONNX vectors get a store of their own
+    store = JobPostingStore(embedding_vectors_id(args.model), args.store)
+
+    if args.command == "info":
+        print(json.dumps({
+            "path": store.path,
+            "model_id": store.model_id,
+            "postings": len(store),
+            "skills": len(store.vocab),
+            "ann_lists": store.index.nlist if store.index is not None else 0,
+        }, indent=2))
+        return
+
+    from services.optimized_job_analyzer import analyze_job_description
+
+    with open(args.input, encoding="utf-8") as f:
+        postings = [json.loads(line) for line in f if line.strip()]
+    embedding_service = EmbeddingService(args.model)
+    added = store.add(postings, analyze_job_description, embedding_service.get_embeddings)
+    store.save()
+    logger.info("Added %d of %d postings", added, len(postings))
+
+
+if __name__ == "__main__":
+    main()
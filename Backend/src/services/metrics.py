@@ -0,0 +1,229 @@
+"""
+Prometheus metrics for the analysis pipeline, served at GET /metrics.
+
+Latency histograms:
+
+    skillbridge_stage_seconds{stage}        one pipeline stage (see STAGES)
+    skillbridge_stage_queue_seconds{stage}  waiting for a StageExecutor slot
+    skillbridge_request_seconds{method,route,status}
+    skillbridge_nlp_batch_sentences         sentences per shared nlp.pipe call
+    skillbridge_embedding_batch_texts       distinct texts per shared encode call
+    skillbridge_embedding_queue_seconds     waiting for that encode call to start
+
+Counters fed as work happens:
+
+    skillbridge_llm_tokens_total{type}      prompt / completion tokens
+
+and values read from their owners at scrape time, so nothing has to keep
+them in sync:
+
+    skillbridge_cache_hits_total / _misses_total / _hit_ratio{cache,kind}
+    skillbridge_cache_entries{cache}
+    skillbridge_model_load_seconds{model}
+    skillbridge_stage_queue_depth{stage}
+
+Caches and executors register themselves with watch_cache() and
+watch_queues(). When PROMETHEUS_MULTIPROC_DIR is set (several uvicorn
+workers, or SKILLBRIDGE_EXECUTOR=process), prometheus_client keeps the
+histograms and counters in files in that directory and /metrics merges
+every process's values.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from services.model_lifecycle import models
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages, in the order a /jobs/jobAnalyzer request runs them
+STAGES = (
+    "pdf",             # PDF bytes -> text
+    "sentence_split",  # senter over the normalized text
+    "skillner",        # tagging and SkillNER matching of uncached sentences
+    "ner",             # custom NER model over the document's lines
+    "weighting",       # context weight of every extracted skill
+    "embedding",       # skill texts -> vectors
+    "matching",        # job x resume similarity and threshold
+    "llm",             # one learning-plan API call
+    "serialization",   # numpy -> JSON-safe response
+)
+
+# Sub-millisecond cache hits up to multi-second LLM calls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "skillbridge_stage_seconds", "Time spent in one pipeline stage",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+STAGE_QUEUE_SECONDS = Histogram(
+    "skillbridge_stage_queue_seconds", "Time a call waited for a free stage slot",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "skillbridge_request_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+# Items per shared model call
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+NLP_BATCH_SENTENCES = Histogram(
+    "skillbridge_nlp_batch_sentences", "Sentences tagged per shared nlp.pipe call",
+    buckets=BATCH_BUCKETS,
+)
+EMBEDDING_BATCH_TEXTS = Histogram(
+    "skillbridge_embedding_batch_texts", "Distinct texts per shared embedding encode call",
+    buckets=BATCH_BUCKETS,
+)
+EMBEDDING_QUEUE_SECONDS = Histogram(
+    "skillbridge_embedding_queue_seconds", "Time an encode call waited for its batch to flush",
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "skillbridge_llm_tokens", "Tokens used by learning-plan API calls", ["type"],
+)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record one run of stage that took seconds."""
+    STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time the with-block as one run of stage (also when it raises)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def count_llm_tokens(usage):
+    """Add an OpenAI response's usage (None if the server sent none)."""
+    if usage is None:
+        return
+    LLM_TOKENS.labels("prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_TOKENS.labels("completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+
+
+# ---------------------------------------------------------------------------
+# Scrape-time values
+# ---------------------------------------------------------------------------
+
+_caches: dict = {}   # cache name -> zero-argument stats function
+_queues: list = []   # zero-argument {stage: depth} functions
+
+
+def watch_cache(name: str, stats_fn):
+    """
+    Export a cache's counters under cache=name.
+
+    Args:
+        stats_fn: returns either {"hits", "misses", ...} for a single cache,
+                  or {kind: {"hits", "misses"}, ..., "entries": n} like
+                  ResultCache.stats(); None while the cache does not exist
+    """
+    _caches[name] = stats_fn
+
+
+def watch_queues(depths_fn):
+    """Export {stage: calls running or waiting}, e.g. StageExecutor.queue_depths."""
+    _queues.append(depths_fn)
+
+
+def _cache_kinds(name: str, stats: dict):
+    """Yield (kind, hits, misses) for either stats layout."""
+    if "hits" in stats:
+        yield name, stats["hits"], stats["misses"]
+        return
+    for kind, counts in stats.items():
+        if isinstance(counts, dict) and "hits" in counts:
+            yield kind, counts["hits"], counts["misses"]
+
+
+class _SnapshotCollector:
+    """Reads cache, model and queue state when Prometheus scrapes."""
+
+    def collect(self):
+        hits = CounterMetricFamily(
+            "skillbridge_cache_hits", "Cache lookups that found an entry", labels=["cache", "kind"])
+        misses = CounterMetricFamily(
+            "skillbridge_cache_misses", "Cache lookups that found nothing", labels=["cache", "kind"])
+        ratio = GaugeMetricFamily(
+            "skillbridge_cache_hit_ratio", "Hits / lookups since start", labels=["cache", "kind"])
+        entries = GaugeMetricFamily(
+            "skillbridge_cache_entries", "Entries held by a cache", labels=["cache"])
+
+        for name, stats_fn in list(_caches.items()):
+            try:
+                stats = stats_fn()
+            except Exception as e:
+                logger.warning("Could not read stats of cache %r: %s", name, e)
+                continue
+            if not stats:
+                continue
+            for kind, kind_hits, kind_misses in _cache_kinds(name, stats):
+                lookups = kind_hits + kind_misses
+                hits.add_metric([name, kind], kind_hits)
+                misses.add_metric([name, kind], kind_misses)
+                ratio.add_metric([name, kind], kind_hits / lookups if lookups else 0.0)
+            size = stats.get("entries", stats.get("memory_entries"))
+            if size is not None:
+                entries.add_metric([name], size)
+
+        load_seconds = GaugeMetricFamily(
+            "skillbridge_model_load_seconds", "Time a model took to load", labels=["model"])
+        for name, status in models.status().items():
+            if status["load_seconds"] is not None:
+                load_seconds.add_metric([name], status["load_seconds"])
+
+        depth = GaugeMetricFamily(
+            "skillbridge_stage_queue_depth", "Calls running or waiting per stage", labels=["stage"])
+        for depths_fn in _queues:
+            for stage, pending in depths_fn().items():
+                depth.add_metric([stage], pending)
+
+        return [hits, misses, ratio, entries, load_seconds, depth]
+
+
+REGISTRY.register(_SnapshotCollector())
+
+
+def render() -> tuple[bytes, str]:
+    """
+    The /metrics payload and its content type.
+
+    In multiprocess mode the histograms and counters come from every
+    process's files; the snapshot values are this process's.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(_SnapshotCollector())
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Drop an exited worker's live gauges from the multiprocess files, if in use."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
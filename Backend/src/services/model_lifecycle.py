@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelLoadError(RuntimeError):
+    """Raised by ModelLifecycleManager.get when a model failed to load."""
+
+
+class _ModelSlot:
+    def __init__(self, name: str, loader, depends_on: tuple, preload: bool = True):
+        self.name = name
+        self.loader = loader
+        self.depends_on = depends_on
+        self.preload = preload
+        self.state = PENDING
+        self.value = None
+        self.error: str | None = None
+        self.seconds: float | None = None
+        self.done = threading.Event()
+
+
+class ModelLifecycleManager:
+    """
+    Loads the heavy models once, either up front in background threads or
+    lazily on first use.
+
+    Each model is registered with a zero-argument loader. ``start()`` runs
+    every loader in its own thread so independent models load concurrently;
+    a loader that needs another model simply calls ``get()`` for it and
+    waits. ``get()`` also works without ``start()``, loading on demand in
+    the calling thread, so scripts and worker processes stay lazy.
+
+    Models registered with ``preload=False`` are only ever loaded by
+    ``get()`` and do not count towards readiness.
+    """
+
+    def __init__(self):
+        self._slots: dict = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader, depends_on: tuple = (), preload: bool = True):
+        """
+        Register a loader. Re-registering a name that hasn't loaded yet replaces it.
+
+        Args:
+            preload: False keeps the model out of start() and is_ready(); it
+                     loads on first get() only
+        """
+        with self._lock:
+            existing = self._slots.get(name)
+            if existing is not None and existing.state != PENDING:
+                raise ValueError(f"Model '{name}' is already {existing.state}")
+            self._slots[name] = _ModelSlot(name, loader, tuple(depends_on), preload)
+
+    def start(self):
+        """Begin loading every pending preloaded model in a background thread; returns immediately."""
+        for name, slot in list(self._slots.items()):
+            if slot.preload and self._claim(name):
+                threading.Thread(
+                    target=self._load, args=(name,), name=f"load-{name}", daemon=True
+                ).start()
+
+    def load_all(self, skip: tuple = ()):
+        """
+        Load every pending preloaded model in the calling thread, in
+        registration order. Unlike start() this creates no threads, so it
+        can run in a process that is about to fork. Failures are recorded
+        in status() rather than raised.
+
+        Args:
+            skip: names to leave pending, for each process to load itself
+        """
+        for name, slot in list(self._slots.items()):
+            if slot.preload and name not in skip and slot.state == PENDING:
+                try:
+                    self.get(name)
+                except ModelLoadError:
+                    pass
+
+    def get(self, name: str, timeout: float | None = None):
+        """
+        Return the loaded model, loading it now if nobody has started it yet.
+
+        Raises:
+            KeyError:       name was never registered
+            ModelLoadError: the loader raised
+            TimeoutError:   timeout elapsed while another thread was loading it
+        """
+        slot = self._slots[name]
+        if self._claim(name):
+            self._load(name)
+        if not slot.done.wait(timeout):
+            raise TimeoutError(f"Model '{name}' still loading after {timeout}s")
+        if slot.state == FAILED:
+            raise ModelLoadError(f"Model '{name}' failed to load: {slot.error}")
+        return slot.value
+
+    def is_ready(self) -> bool:
+        """True once every preloaded model has loaded successfully."""
+        return all(slot.state == READY for slot in self._slots.values() if slot.preload)
+
+    def status(self) -> dict:
+        """Per-model state, load time in seconds and error message, if any."""
+        return {
+            name: {
+                "state": slot.state,
+                "preload": slot.preload,
+                "load_seconds": round(slot.seconds, 3) if slot.seconds is not None else None,
+                "depends_on": list(slot.depends_on),
+                "error": slot.error,
+            }
+            for name, slot in self._slots.items()
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _claim(self, name: str) -> bool:
+        """Mark a pending model as loading; False if someone else already has."""
+        with self._lock:
+            slot = self._slots[name]
+            if slot.state != PENDING:
+                return False
+            slot.state = LOADING
+            return True
+
+    def _load(self, name: str):
+        slot = self._slots[name]
+        logger.info("Loading model '%s'…", name)
+        started = time.perf_counter()
+        try:
+            slot.value = slot.loader()
+            slot.state = READY
+        except Exception as e:
+            slot.error = f"{type(e).__name__}: {e}"
+            slot.state = FAILED
+            logger.error("Model '%s' failed to load: %s", name, slot.error)
+        finally:
+            slot.seconds = time.perf_counter() - started
+            slot.done.set()
+        if slot.state == READY:
+            logger.info("Model '%s' ready in %.1fs", name, slot.seconds)
+
+
+# Process-wide registry; services register their loaders at import time
+models = ModelLifecycleManager()
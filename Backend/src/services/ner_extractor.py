@@ -0,0 +1,172 @@
+"""
+Skill extraction with the custom SpaCy NER model in models/model-best.
+
+The model was trained on data/dev.spacy with data/config.cfg. It is a
+tok2vec + ner pipeline that tags SKILL entities directly. It has no
+static vectors, tagger or parser, and needs neither en_core_web_lg nor
+SkillNER, so it loads and tags far faster than the default extractor.
+Documents are split into lines and tagged in batches with nlp.pipe. Job
+skills are weighted by their context exactly as the SkillNER extractor
+weights them (services/skill_context.py).
+
+Requests choose it with extractor=ner on /jobs/jobAnalyzer;
+SKILLBRIDGE_EXTRACTOR=ner makes it the default. Compare both extractors
+on data/dev.json with `python -m benchmarks.extractor_eval`.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import time
+
+from services import metrics, profiling
+from services.model_lifecycle import models
+from services.skill_context import normalize_document, skill_weight
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODEL_DIR = os.path.join(_SRC_DIR, "models", "model-best")
+
+EXTRACTORS = ("skillner", "ner")
+SKILL_LABEL = "SKILL"
+# The only components extraction runs; anything else in the package is disabled
+_PIPES = ("tok2vec", "ner")
+
+# Bump when a change to this module alters analyze_* output
+NER_EXTRACTOR_VERSION = 2
+
+
+def default_extractor() -> str:
+    """Extractor used when a request doesn't choose one: SKILLBRIDGE_EXTRACTOR, "skillner" by default."""
+    name = os.getenv("SKILLBRIDGE_EXTRACTOR", "skillner").strip().lower()
+    if name not in EXTRACTORS:
+        raise ValueError(f"SKILLBRIDGE_EXTRACTOR must be one of {', '.join(EXTRACTORS)}, got {name!r}")
+    return name
+
+
+def model_path() -> str:
+    return os.getenv("SKILLBRIDGE_NER_MODEL") or DEFAULT_MODEL_DIR
+
+
+def load_ner(path: str | None = None):
+    """Load the NER pipeline with every component but tok2vec and ner disabled."""
+    import spacy
+
+    path = path or model_path()
+    logger.info("Loading NER skill model from %s...", path)
+    nlp = spacy.load(path)
+    if "ner" not in nlp.pipe_names or SKILL_LABEL not in nlp.get_pipe("ner").labels:
+        raise ValueError(f"{path} has no ner component with a {SKILL_LABEL} label")
+    for name in nlp.pipe_names:
+        if name not in _PIPES:
+            nlp.disable_pipe(name)
+    return nlp
+
+
+class NerSkillExtractor:
+    """analyze_job_description / analyze_resume on top of a SKILL NER pipeline."""
+
+    def __init__(self, nlp, batch_size: int = 64):
+        """
+        Args:
+            nlp:        pipeline from load_ner()
+            batch_size: lines per nlp.pipe batch
+        """
+        self.nlp = nlp
+        self.batch_size = batch_size
+
+    def _skill_spans(self, text: str):
+        """(skill, doc, token indices) for every SKILL entity, line by line."""
+        lines = [line for line in text.split("\n") if line.strip()]
+        with metrics.stage_timer("ner"):
+            docs = list(self.nlp.pipe(lines, batch_size=self.batch_size))
+        for doc in docs:
+            for ent in doc.ents:
+                skill = ent.text.strip().lower()
+                if ent.label_ == SKILL_LABEL and skill:
+                    yield skill, doc, list(range(ent.start, ent.end))
+
+    def analyze_job_description(self, text: str) -> dict:
+        """
+        Extract and weight skills from job description text.
+
+        Returns:
+            dict: skill -> highest context weight it appears with
+        """
+        if not text:
+            logger.warning("Empty job description text provided")
+            return {}
+
+        text = normalize_document(text)
+        spans = list(self._skill_spans(text))
+        started = time.perf_counter()
+        skill_weights = {}
+        for skill, doc, indices in spans:
+            skill_weights[skill] = max(skill_weights.get(skill, 0.0), skill_weight(doc, indices))
+        metrics.observe_stage("weighting", time.perf_counter() - started)
+
+        profiling.annotate("job_description", characters=len(text), skills=len(skill_weights))
+        logger.info("NER found %d skills in the job description", len(skill_weights))
+        return skill_weights
+
+    def analyze_resume(self, resume_text: str) -> dict:
+        """
+        Extract skills from a resume.
+
+        Returns:
+            dict: skill -> 1.0
+        """
+        if not resume_text or not isinstance(resume_text, str):
+            logger.error(f"Invalid resume text: {type(resume_text)}")
+            return {}
+
+        resume_text = normalize_document(resume_text)
+        resume_skills = {skill: 1.0 for skill, _, _ in self._skill_spans(resume_text)}
+        profiling.annotate("resume", characters=len(resume_text), skills=len(resume_skills))
+        logger.info("NER found %d skills in the resume", len(resume_skills))
+        return resume_skills
+
+
+@functools.lru_cache(maxsize=None)
+def extractor_version() -> str:
+    """
+    Fingerprint of everything that shapes this extractor's output (this
+    module, SpaCy and the model's meta.json), without loading the model.
+    Used to key cached extraction results.
+    """
+    import spacy
+
+    meta_path = os.path.join(model_path(), "meta.json")
+    try:
+        with open(meta_path, "rb") as f:
+            meta = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        meta = None
+    parts = {"ner": NER_EXTRACTOR_VERSION, "spacy": spacy.__version__, "meta": meta}
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+# Loaded in the background at startup only when it is the default extractor;
+# otherwise on the first extractor=ner request
+models.register(
+    "ner",
+    lambda: NerSkillExtractor(load_ner(), int(os.getenv("SKILLBRIDGE_NER_BATCH_SIZE", "64"))),
+    preload=default_extractor() == "ner",
+)
+
+
+def get_ner_extractor() -> NerSkillExtractor:
+    """Return the shared NER extractor, waiting for it to finish loading if necessary."""
+    return models.get("ner")
+
+
+def analyze_job_description(text):
+    """Public function: job description skills and weights from the NER model."""
+    return get_ner_extractor().analyze_job_description(text)
+
+
+def analyze_resume(text):
+    """Public function: resume skills from the NER model."""
+    return get_ner_extractor().analyze_resume(text)
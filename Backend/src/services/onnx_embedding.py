@@ -0,0 +1,382 @@
+"""
+ONNX Runtime inference for sentence-transformers models.
+
+EmbeddingService normally runs the model through PyTorch. Importing torch
+alone takes seconds and a few hundred MB in every worker. This module
+exports the transformer once to ONNX, optionally with int8 dynamic
+quantization, and serves it with onnxruntime and the `tokenizers` library.
+Pooling and normalisation are redone in NumPy. No torch import is needed
+at serving time. The export writes:
+
+    model.onnx       — fp32 graph: token ids → last hidden state
+    model.int8.onnx  — the same graph with int8 weights (unless --no-quantize)
+    tokenizer.json   — the model's fast tokenizer
+    onnx.json        — model id, pooling, normalisation, max length, inputs
+
+Export (needs torch, sentence-transformers, onnx and onnxruntime). The
+embeddings are then compared with PyTorch's on the skills in
+data/skills.json, and the command fails if any cosine is below 0.99:
+
+    cd Backend/src
+    python -m services.onnx_embedding --model all-MiniLM-L6-v2
+    python -m services.onnx_embedding --model models/fine_tuned_sentence_transformer
+
+Serve it with SKILLBRIDGE_EMBEDDING_BACKEND=onnx.
+"""
+import argparse
+import json
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ONNX_DIR = os.path.join(_SRC_DIR, "models", "onnx")
+DEFAULT_SKILLS_JSON = os.path.join(_SRC_DIR, "..", "data", "skills.json")
+
+_MODEL_FILE = "model.onnx"
+_QUANTIZED_FILE = "model.int8.onnx"
+_TOKENIZER_FILE = "tokenizer.json"
+_META_FILE = "onnx.json"
+
+POOLING_MODES = ("mean", "cls", "max")
+MIN_COSINE = 0.99
+
+# Sentences checked alongside the skills, so the check also covers longer inputs
+ACCURACY_SENTENCES = [
+    "Experience building REST APIs in Python with FastAPI or Flask.",
+    "Deployed containerised services to Kubernetes on AWS and monitored them with Prometheus.",
+    "Strong communication skills and experience mentoring junior engineers.",
+    "Designed ETL pipelines in Apache Spark and maintained a PostgreSQL data warehouse.",
+    "Trained and evaluated machine learning models with scikit-learn and PyTorch.",
+]
+
+
+def model_dir(model_name: str, root: str | None = None) -> str:
+    """Export directory of model_name: SKILLBRIDGE_ONNX_DIR, or models/onnx/<model basename>."""
+    if root is None and os.getenv("SKILLBRIDGE_ONNX_DIR"):
+        return os.getenv("SKILLBRIDGE_ONNX_DIR")
+    return os.path.join(root or DEFAULT_ONNX_DIR, os.path.basename(os.path.normpath(model_name)))
+
+
+# ---------------------------------------------------------------------------
+# Pooling (the NumPy counterpart of sentence-transformers' Pooling / Normalize)
+# ---------------------------------------------------------------------------
+
+def pool(hidden: np.ndarray, attention_mask: np.ndarray, mode: str = "mean") -> np.ndarray:
+    """
+    Reduce token embeddings to one vector per text.
+
+    Args:
+        hidden:         (batch, tokens, dim) last hidden state
+        attention_mask: (batch, tokens) 1 for real tokens, 0 for padding
+        mode:           "mean", "cls" or "max"
+
+    Returns:
+        (batch, dim) float32 array
+    """
+    if mode == "cls":
+        return hidden[:, 0].astype(np.float32)
+    mask = attention_mask[:, :, None].astype(hidden.dtype)
+    if mode == "mean":
+        summed = (hidden * mask).sum(axis=1)
+        return (summed / np.clip(mask.sum(axis=1), 1e-9, None)).astype(np.float32)
+    if mode == "max":
+        return np.where(mask > 0, hidden, -1e9).max(axis=1).astype(np.float32)
+    raise ValueError(f"pooling mode must be one of {', '.join(POOLING_MODES)}, got {mode!r}")
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise each row, leaving all-zero rows at zero."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+# ---------------------------------------------------------------------------
+# Serving
+# ---------------------------------------------------------------------------
+
+class OnnxSentenceEncoder:
+    """SentenceTransformer-compatible encode() backed by onnxruntime."""
+
+    def __init__(self, path: str, model_id: str | None = None, quantized: bool = True,
+                 threads: int = 0):
+        """
+        Args:
+            path:      export directory written by export()
+            model_id:  expected model name; a mismatch raises ValueError
+            quantized: serve model.int8.onnx rather than model.onnx
+            threads:   onnxruntime intra-op threads; 0 lets onnxruntime decide
+        """
+        meta_path = os.path.join(path, _META_FILE)
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(
+                f"No ONNX export at {path}; build it with `python -m services.onnx_embedding`"
+            )
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if model_id is not None and meta["model_id"] != model_id:
+            raise ValueError(f"ONNX export at {path} is for {meta['model_id']!r}, not {model_id!r}")
+        if quantized and not meta.get("quantized"):
+            raise FileNotFoundError(f"ONNX export at {path} has no quantized model; re-export without --no-quantize")
+
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.path = path
+        self.model_id = meta["model_id"]
+        self.pooling = meta["pooling"]
+        self.normalize = meta["normalize"]
+        self.dimension = meta["dimension"]
+        self.quantized = quantized
+        self._inputs = meta["inputs"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(path, _TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=meta["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=meta["pad_id"], pad_token=meta["pad_token"])
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        model_file = os.path.join(path, _QUANTIZED_FILE if quantized else _MODEL_FILE)
+        self.session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        logger.info(
+            "Loaded ONNX embedding model %s (%s, %s threads) from %s",
+            self.model_id, "int8" if quantized else "fp32", threads or "default", model_file,
+        )
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        """
+        Embed sentences like SentenceTransformer.encode (numpy output).
+
+        Texts are batched longest first, as sentence-transformers does, so
+        each batch pads to a similar length.
+
+        Returns:
+            (len(sentences), dimension) float32 array
+        """
+        if isinstance(sentences, str):
+            return self.encode([sentences], batch_size=batch_size)[0]
+        if not sentences:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        order = np.argsort([-len(s) for s in sentences], kind="stable")
+        out = np.empty((len(sentences), self.dimension), dtype=np.float32)
+        for start in range(0, len(sentences), batch_size):
+            batch = order[start:start + batch_size]
+            out[batch] = self._encode_batch([sentences[i] for i in batch])
+        return out
+
+    def _encode_batch(self, texts: list) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: feeds[name] for name in self._inputs})[0]
+        vectors = pool(hidden, feeds["attention_mask"], self.pooling)
+        return normalize(vectors) if self.normalize else vectors
+
+
+def quantized_from_env() -> bool:
+    """Whether SKILLBRIDGE_ONNX_QUANTIZED selects the int8 model (the default)."""
+    return os.getenv("SKILLBRIDGE_ONNX_QUANTIZED", "true").lower() in ("1", "true", "yes")
+
+
+def encoder_from_env(model_name: str) -> OnnxSentenceEncoder:
+    """Build an OnnxSentenceEncoder from SKILLBRIDGE_ONNX_* environment variables."""
+    return OnnxSentenceEncoder(
+        model_dir(model_name),
+        model_id=model_name,
+        quantized=quantized_from_env(),
+        threads=int(os.getenv("SKILLBRIDGE_ONNX_THREADS", "0")),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Accuracy check
+# ---------------------------------------------------------------------------
+
+def check_accuracy(reference, candidate, texts: list, min_cosine: float = MIN_COSINE) -> dict:
+    """
+    Compare candidate's embeddings of texts with reference's.
+
+    Args:
+        reference:  model with a SentenceTransformer-style encode(), e.g. PyTorch
+        candidate:  model to check, e.g. an OnnxSentenceEncoder
+        texts:      inputs to embed with both
+        min_cosine: lowest acceptable cosine similarity for any text
+
+    Returns:
+        dict: texts, min_cosine, mean_cosine, worst (the text with the lowest
+              cosine) and passed
+    """
+    expected = np.asarray(reference.encode(texts, show_progress_bar=False), dtype=np.float32)
+    actual = np.asarray(candidate.encode(texts, show_progress_bar=False), dtype=np.float32)
+    cosines = (normalize(expected) * normalize(actual)).sum(axis=1)
+    worst = int(np.argmin(cosines))
+    return {
+        "texts": len(texts),
+        "min_cosine": round(float(cosines[worst]), 6),
+        "mean_cosine": round(float(cosines.mean()), 6),
+        "worst": texts[worst],
+        "passed": bool(cosines[worst] >= min_cosine),
+    }
+
+
+def accuracy_texts(skills_json: str = DEFAULT_SKILLS_JSON, limit: int = 500) -> list:
+    """Skill names and related terms from data/skills.json, plus ACCURACY_SENTENCES."""
+    from services.skill_index import collect_skill_strings
+
+    skills = collect_skill_strings(skills_json=skills_json) if os.path.exists(skills_json) else []
+    return skills[:limit] + ACCURACY_SENTENCES
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def _pooling_mode(pooling) -> str:
+    """The single pooling mode of a sentence-transformers Pooling module."""
+    config = pooling.get_config_dict()
+    if "pooling_mode" in config:
+        modes = [config["pooling_mode"]]
+    else:
+        flags = {"pooling_mode_mean_tokens": "mean", "pooling_mode_cls_token": "cls",
+                 "pooling_mode_max_tokens": "max"}
+        modes = [mode for key, mode in flags.items() if config.get(key)]
+        if any(v for k, v in config.items() if k.startswith("pooling_mode_") and k not in flags):
+            modes.append("unsupported")
+    if len(modes) != 1 or modes[0] not in POOLING_MODES:
+        raise ValueError(f"Only single {'/'.join(POOLING_MODES)} pooling can be exported, got {config}")
+    return modes[0]
+
+
+def _describe(model) -> dict:
+    """Pooling, normalisation and dimension of a SentenceTransformer's modules."""
+    names = [type(module).__name__ for module in model]
+    if names[0] != "Transformer" or "Pooling" not in names:
+        raise ValueError(f"Expected Transformer → Pooling [→ Normalize] modules, got {names}")
+    unsupported = [n for n in names if n not in ("Transformer", "Pooling", "Normalize")]
+    if unsupported:
+        raise ValueError(f"Cannot export modules {unsupported}; only Transformer, Pooling and Normalize")
+    pooling = model[names.index("Pooling")]
+    return {
+        "pooling": _pooling_mode(pooling),
+        "normalize": "Normalize" in names,
+        "dimension": int(model.get_sentence_embedding_dimension()),
+        "max_seq_length": int(model.max_seq_length),
+    }
+
+
+def export(model_name: str, output_dir: str | None = None, quantize: bool = True,
+           opset: int = 17) -> str:
+    """
+    Export a sentence-transformers model to ONNX in output_dir.
+
+    Args:
+        model_name: sentence-transformers model name or local path
+        output_dir: export directory; defaults to model_dir(model_name)
+        quantize:   also write an int8 dynamically quantized copy
+        opset:      ONNX opset version
+
+    Returns:
+        output_dir
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = output_dir or model_dir(model_name)
+    model = SentenceTransformer(model_name, device="cpu")
+    meta = {"model_id": model_name, **_describe(model)}
+
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    inputs = [name for name in ("input_ids", "attention_mask", "token_type_ids")
+              if name in tokenizer.model_input_names]
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *tensors):
+            return self.transformer(**dict(zip(inputs, tensors))).last_hidden_state
+
+    os.makedirs(output_dir, exist_ok=True)
+    sample = tokenizer(["a sample sentence", "another"], padding=True, return_tensors="pt")
+    model_path = os.path.join(output_dir, _MODEL_FILE)
+    axes = {name: {0: "batch", 1: "tokens"} for name in inputs}
+    axes["last_hidden_state"] = {0: "batch", 1: "tokens"}
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(),
+            tuple(sample[name] for name in inputs),
+            model_path,
+            input_names=inputs,
+            output_names=["last_hidden_state"],
+            dynamic_axes=axes,
+            opset_version=opset,
+            dynamo=False,
+        )
+    logger.info("Exported %s to %s (%.1f MB)", model_name, model_path, os.path.getsize(model_path) / 1e6)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = os.path.join(output_dir, _QUANTIZED_FILE)
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8, per_channel=True)
+        logger.info("Quantized to int8: %s (%.1f MB)", quantized_path, os.path.getsize(quantized_path) / 1e6)
+
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, _TOKENIZER_FILE))
+    meta.update(
+        inputs=inputs,
+        pad_id=tokenizer.pad_token_id,
+        pad_token=tokenizer.pad_token,
+        quantized=quantize,
+        opset=opset,
+    )
+    with open(os.path.join(output_dir, _META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return output_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a sentence-transformers model to ONNX.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model name or path")
+    parser.add_argument("--output", default=None, help="export directory (default models/onnx/<model>)")
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8 copy")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime threads for the check")
+    parser.add_argument("--skills-json", default=DEFAULT_SKILLS_JSON, help="texts for the accuracy check")
+    parser.add_argument("--min-cosine", type=float, default=MIN_COSINE)
+    parser.add_argument("--skip-check", action="store_true", help="do not compare with PyTorch")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    output_dir = export(args.model, args.output, quantize=not args.no_quantize, opset=args.opset)
+    if args.skip_check:
+        return 0
+
+    from sentence_transformers import SentenceTransformer
+    reference = SentenceTransformer(args.model, device="cpu")
+    texts = accuracy_texts(args.skills_json)
+    status = 0
+    for quantized in ([False, True] if not args.no_quantize else [False]):
+        encoder = OnnxSentenceEncoder(output_dir, quantized=quantized, threads=args.threads)
+        report = check_accuracy(reference, encoder, texts, min_cosine=args.min_cosine)
+        label = "int8" if quantized else "fp32"
+        print(f"{label}: {json.dumps(report)}")
+        if not report["passed"]:
+            logger.error("%s embeddings fall below cosine %.2f (worst: %r)",
+                         label, args.min_cosine, report["worst"])
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,60 +1,252 @@
-import re
-import traceback
+import functools
+import hashlib
+import json
+import threading
+import time
 import spacy
 import logging
 from spacy.matcher import PhraseMatcher
-from skillNer.general_params import SKILL_DB
+from spacy.pipeline import Sentencizer
+from skillNer.cleaner import Cleaner, find_index_phrase, stem_text
+from skillNer.general_params import S_GRAM_REDUNDANT, SKILL_DB
+from skillNer.matcher_class import SkillsGetter
 from skillNer.skill_extractor_class import SkillExtractor
+from skillNer.text_class import Text, Word
+from skillNer.utils import Utils
+from services import metrics, profiling, skill_automaton, skillner_snapshot
+from services.model_lifecycle import models
+from services.ner_extractor import default_extractor
+from services.pipe_batcher import batcher_from_env
+from services.sentence_cache import sentence_cache_from_env, sentence_cache_path
+from services.skill_context import normalize_document, skill_weight
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Components of en_core_web_lg that the extractor never reads: sentence
+# boundaries come from the (much cheaper) senter, and SkillNER only needs
+# lemmas and stop-word flags, not dependency arcs or entities.
+_EXCLUDED_PIPES = ["parser", "ner"]
+
+# The same cleaning SkillNER's Text applies before tokenising a sentence
+_skillner_cleaner = Cleaner(
+    include_cleaning_functions=["remove_punctuation", "remove_extra_space"],
+    to_lowercase=False,
+)
+
+
+class _ParsedText(Text):
+    """
+    SkillNER ``Text`` built from an already-tagged Doc.
+
+    ``Text.__init__`` runs the whole SpaCy pipeline on the cleaned sentence
+    itself; this variant takes that Doc from the extractor's batched
+    ``nlp.pipe`` pass so the sentence is only ever tagged once.
+    """
+
+    def __init__(self, text: str, doc):
+        self.immutable_text = text
+        self.abv_text = _skillner_cleaner(text)
+        self.transformed_text = self.abv_text.lower()
+
+        self.list_words = []
+        for token in doc:
+            word = Word(token.text)
+            word.lemmed = token.lemma_
+            word.stemmed = stem_text(token.text)
+            word.is_stop_word = token.is_stop
+            if token.is_stop:
+                word.is_matchable = False
+            self.list_words.append(word)
+
+        for redundant_word in S_GRAM_REDUNDANT:
+            for index in find_index_phrase(phrase=redundant_word, text=self.transformed_text):
+                self[index].is_matchable = False
+
+
+def load_nlp():
+    """Load en_core_web_lg without the components the extractor never reads."""
+    logger.info("Loading SpaCy model...")
+    return spacy.load("en_core_web_lg", exclude=_EXCLUDED_PIPES)
+
+
+def _build_skill_extractor(nlp) -> SkillExtractor:
+    """
+    Create SkillNER's extractor, reusing the prebuilt matcher snapshot when it
+    matches this SpaCy/SkillNER/SKILL_DB version and rebuilding otherwise.
+    """
+    matchers = skillner_snapshot.load_snapshot(
+        nlp.vocab, skillner_snapshot.snapshot_version(nlp, SKILL_DB)
+    )
+    if matchers is None:
+        return SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
+
+    # Same state SkillExtractor.__init__ sets up, minus the matcher rebuild
+    extractor = SkillExtractor.__new__(SkillExtractor)
+    extractor.tranlsator_func = False
+    extractor.nlp = nlp
+    extractor.skills_db = SKILL_DB
+    extractor.phraseMatcher = PhraseMatcher
+    extractor.matchers = matchers
+    return extractor
+
+
 class SkillExtractorSingleton:
     """
     Singleton class to ensure NLP model and skill extractor are loaded only once.
     """
     _instance = None
+    _instance_lock = threading.Lock()
     
-    def __new__(cls):
-        if cls._instance is None:
-            logger.info("Creating new SkillExtractorSingleton instance")
-            cls._instance = super(SkillExtractorSingleton, cls).__new__(cls)
-            cls._instance.initialize()
+    def __new__(cls, nlp=None):
+        with cls._instance_lock:
+            if cls._instance is None:
+                logger.info("Creating new SkillExtractorSingleton instance")
+                instance = super(SkillExtractorSingleton, cls).__new__(cls)
+                instance.initialize(nlp)
+                cls._instance = instance
         return cls._instance
     
-    def initialize(self):
-        """Load the NLP model and initialize the skill extractor once."""
-        logger.info("Loading SpaCy model and SkillNER extractors...")
-        self.nlp = spacy.load("en_core_web_lg")
-        self.skill_extractor = SkillExtractor(self.nlp, SKILL_DB, PhraseMatcher)
-        logger.info("SpaCy model and SkillNER extractors loaded successfully")
+    def initialize(self, nlp=None):
+        """
+        Initialize the skill extractor once.
+
+        Args:
+            nlp: an already-loaded SpaCy pipeline from load_nlp(); loaded here if None
+        """
+        self.nlp = nlp if nlp is not None else load_nlp()
+
+        # senter ships disabled in the en_core_web_* packages. Keep it that
+        # way so nlp.pipe() only tags, and call it directly for sentence splits.
+        if "senter" in self.nlp.component_names:
+            self.sentence_splitter = self.nlp.get_pipe("senter")
+        else:
+            self.sentence_splitter = Sentencizer()
+
+        self.matcher = skill_automaton.matcher_name()
+        if self.matcher == "automaton":
+            logger.info("Compiling the skill automaton...")
+            self.automaton = skill_automaton.build_automaton(
+                SKILL_DB, self.nlp.make_doc, clean=_skillner_cleaner
+            )
+            self.skill_extractor = None
+        else:
+            logger.info("Building SkillNER extractors...")
+            self.automaton = None
+            self.skill_extractor = _build_skill_extractor(self.nlp)
+
+            # SkillNER's matchers compare on the LOWER attribute and its n-gram
+            # scorer only reads static word vectors, so both just need tokenisation
+            # rather than a full pipeline run per matcher.
+            self.skill_extractor.skill_getters = SkillsGetter(self.nlp.make_doc)
+            self.skill_extractor.utils = Utils(self.nlp.make_doc, SKILL_DB)
+
+        # Tags the sentences of concurrent analyze_* calls together
+        self.batcher = batcher_from_env(self.nlp)
+
+        self.sentence_cache = sentence_cache_from_env()
+        cache_path = sentence_cache_path()
+        if cache_path:
+            self.sentence_cache.load(cache_path, extractor_version())
+        logger.info(
+            "SpaCy model and %s matcher loaded successfully (pipes: %s)",
+            self.matcher, ", ".join(self.nlp.pipe_names),
+        )
     
-    @staticmethod
-    def _normalize_text(text: str) -> str:
-        """Normalize whitespace and encoding before SkillNER annotation."""
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
-        # Replace common bullet/arrow characters that confuse SkillNER's tokeniser
-        text = re.sub(r'[•●◦▸▹►◉✓✗✔✖★☆▪▫]', ' ', text)
-        # Collapse multiple spaces/tabs on a single line to one space
-        text = re.sub(r'[^\S\n]+', ' ', text)
-        # Strip each line and drop more than one consecutive blank line
-        lines = [line.strip() for line in text.split('\n')]
-        text = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines))
-        return text.strip()
-
-    def _annotate_sentence(self, sentence: str, threshold: float = 0.8):
+    # Shared with the NER extractor so both clean text the same way
+    _normalize_text = staticmethod(normalize_document)
+
+    def _split_sentences(self, text: str) -> list:
+        """Sentence boundaries from the senter over a tokenizer-only Doc."""
+        doc = self.sentence_splitter(self.nlp.make_doc(text))
+        return [s.text.strip() for s in doc.sents if s.text.strip()]
+
+    def _sentence_annotations(self, text: str):
         """
-        Run SkillNER on a single sentence and return (skill_text, token_indices) pairs.
+        Annotate every sentence of normalized text, reusing cached results.
+
+        Each sentence is keyed by its cleaned form, the exact text the skill
+        matcher sees, so equal keys always give equal annotations. Only
+        sentences missing from the cache are tagged, through the shared
+        PipeBatcher together with those of any concurrent calls, and their
+        annotations (skill, token indices, context weight) are stored for
+        next time.
+
+        Records the sentence_split stage and, when any sentence missed the
+        cache, the skillner and weighting stages.
+
+        Returns:
+            list of (sentence, annotations) pairs; annotations is None when
+            the matcher failed on that sentence
+        """
+        with metrics.stage_timer("sentence_split"):
+            sentences = self._split_sentences(text)
+        keys = [_skillner_cleaner(s) for s in sentences]
+        annotations = {}
+        for key in keys:
+            if key not in annotations:
+                annotations[key] = self.sentence_cache.get(key)
+
+        misses = [key for key, value in annotations.items() if value is None]
+        started = time.perf_counter()
+        weighting_seconds = 0.0
+        for key, sent_doc in zip(misses, self.batcher.pipe(k.lower() for k in misses)):
+            try:
+                raw_skills = self._match_sentence(key, sent_doc)
+            except Exception as e:
+                logger.warning("%s failed on sentence (skipping): %r — %s", self.matcher, key[:80], e)
+                continue
+            weighting_started = time.perf_counter()
+            annotations[key] = [
+                (skill_text, token_indices, self._compute_skill_weight(sent_doc, token_indices))
+                for skill_text, token_indices in raw_skills
+            ]
+            weighting_seconds += time.perf_counter() - weighting_started
+            self.sentence_cache.put(key, annotations[key])
+        if misses:
+            metrics.observe_stage("skillner", time.perf_counter() - started - weighting_seconds)
+            metrics.observe_stage("weighting", weighting_seconds)
+
+        return [(sentence, annotations[key]) for sentence, key in zip(sentences, keys)]
+
+    def _match_sentence(self, key: str, sent_doc):
+        """(skill_text, token_indices) pairs for one cleaned sentence from the configured matcher."""
+        if self.automaton is not None:
+            return self.automaton.match(sent_doc)
+        return self._annotate_sentence(_ParsedText(key, sent_doc))
+
+    def _annotate_sentence(self, text_obj: _ParsedText, threshold: float = 0.8):
+        """
+        Run SkillNER on a single parsed sentence and return (skill_text, token_indices) pairs.
+
+        Mirrors ``SkillExtractor.annotate`` but starts from a pre-tagged Text
+        instead of re-running the pipeline. Token indices refer to the
+        sentence's cleaned Doc.
 
         SkillNER has a known IndexError when the lemmatized doc tokenizes differently
         from the original cleaned doc (e.g. "3+" → ["3","+"] on re-tokenization).
         Processing one sentence at a time limits each crash to that one sentence.
         """
-        annotations = self.skill_extractor.annotate(sentence)
+        getters = self.skill_extractor.skill_getters
+        matchers = self.skill_extractor.matchers
+
+        skills_full, text_obj = getters.get_full_match_skills(text_obj, matchers["full_matcher"])
+        skills_abv, text_obj = getters.get_abv_match_skills(text_obj, matchers["abv_matcher"])
+        skills_uni_full, text_obj = getters.get_full_uni_match_skills(
+            text_obj, matchers["full_uni_matcher"]
+        )
+        skills_low_form, text_obj = getters.get_low_match_skills(
+            text_obj, matchers["low_form_matcher"]
+        )
+        skills_on_token = getters.get_token_match_skills(text_obj, matchers["token_matcher"])
+        ngram_scored = self.skill_extractor.utils.process_n_gram(
+            skills_on_token + skills_low_form + skills_uni_full, text_obj
+        )
+
         raw = []
-        for fm in annotations["results"]["full_matches"]:
+        for fm in skills_full + skills_abv:
             raw.append((fm["doc_node_value"], fm["doc_node_id"]))
-        for ng in annotations["results"]["ngram_scored"]:
+        for ng in ngram_scored:
             if ng["score"] >= threshold:
                 raw.append((ng["doc_node_value"], ng["doc_node_id"]))
         return raw
@@ -76,25 +268,18 @@ class SkillExtractorSingleton:
         text = self._normalize_text(text)
         logger.info("Analyzing job description: %d characters", len(text))
 
-        # Split into sentences so a SkillNER IndexError in one sentence
+        # Work sentence by sentence so a SkillNER IndexError in one sentence
         # doesn't discard results from the entire document.
-        sentences = [s.text.strip() for s in self.nlp(text).sents if s.text.strip()]
+        annotated = self._sentence_annotations(text)
         skill_weights = {}
         skipped = 0
 
-        for sentence in sentences:
-            try:
-                raw_skills = self._annotate_sentence(sentence)
-            except Exception as e:
-                logger.warning(
-                    "SkillNER failed on JD sentence (skipping): %r — %s", sentence[:80], e
-                )
+        for sentence, annotations in annotated:
+            if annotations is None:
                 skipped += 1
                 continue
 
-            sent_doc = self.nlp(sentence)
-            for skill_text, token_indices in raw_skills:
-                weight = self._compute_skill_weight(sent_doc, token_indices)
+            for skill_text, _, weight in annotations:
                 lower_skill = skill_text.lower()
                 if lower_skill not in skill_weights:
                     skill_weights[lower_skill] = weight
@@ -102,7 +287,9 @@ class SkillExtractorSingleton:
                     skill_weights[lower_skill] = max(skill_weights[lower_skill], weight)
 
         if skipped:
-            logger.warning("Skipped %d/%d sentences due to SkillNER errors", skipped, len(sentences))
+            logger.warning("Skipped %d/%d sentences due to SkillNER errors", skipped, len(annotated))
+        profiling.annotate("job_description", characters=len(text), sentences=len(annotated),
+                           skills=len(skill_weights))
         logger.info("Analyzed job description and found %d skills", len(skill_weights))
         return skill_weights
     
@@ -123,80 +310,102 @@ class SkillExtractorSingleton:
         resume_text = self._normalize_text(resume_text)
         logger.info("Analyzing resume text: %d characters", len(resume_text))
 
-        sentences = [s.text.strip() for s in self.nlp(resume_text).sents if s.text.strip()]
+        annotated = self._sentence_annotations(resume_text)
         resume_skills = {}
         skipped = 0
 
-        for sentence in sentences:
-            try:
-                raw_skills = self._annotate_sentence(sentence)
-            except Exception as e:
-                logger.warning(
-                    "SkillNER failed on resume sentence (skipping): %r — %s", sentence[:80], e
-                )
+        for sentence, annotations in annotated:
+            if annotations is None:
                 skipped += 1
                 continue
 
-            for skill_text, _ in raw_skills:
+            for skill_text, _, _ in annotations:
                 skill = skill_text.lower()
                 resume_skills[skill] = 1.0
 
         if skipped:
-            logger.warning("Skipped %d/%d sentences due to SkillNER errors", skipped, len(sentences))
+            logger.warning("Skipped %d/%d sentences due to SkillNER errors", skipped, len(annotated))
+        profiling.annotate("resume", characters=len(resume_text), sentences=len(annotated),
+                           skills=len(resume_skills))
         logger.info("Extracted %d skills from resume", len(resume_skills))
         return resume_skills
     
     def _compute_skill_weight(self, doc, skill_indices):
         """
-        Compute skill weight based on surrounding context.
-        
+        Compute skill weight based on surrounding context (see skill_context.skill_weight).
+
         Args:
-            doc: SpaCy document
+            doc: SpaCy document the indices refer to (the sentence's cleaned Doc)
             skill_indices: Indices of the skill tokens
-            
+
         Returns:
             float: Computed weight
         """
-        keywords_required = {
-            "must", "required", "mandatory", "essential", "needed",
-            "necessity", "expertise", "strong", "proficiency"
-        }
-        
-        keywords_preferred = {
-            "preferred", "nice-to-have", "plus", "beneficial", 
-            "bonus", "familiarity", "desire"
-        }
-        
-        base_weight = 1.0
-        window_size = 5  # how many tokens to look around
+        return skill_weight(doc, skill_indices)
 
-        # doc_node_id from SkillNER is usually a list; guard against int or empty
-        if isinstance(skill_indices, int):
-            skill_indices = [skill_indices]
-        if not skill_indices:
-            return base_weight
+# SpaCy and SkillNER load through the model lifecycle manager: in the
+# background at API startup, or lazily on first use anywhere else. When the
+# NER extractor is the default they are only loaded if a request asks for them.
+_preload = default_extractor() == "skillner"
+models.register("spacy", load_nlp, preload=_preload)
+models.register(
+    "skillner", lambda: SkillExtractorSingleton(models.get("spacy")), depends_on=("spacy",),
+    preload=_preload,
+)
 
-        start_token = min(skill_indices)
-        end_token = max(skill_indices)
-        
-        # Build context range
-        left_context_start = max(0, start_token - window_size)
-        right_context_end = min(len(doc), end_token + window_size + 1)
-        
-        surrounding_tokens = [t.lower_ for t in doc[left_context_start:right_context_end]]
-        
-        # If 'must' or 'required' is near, increase weight
-        if any(k in surrounding_tokens for k in keywords_required):
-            base_weight += 2.0
-            
-        # If 'preferred' is near, increase weight slightly
-        if any(k in surrounding_tokens for k in keywords_preferred):
-            base_weight += 1.0
-            
-        return base_weight
 
-# Create a global instance of the skill extractor singleton
-skill_extractor_instance = SkillExtractorSingleton()
+def get_skill_extractor() -> SkillExtractorSingleton:
+    """Return the shared extractor, waiting for it to finish loading if necessary."""
+    return models.get("skillner")
+
+
+def persist_sentence_cache():
+    """
+    Save the sentence annotation cache to SKILLBRIDGE_SENTENCE_CACHE_PATH,
+    if one is set and the extractor was ever loaded. Called at shutdown.
+    """
+    extractor = SkillExtractorSingleton._instance
+    path = sentence_cache_path()
+    if extractor is None or not path:
+        return
+    try:
+        extractor.sentence_cache.save(path, extractor_version())
+    except OSError as e:
+        logger.error("Could not save sentence cache to %s: %s", path, e)
+
+
+def sentence_cache_stats():
+    """Sentence cache counters, or None while the extractor has not loaded."""
+    extractor = SkillExtractorSingleton._instance
+    return extractor.sentence_cache.stats() if extractor is not None else None
+
+
+# Bump when a change to this module alters analyze_* output, so cached
+# results from the old code are not served
+ANALYZER_VERSION = 3
+
+
+@functools.lru_cache(maxsize=None)
+def extractor_version() -> str:
+    """
+    Fingerprint of everything that shapes analyze_* output (this module,
+    SpaCy and its pipeline, SkillNER and SKILL_DB, the skill matcher and,
+    for the automaton, data/skills.json), without loading models.
+    Used to key cached extraction results.
+    """
+    parts = {
+        "analyzer": ANALYZER_VERSION,
+        "spacy": spacy.__version__,
+        "pipeline": skillner_snapshot.package_version("en_core_web_lg"),
+        "excluded": _EXCLUDED_PIPES,
+        "skillner": skillner_snapshot.package_version("skillNer"),
+        "skill_db": skillner_snapshot.skill_db_hash(SKILL_DB),
+        "matcher": skill_automaton.matcher_name(),
+    }
+    if parts["matcher"] == "automaton":
+        parts["skills_json"] = skill_automaton.vocabulary_version()
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
 
 # Public API functions that use the singleton
 def analyze_job_description(text):
@@ -209,7 +418,7 @@ def analyze_job_description(text):
     Returns:
         dict: Dictionary of skills with weights
     """
-    return skill_extractor_instance.analyze_job_description(text)
+    return get_skill_extractor().analyze_job_description(text)
 
 def analyze_resume(text):
     """
@@ -221,4 +430,4 @@ def analyze_resume(text):
     Returns:
         dict: Dictionary of skills found in the resume
     """
-    return skill_extractor_instance.analyze_resume(text)
\ No newline at end of file
+    return get_skill_extractor().analyze_resume(text)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Cross-request micro-batching for SpaCy tagging.
+
+Every analyze_* call tags the sentences it hasn't seen before. On its own,
+each call would run nlp.pipe over a handful of sentences, paying SpaCy's
+per-call overhead every time. PipeBatcher puts one tagging thread in
+front of the pipeline instead. Callers hand it their sentences and block.
+The thread takes everything queued so far (a job description's and a
+resume's sentences, several batch-screened resumes, concurrent requests),
+tags it in one nlp.pipe call, and routes each Doc back to its caller in
+order.
+
+While a batch is being tagged, the next one builds up in the queue, so
+batches grow with load. An idle server pays no extra latency. Set
+SKILLBRIDGE_NLP_BATCH_WAIT_MS to hold a batch open a little longer for
+stragglers.
+
+With SKILLBRIDGE_NLP_N_PROCESS > 1, batches of at least
+n_process * batch_size sentences are tagged by that many SpaCy worker
+processes. SpaCy starts them on every such call, so smaller batches are
+tagged in-process, where that start-up would cost more than it saves.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from services.metrics import NLP_BATCH_SENTENCES
+
+logger = logging.getLogger(__name__)
+
+
+class PipeBatcher:
+    """Tags sentences from concurrent callers in shared nlp.pipe batches."""
+
+    def __init__(self, nlp, batch_size: int = 64, n_process: int = 1,
+                 max_batch: int = 1024, max_wait_ms: float = 0.0):
+        """
+        Args:
+            nlp:         SpaCy pipeline to tag with
+            batch_size:  nlp.pipe batch size
+            n_process:   SpaCy worker processes for large batches (1: in-process only)
+            max_batch:   most sentences tagged in one call; later callers wait for the next
+            max_wait_ms: how long a batch stays open for more callers once the first arrives
+        """
+        if batch_size < 1 or n_process < 1 or max_batch < 1:
+            raise ValueError("batch_size, n_process and max_batch must be at least 1")
+        self.nlp = nlp
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def pipe(self, texts) -> list:
+        """
+        Tag texts, sharing the nlp.pipe call with whoever else is waiting.
+
+        Returns:
+            one Doc per text, in order
+
+        Raises:
+            whatever the pipeline raised on the batch this call was part of
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PipeBatcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="nlp-batcher", daemon=True)
+                self._thread.start()
+            self._queue.put((texts, future))
+        return future.result()
+
+    def close(self):
+        """Finish the queued calls and stop the tagging thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    # ------------------------------------------------------------------
+    # Tagging thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            calls, size, stop = [first], len(first[0]), False
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch:
+                try:
+                    timeout = deadline - time.perf_counter()
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                calls.append(item)
+                size += len(item[0])
+            self._tag(calls, size)
+            if stop:
+                return
+
+    def _tag(self, calls: list, size: int):
+        texts = [text for call_texts, _ in calls for text in call_texts]
+        n_process = self.n_process if size >= self.n_process * self.batch_size else 1
+        try:
+            docs = list(self.nlp.pipe(texts, batch_size=self.batch_size, n_process=n_process))
+        except Exception as exc:
+            for _, future in calls:
+                future.set_exception(exc)
+            return
+
+        NLP_BATCH_SENTENCES.observe(size)
+        logger.debug("Tagged %d sentences from %d calls (n_process=%d)", size, len(calls), n_process)
+        start = 0
+        for call_texts, future in calls:
+            future.set_result(docs[start:start + len(call_texts)])
+            start += len(call_texts)
+
+
+def batcher_from_env(nlp) -> PipeBatcher:
+    """Build a PipeBatcher for nlp from SKILLBRIDGE_NLP_* environment variables."""
+    return PipeBatcher(
+        nlp,
+        batch_size=int(os.getenv("SKILLBRIDGE_NLP_BATCH_SIZE", "64")),
+        n_process=int(os.getenv("SKILLBRIDGE_NLP_N_PROCESS", "1")),
+        max_batch=int(os.getenv("SKILLBRIDGE_NLP_MAX_BATCH", "1024")),
+        max_wait_ms=float(os.getenv("SKILLBRIDGE_NLP_BATCH_WAIT_MS", "0")),
+    )
@@ -0,0 +1,162 @@
+"""
+Pre-fork model hosting: load the models once, then fork the workers.
+
+`uvicorn --workers N` starts every worker as a fresh interpreter, so each
+one loads its own en_core_web_lg (~800 MB with vectors), SkillNER
+matchers and sentence-transformer. Under gunicorn with preload_app (see
+src/gunicorn.conf.py), the master imports the app and calls preload()
+before it forks any worker. The forked workers then start with every
+model already READY, and the pages holding them are shared copy-on-write.
+Word vectors and model weights are large buffers that are never written,
+so they stay shared for the life of the worker.
+
+preload() finishes with gc.freeze(). Without it, the first collection in
+each worker would write to the header of every object the models
+allocated, and that write alone copies the page.
+
+Models that start threads of their own are left for each worker to load
+after the fork, because threads do not survive it. The onnxruntime
+session is one of them (its thread pool is created with the session).
+
+Check what is actually shared on a running pod with
+
+    python -m services.prefork <gunicorn master pid>
+
+which prints RSS, PSS (RSS with shared pages split between their
+sharers) and private memory for the master and each worker.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from services.model_lifecycle import models
+
+logger = logging.getLogger(__name__)
+
+
+def fork_unsafe() -> tuple:
+    """Models that own threads once loaded, and so must be loaded after the fork."""
+    if os.getenv("SKILLBRIDGE_EMBEDDING_BACKEND", "torch").lower() == "onnx":
+        return ("embeddings",)
+    return ()
+
+
+def preload(manager=models):
+    """
+    Load every preloaded model in this process, then freeze the heap so
+    forked children share it. Call it in the master, right before forking.
+
+    Args:
+        manager: the ModelLifecycleManager to load (the process-wide one by default)
+    """
+    started = time.perf_counter()
+    skip = fork_unsafe()
+    manager.load_all(skip=skip)
+    gc.collect()
+    gc.freeze()
+
+    status = manager.status()
+    failed = [name for name, s in status.items() if s["state"] == "failed"]
+    logger.info(
+        "Pre-fork: loaded %s in %.1fs (%d objects frozen); left for the workers: %s",
+        ", ".join(n for n, s in status.items() if s["state"] == "ready") or "nothing",
+        time.perf_counter() - started, gc.get_freeze_count(),
+        ", ".join(n for n, s in status.items() if s["state"] == "pending") or "nothing",
+    )
+    if failed:
+        logger.error("Pre-fork: %s failed to load; workers will report not ready", ", ".join(failed))
+    if threading.active_count() > 1:
+        logger.warning(
+            "Pre-fork: %d threads are running in the master (%s); they will not exist in the workers",
+            threading.active_count() - 1,
+            ", ".join(t.name for t in threading.enumerate() if t is not threading.current_thread()),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Memory report
+# ---------------------------------------------------------------------------
+
+# /proc/<pid>/smaps_rollup fields (kB) -> report keys
+_ROLLUP_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def process_memory(pid="self") -> dict | None:
+    """
+    RSS, PSS, shared and private bytes of a process, from /proc/<pid>/smaps_rollup.
+
+    Returns:
+        dict of byte counts, plus "shared" and "private" totals; None where
+        smaps_rollup is unavailable (not Linux, or the process is gone)
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    usage = {}
+    for line in lines:
+        field, _, rest = line.partition(":")
+        if field in _ROLLUP_FIELDS:
+            usage[_ROLLUP_FIELDS[field]] = int(rest.split()[0]) * 1024
+    usage["shared"] = usage.get("shared_clean", 0) + usage.get("shared_dirty", 0)
+    usage["private"] = usage.get("private_clean", 0) + usage.get("private_dirty", 0)
+    return usage
+
+
+def child_pids(pid) -> list:
+    """Direct children of a process, from /proc/<pid>/task/*/children."""
+    children = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return children
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children", encoding="ascii") as f:
+                children.extend(int(c) for c in f.read().split())
+        except OSError:
+            continue
+    return sorted(set(children))
+
+
+def memory_report(master_pid) -> dict:
+    """Memory of a master process and its workers, plus totals (PSS sums to the real footprint)."""
+    processes = {"master": process_memory(master_pid)}
+    for child in child_pids(master_pid):
+        processes[f"worker {child}"] = process_memory(child)
+    known = [usage for usage in processes.values() if usage]
+    return {
+        "processes": processes,
+        "total_rss": sum(u["rss"] for u in known),
+        "total_pss": sum(u["pss"] for u in known),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report shared and private memory of a pre-fork server.")
+    parser.add_argument("pid", help="gunicorn master pid")
+    args = parser.parse_args(argv)
+
+    report = memory_report(args.pid)
+    if report["processes"]["master"] is None:
+        print(f"No /proc/{args.pid}/smaps_rollup — is the pid right, and is this Linux?", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+"""
+Opt-in sampling profiler for single requests.
+
+A request is profiled when it carries an allowlisted token, either in the
+X-SkillBridge-Profile header or in the ?profile= query parameter, or when it
+is picked by SKILLBRIDGE_PROFILE_SAMPLE_RATE. While the request runs, a
+background thread samples the stacks of the threads doing its work every
+SKILLBRIDGE_PROFILE_INTERVAL_MS. Those threads are the StageExecutor workers
+that run its stages (see bind()). Counts are kept per collapsed stack, so
+memory does not grow with the request's duration.
+
+Finished profiles are written to SKILLBRIDGE_PROFILE_DIR together with the
+request's normalized input sizes (see annotate()). GET /profiles/{id}
+serves them as speedscope JSON or as collapsed stacks for flamegraph.pl.
+
+Only thread-mode stages are sampled. Work in process pools
+(SKILLBRIDGE_EXECUTOR=process, SKILLBRIDGE_PDF_WORKERS > 1) and short
+on-loop steps are not.
+"""
+import contextvars
+import functools
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-SkillBridge-Profile"
+PROFILE_QUERY = "profile"
+FORMATS = ("speedscope", "collapsed")
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# The profile of the request being handled, inherited by its asyncio tasks
+_current: contextvars.ContextVar = contextvars.ContextVar("skillbridge_profile", default=None)
+# Worker thread id -> the profile whose work it is running
+_thread_profiles: dict = {}
+# Code object -> frame label, so each sample only does dict lookups
+_labels: dict = {}
+
+
+def _frame_label(code) -> str:
+    """ "function (path:first line)", the path relative to src/, site-packages or the stdlib."""
+    label = _labels.get(code)
+    if label is None:
+        path = code.co_filename
+        if "site-packages" + os.sep in path:
+            path = path.split("site-packages" + os.sep, 1)[1]
+        elif path.startswith(_SRC_DIR):
+            path = os.path.relpath(path, _SRC_DIR)
+        elif path.startswith(_STDLIB_DIR):
+            path = os.path.relpath(path, _STDLIB_DIR)
+        label = f"{code.co_name} ({path}:{code.co_firstlineno})"
+        _labels[code] = label
+    return label
+
+
+def _collapse(frame, root: str) -> str:
+    """
+    The stack ending in frame, joined by ";" from root down. Frames above
+    the bound call (the pool's thread machinery) are replaced by root.
+    """
+    labels = []
+    while frame is not None and frame.f_code is not _BOUND_CODE:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+class RequestProfile:
+    """Samples the threads attached to one request until stopped."""
+
+    def __init__(self, trigger: str, method: str, path: str, interval: float = 0.005):
+        self.id = uuid.uuid4().hex
+        self.trigger = trigger
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.inputs: dict = {}
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+        self._threads: dict = {}   # thread id -> [attach count, root label]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._run, name=f"profiler-{self.id[:8]}", daemon=True
+        )
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+
+    def attach(self, ident: int, root: str = "worker"):
+        """Start sampling thread ident, under a root frame named root."""
+        with self._lock:
+            self._threads.setdefault(ident, [0, root])[0] += 1
+
+    def detach(self, ident: int):
+        with self._lock:
+            entry = self._threads.get(ident)
+            if entry is not None:
+                entry[0] -= 1
+                if entry[0] <= 0:
+                    del self._threads[ident]
+
+    def annotate(self, section: str, **fields):
+        with self._lock:
+            self.inputs.setdefault(section, []).append(fields)
+
+    def record(self, status: int | None) -> dict:
+        """Everything the store keeps for this profile."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "trigger": self.trigger,
+                "method": self.method,
+                "path": self.path,
+                "status": status,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)),
+                "duration_seconds": round(self.duration, 4) if self.duration is not None else None,
+                "interval_seconds": self.interval,
+                "samples": self.samples,
+                "inputs": dict(self.inputs),
+                "stacks": dict(self.stacks.most_common()),
+            }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = [(ident, root) for ident, (_, root) in self._threads.items()]
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            stacks = [_collapse(frames[ident], root) for ident, root in threads if ident in frames]
+            with self._lock:
+                self.stacks.update(stacks)
+                self.samples += len(stacks)
+
+
+# ---------------------------------------------------------------------------
+# Request context
+# ---------------------------------------------------------------------------
+
+def current() -> RequestProfile | None:
+    """The profile of the request being handled in this context, if any."""
+    return _current.get()
+
+
+def activate(profile: RequestProfile):
+    """Make profile current for this context and the tasks it starts; returns a reset token."""
+    return _current.set(profile)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def _run_bound(profile: RequestProfile, root: str, fn, args, kwargs):
+    ident = threading.get_ident()
+    profile.attach(ident, root)
+    _thread_profiles[ident] = profile
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _thread_profiles.pop(ident, None)
+        profile.detach(ident)
+
+
+_BOUND_CODE = _run_bound.__code__
+
+
+def bind(fn, stage: str = "worker"):
+    """
+    Wrap fn so the thread that runs it is sampled for the current request's
+    profile, with its stacks rooted at a "stage:<stage>" frame. Returns fn
+    unchanged when the request is not being profiled. Used by StageExecutor
+    before handing a call to its thread pool.
+    """
+    profile = _current.get()
+    if profile is None:
+        return fn
+
+    @functools.wraps(fn)
+    def profiled(*args, **kwargs):
+        return _run_bound(profile, f"stage:{stage}", fn, args, kwargs)
+
+    return profiled
+
+
+def annotate(section: str, **fields):
+    """
+    Record input sizes (e.g. characters, sentences) for the profile of the
+    request this code is running for. A no-op when it is not profiled.
+    """
+    profile = _current.get() or _thread_profiles.get(threading.get_ident())
+    if profile is not None:
+        profile.annotate(section, **fields)
+
+
+# ---------------------------------------------------------------------------
+# Output formats
+# ---------------------------------------------------------------------------
+
+def to_collapsed(record: dict) -> str:
+    """Brendan Gregg's folded format: one "frame;frame;frame count" line per stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in record["stacks"].items())
+
+
+def to_speedscope(record: dict) -> dict:
+    """A speedscope "sampled" profile; weights are seconds (samples × interval)."""
+    frames, index = [], {}
+    samples, weights = [], []
+    for stack, count in record["stacks"].items():
+        ids = []
+        for label in stack.split(";"):
+            if label not in index:
+                index[label] = len(frames)
+                name, _, location = label.partition(" (")
+                frame = {"name": name}
+                file, _, line = location.rstrip(")").rpartition(":")
+                if file and line.isdigit():
+                    frame.update(file=file, line=int(line))
+                frames.append(frame)
+            ids.append(index[label])
+        samples.append(ids)
+        weights.append(round(count * record["interval_seconds"], 6))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": f"{record['method']} {record['path']} ({record['id']})",
+        "exporter": "skillbridge",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": record["path"],
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 6),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Configuration and storage
+# ---------------------------------------------------------------------------
+
+class Profiler:
+    """
+    Decides which requests to profile and keeps the newest profiles on disk.
+
+    Args:
+        tokens:      allowlisted tokens; requests presenting one are profiled
+        sample_rate: fraction of all other requests profiled (0 disables)
+        interval:    seconds between stack samples
+        directory:   where profiles are written, one JSON file each
+        keep:        newest profiles kept; older ones are deleted
+    """
+
+    def __init__(self, tokens=(), sample_rate: float = 0.0, interval: float = 0.005,
+                 directory: str = "workspace/profiles", keep: int = 100):
+        self.tokens = [t for t in tokens if t]
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.directory = directory
+        self.keep = keep
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.tokens) or self.sample_rate > 0
+
+    def is_allowed(self, token: str | None) -> bool:
+        """True if token is on the allowlist (constant-time comparison)."""
+        if not token:
+            return False
+        return any(hmac.compare_digest(token.encode(), t.encode()) for t in self.tokens)
+
+    def trigger(self, token: str | None) -> str | None:
+        """ "requested", "sampled" or None (don't profile) for a request presenting token."""
+        if self.is_allowed(token):
+            return "requested"
+        if token:
+            logger.warning("Ignoring profiling request with an unknown token")
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def start(self, trigger: str, method: str, path: str) -> RequestProfile:
+        profile = RequestProfile(trigger, method, path, self.interval)
+        profile.start()
+        return profile
+
+    def finish(self, profile: RequestProfile, status: int | None) -> dict:
+        """Stop sampling and write the profile; returns its record."""
+        profile.stop()
+        record = profile.record(status)
+        try:
+            self.save(record)
+        except OSError as e:
+            logger.error("Could not save profile %s: %s", profile.id, e)
+        logger.info(
+            "Profiled %s %s (%s): %.3fs, %d samples, inputs=%s",
+            profile.method, profile.path, profile.trigger, profile.duration,
+            record["samples"], record["inputs"],
+        )
+        return record
+
+    def save(self, record: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{record['id']}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp, path)
+        self._prune()
+
+    def load(self, profile_id: str) -> dict | None:
+        """A stored profile record, or None if there is no such profile."""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def summaries(self) -> list:
+        """Summaries of the stored profiles, newest first."""
+        summaries = []
+        for name in self._files():
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            record.pop("stacks", None)
+            summaries.append(record)
+        return summaries
+
+    def _files(self) -> list:
+        """Profile file names, newest first."""
+        try:
+            names = [
+                name for name in os.listdir(self.directory)
+                if name.endswith(".json") and _PROFILE_ID.match(name[:-len(".json")])
+            ]
+        except FileNotFoundError:
+            return []
+        return sorted(
+            names, key=lambda name: os.path.getmtime(os.path.join(self.directory, name)), reverse=True
+        )
+
+    def _prune(self):
+        for name in self._files()[self.keep:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+def profiler_from_env() -> Profiler:
+    """Build the profiler from SKILLBRIDGE_PROFILE_* environment variables."""
+    return Profiler(
+        tokens=[t.strip() for t in os.getenv("SKILLBRIDGE_PROFILE_TOKENS", "").split(",")],
+        sample_rate=float(os.getenv("SKILLBRIDGE_PROFILE_SAMPLE_RATE", "0")),
+        interval=float(os.getenv("SKILLBRIDGE_PROFILE_INTERVAL_MS", "5")) / 1000,
+        directory=os.getenv("SKILLBRIDGE_PROFILE_DIR", os.path.join("workspace", "profiles")),
+        keep=int(os.getenv("SKILLBRIDGE_PROFILE_KEEP", "100")),
+    )
@@ -0,0 +1,213 @@
+"""
+Offline catalog of learning resources (courses, books, project ideas).
+
+Entries are keyed by canonical skill name. data/skills.json provides the
+canonical names, their related terms (looked up as aliases) and each skill's
+category. data/learning_resources.json seeds resources per skill and per
+category, and more JSON or SQLite files can be layered on top. Everything is
+indexed in memory, so a lookup costs a dict access.
+
+A lookup tries the skill itself, then the canonical skill it is a related
+term of, then that skill's category.
+
+JSON files use the layout of data/learning_resources.json:
+
+    {"skills":     {"kubernetes": {"courses": [{"title", "url"}], "books": [...],
+                                   "projects": ["..."], "aliases": ["k8s"],
+                                   "category": "containerization"}},
+     "categories": {"containerization": {...same fields...}}}
+
+SQLite files hold one row per resource:
+
+    CREATE TABLE resources (skill TEXT, kind TEXT, title TEXT, url TEXT, author TEXT)
+
+where kind is course, book or project, and a skill of "category:<name>"
+targets a whole category.
+"""
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+
+from services.embedding_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SKILLS_JSON = os.path.join(_SRC_DIR, "..", "data", "skills.json")
+DEFAULT_CATALOG_JSON = os.path.join(_SRC_DIR, "..", "data", "learning_resources.json")
+
+KINDS = ("courses", "books", "projects")
+_SQLITE_KINDS = {"course": "courses", "book": "books", "project": "projects"}
+_CATEGORY_PREFIX = "category:"
+
+
+def _empty_entry() -> dict:
+    return {kind: [] for kind in KINDS}
+
+
+def _resource_id(resource) -> str:
+    return normalize_text(resource if isinstance(resource, str) else resource.get("title", ""))
+
+
+class ResourceCatalog:
+    """In-memory index of learning resources by skill, alias and category."""
+
+    def __init__(self):
+        self._skills: dict = {}       # canonical skill -> entry
+        self._categories: dict = {}   # category -> entry
+        self._aliases: dict = {}      # related term -> canonical skill
+        self._skill_category: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def stats(self) -> dict:
+        return {"skills": len(self._skills), "categories": len(self._categories),
+                "aliases": len(self._aliases)}
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def add_taxonomy(self, path: str):
+        """Read canonical names, related terms and categories from data/skills.json."""
+        with open(path, encoding="utf-8") as f:
+            skills = json.load(f)["skills"]
+        for skill in skills:
+            name = normalize_text(skill["name"])
+            if skill.get("category"):
+                self._skill_category[name] = normalize_text(skill["category"])
+            for term in skill.get("related_terms", []):
+                self._aliases.setdefault(normalize_text(term), name)
+
+    def add_entries(self, payload: dict):
+        """
+        Merge a {"skills": {...}, "categories": {...}} payload. Resources are
+        appended to any already known for the same skill, skipping titles
+        that are already listed.
+        """
+        for name, fields in payload.get("skills", {}).items():
+            name = normalize_text(name)
+            self._merge(self._skills.setdefault(name, _empty_entry()), fields)
+            if fields.get("category"):
+                self._skill_category[name] = normalize_text(fields["category"])
+            for alias in fields.get("aliases", []):
+                self._aliases[normalize_text(alias)] = name
+        for name, fields in payload.get("categories", {}).items():
+            self._merge(self._categories.setdefault(normalize_text(name), _empty_entry()), fields)
+
+    def load_json(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            self.add_entries(json.load(f))
+
+    def load_sqlite(self, path: str):
+        payload = {"skills": {}, "categories": {}}
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+            rows = conn.execute("SELECT skill, kind, title, url, author FROM resources").fetchall()
+        for skill, kind, title, url, author in rows:
+            kind = _SQLITE_KINDS.get((kind or "").lower())
+            if kind is None or not skill or not title:
+                continue
+            if skill.lower().startswith(_CATEGORY_PREFIX):
+                target = payload["categories"].setdefault(skill[len(_CATEGORY_PREFIX):], {})
+            else:
+                target = payload["skills"].setdefault(skill, {})
+            if kind == "projects":
+                resource = title
+            else:
+                resource = {"title": title, **({"url": url} if url else {}),
+                            **({"author": author} if author else {})}
+            target.setdefault(kind, []).append(resource)
+        self.add_entries(payload)
+
+    def load(self, path: str):
+        """Load a .json, .db, .sqlite or .sqlite3 catalog file."""
+        if path.lower().endswith((".db", ".sqlite", ".sqlite3")):
+            self.load_sqlite(path)
+        else:
+            self.load_json(path)
+        logger.info("Loaded learning resources from %s", path)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def lookup(self, skill: str):
+        """
+        Resources for skill.
+
+        Returns:
+            (source, entry) where source is the skill, canonical skill or
+            category the resources were found under; None if nothing matches
+        """
+        name = normalize_text(skill)
+        canonical = name if name in self._skills else self._aliases.get(name, name)
+        entry = self._skills.get(canonical)
+        if entry is not None and any(entry[kind] for kind in KINDS):
+            return canonical, entry
+        category = self._skill_category.get(canonical)
+        if category in self._categories:
+            return category, self._categories[category]
+        return None
+
+    def plan(self, skill: str) -> str | None:
+        """Plain-text learning plan for skill, or None if the catalog has nothing."""
+        found = self.lookup(skill)
+        if found is None:
+            return None
+        source, entry = found
+
+        lines = []
+        if source != normalize_text(skill):
+            lines.append(f"(Resources for {source})")
+        if entry["courses"]:
+            lines.append("Courses:")
+            lines.extend(f"- {_describe(course)}" for course in entry["courses"][:2])
+        if entry["books"]:
+            lines.append("Book: " + _describe(entry["books"][0]))
+        if entry["projects"]:
+            lines.append("Project idea: " + entry["projects"][0])
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _merge(entry: dict, fields: dict):
+        for kind in KINDS:
+            known = {_resource_id(resource) for resource in entry[kind]}
+            for resource in fields.get(kind, []):
+                if _resource_id(resource) not in known:
+                    entry[kind].append(resource)
+                    known.add(_resource_id(resource))
+
+
+def _describe(resource) -> str:
+    if isinstance(resource, str):
+        return resource
+    text = resource["title"]
+    if resource.get("author"):
+        text += f" by {resource['author']}"
+    if resource.get("url"):
+        text += f" — {resource['url']}"
+    return text
+
+
+def catalog_from_env() -> ResourceCatalog:
+    """
+    Build the catalog from data/skills.json, data/learning_resources.json and
+    any extra files listed (comma-separated, applied in order) in
+    SKILLBRIDGE_RESOURCE_CATALOG.
+    """
+    catalog = ResourceCatalog()
+    if os.path.exists(DEFAULT_SKILLS_JSON):
+        catalog.add_taxonomy(DEFAULT_SKILLS_JSON)
+    if os.path.exists(DEFAULT_CATALOG_JSON):
+        catalog.load(DEFAULT_CATALOG_JSON)
+    for path in filter(None, (p.strip() for p in os.getenv("SKILLBRIDGE_RESOURCE_CATALOG", "").split(","))):
+        catalog.load(path)
+    logger.info("Resource catalog ready: %s", catalog.stats())
+    return catalog
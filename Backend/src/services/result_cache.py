@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 of raw bytes, e.g. an uploaded PDF."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(kind: str, *parts) -> str:
+    """
+    Cache key for one kind of result ("response", "resume", "job", ...)
+    and the JSON-serialisable inputs that determine it.
+    """
+    payload = json.dumps([kind, *parts], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class MemoryBackend:
+    """In-process LRU store of cache records, bounded by entry count."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._records: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                self._records.move_to_end(key)
+            return record
+
+    def set(self, key: str, record: dict):
+        with self._lock:
+            self._records[key] = record
+            self._records.move_to_end(key)
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._records.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class DiskBackend:
+    """
+    One JSON file per record under ``directory``, shared by every worker
+    process and kept across restarts.
+
+    Reads refresh a file's mtime, so when the entry count passes
+    ``max_entries`` the least recently used tenth is removed.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 10_000):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self._count = sum(1 for _ in self._files())
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+            os.utime(path)
+            return record
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Dropping unreadable cache entry %s: %s", path, e)
+            self.delete(key)
+            return None
+
+    def set(self, key: str, record: dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            existed = os.path.exists(path)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error("Could not write cache entry %s: %s", path, e)
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        with self._lock:
+            if not existed:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self._path(key))
+            with self._lock:
+                self._count -= 1
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for path in list(self._files()):
+            os.unlink(path)
+        with self._lock:
+            self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".json"):
+                    yield os.path.join(root, name)
+
+    def _evict(self):
+        """Remove the least recently used tenth (caller holds self._lock)."""
+        entries = []
+        for path in self._files():
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        excess = len(entries) - self.max_entries + max(1, self.max_entries // 10)
+        for _, path in entries[:max(excess, 0)]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        # Other processes write here too, so recount rather than subtract
+        self._count = sum(1 for _ in self._files())
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class ResultCache:
+    """
+    TTL cache of JSON-serialisable analysis results over a pluggable backend.
+
+    A backend is any object with get(key) -> record | None, set(key, record),
+    delete(key), clear() and __len__; MemoryBackend and DiskBackend are
+    provided. Hits and misses are counted per kind of result.
+    """
+
+    def __init__(self, backend=None, ttl_seconds: float = 3600):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl_seconds = ttl_seconds
+        self._stats: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, key: str):
+        """Return the cached value, or None if absent or expired."""
+        record = self.backend.get(key)
+        if record is not None and record["expires_at"] < time.time():
+            self.backend.delete(key)
+            record = None
+        self._count(kind, "hits" if record is not None else "misses")
+        return record["value"] if record is not None else None
+
+    def set(self, kind: str, key: str, value):
+        self.backend.set(key, {"kind": kind, "expires_at": time.time() + self.ttl_seconds, "value": value})
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        """{kind: {hits, misses}} plus the backend's entry count."""
+        with self._lock:
+            stats = {kind: dict(counts) for kind, counts in self._stats.items()}
+        stats["entries"] = len(self.backend)
+        return stats
+
+    def _count(self, kind: str, outcome: str):
+        with self._lock:
+            counts = self._stats.setdefault(kind, {"hits": 0, "misses": 0})
+            counts[outcome] += 1
+
+
+def result_cache_from_env(prefix: str = "SKILLBRIDGE_RESULT_CACHE", default_ttl: float = 3600,
+                          default_dir: str = os.path.join("workspace", "result_cache")) -> ResultCache:
+    """
+    Build a cache from ``<prefix>``, ``<prefix>_TTL``, ``_SIZE`` and ``_DIR``
+    environment variables.
+
+    Args:
+        prefix:      environment variable prefix; caches with their own prefix
+                     get their own mode, size and directory
+        default_ttl: seconds entries stay valid when ``<prefix>_TTL`` is unset
+        default_dir: directory of the disk backend when ``<prefix>_DIR`` is unset
+    """
+    mode = os.getenv(prefix, "memory").lower()
+    ttl = float(os.getenv(f"{prefix}_TTL", str(default_ttl)))
+    size = int(os.getenv(f"{prefix}_SIZE", "1024"))
+
+    if mode in ("off", "none", "false", "0"):
+        # A zero-capacity LRU evicts every entry as soon as it is stored
+        return ResultCache(MemoryBackend(0), ttl)
+    if mode == "disk":
+        directory = os.getenv(f"{prefix}_DIR") or default_dir
+        logger.info("%s: disk at %s (ttl=%ss, max %d entries)", prefix, directory, ttl, size)
+        return ResultCache(DiskBackend(directory, max_entries=size), ttl)
+    if mode != "memory":
+        raise ValueError(f"{prefix} must be memory, disk or off, got {mode!r}")
+    return ResultCache(MemoryBackend(size), ttl)
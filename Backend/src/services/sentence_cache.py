@@ -0,0 +1,208 @@
+"""
+Memo of SkillNER annotations per sentence.
+
+Job postings repeat the same boilerplate ("We are an equal opportunity
+employer…") and resumes the same bullet phrasing, so most sentences the
+extractor sees have been annotated before. The cache maps a cleaned
+sentence to its annotations, a list of (skill_text, token_indices, weight),
+so a repeat skips both SpaCy tagging and the SkillNER matchers.
+
+Eviction is LRU or LFU, access is guarded by a lock, and the contents can
+be written to disk on shutdown and reloaded on start. A snapshot stores
+the extractor version it was made with and is ignored after an upgrade.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("lru", "lfu")
+
+
+def _entry_bytes(sentence: str, annotations: list) -> int:
+    """Approximate memory held by one entry (strings, tuples and index lists)."""
+    size = sys.getsizeof(sentence) + sys.getsizeof(annotations)
+    for skill, indices, weight in annotations:
+        size += sys.getsizeof(skill) + sys.getsizeof(indices) + 28 * len(indices) + 24 + 64
+    return size
+
+
+class SentenceAnnotationCache:
+    """
+    Bounded, thread-safe map of cleaned sentence → SkillNER annotations.
+
+    LRU evicts the least recently used sentence. LFU evicts the least often
+    used one, breaking ties by age, so recurring boilerplate survives a
+    burst of one-off sentences.
+    """
+
+    def __init__(self, capacity: int = 20_000, policy: str = "lru"):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.capacity = capacity
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.memory_bytes = 0
+
+        self._entries: OrderedDict = OrderedDict()   # sentence -> annotations
+        self._sizes: dict = {}
+        # LFU bookkeeping: use count per sentence, and sentences per count in age order
+        self._counts: dict = {}
+        self._by_count: defaultdict = defaultdict(OrderedDict)
+        self._min_count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, sentence: str):
+        """Cached annotations for sentence, or None."""
+        with self._lock:
+            annotations = self._entries.get(sentence)
+            if annotations is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(sentence)
+            return annotations
+
+    def put(self, sentence: str, annotations: list):
+        """Store annotations, evicting one entry if the cache is full."""
+        if self.capacity <= 0:
+            return
+        annotations = [(skill, list(indices), weight) for skill, indices, weight in annotations]
+        with self._lock:
+            if sentence in self._entries:
+                self.memory_bytes -= self._sizes[sentence]
+                self._entries[sentence] = annotations
+                self._touch(sentence)
+            else:
+                if len(self._entries) >= self.capacity:
+                    self._evict()
+                self._entries[sentence] = annotations
+                if self.policy == "lfu":
+                    self._counts[sentence] = 1
+                    self._by_count[1][sentence] = None
+                    self._min_count = 1
+            self._sizes[sentence] = _entry_bytes(sentence, annotations)
+            self.memory_bytes += self._sizes[sentence]
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters, hit ratio, entry count and approximate bytes held."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "policy": self.policy,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "capacity": self.capacity,
+                "memory_bytes": self.memory_bytes,
+            }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str, version: str) -> int:
+        """
+        Write the entries (most valuable last) to path as JSON.
+
+        Returns:
+            number of entries written
+        """
+        with self._lock:
+            entries = [[sentence, annotations] for sentence, annotations in self._ordered()]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "policy": self.policy, "entries": entries}, f)
+        os.replace(tmp_path, path)
+        logger.info("Saved %d cached sentence annotations to %s", len(entries), path)
+        return len(entries)
+
+    def load(self, path: str, version: str) -> int:
+        """
+        Add the entries saved at path, unless they came from another version.
+
+        Returns:
+            number of entries loaded
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read sentence cache %s: %s", path, e)
+            return 0
+        if payload.get("version") != version:
+            logger.info("Sentence cache %s is from another extractor version; starting empty", path)
+            return 0
+
+        entries = payload.get("entries", [])[-self.capacity:] if self.capacity > 0 else []
+        for sentence, annotations in entries:
+            self.put(sentence, [tuple(a) for a in annotations])
+        logger.info("Loaded %d cached sentence annotations from %s", len(entries), path)
+        return len(entries)
+
+    # ------------------------------------------------------------------
+    # Internal helpers (caller holds self._lock)
+    # ------------------------------------------------------------------
+
+    def _touch(self, sentence: str):
+        if self.policy == "lru":
+            self._entries.move_to_end(sentence)
+            return
+        count = self._counts[sentence]
+        del self._by_count[count][sentence]
+        if not self._by_count[count]:
+            del self._by_count[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._counts[sentence] = count + 1
+        self._by_count[count + 1][sentence] = None
+
+    def _evict(self):
+        if self.policy == "lru":
+            victim, _ = self._entries.popitem(last=False)
+        else:
+            bucket = self._by_count[self._min_count]
+            victim, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self._by_count[self._min_count]
+            del self._entries[victim]
+            del self._counts[victim]
+        self.memory_bytes -= self._sizes.pop(victim)
+        self.evictions += 1
+
+    def _ordered(self):
+        """Entries from least to most valuable under the eviction policy."""
+        if self.policy == "lru":
+            return list(self._entries.items())
+        return [
+            (sentence, self._entries[sentence])
+            for count in sorted(self._by_count)
+            for sentence in self._by_count[count]
+        ]
+
+
+def sentence_cache_from_env() -> SentenceAnnotationCache:
+    """Build the cache from SKILLBRIDGE_SENTENCE_CACHE_* environment variables."""
+    return SentenceAnnotationCache(
+        capacity=int(os.getenv("SKILLBRIDGE_SENTENCE_CACHE_SIZE", "20000")),
+        policy=os.getenv("SKILLBRIDGE_SENTENCE_CACHE_POLICY", "lru").lower(),
+    )
+
+
+def sentence_cache_path() -> str | None:
+    """File the cache persists to between restarts, if SKILLBRIDGE_SENTENCE_CACHE_PATH is set."""
+    return os.getenv("SKILLBRIDGE_SENTENCE_CACHE_PATH") or None
@@ -0,0 +1,250 @@
+"""
+Single-pass skill matcher: one Aho–Corasick automaton over normalised tokens.
+
+SkillNER annotates a sentence with five PhraseMatchers over four
+re-tokenised copies of it (lemmas, stems, abbreviations, lower case), then
+resolves overlaps by n-gram scoring in Python loops. This module compiles
+the same vocabulary into one automaton instead:
+
+    SKILL_DB full names (already lemmatised)   kind "full"
+    SKILL_DB abbreviations                      kind "abv"   (exact lower-case tokens only)
+    SKILL_DB low surface forms                  kind "low"
+    data/skills.json names and related terms    kind "related"
+
+Every pattern token and every document token is reduced to one key: the
+Porter stem of its lower-cased lemma. "APIs", "API" and "api" therefore
+walk the same edge. A sentence is matched in one pass over its tokens,
+and spans report token indices into that sentence's Doc, exactly like
+SkillNER's doc_node_id. Overlapping matches are resolved the way
+SkillNER's pipeline prefers them: longest span first, then full, abv,
+low, related, then leftmost. Single-token matches on stop words are
+dropped, as SkillNER marks stop words unmatchable.
+
+Select it with SKILLBRIDGE_SKILL_MATCHER=automaton. Compare it with
+SkillNER on a corpus with `python -m benchmarks.matcher_parity`.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import time
+
+from nltk.stem import PorterStemmer
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SKILLS_JSON = os.path.join(_SRC_DIR, "..", "data", "skills.json")
+
+MATCHERS = ("skillner", "automaton")
+
+# Lower wins when two patterns cover the same span
+KIND_PRIORITY = {"full": 0, "abv": 1, "low": 2, "related": 3}
+
+_stemmer = PorterStemmer()
+
+
+def matcher_name() -> str:
+    """The configured skill matcher: SKILLBRIDGE_SKILL_MATCHER, "skillner" by default."""
+    name = os.getenv("SKILLBRIDGE_SKILL_MATCHER", "skillner").strip().lower()
+    if name not in MATCHERS:
+        raise ValueError(f"SKILLBRIDGE_SKILL_MATCHER must be one of {', '.join(MATCHERS)}, got {name!r}")
+    return name
+
+
+@functools.lru_cache(maxsize=200_000)
+def token_key(word: str) -> str:
+    """The automaton's alphabet: Porter stem of the lower-cased word."""
+    return _stemmer.stem(word.lower())
+
+
+class SkillAutomaton:
+    """Aho–Corasick automaton whose symbols are token keys rather than characters."""
+
+    def __init__(self):
+        self._children = [{}]          # per-state edges while building; dropped by compile()
+        self._next: dict = {}          # (state, key) -> state once compiled
+        self._fail: list = [0]
+        self._outputs: dict = {}       # state -> tuple of pattern ids ending there
+        self._seen: dict = {}
+        # Per pattern: (length, kind, skill_id, exact lower-case tokens or None)
+        self.patterns: list = []
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    @property
+    def states(self) -> int:
+        return len(self._fail)
+
+    def add(self, tokens: list, kind: str, skill_id: str) -> bool:
+        """
+        Add a pattern before compile().
+
+        Args:
+            tokens:   the pattern's tokens, as the document tokenizer splits it
+            kind:     "full", "abv", "low" or "related"
+            skill_id: SKILL_DB id (or the skills.json name) it stands for
+
+        Returns:
+            False when the pattern is empty or already present
+        """
+        if kind not in KIND_PRIORITY:
+            raise ValueError(f"kind must be one of {', '.join(KIND_PRIORITY)}, got {kind!r}")
+        if self._children is None:
+            raise RuntimeError("Cannot add patterns to a compiled automaton")
+        lowered = tuple(t.lower() for t in tokens if t.strip())
+        if not lowered:
+            return False
+        keys = tuple(token_key(t) for t in lowered)
+        exact = lowered if kind == "abv" else None
+        if (keys, kind, exact) in self._seen:
+            return False
+
+        state = 0
+        for key in keys:
+            child = self._children[state].get(key)
+            if child is None:
+                child = len(self._children)
+                self._children[state][key] = child
+                self._children.append({})
+            state = child
+        pattern_id = len(self.patterns)
+        self.patterns.append((len(keys), kind, skill_id, exact))
+        self._outputs[state] = self._outputs.get(state, ()) + (pattern_id,)
+        self._seen[(keys, kind, exact)] = pattern_id
+        return True
+
+    def compile(self) -> "SkillAutomaton":
+        """Compute failure links breadth-first and freeze the automaton."""
+        children = self._children
+        fail = [0] * len(children)
+        queue = list(children[0].values())
+        for state in queue:
+            for key, child in children[state].items():
+                fallback = fail[state]
+                while fallback and key not in children[fallback]:
+                    fallback = fail[fallback]
+                target = children[fallback].get(key, 0)
+                fail[child] = target if target != child else 0
+                inherited = self._outputs.get(fail[child])
+                if inherited:
+                    self._outputs[child] = self._outputs.get(child, ()) + inherited
+                queue.append(child)
+
+        self._next = {(state, key): child for state, edges in enumerate(children) for key, child in edges.items()}
+        self._fail = fail
+        self._children = None
+        self._seen = {}
+        return self
+
+    def find(self, keys: list):
+        """
+        Every pattern occurrence in a sequence of token keys.
+
+        Yields:
+            (start, end, pattern_id) with end exclusive
+        """
+        transitions, fail, outputs, patterns = self._next, self._fail, self._outputs, self.patterns
+        state = 0
+        for position, key in enumerate(keys):
+            while state and (state, key) not in transitions:
+                state = fail[state]
+            state = transitions.get((state, key), 0)
+            for pattern_id in outputs.get(state, ()):
+                yield position + 1 - patterns[pattern_id][0], position + 1, pattern_id
+
+    def match(self, doc) -> list:
+        """
+        Skills in one sentence, as (skill_text, token_indices) pairs.
+
+        Args:
+            doc: the sentence's tokens (a SpaCy Doc, or anything yielding
+                 tokens with lower_, lemma_ and is_stop)
+
+        Returns:
+            non-overlapping matches in document order. skill_text is the
+            lemmatised span for full names, as SkillNER reports them, and
+            the lower-cased span otherwise. token_indices index into doc.
+        """
+        tokens = list(doc)
+        keys = [token_key(t.lemma_ or t.lower_) for t in tokens]
+
+        candidates = []
+        for start, end, pattern_id in self.find(keys):
+            length, kind, _, exact = self.patterns[pattern_id]
+            if length == 1 and tokens[start].is_stop:
+                continue
+            if exact is not None and tuple(t.lower_ for t in tokens[start:end]) != exact:
+                continue
+            candidates.append((-length, KIND_PRIORITY[kind], start, end, kind))
+
+        taken = [False] * len(tokens)
+        chosen = []
+        for _, _, start, end, kind in sorted(candidates):
+            if any(taken[start:end]):
+                continue
+            taken[start:end] = [True] * (end - start)
+            chosen.append((start, end, kind))
+
+        skills = []
+        for start, end, kind in sorted(chosen):
+            span = tokens[start:end]
+            words = [t.lemma_ or t.lower_ for t in span] if kind == "full" else [t.lower_ for t in span]
+            skills.append((" ".join(words), list(range(start, end))))
+        return skills
+
+
+def build_automaton(skill_db: dict, tokenize, clean=None,
+                    skills_json: str | None = DEFAULT_SKILLS_JSON) -> SkillAutomaton:
+    """
+    Compile SKILL_DB and data/skills.json into a SkillAutomaton.
+
+    Args:
+        skill_db:    SkillNER SKILL_DB-style dict
+        tokenize:    the tokenizer documents are split with (e.g. nlp.make_doc),
+                     so patterns split the same way
+        clean:       text cleaning applied to documents before tokenising
+                     (e.g. SkillNER's punctuation removal); applied to the
+                     skills.json terms too
+        skills_json: path to a {"skills": [{name, related_terms}]} file; None skips it
+
+    Returns:
+        the compiled automaton
+    """
+    started = time.perf_counter()
+    automaton = SkillAutomaton()
+
+    def add(text, kind, skill_id):
+        if isinstance(text, str) and text.strip():
+            automaton.add([t.text for t in tokenize(text)], kind, skill_id)
+
+    for skill_id, entry in skill_db.items():
+        forms = entry.get("high_surfce_forms", {})
+        add(forms.get("full"), "full", skill_id)
+        add(forms.get("abv"), "abv", skill_id)
+        for form in entry.get("low_surface_forms", []):
+            add(form, "low", skill_id)
+
+    if skills_json and os.path.exists(skills_json):
+        with open(skills_json, encoding="utf-8") as f:
+            for skill in json.load(f).get("skills", []):
+                for term in [skill.get("name", "")] + skill.get("related_terms", []):
+                    if isinstance(term, str):
+                        add(clean(term) if clean else term, "related", skill.get("name", term))
+
+    automaton.compile()
+    logger.info(
+        "Compiled skill automaton: %d patterns, %d states in %.2fs",
+        len(automaton), automaton.states, time.perf_counter() - started,
+    )
+    return automaton
+
+
+def vocabulary_version(skills_json: str = DEFAULT_SKILLS_JSON) -> str:
+    """Hash of data/skills.json, which the automaton compiles in alongside SKILL_DB."""
+    if not os.path.exists(skills_json):
+        return "none"
+    with open(skills_json, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
@@ -0,0 +1,99 @@
+"""
+Document clean-up and context weighting shared by the skill extractors.
+
+SkillExtractorSingleton (SkillNER or the skill automaton) and the custom
+NER extractor clean text and weight a job skill by the words around it in
+exactly the same way, so their outputs can be compared and swapped.
+"""
+import re
+
+# Words near a skill that mark it as required (+2) or preferred (+1)
+REQUIRED_KEYWORDS = {
+    "must", "required", "mandatory", "essential", "needed",
+    "necessity", "expertise", "strong", "proficiency"
+}
+PREFERRED_KEYWORDS = {
+    "preferred", "nice-to-have", "plus", "beneficial",
+    "bonus", "familiarity", "desire"
+}
+BASE_WEIGHT = 1.0
+WINDOW_SIZE = 5  # how many words to look around
+
+
+def _word_sequences(keywords) -> list:
+    """
+    Keywords as sequences of lowercase words, the form they take in a
+    punctuation-stripped sentence ("nice-to-have" -> ("nice", "to", "have")).
+    """
+    return [tuple(re.findall(r"[a-z0-9]+", keyword.lower())) for keyword in keywords]
+
+
+_REQUIRED_SEQUENCES = _word_sequences(REQUIRED_KEYWORDS)
+_PREFERRED_SEQUENCES = _word_sequences(PREFERRED_KEYWORDS)
+
+
+def _contains_any(words: list, sequences: list) -> bool:
+    """True if any of the word sequences occurs, contiguously, in words."""
+    for sequence in sequences:
+        n = len(sequence)
+        if any(tuple(words[i:i + n]) == sequence for i in range(len(words) - n + 1)):
+            return True
+    return False
+
+
+def normalize_document(text: str) -> str:
+    """Normalize whitespace and encoding before skill extraction."""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    # Replace common bullet/arrow characters that confuse SkillNER's tokeniser
+    text = re.sub(r'[•●◦▸▹►◉✓✗✔✖★☆▪▫]', ' ', text)
+    # Collapse multiple spaces/tabs on a single line to one space
+    text = re.sub(r'[^\S\n]+', ' ', text)
+    # Strip each line and drop more than one consecutive blank line
+    lines = [line.strip() for line in text.split('\n')]
+    text = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines))
+    return text.strip()
+
+
+def skill_weight(doc, skill_indices) -> float:
+    """
+    Compute skill weight based on surrounding context.
+
+    Args:
+        doc: SpaCy document the indices refer to
+        skill_indices: Indices of the skill tokens
+
+    Returns:
+        float: Computed weight
+    """
+    base_weight = BASE_WEIGHT
+
+    # doc_node_id from SkillNER is usually a list; guard against int or empty
+    if isinstance(skill_indices, int):
+        skill_indices = [skill_indices]
+    if not skill_indices:
+        return base_weight
+
+    start_token = min(skill_indices)
+    end_token = max(skill_indices)
+
+    # SkillNER's sentences have their punctuation stripped before tagging and
+    # the NER extractor's do not, so the window is counted in words and
+    # compared as words: "nice-to-have" is nice, to, have in both
+    def words(tokens):
+        return [t.lower_ for t in tokens if not t.is_punct]
+
+    surrounding_words = (
+        words(doc[:start_token])[-WINDOW_SIZE:]
+        + words(doc[start_token:end_token + 1])
+        + words(doc[end_token + 1:])[:WINDOW_SIZE]
+    )
+
+    # If 'must' or 'required' is near, increase weight
+    if _contains_any(surrounding_words, _REQUIRED_SEQUENCES):
+        base_weight += 2.0
+
+    # If 'preferred' is near, increase weight slightly
+    if _contains_any(surrounding_words, _PREFERRED_SEQUENCES):
+        base_weight += 1.0
+
+    return base_weight
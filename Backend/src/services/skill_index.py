@@ -0,0 +1,192 @@
+"""
+Precomputed embeddings for every skill string the extractor can emit.
+
+SkillNER only ever reports surface forms from SKILL_DB, and data/skills.json
+adds our own canonical names and related terms, so nearly every skill that
+reaches the gap analyzer can be embedded ahead of time. The build step
+writes two files:
+
+    embeddings.npy  — (n, dim) float16 or float32 matrix
+    strings.json    — model id, dtype and the n normalized strings, in row order
+
+Build it once (the Dockerfile does this at image build time):
+
+    cd Backend/src
+    python -m services.skill_index --output models/skill_index
+"""
+import argparse
+import json
+import logging
+import os
+import numpy as np
+from services.embedding_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INDEX_DIR = os.path.join(_SRC_DIR, "models", "skill_index")
+DEFAULT_SKILLS_JSON = os.path.join(_SRC_DIR, "..", "data", "skills.json")
+
+_EMBEDDINGS_FILE = "embeddings.npy"
+_STRINGS_FILE = "strings.json"
+
+
+class SkillEmbeddingIndex:
+    """Read-only lookup table of precomputed skill embeddings for one model."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, _STRINGS_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.path = path
+        self.model_id = meta["model_id"]
+        self.dtype = meta["dtype"]
+        # Memory-mapped so every worker process shares the same pages
+        self._matrix = np.load(os.path.join(path, _EMBEDDINGS_FILE), mmap_mode="r")
+        self._rows = {text: row for row, text in enumerate(meta["strings"])}
+        self.dim = self._matrix.shape[1]
+        logger.info(
+            "Loaded skill embedding index: %d strings (%s, dim=%d) from %s",
+            len(self._rows), self.dtype, self.dim, path,
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, text: str) -> bool:
+        return normalize_text(text) in self._rows
+
+    def lookup(self, texts: list) -> tuple[dict, list]:
+        """
+        Returns:
+            (found, missing) — found maps position in ``texts`` to a float32
+            vector; missing lists the positions not in the index
+        """
+        found: dict = {}
+        missing: list = []
+        for pos, text in enumerate(texts):
+            row = self._rows.get(normalize_text(text))
+            if row is None:
+                missing.append(pos)
+            else:
+                found[pos] = np.asarray(self._matrix[row], dtype=np.float32)
+        return found, missing
+
+
+def load_index(model_id: str, path: str | None = None) -> SkillEmbeddingIndex | None:
+    """
+    Load the index at path (default: SKILLBRIDGE_SKILL_INDEX or models/skill_index).
+
+    Returns None when the index is absent or was built with a different model,
+    so callers simply fall back to encoding everything.
+    """
+    path = path or os.getenv("SKILLBRIDGE_SKILL_INDEX") or DEFAULT_INDEX_DIR
+    if not os.path.exists(os.path.join(path, _STRINGS_FILE)):
+        logger.info("No skill embedding index at %s; all skills will be encoded on demand", path)
+        return None
+    try:
+        index = SkillEmbeddingIndex(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error("Could not load skill embedding index from %s: %s", path, e)
+        return None
+    if index.model_id != model_id:
+        logger.warning(
+            "Skill embedding index at %s was built for %r, not %r — ignoring it",
+            path, index.model_id, model_id,
+        )
+        return None
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Build step
+# ---------------------------------------------------------------------------
+
+def collect_skill_strings(skill_db: dict | None = None, skills_json: str | None = None) -> list:
+    """
+    Gather every normalized skill string from SKILL_DB and data/skills.json.
+
+    Args:
+        skill_db:    SkillNER SKILL_DB-style dict; None skips it
+        skills_json: path to a {"skills": [{name, related_terms}]} file; None skips it
+
+    Returns:
+        list of unique normalized strings, in first-seen order
+    """
+    strings = []
+    if skill_db:
+        for entry in skill_db.values():
+            strings.append(entry.get("skill_name", ""))
+            strings.extend(entry.get("high_surfce_forms", {}).values())
+            strings.extend(entry.get("low_surface_forms", []))
+    if skills_json:
+        with open(skills_json, encoding="utf-8") as f:
+            for skill in json.load(f).get("skills", []):
+                strings.append(skill.get("name", ""))
+                strings.extend(skill.get("related_terms", []))
+
+    normalized = (normalize_text(s) for s in strings if isinstance(s, str))
+    return list(dict.fromkeys(s for s in normalized if s))
+
+
+def build_index(model, model_id: str, strings: list, output_dir: str,
+                dtype: str = "float16", batch_size: int = 256) -> str:
+    """
+    Encode strings with model and write embeddings.npy + strings.json to output_dir.
+
+    Args:
+        model:      object with a SentenceTransformer-style encode()
+        model_id:   name recorded in the index; must match EmbeddingService's model_name
+        strings:    normalized strings to encode
+        output_dir: directory to create / overwrite
+        dtype:      "float16" (half the size) or "float32"
+
+    Returns:
+        output_dir
+    """
+    if dtype not in ("float16", "float32"):
+        raise ValueError(f"dtype must be float16 or float32, got {dtype!r}")
+
+    logger.info("Encoding %d skill strings with %s…", len(strings), model_id)
+    embeddings = model.encode(strings, batch_size=batch_size, show_progress_bar=False)
+    embeddings = np.asarray(embeddings).astype(dtype)
+
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(os.path.join(output_dir, _EMBEDDINGS_FILE), embeddings)
+    with open(os.path.join(output_dir, _STRINGS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"model_id": model_id, "dtype": dtype, "strings": strings}, f)
+
+    logger.info(
+        "Wrote skill embedding index to %s (%d × %d, %.1f MB)",
+        output_dir, embeddings.shape[0], embeddings.shape[1], embeddings.nbytes / 1e6,
+    )
+    return output_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the precomputed skill embedding index.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model")
+    parser.add_argument("--output", default=DEFAULT_INDEX_DIR, help="index directory")
+    parser.add_argument("--skills-json", default=DEFAULT_SKILLS_JSON, help="path to data/skills.json")
+    parser.add_argument("--dtype", choices=("float16", "float32"), default="float16")
+    parser.add_argument("--no-skill-db", action="store_true", help="skip SkillNER's SKILL_DB")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    skill_db = None
+    if not args.no_skill_db:
+        from skillNer.general_params import SKILL_DB
+        skill_db = SKILL_DB
+    skills_json = args.skills_json if os.path.exists(args.skills_json) else None
+    if skills_json is None:
+        logger.warning("%s not found; indexing SKILL_DB only", args.skills_json)
+
+    strings = collect_skill_strings(skill_db, skills_json)
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(args.model, device="cpu")
+    build_index(model, args.model, strings, args.output, dtype=args.dtype)
+
+
+if __name__ == "__main__":
+    main()
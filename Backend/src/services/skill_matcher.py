@@ -0,0 +1,129 @@
+import logging
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+logger = logging.getLogger(__name__)
+
+MATCH_MODES = ("best", "top_k", "one_to_one")
+
+
+def normalize_rows(matrix) -> np.ndarray:
+    """
+    Scale every row of an embedding matrix to unit length.
+
+    All-zero rows (used as placeholders when encoding fails) stay zero, so
+    they score 0.0 against everything instead of producing NaNs.
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def similarity_matrix(query_embeddings, candidate_embeddings) -> np.ndarray:
+    """
+    Cosine similarity of every query row against every candidate row.
+
+    Returns:
+        np.ndarray of shape (n_queries, n_candidates)
+    """
+    return normalize_rows(query_embeddings) @ normalize_rows(candidate_embeddings).T
+
+
+def best_matches(similarities: np.ndarray, threshold: float) -> dict:
+    """
+    Pick the single most similar candidate for each query row.
+
+    Ties go to the lowest candidate index.
+
+    Returns:
+        {row: [(col, score)]} for rows whose best score reaches threshold
+    """
+    if similarities.size == 0:
+        return {}
+    cols = similarities.argmax(axis=1)
+    scores = similarities[np.arange(len(cols)), cols]
+    rows = np.flatnonzero(scores >= threshold)
+    return {int(r): [(int(cols[r]), float(scores[r]))] for r in rows}
+
+
+def top_k_matches(similarities: np.ndarray, threshold: float, k: int) -> dict:
+    """
+    Keep up to k candidates per query row, ranked by similarity.
+
+    Returns:
+        {row: [(col, score), ...]} best-first, only scores ≥ threshold
+    """
+    if similarities.size == 0 or k < 1:
+        return {}
+    k = min(k, similarities.shape[1])
+    # argpartition finds the k largest without sorting the whole row
+    top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(similarities, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    matches = {}
+    for row in range(similarities.shape[0]):
+        kept = [
+            (int(col), float(score))
+            for col, score in zip(top[row], top_scores[row])
+            if score >= threshold
+        ]
+        if kept:
+            matches[row] = kept
+    return matches
+
+
+def one_to_one_matches(similarities: np.ndarray, threshold: float) -> dict:
+    """
+    Assign each candidate to at most one query row (Hungarian algorithm).
+
+    Maximises the total similarity of the assignment, then drops pairs that
+    fall below threshold.
+
+    Returns:
+        {row: [(col, score)]}
+    """
+    if similarities.size == 0:
+        return {}
+    rows, cols = linear_sum_assignment(similarities, maximize=True)
+    return {
+        int(r): [(int(c), float(similarities[r, c]))]
+        for r, c in zip(rows, cols)
+        if similarities[r, c] >= threshold
+    }
+
+
+def match(
+    query_embeddings,
+    candidate_embeddings,
+    threshold: float,
+    mode: str = "best",
+    k: int = 3,
+) -> dict:
+    """
+    Match query embeddings against candidate embeddings in one matrix product.
+
+    Args:
+        query_embeddings:     (n, d) array-like, e.g. job-skill embeddings
+        candidate_embeddings: (m, d) array-like, e.g. resume-skill embeddings
+        threshold:            minimum cosine similarity for a match
+        mode:                 "best" | "top_k" | "one_to_one"
+        k:                    candidates kept per row in "top_k" mode
+
+    Returns:
+        {query_row: [(candidate_col, score), ...]} best-first
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode: {mode!r} (expected one of {MATCH_MODES})")
+    if len(query_embeddings) == 0 or len(candidate_embeddings) == 0:
+        return {}
+
+    similarities = similarity_matrix(query_embeddings, candidate_embeddings)
+    if mode == "top_k":
+        return top_k_matches(similarities, threshold, k)
+    if mode == "one_to_one":
+        return one_to_one_matches(similarities, threshold)
+    return best_matches(similarities, threshold)
@@ -0,0 +1,158 @@
+"""
+Versioned snapshot of SkillNER's PhraseMatchers.
+
+Building SkillNER's five matchers tokenizes tens of thousands of SKILL_DB
+surface forms on every process start. The matchers only store each pattern
+as a tuple of LOWER-attribute hashes, so those tuples are written to disk
+once and replayed straight into fresh PhraseMatchers at startup without
+tokenizing anything. The snapshot carries a version hash of everything that
+shapes those hashes (SpaCy, SkillNER, the pipeline and SKILL_DB); on a
+mismatch the caller rebuilds from scratch.
+
+Build it once (the Dockerfile does this at image build time):
+
+    cd Backend/src
+    python -m services.skillner_snapshot
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from importlib import metadata
+import spacy
+import srsly
+from spacy.matcher import PhraseMatcher
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_SNAPSHOT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "models", "skillner_matchers.msgpack",
+)
+
+
+def snapshot_path() -> str:
+    return os.getenv("SKILLBRIDGE_SKILLNER_SNAPSHOT") or DEFAULT_SNAPSHOT_PATH
+
+
+def package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def skill_db_hash(skill_db: dict) -> str:
+    return hashlib.sha256(json.dumps(skill_db, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def snapshot_version(nlp, skill_db: dict) -> str:
+    """Hash of the SpaCy / SkillNER / pipeline / SKILL_DB versions a snapshot depends on."""
+    parts = {
+        "format": SNAPSHOT_FORMAT,
+        "spacy": spacy.__version__,
+        "skillner": package_version("skillNer"),
+        "pipeline": f"{nlp.meta.get('lang')}_{nlp.meta.get('name')}-{nlp.meta.get('version')}",
+        "skill_db": skill_db_hash(skill_db),
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def save_snapshot(matchers: dict, version: str, path: str | None = None) -> str:
+    """
+    Write the patterns of SkillNER's loaded matchers to path.
+
+    Args:
+        matchers: {name: PhraseMatcher} as returned by Matchers.load_matchers()
+        version:  snapshot_version() of the pipeline they were built with
+
+    Returns:
+        the path written
+    """
+    path = path or snapshot_path()
+    payload = {"version": version, "matchers": {}}
+    for name, matcher in matchers.items():
+        # __reduce__ exposes (vocab, {key: {pattern hash tuples}}, callbacks, attr)
+        _, patterns, _, attr = matcher.__reduce__()[1]
+        payload["matchers"][name] = {
+            "attr": attr,
+            "patterns": {key: [list(p) for p in specs] for key, specs in patterns.items()},
+        }
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(srsly.msgpack_dumps(payload))
+    os.replace(tmp_path, path)
+    logger.info("Wrote SkillNER matcher snapshot to %s (%d matchers)", path, len(matchers))
+    return path
+
+
+def load_snapshot(vocab, version: str, path: str | None = None) -> dict | None:
+    """
+    Rebuild SkillNER's matchers from a snapshot.
+
+    Returns:
+        {name: PhraseMatcher}, or None when the snapshot is missing, unreadable
+        or was built against a different version
+    """
+    path = path or snapshot_path()
+    if not os.path.exists(path):
+        logger.info("No SkillNER matcher snapshot at %s; building matchers from SKILL_DB", path)
+        return None
+
+    started = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            payload = srsly.msgpack_loads(f.read())
+    except (OSError, ValueError) as e:
+        logger.error("Could not read SkillNER matcher snapshot %s: %s", path, e)
+        return None
+    if not isinstance(payload, dict):
+        logger.error("SkillNER matcher snapshot %s is not a snapshot; rebuilding", path)
+        return None
+
+    if payload.get("version") != version:
+        logger.warning(
+            "SkillNER matcher snapshot %s is stale (SpaCy/SkillNER/SKILL_DB changed); rebuilding",
+            path,
+        )
+        return None
+
+    matchers = {}
+    for name, data in payload["matchers"].items():
+        matcher = PhraseMatcher(vocab, attr=data["attr"])
+        for key, specs in data["patterns"].items():
+            matcher.add(key, specs)
+        matchers[name] = matcher
+
+    logger.info(
+        "Loaded SkillNER matcher snapshot in %.2fs from %s",
+        time.perf_counter() - started, path,
+    )
+    return matchers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the SkillNER matcher snapshot.")
+    parser.add_argument("--output", default=None, help="snapshot file (default: models/skillner_matchers.msgpack)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    from skillNer.general_params import SKILL_DB
+    from skillNer.matcher_class import Matchers
+    from services.optimized_job_analyzer import load_nlp
+
+    nlp = load_nlp()
+    started = time.perf_counter()
+    matchers = Matchers(nlp, SKILL_DB, PhraseMatcher).load_matchers()
+    logger.info("Built SkillNER matchers in %.1fs", time.perf_counter() - started)
+    save_snapshot(matchers, snapshot_version(nlp, SKILL_DB), args.output)
+
+
+if __name__ == "__main__":
+    main()
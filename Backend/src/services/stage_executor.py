@@ -0,0 +1,176 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from services import profiling
+from services.metrics import STAGE_QUEUE_SECONDS
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Default number of calls each stage may run at once. Override per stage with
+# SKILLBRIDGE_<STAGE>_CONCURRENCY, e.g. SKILLBRIDGE_SKILLS_CONCURRENCY=4.
+DEFAULT_STAGE_LIMITS = {
+    "pdf": 4,
+    "skills": 2,
+    "gaps": 2,
+}
+
+
+class StageBusyError(Exception):
+    """Raised when a stage's wait queue is full and the call is rejected."""
+
+    def __init__(self, stage: str, retry_after: int):
+        super().__init__(f"Stage '{stage}' is at capacity; retry in {retry_after}s")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class StageExecutor:
+    """
+    Runs blocking pipeline stages off the asyncio event loop.
+
+    Each stage has its own concurrency limit (a semaphore) and a bounded wait
+    queue in front of it. When the queue is full the call is rejected straight
+    away with StageBusyError, so the router can answer 429 instead of letting
+    requests pile up behind a busy model.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int | None = None,
+        stage_limits: dict | None = None,
+        max_queue: int = 16,
+        retry_after: int = 5,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown executor mode: {mode!r} (expected 'thread' or 'process')")
+
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self.stage_limits = dict(DEFAULT_STAGE_LIMITS)
+        self.stage_limits.update(stage_limits or {})
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+
+        self._semaphores = {
+            stage: asyncio.Semaphore(limit) for stage, limit in self.stage_limits.items()
+        }
+        self._pending = {stage: 0 for stage in self.stage_limits}
+
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+
+        logger.info(
+            "StageExecutor ready (mode=%s, workers=%d, queue=%d, limits=%s)",
+            mode, self.max_workers, max_queue, self.stage_limits,
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def run(self, stage: str, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the pool assigned to stage.
+
+        Raises:
+            StageBusyError: the stage already has limit + max_queue calls
+                            in flight
+            KeyError:       stage has no configured limit
+        """
+        limit = self.stage_limits[stage]
+        if self._pending[stage] >= limit + self.max_queue:
+            logger.warning(
+                "Rejecting %s call: %d in flight (limit %d, queue %d)",
+                stage, self._pending[stage], limit, self.max_queue,
+            )
+            raise StageBusyError(stage, self.retry_after)
+
+        self._pending[stage] += 1
+        queued = time.perf_counter()
+        try:
+            await self._semaphores[stage].acquire()
+        except BaseException:
+            self._pending[stage] -= 1
+            raise
+
+        STAGE_QUEUE_SECONDS.labels(stage).observe(time.perf_counter() - queued)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        if self.mode == "thread":
+            # Lets a profiled request sample the worker running its stage
+            call = profiling.bind(call, stage)
+        try:
+            future = self._pool_for(stage).submit(call)
+        except BaseException:
+            self._release(stage)
+            raise
+
+        # A running call cannot be stopped, so the slot is held until the
+        # worker finishes even if the awaiting task is cancelled first
+        future.add_done_callback(lambda _: self._release_threadsafe(loop, stage))
+        return await asyncio.wrap_future(future)
+
+    def queue_depths(self) -> dict:
+        """Return {stage: calls running or waiting} for every configured stage."""
+        return dict(self._pending)
+
+    def shutdown(self):
+        """Stop the worker pools; pending work is allowed to finish."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _release(self, stage: str):
+        self._pending[stage] -= 1
+        self._semaphores[stage].release()
+
+    def _release_threadsafe(self, loop, stage: str):
+        """Release a slot from a worker thread (or wherever the future completed)."""
+        try:
+            loop.call_soon_threadsafe(self._release, stage)
+        except RuntimeError:
+            # The loop has closed; nothing is waiting on the slot any more
+            self._release(stage)
+
+    def _pool_for(self, stage: str) -> Executor:
+        if self.mode == "process":
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._process_pool
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="stage"
+            )
+        return self._thread_pool
+
+
+def executor_from_env() -> StageExecutor:
+    """Build a StageExecutor from SKILLBRIDGE_* environment variables."""
+    stage_limits = {}
+    for stage in DEFAULT_STAGE_LIMITS:
+        value = os.getenv(f"SKILLBRIDGE_{stage.upper()}_CONCURRENCY")
+        if value:
+            stage_limits[stage] = int(value)
+
+    max_workers = os.getenv("SKILLBRIDGE_MAX_WORKERS")
+    return StageExecutor(
+        mode=os.getenv("SKILLBRIDGE_EXECUTOR", "thread"),
+        max_workers=int(max_workers) if max_workers else None,
+        stage_limits=stage_limits,
+        max_queue=int(os.getenv("SKILLBRIDGE_QUEUE_SIZE", "16")),
+        retry_after=int(os.getenv("SKILLBRIDGE_RETRY_AFTER", "5")),
+    )
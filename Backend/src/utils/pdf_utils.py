@@ -1,26 +1,344 @@
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
+from pdfminer.converter import TextConverter
 from pdfminer.high_level import extract_text
-import tempfile
+from pdfminer.layout import LAParams
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+import multiprocessing
 import os
 import logging
+import threading
+import time
+import zipfile
+
+from services import profiling
+from services.metrics import observe_stage
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF cannot be parsed."""
+
+
+class PDFTooLargeError(PDFExtractionError):
+    """Raised when a PDF exceeds the configured byte or page limit."""
+
+
+def _as_binary_stream(pdf_data, max_bytes: int | None = None):
+    """
+    Wrap bytes / bytearray / memoryview / a binary stream in a seekable reader
+    without touching disk.
+
+    Raises:
+        PDFTooLargeError: the input is larger than max_bytes
+        TypeError:        unsupported input type
+    """
+    if isinstance(pdf_data, (bytes, bytearray, memoryview)):
+        size = pdf_data.nbytes if isinstance(pdf_data, memoryview) else len(pdf_data)
+        if max_bytes is not None and size > max_bytes:
+            raise PDFTooLargeError(f"PDF is {size} bytes; the limit is {max_bytes}")
+        # BytesIO shares a bytes object's buffer until it is written to;
+        # a bytearray or memoryview is copied (once) into the reader
+        return BytesIO(pdf_data)
+
+    if hasattr(pdf_data, "read"):
+        if hasattr(pdf_data, "seekable") and pdf_data.seekable() and max_bytes is None:
+            return pdf_data
+        # pdfminer needs random access, so non-seekable streams are buffered;
+        # read one byte past the limit to detect oversize input
+        data = pdf_data.read() if max_bytes is None else pdf_data.read(max_bytes + 1)
+        if max_bytes is not None and len(data) > max_bytes:
+            raise PDFTooLargeError(f"PDF is larger than the {max_bytes}-byte limit")
+        return BytesIO(data)
+
+    raise TypeError(f"Unsupported PDF input type: {type(pdf_data)}")
+
+
+# Layout-analysis presets. "exact" is pdfminer's default and reproduces
+# extract_text() byte for byte. The skill extractor only needs the reading
+# order of the text, not its boxes, so "fast" skips the costly
+# box-ordering pass and "none" turns layout analysis off entirely
+# (characters come out in content-stream order).
+LAYOUT_MODES = ("exact", "fast", "none")
+
+
+def layout_params(layout: str = "exact") -> LAParams | None:
+    """Return the LAParams for a layout mode (None means no layout analysis)."""
+    if layout == "exact":
+        return LAParams()
+    if layout == "fast":
+        return LAParams(boxes_flow=None, detect_vertical=False, all_texts=False)
+    if layout == "none":
+        return None
+    raise ValueError(f"layout must be one of {LAYOUT_MODES}, got {layout!r}")
+
+
+def _render_pages(fp, laparams: LAParams | None, pagenos=None, max_pages: int | None = None):
+    """
+    Yield (page_number, text, seconds) for each selected page of an open PDF.
+
+    page_number is 1-based; pagenos, if given, is a set of 0-based indices.
+    """
+    output = StringIO()
+    rsrcmgr = PDFResourceManager(caching=True)
+    device = TextConverter(rsrcmgr, output, laparams=laparams)
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+
+    try:
+        for index, page in enumerate(PDFPage.get_pages(fp, caching=True)):
+            page_number = index + 1
+            if max_pages is not None and page_number > max_pages:
+                raise PDFTooLargeError(f"PDF has more than {max_pages} pages")
+            if pagenos is not None and index not in pagenos:
+                continue
+            started = time.perf_counter()
+            interpreter.process_page(page)
+            text = output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            yield page_number, text, time.perf_counter() - started
+    except PDFExtractionError:
+        raise
+    except Exception as e:
+        raise PDFExtractionError(f"Could not parse PDF: {e}") from e
+    finally:
+        device.close()
+
+
+def iter_pdf_pages(pdf_data, max_pages: int | None = None, max_bytes: int | None = None,
+                   laparams: LAParams | None = None):
+    """
+    Yield the text of each page in order, parsing the PDF from memory.
+
+    Pages are produced one at a time so callers can stop early, and only the
+    current page's text is buffered. Each page's text ends with pdfminer's
+    form-feed separator, so ''.join() of the pages equals extract_text().
+
+    Args:
+        pdf_data:  bytes, bytearray, memoryview or binary file-like object
+        max_pages: raise PDFTooLargeError if the PDF has more pages than this
+        max_bytes: raise PDFTooLargeError if the PDF is larger than this
+        laparams:  pdfminer layout parameters (default: LAParams())
+
+    Raises:
+        PDFTooLargeError:   a limit was exceeded
+        PDFExtractionError: the PDF could not be parsed
+    """
+    fp = _as_binary_stream(pdf_data, max_bytes)
+    for _, text, _ in _render_pages(fp, laparams or LAParams(), max_pages=max_pages):
+        yield text
+
+
+# ---------------------------------------------------------------------------
+# Parallel per-page extraction
+# ---------------------------------------------------------------------------
+
+_page_pool: ProcessPoolExecutor | None = None
+_page_pool_workers = 0
+_page_pool_lock = threading.Lock()
+
+
+def _pool_context():
+    """
+    Start page workers from a forkserver (spawn where that isn't available).
+
+    Forking the API process copies its threads' locks mid-use — the event
+    loop's executors, the model loaders, tokenizer pools — and a worker can
+    deadlock on one it inherited held. Workers only need pdfminer, so a
+    clean interpreter costs little.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _get_page_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared process pool for page rendering, created on first use."""
+    global _page_pool, _page_pool_workers
+    with _page_pool_lock:
+        if _page_pool is None or _page_pool_workers != workers:
+            if _page_pool is not None:
+                _page_pool.shutdown(wait=False)
+            _page_pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+            _page_pool_workers = workers
+        return _page_pool
+
+
+def shutdown_page_pool():
+    """Stop the page-rendering process pool, if one was started."""
+    global _page_pool, _page_pool_workers
+    with _page_pool_lock:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=False, cancel_futures=True)
+            _page_pool = None
+            _page_pool_workers = 0
+
+
+def _count_pages(fp) -> int:
+    """Number of pages, read from the page tree without rendering anything."""
+    try:
+        return sum(1 for _ in PDFPage.get_pages(fp))
+    except Exception as e:
+        raise PDFExtractionError(f"Could not parse PDF: {e}") from e
+    finally:
+        fp.seek(0)
+
+
+def _render_page_range(pdf_bytes: bytes, pagenos: list, layout: str) -> list:
+    """Process-pool task: render a contiguous run of pages from raw PDF bytes."""
+    return list(_render_pages(BytesIO(pdf_bytes), layout_params(layout), pagenos=set(pagenos)))
+
+
+def extract_pdf_pages(pdf_data, layout: str = "exact", workers: int = 1,
+                      max_pages: int | None = None, max_bytes: int | None = None) -> list:
+    """
+    Extract every page's text, optionally spreading pages across processes.
+
+    Pages are split into one contiguous run per worker and reassembled in
+    page order. PDFs with a single page, or workers <= 1, are rendered in
+    the calling process.
+
+    Args:
+        pdf_data:  bytes, bytearray, memoryview or binary file-like object
+        layout:    "exact", "fast" or "none" (see LAYOUT_MODES)
+        workers:   number of processes to render pages in
+        max_pages: page limit (see iter_pdf_pages)
+        max_bytes: byte limit (see iter_pdf_pages)
+
+    Returns:
+        list of {"page": int, "text": str, "seconds": float}, in page order
+
+    Raises:
+        PDFTooLargeError:   a limit was exceeded
+        PDFExtractionError: the PDF could not be parsed
+    """
+    laparams = layout_params(layout)
+    fp = _as_binary_stream(pdf_data, max_bytes)
+
+    page_count = _count_pages(fp) if workers > 1 else 0
+    if page_count < 2:
+        rendered = list(_render_pages(fp, laparams, max_pages=max_pages))
+    else:
+        if max_pages is not None and page_count > max_pages:
+            raise PDFTooLargeError(f"PDF has more than {max_pages} pages")
+        pdf_bytes = fp.getvalue() if isinstance(fp, BytesIO) else fp.read()
+        workers = min(workers, page_count)
+        chunk = -(-page_count // workers)
+        runs = [list(range(i, min(i + chunk, page_count))) for i in range(0, page_count, chunk)]
+        pool = _get_page_pool(workers)
+        futures = [pool.submit(_render_page_range, pdf_bytes, run, layout) for run in runs]
+        rendered = [page for future in futures for page in future.result()]
+
+    return [
+        {"page": number, "text": text, "seconds": seconds}
+        for number, text, seconds in rendered
+    ]
+
+
+def extract_text_from_bytes(pdf_data, max_pages: int | None = None,
+                            max_bytes: int | None = None, layout: str = "exact",
+                            workers: int = 1) -> str:
+    """
+    Extract all text from an in-memory PDF.
+
+    Args:
+        pdf_data:  bytes, bytearray, memoryview or binary file-like object
+        max_pages: page limit (see iter_pdf_pages)
+        max_bytes: byte limit (see iter_pdf_pages)
+        layout:    "exact" (identical to pdfminer's extract_text()), "fast" or "none"
+        workers:   processes to render pages in (see extract_pdf_pages)
+
+    Returns:
+        str: extracted text
+
+    Raises:
+        PDFTooLargeError:   a limit was exceeded
+        PDFExtractionError: the PDF could not be parsed
+    """
+    started = time.perf_counter()
+    pages = extract_pdf_pages(
+        pdf_data, layout=layout, workers=workers, max_pages=max_pages, max_bytes=max_bytes,
+    )
+    text = "".join(page["text"] for page in pages)
+    elapsed = time.perf_counter() - started
+    observe_stage("pdf", elapsed)
+    profiling.annotate("pdf", pages=len(pages), characters=len(text))
+    logger.info(
+        "Extracted %d characters from %d-page PDF in %.3fs (layout=%s, workers=%d; per page: %s)",
+        len(text), len(pages), elapsed, layout, workers,
+        ", ".join(f"{page['seconds']:.3f}s" for page in pages),
+    )
+    return text
+
+
+def read_pdfs_from_zip(zip_data, max_files: int | None = None,
+                       max_bytes: int | None = None) -> list:
+    """
+    Read every PDF member of an in-memory zip archive.
+
+    Directories, non-PDF members and macOS resource forks are skipped.
+
+    Args:
+        zip_data:  bytes of a .zip file
+        max_files: raise PDFTooLargeError if the archive holds more PDFs than this
+        max_bytes: raise PDFTooLargeError if any PDF inflates to more than this
+
+    Returns:
+        list of (member_name, pdf_bytes), in archive order
+
+    Raises:
+        PDFTooLargeError:   a limit was exceeded
+        PDFExtractionError: the archive could not be read
+    """
+    try:
+        archive = zipfile.ZipFile(BytesIO(zip_data))
+    except zipfile.BadZipFile as e:
+        raise PDFExtractionError(f"Could not read zip archive: {e}") from e
+
+    with archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith(".pdf")
+            and not info.filename.startswith("__MACOSX/")
+        ]
+        if max_files is not None and len(members) > max_files:
+            raise PDFTooLargeError(f"Archive holds {len(members)} PDFs; the limit is {max_files}")
+
+        pdfs = []
+        for info in members:
+            if max_bytes is not None and info.file_size > max_bytes:
+                raise PDFTooLargeError(
+                    f"{info.filename} is {info.file_size} bytes; the limit is {max_bytes}"
+                )
+            try:
+                with archive.open(info) as member:
+                    # The header size can lie, so never inflate past the limit
+                    data = member.read() if max_bytes is None else member.read(max_bytes + 1)
+            except (zipfile.BadZipFile, OSError, RuntimeError) as e:
+                raise PDFExtractionError(f"Could not read {info.filename}: {e}") from e
+            if max_bytes is not None and len(data) > max_bytes:
+                raise PDFTooLargeError(f"{info.filename} is larger than the {max_bytes}-byte limit")
+            pdfs.append((info.filename, data))
+    return pdfs
+
+
 def extract_text_from_pdf(pdf_file_or_path):
     """
     Extract text content from a PDF file.
-    
+
     Args:
-        pdf_file_or_path: UploadFile from FastAPI, file-like object, or a dictionary containing a file
-        
+        pdf_file_or_path: UploadFile from FastAPI, file-like object, raw bytes,
+            a dictionary containing a file, or a path string
+
     Returns:
         str: Extracted text content
     """
-    temp_path = None
-    
     try:
         logger.info("Extracting text from PDF file object")
-        
+
         # Handle different input types
         if isinstance(pdf_file_or_path, dict) and 'file' in pdf_file_or_path:
             # If it's a dictionary with a 'file' key, extract the file object
@@ -28,47 +346,31 @@ def extract_text_from_pdf(pdf_file_or_path):
         else:
             # Otherwise assume it's already a file object or UploadFile
             file_obj = pdf_file_or_path
-            
-        # Check if it's a file-like object with a read method
-        if hasattr(file_obj, 'read'):
-            # Save content to a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                content = file_obj.read()
-                temp_file.write(content)
-                temp_path = temp_file.name
-                
+
+        # UploadFile wraps the real stream in .file
+        if hasattr(file_obj, 'file') and hasattr(file_obj.file, 'read'):
+            file_obj = file_obj.file
+
+        # In-memory input is parsed directly, without a temporary file
+        if isinstance(file_obj, (bytes, bytearray, memoryview)) or hasattr(file_obj, 'read'):
+            text = extract_text_from_bytes(file_obj)
         # Check if it's a path string
         elif isinstance(pdf_file_or_path, str) and os.path.exists(pdf_file_or_path):
-            temp_path = pdf_file_or_path
+            text = extract_text(pdf_file_or_path)
         else:
             raise ValueError(f"Unsupported input type: {type(pdf_file_or_path)}")
-        
-        # Extract text from the PDF
-        text = extract_text(temp_path)
-        
+
         # Check if extraction was successful
         if not text or len(text.strip()) == 0:
             logger.warning(f"Extracted empty text from PDF")
             text = "No text could be extracted from this PDF. Please try a different file."
         else:
             logger.info(f"Successfully extracted {len(text)} characters from PDF")
-        
-        # Clean up the temporary file if we created one
-        if temp_path and pdf_file_or_path != temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
-            logger.debug(f"Deleted temporary file: {temp_path}")
-        
+
         return text
-        
+
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
-        
-        # Clean up the temporary file if it exists
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-                
+
         # Return error message instead of raising exception
-        return f"Error extracting text from PDF: {str(e)}"
\ No newline at end of file
+        return f"Error extracting text from PDF: {str(e)}"
@@ -0,0 +1,89 @@
+"""
+Tests for services/ann_index.py — the pure-NumPy IVF nearest-neighbour index.
+
+Vectors are random points around a few hundred cluster centres, which is
+roughly how job-posting profiles group by role.
+"""
+import numpy as np
+import pytest
+
+from services.ann_index import IVFIndex, normalize_rows, spherical_kmeans
+
+
+@pytest.fixture(scope="module")
+def clustered():
+    rng = np.random.default_rng(7)
+    centres = rng.normal(size=(60, 32))
+    return normalize_rows(centres[rng.integers(0, 60, 6000)] + 0.3 * rng.normal(size=(6000, 32)))
+
+
+def exact_top_k(vectors, query, k):
+    scores = vectors @ normalize_rows(query)[0]
+    return set(np.argsort(-scores)[:k].tolist())
+
+
+class TestNormalizeRows:
+    def test_unit_length(self):
+        rows = normalize_rows([[3.0, 4.0], [1.0, 0.0]])
+        assert np.allclose(np.linalg.norm(rows, axis=1), 1.0)
+
+    def test_zero_rows_stay_zero(self):
+        assert np.all(normalize_rows([[0.0, 0.0]]) == 0)
+
+
+class TestIVFIndex:
+    def test_small_collections_use_exact_search(self):
+        vectors = normalize_rows(np.random.default_rng(0).normal(size=(100, 8)))
+        index = IVFIndex.build(vectors)
+        assert index.nlist == 1
+        query = vectors[5]
+        assert {row for row, _ in index.search(query, k=5)} == exact_top_k(vectors, query, 5)
+
+    def test_results_sorted_and_scored(self, clustered):
+        index = IVFIndex.build(clustered, nlist=40)
+        results = index.search(clustered[0], k=10)
+        scores = [score for _, score in results]
+        assert scores == sorted(scores, reverse=True)
+        assert results[0] == (0, pytest.approx(1.0, abs=1e-5))
+
+    def test_recall_against_exact_search(self, clustered):
+        index = IVFIndex.build(clustered, nlist=40)
+        rng = np.random.default_rng(1)
+        queries = normalize_rows(clustered[:50] + 0.2 * rng.normal(size=(50, 32)))
+        recall = np.mean([
+            len({row for row, _ in index.search(q, k=10, nprobe=8)} & exact_top_k(clustered, q, 10)) / 10
+            for q in queries
+        ])
+        assert recall >= 0.9
+
+    def test_full_probe_is_exact(self, clustered):
+        index = IVFIndex.build(clustered, nlist=40)
+        query = clustered[123]
+        found = {row for row, _ in index.search(query, k=10, nprobe=index.nlist)}
+        assert found == exact_top_k(clustered, query, 10)
+
+    def test_every_vector_is_listed_once(self, clustered):
+        index = IVFIndex.build(clustered, nlist=40)
+        assert sorted(index.ids.tolist()) == list(range(len(clustered)))
+        assert index.offsets[-1] == len(clustered)
+
+    def test_k_larger_than_collection(self):
+        vectors = normalize_rows(np.eye(3))
+        assert len(IVFIndex.build(vectors).search(vectors[0], k=10)) == 3
+
+    def test_empty_index(self):
+        index = IVFIndex.build(np.zeros((0, 4)))
+        assert index.search(np.ones(4), k=3) == []
+
+    def test_save_and_load(self, clustered, tmp_path):
+        index = IVFIndex.build(clustered, nlist=40)
+        index.save(str(tmp_path / "ann"))
+        loaded = IVFIndex.load(str(tmp_path / "ann"))
+        assert loaded.search(clustered[9], k=5) == index.search(clustered[9], k=5)
+
+
+class TestSphericalKMeans:
+    def test_centroids_are_unit_vectors(self, clustered):
+        centroids = spherical_kmeans(clustered, 20, iterations=5)
+        assert centroids.shape == (20, 32)
+        assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0, atol=1e-5)
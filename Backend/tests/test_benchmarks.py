@@ -0,0 +1,199 @@
+"""
+Tests for the benchmarks/ suite — synthetic documents, the stub embedding
+model, latency summaries, baseline comparison, the runner itself on the
+stages that need no SpaCy, and the matcher parity comparison.
+"""
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from benchmarks import synthetic
+from benchmarks.extractor_eval import evaluate, load_annotated
+from benchmarks.matcher_parity import compare_skill_sets, load_corpus
+from benchmarks.run import main
+from benchmarks.stubs import StubEmbeddingService
+from benchmarks.timing import compare, measure, summarize
+from utils.pdf_utils import extract_text_from_bytes
+
+CHEAP_STAGES = "extract_text_from_pdf,identify_semantic_skill_gaps,convert_numpy_to_python"
+
+
+class TestSynthetic:
+    def test_same_seed_same_documents(self):
+        first, second = synthetic.make_pair(7), synthetic.make_pair(7)
+        assert first[0].text == second[0].text
+        assert first[1].skills == second[1].skills
+        assert synthetic.make_pair(8)[0].text != first[0].text
+
+    def test_sizes(self):
+        small_resume, small_jd = synthetic.make_pair(0, "small")
+        large_resume, _ = synthetic.make_pair(0, "large")
+        assert len(small_resume.text.splitlines()) == synthetic.SIZES["small"]["resume_sentences"]
+        assert len(small_jd.text.splitlines()) == synthetic.SIZES["small"]["jd_sentences"]
+        assert len(large_resume.text) > len(small_resume.text)
+
+    def test_overrides(self):
+        resume, jd = synthetic.make_pair(0, resume_sentences=5, jd_sentences=3)
+        assert len(resume.text.splitlines()) == 5
+        assert len(jd.text.splitlines()) == 3
+
+    def test_planted_skills_appear_in_text(self):
+        resume, jd = synthetic.make_pair(3)
+        assert resume.skills and jd.skills
+        assert all(skill in resume.text for skill in resume.skills)
+        assert set(jd.skills.values()) <= {synthetic.REQUIRED_WEIGHT, synthetic.PREFERRED_WEIGHT}
+
+    def test_pdf_round_trip(self):
+        resume, _ = synthetic.make_pair(1, "large")
+        text = extract_text_from_bytes(synthetic.render_pdf(resume.text))
+        assert all(skill in text for skill in resume.skills)
+
+
+class TestStubEmbeddings:
+    def test_deterministic_unit_vectors(self):
+        vectors = StubEmbeddingService().get_embeddings(["Python", "python ", "docker"])
+        assert vectors.shape == (3, 384)
+        assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+        assert np.allclose(vectors[0], vectors[1])
+        assert np.allclose(vectors[2], StubEmbeddingService().get_embedding("docker"))
+
+    def test_different_texts_do_not_match(self):
+        a, b = StubEmbeddingService().get_embeddings(["kubernetes", "excel"])
+        assert float(a @ b) < 0.3
+
+
+class TestTiming:
+    def test_summarize(self):
+        summary = summarize([0.001] * 99 + [0.1])
+        assert summary["iterations"] == 100
+        assert summary["p50_ms"] == pytest.approx(1.0)
+        assert summary["p99_ms"] > summary["p95_ms"]
+        assert summary["max_ms"] == pytest.approx(100.0)
+        assert summary["ops_per_sec"] == pytest.approx(100 / 0.199, rel=1e-3)
+
+    def test_measure_calls_every_input_after_warmup(self):
+        calls = []
+        summary = measure(calls.append, [1, 2, 3], warmup=1)
+        assert calls == [1, 1, 2, 3]
+        assert summary["iterations"] == 3
+
+    def test_compare_flags_slowdowns_beyond_tolerance(self):
+        baseline = {"a": {"ops_per_sec": 100.0, "p50_ms": 10.0, "p95_ms": 12.0, "p99_ms": 15.0},
+                    "b": {"ops_per_sec": 100.0, "p50_ms": 10.0, "p95_ms": 12.0, "p99_ms": 15.0}}
+        current = {"a": {"ops_per_sec": 95.0, "p50_ms": 10.5, "p95_ms": 12.0, "p99_ms": 15.0},
+                   "b": {"ops_per_sec": 100.0, "p50_ms": 10.0, "p95_ms": 12.0, "p99_ms": 20.0},
+                   "c": {"skipped": "No module named 'spacy'"}}
+        report = compare(current, baseline, tolerance=0.10)
+        assert report["a"]["regression"] is False
+        assert report["a"]["ops_per_sec"]["change"] == pytest.approx(-0.05)
+        assert report["b"]["regression"] is True
+        assert "c" not in report
+
+
+class TestRunner:
+    @pytest.fixture(autouse=True)
+    def isolated_env(self):
+        # The runner switches caches and the OpenAI key off through os.environ
+        with patch.dict("os.environ"):
+            yield
+
+    def _run(self, tmp_path, *extra):
+        output = tmp_path / "report.json"
+        status = main([
+            "--size", "small", "--iterations", "3", "--stages", CHEAP_STAGES,
+            "--baseline", str(tmp_path / "baseline.json"), "--output", str(output), *extra,
+        ])
+        return status, json.loads(output.read_text())
+
+    def test_report(self, tmp_path):
+        status, report = self._run(tmp_path)
+        assert status == 0
+        assert set(report["results"]) == set(CHEAP_STAGES.split(","))
+        assert all(r["iterations"] == 3 for r in report["results"].values())
+        assert report["meta"]["embeddings"] == "stub"
+        assert "comparison" not in report
+
+    def test_compares_with_saved_baseline(self, tmp_path):
+        self._run(tmp_path, "--save-baseline")
+        _, report = self._run(tmp_path)
+        assert set(report["comparison"]) == set(CHEAP_STAGES.split(","))
+
+    def test_fail_on_regression(self, tmp_path):
+        self._run(tmp_path, "--save-baseline")
+        baseline = json.loads((tmp_path / "baseline.json").read_text())
+        for result in baseline["results"].values():
+            result.update(ops_per_sec=result["ops_per_sec"] * 1000,
+                          p50_ms=1e-6, p95_ms=1e-6, p99_ms=1e-6)
+        (tmp_path / "baseline.json").write_text(json.dumps(baseline))
+
+        status, report = self._run(tmp_path, "--fail-on-regression")
+        assert status == 1
+        assert all(entry["regression"] for entry in report["comparison"].values())
+
+    def test_baseline_with_other_settings_is_ignored(self, tmp_path):
+        self._run(tmp_path, "--save-baseline")
+        output = tmp_path / "medium.json"
+        main(["--size", "medium", "--iterations", "2", "--stages", "convert_numpy_to_python",
+              "--baseline", str(tmp_path / "baseline.json"), "--output", str(output)])
+        assert "comparison" not in json.loads(output.read_text())
+
+
+class TestMatcherParity:
+    def test_agreement(self):
+        reference = [{"python", "sql"}, {"docker"}, set()]
+        candidate = [{"python", "sql"}, {"docker", "node js"}, set()]
+        report = compare_skill_sets(reference, candidate)
+        assert report["parity"]["recall"] == 1.0
+        assert report["parity"]["precision"] == pytest.approx(0.75)
+        assert report["parity"]["mean_jaccard"] == pytest.approx((1 + 0.5 + 1) / 3, abs=1e-4)
+        assert report["parity"]["identical_documents"] == pytest.approx(2 / 3, abs=1e-4)
+        assert report["extra"] == {"node js": 1}
+        assert report["missing"] == {}
+
+    def test_most_frequent_differences_first(self):
+        reference = [{"excel", "git"}, {"excel"}, {"excel", "git"}]
+        report = compare_skill_sets(reference, [set(), set(), set()], top=1)
+        assert report["missing"] == {"excel": 3}
+        assert report["parity"]["recall"] == 0.0
+
+    def test_load_corpus(self, tmp_path):
+        as_list = tmp_path / "dev.json"
+        as_list.write_text(json.dumps([{"text": "a"}, {"text": ""}, {"text": "b"}, {"text": "c"}]))
+        as_lines = tmp_path / "corpus.jsonl"
+        as_lines.write_text('{"text": "a"}\n\n{"text": "b"}\n')
+        assert load_corpus(str(as_list), limit=2) == ["a", "b"]
+        assert load_corpus(str(as_lines)) == ["a", "b"]
+
+
+class TestExtractorEval:
+    def test_gold_skills_from_character_spans(self, tmp_path):
+        path = tmp_path / "dev.json"
+        path.write_text(json.dumps([
+            {"text": "Node  JS and SQL", "ents": [{"start": 0, "end": 8, "label": "SKILL"},
+                                                  {"start": 13, "end": 16, "label": "SKILL"}]},
+            {"text": "Pune office", "ents": [{"start": 0, "end": 4, "label": "LOC"}]},
+            {"text": "", "ents": []},
+        ]))
+        assert load_annotated(str(path)) == [("Node  JS and SQL", {"node js", "sql"}), ("Pune office", set())]
+        assert load_annotated(str(path), limit=1) == [("Node  JS and SQL", {"node js", "sql"})]
+
+    def test_scores_against_gold(self):
+        documents = [("python and sql", {"python", "sql"}), ("docker", {"docker"})]
+        found = {"python and sql": {"Python": 1.0}, "docker": {"docker": 1.0, "linux": 1.0}}
+        report = evaluate(found.get, documents)
+        assert report["skills"] == 3
+        assert report["scores"]["precision"] == pytest.approx(2 / 3, abs=1e-4)
+        assert report["scores"]["recall"] == pytest.approx(2 / 3, abs=1e-4)
+        assert report["missing"] == {"sql": 1}
+        assert report["extra"] == {"linux": 1}
+        assert report["timing"]["iterations"] == 2
+
+    def test_failures_count_as_empty(self):
+        def analyze(text):
+            raise RuntimeError("model missing")
+
+        report = evaluate(analyze, [("python", {"python"})])
+        assert report["errors"] == 1
+        assert report["scores"]["recall"] == 0.0
@@ -0,0 +1,63 @@
+"""
+Tests for services/candidate_ranking.py — weighted coverage and ranking
+used by the batch screening endpoint.
+"""
+import pytest
+
+from services.candidate_ranking import rank_candidates, summarize_match, weighted_coverage
+
+JOB_SKILLS = {"python": 3.0, "docker": 1.0, "sql": 1.0}
+
+
+class TestWeightedCoverage:
+    def test_full_coverage(self):
+        matching = {skill: {} for skill in JOB_SKILLS}
+        assert weighted_coverage(JOB_SKILLS, matching) == pytest.approx(1.0)
+
+    def test_weighted_by_job_importance(self):
+        assert weighted_coverage(JOB_SKILLS, {"python": {}}) == pytest.approx(0.6)
+        assert weighted_coverage(JOB_SKILLS, {"docker": {}}) == pytest.approx(0.2)
+
+    def test_no_job_skills(self):
+        assert weighted_coverage({}, {"python": {}}) == 0.0
+
+    def test_ignores_matches_outside_the_job(self):
+        assert weighted_coverage(JOB_SKILLS, {"rust": {}}) == 0.0
+
+
+class TestRanking:
+    def _entry(self, name, matching):
+        missing = {s: w for s, w in JOB_SKILLS.items() if s not in matching}
+        return summarize_match(
+            name, JOB_SKILLS, {"matching_skills": {s: {} for s in matching}, "missing_skills": missing}
+        )
+
+    def test_summary_fields(self):
+        entry = self._entry("a.pdf", ["python"])
+        assert entry == {
+            "name": "a.pdf",
+            "coverage": 0.6,
+            "matched": 1,
+            "missing": 2,
+            "missing_skills": ["docker", "sql"],
+        }
+
+    def test_ordered_by_coverage(self):
+        ranked = rank_candidates([
+            self._entry("low.pdf", ["docker"]),
+            self._entry("high.pdf", ["python", "sql"]),
+            self._entry("mid.pdf", ["python"]),
+        ])
+        assert [e["name"] for e in ranked] == ["high.pdf", "mid.pdf", "low.pdf"]
+        assert [e["rank"] for e in ranked] == [1, 2, 3]
+
+    def test_ties_broken_by_matched_count_then_name(self):
+        ranked = rank_candidates([
+            self._entry("b.pdf", ["docker"]),
+            self._entry("a.pdf", ["sql"]),
+            self._entry("c.pdf", []),
+        ])
+        assert [e["name"] for e in ranked] == ["a.pdf", "b.pdf", "c.pdf"]
+
+    def test_empty(self):
+        assert rank_candidates([]) == []
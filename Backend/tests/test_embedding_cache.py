@@ -0,0 +1,164 @@
+"""
+Tests for services/embedding_cache.py and EmbeddingService's use of it.
+
+The disk tier is exercised in pytest's tmp_path. EmbeddingService is
+built with SentenceTransformer patched out, and a counting fake model
+records which texts were actually sent for encoding.
+"""
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from services.embedding_cache import EmbeddingCache, cache_key, normalize_text
+from services.embedding_service import EmbeddingService
+
+
+def _vec(seed: int, dim: int = 4) -> np.ndarray:
+    return np.arange(dim, dtype=np.float32) + seed
+
+
+class CountingModel:
+    """Fake SentenceTransformer: encodes a text as [len(text)] * 4 and logs each call."""
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t))] * 4 for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def service():
+    model = CountingModel()
+    with patch("sentence_transformers.SentenceTransformer", return_value=model):
+        svc = EmbeddingService(cache=EmbeddingCache("fake-model", capacity=100))
+    return svc, model
+
+
+class TestKeys:
+    def test_normalization_folds_case_and_whitespace(self):
+        assert normalize_text("  Machine\tLearning ") == "machine learning"
+
+    def test_key_depends_on_model(self):
+        assert cache_key("a", "python") != cache_key("b", "python")
+        assert cache_key("a", "Python ") == cache_key("a", "python")
+
+
+class TestMemoryTier:
+    def test_miss_then_hit(self):
+        cache = EmbeddingCache("m")
+        found, missing = cache.lookup(["python"])
+        assert (found, missing) == ({}, [0])
+        cache.store(["python"], [_vec(1)])
+        found, missing = cache.lookup(["python", "java"])
+        assert missing == [1]
+        assert found[0].tolist() == _vec(1).tolist()
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = EmbeddingCache("m", capacity=2)
+        cache.store(["a", "b"], [_vec(1), _vec(2)])
+        cache.lookup(["a"])  # touch a so b is the oldest
+        cache.store(["c"], [_vec(3)])
+        _, missing = cache.lookup(["a", "b", "c"])
+        assert missing == [1]
+
+
+class TestDiskTier:
+    def test_survives_restart(self, tmp_path):
+        EmbeddingCache("m", cache_dir=str(tmp_path)).store(["python", "sql"], [_vec(1), _vec(2)])
+
+        reopened = EmbeddingCache("m", cache_dir=str(tmp_path))
+        found, missing = reopened.lookup(["sql", "python"])
+        assert missing == []
+        assert found[0].tolist() == _vec(2).tolist()
+        assert reopened.stats()["disk_hits"] == 2
+
+    def test_reader_sees_rows_appended_by_another_instance(self, tmp_path):
+        writer = EmbeddingCache("m", cache_dir=str(tmp_path))
+        writer.store(["a"], [_vec(1)])
+        reader = EmbeddingCache("m", cache_dir=str(tmp_path), read_only=True)
+        writer.store(["b"], [_vec(2)])
+        found, missing = reader.lookup(["b"])
+        assert missing == []
+        assert found[0].tolist() == _vec(2).tolist()
+
+    def test_read_only_never_writes(self, tmp_path):
+        cache = EmbeddingCache("m", cache_dir=str(tmp_path), read_only=True)
+        cache.store(["a"], [_vec(1)])
+        assert list(tmp_path.iterdir()) == []
+
+    def test_repeated_store_does_not_duplicate_rows(self, tmp_path):
+        cache = EmbeddingCache("m", cache_dir=str(tmp_path))
+        cache.store(["a"], [_vec(1)])
+        cache.store(["a", "b"], [_vec(1), _vec(2)])
+        assert cache.stats()["disk_entries"] == 2
+
+    def test_each_store_appends_one_log_line(self, tmp_path):
+        cache = EmbeddingCache("m", cache_dir=str(tmp_path))
+        cache.store(["a", "b"], [_vec(1), _vec(2)])
+        cache.store(["c"], [_vec(3)])
+        lines = (tmp_path / "m" / "keys.1.jsonl").read_text().splitlines()
+        assert [len(json.loads(line)["keys"]) for line in lines] == [2, 1]
+        assert json.loads(lines[1])["row"] == 2
+
+    def test_partly_written_log_line_is_skipped(self, tmp_path):
+        EmbeddingCache("m", cache_dir=str(tmp_path)).store(["a"], [_vec(1)])
+        with open(tmp_path / "m" / "keys.1.jsonl", "a") as f:
+            f.write('{"row": 1, "keys": ["')
+        reopened = EmbeddingCache("m", cache_dir=str(tmp_path))
+        assert reopened.lookup(["a"])[1] == []
+
+    def test_disk_rows_are_capped(self, tmp_path):
+        cache = EmbeddingCache("m", capacity=1, cache_dir=str(tmp_path), max_disk_rows=4)
+        for i, text in enumerate("abcdef"):
+            cache.store([text], [_vec(i)])
+            assert cache.stats()["disk_entries"] <= 4
+
+        # The most recently added rows survive compaction, with their vectors
+        reopened = EmbeddingCache("m", cache_dir=str(tmp_path), max_disk_rows=4)
+        found, missing = reopened.lookup(["a", "e", "f"])
+        assert missing == [0]
+        assert found[2].tolist() == _vec(5).tolist()
+        assert sorted(p.name for p in (tmp_path / "m").glob("*.f32")) == ["vectors.2.f32"]
+
+    def test_reader_follows_compaction(self, tmp_path):
+        writer = EmbeddingCache("m", cache_dir=str(tmp_path), max_disk_rows=2)
+        writer.store(["a", "b"], [_vec(1), _vec(2)])
+        reader = EmbeddingCache("m", cache_dir=str(tmp_path), read_only=True)
+        writer.store(["c"], [_vec(3)])
+        found, missing = reader.lookup(["c", "b"])
+        assert missing == []
+        assert [v.tolist() for v in (found[0], found[1])] == [_vec(3).tolist(), _vec(2).tolist()]
+
+    def test_cache_of_another_model_is_ignored(self, tmp_path):
+        EmbeddingCache("m", cache_dir=str(tmp_path)).store(["a"], [_vec(1)])
+        (tmp_path / "other").mkdir()
+        for f in (tmp_path / "m").iterdir():
+            (tmp_path / "other" / f.name).write_bytes(f.read_bytes())
+        assert EmbeddingCache("other", cache_dir=str(tmp_path)).lookup(["a"])[1] == [0]
+
+
+class TestEmbeddingServiceCaching:
+    def test_only_misses_are_encoded_in_one_batch(self, service):
+        svc, model = service
+        svc.get_embeddings(["python", "sql"])
+        svc.get_embeddings(["sql", "docker", "Docker", "python"])
+        assert model.calls == [["python", "sql"], ["docker"]]
+        assert svc.cache_stats()["hits"] == 2
+
+    def test_output_order_matches_input(self, service):
+        svc, _ = service
+        svc.get_embeddings(["ab"])
+        out = svc.get_embeddings(["abcd", "ab", "abc"])
+        assert out[:, 0].tolist() == [4.0, 2.0, 3.0]
+
+    def test_single_embedding_uses_cache(self, service):
+        svc, model = service
+        svc.get_embeddings(["rust"])
+        assert svc.get_embedding("rust").tolist() == [4.0] * 4
+        assert len(model.calls) == 1
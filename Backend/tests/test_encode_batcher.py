@@ -0,0 +1,164 @@
+"""
+Tests for services/encode_batcher.py — cross-request batching of embedding
+encode calls, and EmbeddingService's use of it.
+
+A fake model encodes a text as [len(text)] * 4 and records every call; a
+threading.Event holds it mid-encode so the tests decide which callers
+share a flush.
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from services.embedding_cache import EmbeddingCache
+from services.embedding_service import EmbeddingService
+from services.encode_batcher import EncodeBatcher, encode_batcher_from_env
+
+
+class FakeModel:
+    def __init__(self, gate: threading.Event | None = None, fail: bool = False):
+        self.calls = []
+        self.gate = gate
+        self.fail = fail
+        self.entered = threading.Event()
+
+    def encode(self, texts, batch_size, show_progress_bar):
+        self.calls.append((list(texts), batch_size))
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("out of memory")
+        return np.array([[float(len(t))] * 4 for t in texts], dtype=np.float32)
+
+
+def run_all(fn, inputs):
+    """Call fn on every input from its own thread; results (or exceptions) in input order."""
+    results = [None] * len(inputs)
+
+    def call(i):
+        try:
+            results[i] = fn(inputs[i])
+        except Exception as exc:
+            results[i] = exc
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(inputs))]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def join(threads):
+    for thread in threads:
+        thread.join(5)
+
+
+def wait_for_queue(batcher, size: int):
+    deadline = time.monotonic() + 5
+    while batcher._queue.qsize() < size:
+        assert time.monotonic() < deadline, "callers never queued"
+        time.sleep(0.001)
+
+
+class TestBatching:
+    def test_single_caller_flushes_after_max_wait(self):
+        model = FakeModel()
+        batcher = EncodeBatcher(model, max_wait_ms=20, batch_size=16)
+        started = time.perf_counter()
+        out = batcher.encode(["python", "sql"])
+        assert time.perf_counter() - started >= 0.015
+        assert out[:, 0].tolist() == [6.0, 3.0]
+        assert model.calls == [(["python", "sql"], 16)]
+        batcher.close()
+
+    def test_concurrent_callers_share_one_deduplicated_call(self):
+        model = FakeModel()
+        batcher = EncodeBatcher(model, max_wait_ms=500)
+        inputs = [["python", "sql"], ["sql", "go"], ["python"], ["rust", "go", "rust"]]
+        threads, results = run_all(batcher.encode, inputs)
+        join(threads)
+        batcher.close()
+
+        assert len(model.calls) == 1
+        assert sorted(model.calls[0][0]) == ["go", "python", "rust", "sql"]
+        for texts, out in zip(inputs, results):
+            assert out[:, 0].tolist() == [float(len(t)) for t in texts]
+
+    def test_max_batch_flushes_early(self):
+        model = FakeModel()
+        batcher = EncodeBatcher(model, max_batch=3, max_wait_ms=10_000)
+        started = time.perf_counter()
+        threads, results = run_all(batcher.encode, [["a", "b"], ["c"]])
+        join(threads)
+        batcher.close()
+        assert time.perf_counter() - started < 5
+        assert [r.shape for r in results] == [(2, 4), (1, 4)]
+
+    def test_later_callers_wait_for_the_next_batch(self):
+        gate = threading.Event()
+        model = FakeModel(gate)
+        batcher = EncodeBatcher(model, max_wait_ms=0)
+        first, _ = run_all(batcher.encode, [["a"]])
+        assert model.entered.wait(5)
+        threads, results = run_all(batcher.encode, [["bb"], ["ccc"]])
+        wait_for_queue(batcher, 2)
+        gate.set()
+        join(first + threads)
+        batcher.close()
+        assert [sorted(texts) for texts, _ in model.calls] == [["a"], ["bb", "ccc"]]
+        assert [r[0, 0] for r in results] == [2.0, 3.0]
+
+    def test_empty_input(self):
+        model = FakeModel()
+        assert EncodeBatcher(model).encode([]).size == 0
+        assert model.calls == []
+
+
+class TestErrors:
+    def test_failure_reaches_every_caller(self):
+        batcher = EncodeBatcher(FakeModel(fail=True), max_wait_ms=200)
+        threads, results = run_all(batcher.encode, [["a"], ["b"]])
+        join(threads)
+        batcher.close()
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_closed(self):
+        batcher = EncodeBatcher(FakeModel(), max_wait_ms=0)
+        batcher.encode(["a"])
+        batcher.close()
+        with pytest.raises(RuntimeError):
+            batcher.encode(["a"])
+
+    def test_invalid_sizes(self):
+        with pytest.raises(ValueError):
+            EncodeBatcher(FakeModel(), max_batch=0)
+
+
+class TestFromEnv:
+    def test_settings(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_EMBEDDING_MAX_BATCH", "256")
+        monkeypatch.setenv("SKILLBRIDGE_EMBEDDING_MAX_WAIT_MS", "2")
+        monkeypatch.setenv("SKILLBRIDGE_EMBEDDING_BATCH_SIZE", "64")
+        batcher = encode_batcher_from_env(FakeModel())
+        assert (batcher.max_batch, batcher.max_wait, batcher.batch_size) == (256, 0.002, 64)
+
+
+class TestEmbeddingService:
+    def test_misses_from_concurrent_requests_are_encoded_together(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_EMBEDDING_MAX_WAIT_MS", "500")
+        model = FakeModel()
+        with patch("sentence_transformers.SentenceTransformer", return_value=model):
+            service = EmbeddingService(cache=EmbeddingCache("fake-model", capacity=100))
+        service.skill_index = None
+
+        inputs = [["Python", "SQL"], ["sql", "Docker"], ["docker"]]
+        threads, results = run_all(service.get_embeddings, inputs)
+        join(threads)
+        service.encoder.close()
+
+        assert len(model.calls) == 1
+        assert sorted(model.calls[0][0]) == ["docker", "python", "sql"]
+        assert [r[:, 0].tolist() for r in results] == [[6.0, 3.0], [3.0, 6.0], [6.0]]
@@ -238,3 +238,84 @@ class TestMultiSkillMatching:
         )
         assert "python" in result["matching_skills"]
         assert "kubernetes" in result["missing_skills"]
+
+
+# ---------------------------------------------------------------------------
+# Alternative match modes
+# ---------------------------------------------------------------------------
+
+class TestMatchModes:
+    def _make(self, **kwargs) -> EnhancedGapAnalyzer:
+        fake = FakeEmbeddingService()
+        with patch("agents.enhanced_gap_agent.EmbeddingService", return_value=fake):
+            return EnhancedGapAnalyzer(similarity_threshold=0.7, **kwargs)
+
+    def test_top_k_mode_lists_alternatives(self):
+        result = self._make(match_mode="top_k", top_k=2).identify_semantic_skill_gaps(
+            job_skills={"python": 3.0},
+            resume_skills={"python": 1.0, "java": 1.0},
+        )
+        top = result["matching_skills"]["python"]["top_matches"]
+        assert [m["resume_match"] for m in top] == ["python"]
+
+    def test_top_k_alternatives_stay_resume_only(self):
+        # "python 3" is a near-duplicate of "python"; "java" is unrelated
+        vectors = {"python": [1.0, 0.0, 0.0], "python 3": [0.95, 0.31, 0.0], "java": [0.0, 0.0, 1.0]}
+
+        class NearDuplicates:
+            def get_embeddings(self, texts):
+                return np.array([vectors[t] for t in texts])
+
+        results = {
+            mode: EnhancedGapAnalyzer(
+                similarity_threshold=0.7, match_mode=mode, top_k=3, embedding_service=NearDuplicates()
+            ).identify_semantic_skill_gaps({"python": 3.0}, {"python": 1.0, "python 3": 1.0, "java": 1.0})
+            for mode in ("best", "top_k")
+        }
+        top = results["top_k"]["matching_skills"]["python"]["top_matches"]
+        assert [m["resume_match"] for m in top] == ["python", "python 3"]
+        assert results["top_k"]["resume_only_skills"] == {"python 3": 1.0, "java": 1.0}
+        assert results["top_k"]["resume_only_skills"] == results["best"]["resume_only_skills"]
+
+    def test_best_mode_has_no_top_matches_field(self, analyzer):
+        result = analyzer.identify_semantic_skill_gaps({"python": 3.0}, {"python": 1.0})
+        assert "top_matches" not in result["matching_skills"]["python"]
+
+    def test_one_to_one_mode_matches_identical_skills(self):
+        result = self._make(match_mode="one_to_one").identify_semantic_skill_gaps(
+            job_skills={"python": 3.0, "sql": 2.0},
+            resume_skills={"sql": 1.0, "python": 1.0},
+        )
+        assert result["matching_skills"]["python"]["resume_match"] == "python"
+        assert result["matching_skills"]["sql"]["resume_match"] == "sql"
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            self._make(match_mode="fuzzy")
+
+
+# ---------------------------------------------------------------------------
+# Reusing precomputed job embeddings (batch screening)
+# ---------------------------------------------------------------------------
+
+class TestPrecomputedJobEmbeddings:
+    def test_reused_embeddings_give_same_result(self, analyzer):
+        job = {"python": 3.0, "docker": 2.0}
+        resume = {"python": 1.0, "java": 1.0}
+        job_embeddings = analyzer.embed_skills(list(job))
+        assert analyzer.identify_semantic_skill_gaps(job, resume, job_embeddings=job_embeddings) \
+            == analyzer.identify_semantic_skill_gaps(job, resume)
+
+    def test_job_is_not_re_embedded(self, analyzer):
+        job = {"python": 3.0, "docker": 2.0}
+        job_embeddings = analyzer.embed_skills(list(job))
+        with patch.object(analyzer.embedding_service, "get_embeddings",
+                          wraps=analyzer.embedding_service.get_embeddings) as spy:
+            analyzer.identify_semantic_skill_gaps(job, {"python": 1.0}, job_embeddings=job_embeddings)
+        spy.assert_called_once_with(["python"])
+
+    def test_mismatched_embeddings_are_recomputed(self, analyzer):
+        job = {"python": 3.0, "docker": 2.0}
+        stale = analyzer.embed_skills(["python"])
+        result = analyzer.identify_semantic_skill_gaps(job, {"docker": 1.0}, job_embeddings=stale)
+        assert "docker" in result["matching_skills"]
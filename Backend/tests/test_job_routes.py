@@ -0,0 +1,476 @@
+"""
+Endpoint tests for routers/job_routes.py, driven through httpx's
+ASGITransport against an app that mounts only the jobs router.
+
+Skill extraction, the embedding model and the learning-resource agent are
+replaced with small deterministic fakes, so no SpaCy pipeline, SkillNER
+matcher, sentence-transformer or LLM is loaded. PDFs are real (rendered by
+benchmarks/synthetic.py) and go through pdfminer. Importing the router
+imports SkillNER, which needs its skill database (downloaded on first use),
+so the module is skipped where that is unavailable.
+"""
+import asyncio
+import io
+import json
+import threading
+import time
+import zipfile
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+try:
+    from routers import job_routes
+except Exception as exc:  # SkillNER fetches SKILL_DB when first imported
+    pytest.skip(f"routers.job_routes is unavailable: {exc}", allow_module_level=True)
+
+from fastapi import FastAPI  # noqa: E402
+
+from agents.enhanced_gap_agent import EnhancedGapAnalyzer  # noqa: E402
+from benchmarks.stubs import StubEmbeddingService  # noqa: E402
+from benchmarks.synthetic import render_pdf  # noqa: E402
+from services.job_store import JobPostingStore  # noqa: E402
+from services.result_cache import ResultCache, content_hash  # noqa: E402
+from services.stage_executor import StageExecutor  # noqa: E402
+
+VOCABULARY = ("python", "sql", "docker", "kubernetes", "terraform")
+
+JOB_DESCRIPTION = (
+    "We are hiring a platform engineer. Python and SQL are required; "
+    "Docker and Kubernetes experience is a plus."
+)
+RESUME = "Backend developer with six years of Python and Docker in production, plus some Go."
+RESUMES = {
+    "ada.pdf": "Data engineer: Python, SQL, Docker and Kubernetes pipelines for five years.",
+    "bob.pdf": "Frontend developer who has written a little Python and some SQL reports.",
+    "cy.pdf": "Infrastructure engineer automating Terraform and Kubernetes rollouts daily.",
+}
+
+
+class FakeExtractor:
+    """Finds VOCABULARY words in a text; job skills weigh 1.0, like unweighted SkillNER output."""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze_job(self, text: str) -> dict:
+        self.calls.append(("job", text))
+        return self._find(text)
+
+    def analyze_resume(self, text: str) -> dict:
+        self.calls.append(("resume", text))
+        return self._find(text)
+
+    def tracking_concurrency(self):
+        """Make analyze_resume slow and record the most calls ever running at once."""
+        lock = threading.Lock()
+        self.running = self.peak = 0
+        analyze = self.analyze_resume
+
+        def slow_analyze(text):
+            with lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            time.sleep(0.05)
+            with lock:
+                self.running -= 1
+            return analyze(text)
+
+        return slow_analyze
+
+    @staticmethod
+    def _find(text: str) -> dict:
+        words = text.lower()
+        return {skill: 1.0 for skill in VOCABULARY if skill in words}
+
+
+class FakeResources:
+    """Stands in for get_learning_resources and counts the calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, missing_skills: dict) -> str:
+        self.calls.append(sorted(missing_skills))
+        return f"plan {len(self.calls)}: " + ", ".join(sorted(missing_skills))
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    fake = FakeExtractor()
+    monkeypatch.setitem(
+        job_routes.SKILL_EXTRACTORS, "skillner", (fake.analyze_job, fake.analyze_resume, lambda: "fake"),
+    )
+    monkeypatch.setattr(job_routes, "_default_job_analyzer", fake.analyze_job)
+    monkeypatch.setattr(job_routes, "_default_resume_analyzer", fake.analyze_resume)
+    return fake
+
+
+@pytest.fixture
+def resources(monkeypatch):
+    fake = FakeResources()
+    monkeypatch.setattr(job_routes, "get_learning_resources", fake)
+    return fake
+
+
+@pytest.fixture
+def analyzer():
+    return EnhancedGapAnalyzer(job_routes.SEMANTIC_THRESHOLD, embedding_service=StubEmbeddingService())
+
+
+@pytest.fixture
+def app(monkeypatch, extractor, resources, analyzer):
+    monkeypatch.setattr(job_routes, "_get_semantic_analyzer", lambda: analyzer)
+    monkeypatch.setattr(job_routes, "result_cache", ResultCache())
+    monkeypatch.setattr(job_routes, "stage_executor", StageExecutor(max_workers=4))
+    monkeypatch.setattr(job_routes, "DEFAULT_EXTRACTOR", "skillner")
+
+    app = FastAPI()
+    app.include_router(job_routes.router)
+    yield app
+    job_routes.stage_executor.shutdown()
+
+
+def client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def post(app, path: str, files, data: dict):
+    async def scenario():
+        async with client(app) as http:
+            return await http.post(path, files=files, data=data)
+
+    return asyncio.run(scenario())
+
+
+def pdf_upload(name: str, text: str) -> tuple:
+    return ("files", (name, render_pdf(text), "application/pdf"))
+
+
+def ndjson(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def analyze(app, resume: str = RESUME, **data):
+    """POST one resume to /jobs/jobAnalyzer and return the response."""
+    async def scenario():
+        async with client(app) as http:
+            return await http.post(
+                "/jobs/jobAnalyzer",
+                files={"file": ("resume.pdf", render_pdf(resume), "application/pdf")},
+                data={"job_description": JOB_DESCRIPTION, **data},
+            )
+
+    return asyncio.run(scenario())
+
+
+class TestJobAnalyzer:
+    def test_exact_analysis(self, app):
+        response = analyze(app, use_semantic="false")
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "miss"
+        body = response.json()
+        assert body["status"] == "success"
+        assert body["analysis_type"] == "exact"
+        assert set(body["analysis"]["matching_skills"]) == {"python", "docker"}
+        assert set(body["analysis"]["missing_skills"]) == {"sql", "kubernetes"}
+
+    def test_cache_hit_looks_up_learning_resources_again(self, app, extractor, resources):
+        first = analyze(app)
+        second = analyze(app)
+        assert second.headers["X-Cache"] == "hit"
+        assert second.json()["analysis"] == first.json()["analysis"]
+        # Plans that arrived since the first request replace its answer
+        assert first.json()["llm_output"] == "plan 1: kubernetes, sql"
+        assert second.json()["llm_output"] == "plan 2: kubernetes, sql"
+        assert resources.calls == [["kubernetes", "sql"]] * 2
+        assert len([kind for kind, _ in extractor.calls if kind == "resume"]) == 1
+
+    def test_cached_response_leaves_out_learning_resources(self, app):
+        analyze(app, use_semantic="false")
+        response_key = job_routes._response_key(
+            content_hash(render_pdf(RESUME)), JOB_DESCRIPTION, False, "skillner"
+        )
+        cached = job_routes.result_cache.get("response", response_key)
+        assert cached["status"] == "success"
+        assert "llm_output" not in cached
+
+    def test_match_mode_is_part_of_the_response_key(self, monkeypatch):
+        pdf_hash = content_hash(b"%PDF")
+        best = job_routes._response_key(pdf_hash, JOB_DESCRIPTION, True)
+        exact = job_routes._response_key(pdf_hash, JOB_DESCRIPTION, False)
+        monkeypatch.setattr(job_routes, "MATCH_MODE", "top_k")
+        top_k = job_routes._response_key(pdf_hash, JOB_DESCRIPTION, True)
+        monkeypatch.setattr(job_routes, "MATCH_TOP_K", 5)
+        assert len({best, top_k, job_routes._response_key(pdf_hash, JOB_DESCRIPTION, True)}) == 3
+        # Exact matching ignores the semantic settings
+        assert job_routes._response_key(pdf_hash, JOB_DESCRIPTION, False) == exact
+
+    def test_int8_vectors_are_part_of_the_response_key(self, monkeypatch):
+        pdf_hash = content_hash(b"%PDF")
+        fp32 = job_routes._response_key(pdf_hash, JOB_DESCRIPTION, True)
+        monkeypatch.setattr(job_routes, "EMBEDDING_VECTORS_ID", f"{job_routes.EMBEDDING_MODEL}:int8")
+        assert job_routes._response_key(pdf_hash, JOB_DESCRIPTION, True) != fp32
+
+    def test_busy_stage_answers_429_with_retry_after(self, app, monkeypatch):
+        executor = StageExecutor(stage_limits={"pdf": 1}, max_queue=0, retry_after=7)
+        monkeypatch.setattr(job_routes, "stage_executor", executor)
+        release = threading.Event()
+
+        async def scenario():
+            # Occupy the only pdf slot, so the request is turned away
+            busy = asyncio.ensure_future(executor.run("pdf", release.wait, 5))
+            await asyncio.sleep(0.05)
+            try:
+                async with client(app) as http:
+                    return await http.post(
+                        "/jobs/jobAnalyzer",
+                        files={"file": ("resume.pdf", render_pdf(RESUME), "application/pdf")},
+                        data={"job_description": JOB_DESCRIPTION},
+                    )
+            finally:
+                release.set()
+                await busy
+
+        response = asyncio.run(scenario())
+        executor.shutdown()
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+        assert "pdf" in response.json()["detail"]
+
+
+def sse(response) -> list:
+    """(event, data) pairs of a text/event-stream body."""
+    events = []
+    for frame in response.text.split("\n\n"):
+        if not frame:
+            continue
+        event, data = frame.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+STAGE_EVENTS = ["pdf_extracted", "job_skills", "resume_skills", "gap_analysis", "learning_resources", "result"]
+
+
+class TestStreaming:
+    def test_ndjson_stages_then_result(self, app):
+        response = analyze(app, stream="ndjson", use_semantic="false")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert response.headers["Cache-Control"] == "no-cache"
+
+        records = ndjson(response)
+        types = [r["type"] for r in records]
+        # The two skill extractions run concurrently and arrive in either order
+        assert types[0] == "pdf_extracted"
+        assert sorted(types[1:3]) == ["job_skills", "resume_skills"]
+        assert types[3:] == ["gap_analysis", "learning_resources", "result"]
+        assert all("elapsed_seconds" in r for r in records[:-1])
+
+        result = records[-1]
+        assert result["status"] == "success"
+        assert set(result["analysis"]["missing_skills"]) == {"sql", "kubernetes"}
+        assert result["llm_output"] == records[4]["llm_output"]
+
+    def test_sse_framing(self, app):
+        response = analyze(app, stream="sse")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.endswith("\n\n")
+
+        events = sse(response)
+        assert sorted(name for name, _ in events) == sorted(STAGE_EVENTS)
+        assert events[-1][0] == "result"
+        assert events[-1][1]["analysis_type"] == "semantic"
+        assert "type" not in events[-1][1]
+
+    def test_cached_response_streams_only_the_result(self, app):
+        analyze(app, stream="ndjson")
+        response = analyze(app, stream="ndjson")
+        assert response.headers["X-Cache"] == "hit"
+        assert [r["type"] for r in ndjson(response)] == ["result"]
+
+    def test_short_resume_ends_with_an_error_result(self, app):
+        records = ndjson(analyze(app, resume="Python.", stream="ndjson"))
+        assert [r["type"] for r in records] == ["pdf_extracted", "result"]
+        assert records[-1]["status"] == "error"
+
+    def test_stage_failure_becomes_an_error_event(self, app, monkeypatch):
+        def broken(text):
+            raise RuntimeError("matcher crashed")
+
+        monkeypatch.setitem(job_routes.SKILL_EXTRACTORS, "skillner", (broken, broken, lambda: "fake"))
+        for fmt in ("ndjson", "sse"):
+            response = analyze(app, stream=fmt)
+            # The status line went out with the first event
+            assert response.status_code == 200
+            records = ndjson(response) if fmt == "ndjson" else [
+                {"type": name, **data} for name, data in sse(response)
+            ]
+            assert records[0]["type"] == "pdf_extracted"
+            assert records[-1]["type"] == "error"
+            assert records[-1]["status_code"] == 500
+            assert "matcher crashed" in records[-1]["detail"]
+
+    def test_busy_stage_becomes_an_error_event(self, app, monkeypatch):
+        executor = StageExecutor(stage_limits={"skills": 1}, max_queue=0, retry_after=3)
+        monkeypatch.setattr(job_routes, "stage_executor", executor)
+        # Job and resume skills compete for the single skills slot
+        records = ndjson(analyze(app, stream="ndjson"))
+        executor.shutdown()
+        assert records[-1]["type"] == "error"
+        assert records[-1]["status_code"] == 429
+        assert records[-1]["retry_after"] == 3
+
+    def test_unknown_format(self, app):
+        response = analyze(app, stream="xml")
+        assert response.status_code == 422
+
+
+class TestBatchAnalyzer:
+    def screen(self, app, files, **data):
+        return post(app, "/jobs/batchAnalyzer", files,
+                    {"job_description": JOB_DESCRIPTION, "use_semantic": "false", **data})
+
+    def test_job_then_results_then_ranking(self, app):
+        response = self.screen(app, [pdf_upload(name, text) for name, text in RESUMES.items()])
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        records = ndjson(response)
+        assert [r["type"] for r in records] == ["job", "result", "result", "result", "ranking"]
+        assert records[0]["resume_count"] == 3
+        assert set(records[0]["job_skills"]) == {"python", "sql", "docker", "kubernetes"}
+        assert {r["file_name"] for r in records[1:4]} == set(RESUMES)
+        assert all(r["status"] == "success" for r in records[1:4])
+
+        ranking = records[-1]
+        assert [c["file_name"] for c in ranking["candidates"]] == ["ada.pdf", "bob.pdf", "cy.pdf"]
+        assert [c["rank"] for c in ranking["candidates"]] == [1, 2, 3]
+        assert ranking["failed"] == 0
+
+    def test_semantic_mode(self, app):
+        records = ndjson(self.screen(app, [pdf_upload("ada.pdf", RESUMES["ada.pdf"])], use_semantic="true"))
+        assert records[0]["analysis_type"] == "semantic"
+        assert records[1]["coverage"] == 1.0
+
+    def test_unreadable_files_become_error_records(self, app):
+        files = [
+            pdf_upload("ada.pdf", RESUMES["ada.pdf"]),
+            ("files", ("notes.pdf", b"not a pdf at all", "application/pdf")),
+            pdf_upload("short.pdf", "Python."),
+        ]
+        records = ndjson(self.screen(app, files))
+        results = {r["file_name"]: r for r in records if r["type"] == "result"}
+        assert results["ada.pdf"]["status"] == "success"
+        assert results["notes.pdf"]["status"] == "error"
+        assert results["short.pdf"]["status"] == "error"
+        assert "enough text" in results["short.pdf"]["message"]
+
+        ranking = records[-1]
+        assert [c["file_name"] for c in ranking["candidates"]] == ["ada.pdf"]
+        assert ranking["failed"] == 2
+
+    def test_zip_archive(self, app):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for name, text in RESUMES.items():
+                archive.writestr(f"resumes/{name}", render_pdf(text))
+            archive.writestr("resumes/readme.txt", "not a resume")
+        files = [("archive", ("resumes.zip", buffer.getvalue(), "application/zip"))]
+
+        records = ndjson(self.screen(app, files))
+        assert records[0]["resume_count"] == 3
+        assert {r["file_name"] for r in records if r["type"] == "result"} == {
+            f"resumes/{name}" for name in RESUMES
+        }
+
+    def test_too_many_files(self, app, monkeypatch):
+        monkeypatch.setattr(job_routes, "BATCH_MAX_FILES", 2)
+        response = self.screen(app, [pdf_upload(name, text) for name, text in RESUMES.items()])
+        assert response.status_code == 413
+        assert "limit is 2" in response.json()["detail"]
+
+    def test_too_many_files_in_archive(self, app, monkeypatch):
+        monkeypatch.setattr(job_routes, "BATCH_MAX_FILES", 2)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for name, text in RESUMES.items():
+                archive.writestr(name, render_pdf(text))
+        response = self.screen(app, [("archive", ("resumes.zip", buffer.getvalue(), "application/zip"))])
+        assert response.status_code == 413
+
+    def test_no_resumes(self, app):
+        response = self.screen(app, [("files", ("empty.pdf", b"", "application/pdf"))])
+        assert response.status_code == 422
+
+    def test_concurrency_limit(self, app, extractor, monkeypatch):
+        monkeypatch.setattr(job_routes, "BATCH_CONCURRENCY", 1)
+        monkeypatch.setattr(job_routes, "_default_resume_analyzer", extractor.tracking_concurrency())
+        files = [pdf_upload(f"{i}-{name}", text) for i in range(2) for name, text in RESUMES.items()]
+
+        records = ndjson(self.screen(app, files))
+        assert sum(r["type"] == "result" and r["status"] == "success" for r in records) == 6
+        assert extractor.peak == 1
+
+        monkeypatch.setattr(job_routes, "BATCH_CONCURRENCY", 3)
+        monkeypatch.setattr(job_routes, "result_cache", ResultCache())
+        self.screen(app, files)
+        # The skills stage (2 slots by default) is the tighter limit now
+        assert extractor.peak == 2
+
+
+class TestMatchJobs:
+    POSTINGS = [
+        {"id": "data", "title": "Data Engineer", "text": "python sql docker kubernetes"},
+        {"id": "infra", "title": "Infrastructure Engineer", "text": "terraform kubernetes docker"},
+        {"id": "analyst", "title": "Analyst", "text": "sql"},
+    ]
+
+    @pytest.fixture
+    def use_store(self, monkeypatch, tmp_path):
+        def install(postings):
+            store = JobPostingStore("stub", str(tmp_path / "store"))
+            if postings:
+                store.add(postings, FakeExtractor._find, StubEmbeddingService().get_embeddings)
+            get = job_routes.models.get
+            monkeypatch.setattr(
+                job_routes.models, "get", lambda name: store if name == "job_store" else get(name)
+            )
+            return store
+
+        return install
+
+    def match(self, app, resume: str = RESUMES["ada.pdf"], **data):
+        return post(app, "/jobs/matchJobs",
+                    {"file": ("ada.pdf", render_pdf(resume), "application/pdf")}, data)
+
+    def test_best_postings_first(self, app, use_store):
+        use_store(self.POSTINGS)
+        response = self.match(app, top_n="2")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "success"
+        assert body["postings_searched"] == 3
+        assert len(body["matches"]) == 2
+        assert body["matches"][0]["id"] == "data"
+
+    def test_empty_store(self, app, use_store):
+        use_store([])
+        response = self.match(app)
+        assert response.status_code == 503
+        assert "No job postings" in response.json()["detail"]
+
+    def test_top_n_range(self, app, use_store):
+        use_store(self.POSTINGS)
+        assert self.match(app, top_n="0").status_code == 422
+        assert self.match(app, top_n="101").status_code == 422
+
+    def test_resume_without_skills(self, app, use_store):
+        use_store(self.POSTINGS)
+        body = self.match(app, resume="Experienced chef running a busy kitchen with a team of twelve.").json()
+        assert body["status"] == "error"
@@ -0,0 +1,137 @@
+"""
+Tests for services/job_store.py — the job-posting corpus behind /jobs/matchJobs.
+
+"Analysis" splits a posting's text into words (each word is a skill with
+weight 1), and EnhancedGapAnalyzer runs on the one-hot FakeEmbeddingService
+from test_enhanced_gap_agent, so identical skills match and others don't.
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from agents.enhanced_gap_agent import EnhancedGapAnalyzer
+from services.job_store import JobPostingStore, profile_vector
+from tests.test_enhanced_gap_agent import FakeEmbeddingService
+
+MODEL_ID = "fake-model"
+
+POSTINGS = [
+    {"id": "backend", "title": "Backend Engineer", "text": "python django sql docker"},
+    {"id": "data", "title": "Data Scientist", "text": "python pandas sql statistics"},
+    {"id": "frontend", "title": "Frontend Engineer", "text": "javascript react css"},
+    {"id": "devops", "title": "DevOps Engineer", "text": "docker kubernetes terraform aws"},
+]
+
+
+def analyze(text: str) -> dict:
+    return {word: 1.0 for word in text.split()}
+
+
+@pytest.fixture
+def fake_embeddings():
+    return FakeEmbeddingService()
+
+
+@pytest.fixture
+def analyzer(fake_embeddings):
+    with patch("agents.enhanced_gap_agent.EmbeddingService", return_value=fake_embeddings):
+        return EnhancedGapAnalyzer(similarity_threshold=0.7)
+
+
+@pytest.fixture
+def store(tmp_path, fake_embeddings):
+    store = JobPostingStore(MODEL_ID, str(tmp_path / "store"))
+    store.add(POSTINGS, analyze, fake_embeddings.get_embeddings)
+    return store
+
+
+class TestProfileVector:
+    def test_unit_length(self):
+        vectors = np.array([[1.0, 0.0], [0.0, 1.0]])
+        assert np.linalg.norm(profile_vector([3.0, 1.0], vectors)) == pytest.approx(1.0)
+
+    def test_weights_pull_towards_heavier_skills(self):
+        vectors = np.array([[1.0, 0.0], [0.0, 1.0]])
+        vector = profile_vector([3.0, 1.0], vectors)
+        assert vector[0] > vector[1]
+
+
+class TestBuilding:
+    def test_postings_and_shared_vocabulary(self, store):
+        assert len(store) == 4
+        # python, sql and docker are shared between postings
+        assert len(store.vocab) == 12
+        assert store.profiles.shape == (4, FakeEmbeddingService.DIM)
+
+    def test_skills_are_embedded_once(self, tmp_path):
+        embed_calls = []
+
+        def embed(texts):
+            embed_calls.append(list(texts))
+            return np.eye(len(texts), 16)
+
+        store = JobPostingStore(MODEL_ID, str(tmp_path / "s"))
+        store.add(POSTINGS[:2], analyze, embed)
+        store.add([{"id": "more", "text": "python rust"}], analyze, embed)
+        assert len(embed_calls) == 2
+        assert embed_calls[1] == ["rust"]
+
+    def test_readding_an_id_replaces_it(self, store, fake_embeddings):
+        store.add([{"id": "frontend", "title": "UI", "text": "typescript vue"}],
+                  analyze, fake_embeddings.get_embeddings)
+        assert len(store) == 4
+        row = store._rows["frontend"]
+        assert store.postings[row]["title"] == "UI"
+        assert list(store.postings[row]["job_skills"]) == ["typescript", "vue"]
+
+    def test_postings_without_skills_are_skipped(self, tmp_path, fake_embeddings):
+        store = JobPostingStore(MODEL_ID, str(tmp_path / "s"))
+        assert store.add([{"id": "empty", "text": ""}], analyze, fake_embeddings.get_embeddings) == 0
+        assert len(store) == 0
+
+    def test_save_and_reload(self, store, tmp_path):
+        store.save()
+        reloaded = JobPostingStore(MODEL_ID, store.path)
+        assert len(reloaded) == 4
+        assert reloaded.vocab == store.vocab
+        assert reloaded.postings[0]["job_skills"] == store.postings[0]["job_skills"]
+        assert np.allclose(reloaded.skill_embeddings(0), store.skill_embeddings(0))
+
+    def test_other_models_store_is_ignored(self, store):
+        store.save()
+        assert len(JobPostingStore("another-model", store.path)) == 0
+
+    def test_missing_store_is_empty(self, tmp_path):
+        assert len(JobPostingStore(MODEL_ID, str(tmp_path / "nothing"))) == 0
+
+
+class TestMatchResume:
+    def test_best_covered_posting_first(self, store, analyzer):
+        results = store.match_resume({"python": 2.0, "sql": 1.0, "django": 1.0, "docker": 1.0}, analyzer)
+        assert results[0]["id"] == "backend"
+        assert results[0]["coverage"] == pytest.approx(1.0)
+        assert results[0]["title"] == "Backend Engineer"
+        assert [r["rank"] for r in results] == list(range(1, len(results) + 1))
+
+    def test_result_fields(self, store, analyzer):
+        result = store.match_resume({"docker": 1.0, "aws": 1.0}, analyzer, top_n=1)[0]
+        assert result["id"] == "devops"
+        assert result["coverage"] == pytest.approx(0.5)
+        assert sorted(result["missing_skills"]) == ["kubernetes", "terraform"]
+        assert set(result) >= {"id", "title", "meta", "coverage", "matched", "missing",
+                               "profile_similarity", "rank"}
+
+    def test_top_n(self, store, analyzer):
+        assert len(store.match_resume({"python": 1.0}, analyzer, top_n=2)) == 2
+
+    def test_stored_job_embeddings_are_reused(self, store, analyzer, fake_embeddings):
+        with patch.object(fake_embeddings, "get_embeddings",
+                          wraps=fake_embeddings.get_embeddings) as spy:
+            store.match_resume({"python": 1.0, "react": 1.0}, analyzer)
+        # Only the resume is embedded, once
+        spy.assert_called_once_with(["python", "react"])
+
+    def test_empty_inputs(self, store, analyzer, tmp_path):
+        assert store.match_resume({}, analyzer) == []
+        assert JobPostingStore(MODEL_ID, str(tmp_path / "none")).match_resume({"python": 1.0}, analyzer) == []
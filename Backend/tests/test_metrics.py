@@ -0,0 +1,148 @@
+"""
+Tests for services/metrics.py — stage histograms, token counters and the
+cache / model / queue values read at scrape time.
+
+Metrics live in prometheus_client's global registry, so every assertion
+compares a sample before and after the code under test instead of
+expecting absolute values.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+
+from agents.enhanced_gap_agent import EnhancedGapAnalyzer
+from services import metrics
+from services.model_lifecycle import ModelLifecycleManager
+from services.stage_executor import StageExecutor
+from tests.test_pdf_utils import make_pdf
+from utils.pdf_utils import extract_text_from_bytes
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _stage_count(stage: str) -> float:
+    return _sample("skillbridge_stage_seconds_count", stage=stage)
+
+
+@pytest.fixture
+def watched():
+    """Isolate watch_cache / watch_queues registrations made by a test."""
+    with patch.dict(metrics._caches, clear=True), patch.object(metrics, "_queues", []):
+        yield
+
+
+class TestStageTimer:
+    def test_records_one_observation(self):
+        before = _stage_count("matching")
+        with metrics.stage_timer("matching"):
+            pass
+        assert _stage_count("matching") == before + 1
+
+    def test_records_when_the_block_raises(self):
+        before = _stage_count("llm")
+        with pytest.raises(RuntimeError):
+            with metrics.stage_timer("llm"):
+                raise RuntimeError("boom")
+        assert _stage_count("llm") == before + 1
+
+    def test_observe_stage_adds_to_sum(self):
+        before = _sample("skillbridge_stage_seconds_sum", stage="serialization")
+        metrics.observe_stage("serialization", 0.25)
+        assert _sample("skillbridge_stage_seconds_sum", stage="serialization") == pytest.approx(before + 0.25)
+
+
+class TestTokenCounts:
+    def test_counts_prompt_and_completion(self):
+        prompt = _sample("skillbridge_llm_tokens_total", type="prompt")
+        completion = _sample("skillbridge_llm_tokens_total", type="completion")
+        metrics.count_llm_tokens(SimpleNamespace(prompt_tokens=40, completion_tokens=7))
+        assert _sample("skillbridge_llm_tokens_total", type="prompt") == prompt + 40
+        assert _sample("skillbridge_llm_tokens_total", type="completion") == completion + 7
+
+    def test_missing_usage_is_ignored(self):
+        before = _sample("skillbridge_llm_tokens_total", type="prompt")
+        metrics.count_llm_tokens(None)
+        assert _sample("skillbridge_llm_tokens_total", type="prompt") == before
+
+
+class TestSnapshot:
+    def test_single_cache_layout(self, watched):
+        metrics.watch_cache("sentences", lambda: {"hits": 3, "misses": 1, "entries": 4})
+        assert _sample("skillbridge_cache_hits_total", cache="sentences", kind="sentences") == 3
+        assert _sample("skillbridge_cache_hit_ratio", cache="sentences", kind="sentences") == 0.75
+        assert _sample("skillbridge_cache_entries", cache="sentences") == 4
+
+    def test_per_kind_layout(self, watched):
+        metrics.watch_cache("results", lambda: {
+            "resume": {"hits": 1, "misses": 1}, "job": {"hits": 0, "misses": 2}, "entries": 3,
+        })
+        assert _sample("skillbridge_cache_hit_ratio", cache="results", kind="resume") == 0.5
+        assert _sample("skillbridge_cache_misses_total", cache="results", kind="job") == 2
+        assert _sample("skillbridge_cache_hit_ratio", cache="results", kind="job") == 0.0
+
+    def test_unavailable_and_failing_caches_are_skipped(self, watched):
+        def broken():
+            raise OSError("disk gone")
+
+        metrics.watch_cache("embeddings", lambda: None)
+        metrics.watch_cache("broken", broken)
+        metrics.watch_cache("ok", lambda: {"hits": 1, "misses": 0})
+        assert REGISTRY.get_sample_value(
+            "skillbridge_cache_hits_total", {"cache": "embeddings", "kind": "embeddings"}) is None
+        assert _sample("skillbridge_cache_hits_total", cache="ok", kind="ok") == 1
+
+    def test_queue_depths(self, watched):
+        executor = StageExecutor()
+        metrics.watch_queues(executor.queue_depths)
+        executor._pending["skills"] = 3
+        assert _sample("skillbridge_stage_queue_depth", stage="skills") == 3
+        assert _sample("skillbridge_stage_queue_depth", stage="pdf") == 0
+
+    def test_model_load_seconds(self):
+        manager = ModelLifecycleManager()
+        manager.register("tiny", lambda: "model")
+        manager.register("unused", lambda: "model")
+        manager.get("tiny")
+        with patch.object(metrics, "models", manager):
+            assert REGISTRY.get_sample_value("skillbridge_model_load_seconds", {"model": "tiny"}) >= 0
+            assert REGISTRY.get_sample_value("skillbridge_model_load_seconds", {"model": "unused"}) is None
+
+    def test_render(self, watched):
+        metrics.watch_cache("results", lambda: {"response": {"hits": 1, "misses": 0}, "entries": 1})
+        payload, content_type = metrics.render()
+        assert content_type.startswith("text/plain")
+        assert b'skillbridge_cache_hits_total{cache="results",kind="response"} 1.0' in payload
+        assert b"skillbridge_stage_seconds_bucket" in payload
+
+
+class TestInstrumentedStages:
+    def test_pdf_extraction(self):
+        before = _stage_count("pdf")
+        extract_text_from_bytes(make_pdf([["Python developer"]]))
+        assert _stage_count("pdf") == before + 1
+
+    def test_embedding_and_matching(self):
+        service = SimpleNamespace(get_embeddings=lambda texts: np.eye(len(texts), 8))
+        with patch("agents.enhanced_gap_agent.EmbeddingService", return_value=service):
+            analyzer = EnhancedGapAnalyzer()
+        embedding, matching = _stage_count("embedding"), _stage_count("matching")
+        analyzer.identify_semantic_skill_gaps({"python": 1.0}, {"python": 1.0, "sql": 1.0})
+        assert _stage_count("embedding") == embedding + 2
+        assert _stage_count("matching") == matching + 1
+
+    def test_stage_executor_queue_wait(self):
+        executor = StageExecutor(stage_limits={"gaps": 1})
+        before = _sample("skillbridge_stage_queue_seconds_count", stage="gaps")
+
+        async def scenario():
+            await asyncio.gather(*(executor.run("gaps", sum, [1, 2]) for _ in range(3)))
+
+        asyncio.run(scenario())
+        executor.shutdown()
+        assert _sample("skillbridge_stage_queue_seconds_count", stage="gaps") == before + 3
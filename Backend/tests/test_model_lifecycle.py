@@ -0,0 +1,125 @@
+"""
+Tests for services/model_lifecycle.py — background / lazy model loading.
+
+Loaders are plain functions (some gated on threading.Event) so the tests
+control when each "model" finishes loading.
+"""
+import threading
+
+import pytest
+
+from services.model_lifecycle import (
+    FAILED,
+    LOADING,
+    PENDING,
+    READY,
+    ModelLifecycleManager,
+    ModelLoadError,
+)
+
+
+@pytest.fixture
+def manager():
+    return ModelLifecycleManager()
+
+
+class TestLazyLoading:
+    def test_get_loads_on_first_use_only(self, manager):
+        calls = []
+        manager.register("m", lambda: calls.append(1) or "model")
+        assert manager.status()["m"]["state"] == PENDING
+        assert manager.get("m") == "model"
+        assert manager.get("m") == "model"
+        assert calls == [1]
+        assert manager.status()["m"]["state"] == READY
+        assert manager.status()["m"]["load_seconds"] is not None
+
+    def test_unknown_model(self, manager):
+        with pytest.raises(KeyError):
+            manager.get("nope")
+
+    def test_failed_loader_reports_error(self, manager):
+        def broken():
+            raise OSError("weights missing")
+
+        manager.register("m", broken)
+        with pytest.raises(ModelLoadError, match="weights missing"):
+            manager.get("m")
+        assert manager.status()["m"]["state"] == FAILED
+        assert "OSError" in manager.status()["m"]["error"]
+        assert not manager.is_ready()
+
+
+class TestBackgroundLoading:
+    def test_start_loads_models_concurrently(self, manager):
+        a_started, b_started = threading.Event(), threading.Event()
+
+        def load_a():
+            a_started.set()
+            # Only finishes if b is loading at the same time
+            assert b_started.wait(timeout=5)
+            return "a"
+
+        def load_b():
+            b_started.set()
+            assert a_started.wait(timeout=5)
+            return "b"
+
+        manager.register("a", load_a)
+        manager.register("b", load_b)
+        manager.start()
+        assert manager.get("a", timeout=5) == "a"
+        assert manager.get("b", timeout=5) == "b"
+        assert manager.is_ready()
+
+    def test_dependent_loader_waits_for_dependency(self, manager):
+        release = threading.Event()
+        manager.register("base", lambda: release.wait(timeout=5) and "nlp")
+        manager.register("derived", lambda: manager.get("base") + "+skills", depends_on=("base",))
+        manager.start()
+
+        assert manager.status()["base"]["state"] == LOADING
+        assert not manager.is_ready()
+        release.set()
+        assert manager.get("derived", timeout=5) == "nlp+skills"
+        assert manager.status()["derived"]["depends_on"] == ["base"]
+
+    def test_get_times_out_while_loading(self, manager):
+        release = threading.Event()
+        manager.register("slow", lambda: release.wait(timeout=5))
+        manager.start()
+        with pytest.raises(TimeoutError):
+            manager.get("slow", timeout=0.01)
+        release.set()
+
+    def test_cannot_reregister_loaded_model(self, manager):
+        manager.register("m", lambda: 1)
+        manager.get("m")
+        with pytest.raises(ValueError):
+            manager.register("m", lambda: 2)
+
+
+class TestOnDemandOnly:
+    def test_not_started_and_not_needed_for_readiness(self, manager):
+        calls = []
+        manager.register("eager", lambda: "e")
+        manager.register("lazy", lambda: calls.append(1) or "l", preload=False)
+        manager.start()
+        assert manager.get("eager", timeout=5) == "e"
+        assert calls == []
+        assert manager.status()["lazy"] == {
+            "state": PENDING, "preload": False, "load_seconds": None, "depends_on": [], "error": None,
+        }
+        assert manager.is_ready()
+
+        assert manager.get("lazy") == "l"
+        assert calls == [1]
+
+    def test_failure_does_not_affect_readiness(self, manager):
+        def broken():
+            raise OSError("weights missing")
+
+        manager.register("lazy", broken, preload=False)
+        with pytest.raises(ModelLoadError):
+            manager.get("lazy")
+        assert manager.is_ready()
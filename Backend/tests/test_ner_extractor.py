@@ -0,0 +1,137 @@
+"""
+Tests for services/ner_extractor.py and the context weighting it shares
+with SkillNER (services/skill_context.py).
+
+Extraction runs on a blank SpaCy pipeline whose entity ruler tags SKILL
+spans deterministically; load_ner() is exercised on a freshly initialised
+(untrained) tok2vec + ner pipeline saved to disk. Neither needs
+models/model-best.
+"""
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from services import ner_extractor  # noqa: E402
+from services.model_lifecycle import models  # noqa: E402
+from services.ner_extractor import NerSkillExtractor, load_ner  # noqa: E402
+from services.skill_context import normalize_document, skill_weight  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "SKILL", "pattern": [{"LOWER": "python"}]},
+        {"label": "SKILL", "pattern": [{"LOWER": "machine"}, {"LOWER": "learning"}]},
+        {"label": "SKILL", "pattern": [{"LOWER": "docker"}]},
+        {"label": "ORG", "pattern": [{"LOWER": "acme"}]},
+    ])
+    return nlp
+
+
+@pytest.fixture
+def extractor(nlp):
+    return NerSkillExtractor(nlp, batch_size=2)
+
+
+def untrained_pipeline(labels=("SKILL",)):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("tok2vec")
+    ner = nlp.add_pipe("ner")
+    for label in labels:
+        ner.add_label(label)
+    nlp.initialize()
+    return nlp
+
+
+class TestExtraction:
+    def test_job_skills_weighted_by_context(self, extractor):
+        skills = extractor.analyze_job_description(
+            "Python is required.\n\nMachine Learning experience is a plus.\nWe use Docker at Acme."
+        )
+        assert skills == {"python": 3.0, "machine learning": 2.0, "docker": 1.0}
+
+    def test_highest_weight_wins(self, extractor):
+        skills = extractor.analyze_job_description("Some python.\nStrong python is a must.")
+        assert skills == {"python": 3.0}
+
+    def test_resume_skills(self, extractor):
+        assert extractor.analyze_resume("• Python, Docker\r\nAcme Corp") == {"python": 1.0, "docker": 1.0}
+
+    def test_lines_are_tagged_in_batches(self, nlp):
+        batches = []
+
+        class Recording:
+            def pipe(self, texts, batch_size):
+                texts = list(texts)
+                batches.append((len(texts), batch_size))
+                return nlp.pipe(texts, batch_size=batch_size)
+
+        NerSkillExtractor(Recording(), batch_size=16).analyze_resume("python\n\n\ndocker\nacme")
+        assert batches == [(3, 16)]
+
+    def test_empty_input(self, extractor):
+        assert extractor.analyze_job_description("") == {}
+        assert extractor.analyze_resume(None) == {}
+
+
+class TestLoading:
+    def test_extra_pipes_are_disabled(self, tmp_path):
+        nlp = untrained_pipeline()
+        nlp.add_pipe("sentencizer")
+        nlp.to_disk(tmp_path / "model")
+
+        loaded = load_ner(str(tmp_path / "model"))
+        assert loaded.pipe_names == ["tok2vec", "ner"]
+        assert NerSkillExtractor(loaded).analyze_resume("Python and SQL developer") is not None
+
+    def test_model_without_skill_label(self, tmp_path):
+        untrained_pipeline(labels=("ORG",)).to_disk(tmp_path / "model")
+        with pytest.raises(ValueError):
+            load_ner(str(tmp_path / "model"))
+
+    def test_model_path_from_env(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_NER_MODEL", "/models/skills")
+        assert ner_extractor.model_path() == "/models/skills"
+        monkeypatch.delenv("SKILLBRIDGE_NER_MODEL")
+        assert ner_extractor.model_path() == ner_extractor.DEFAULT_MODEL_DIR
+
+
+class TestSelection:
+    def test_default_is_skillner(self, monkeypatch):
+        monkeypatch.delenv("SKILLBRIDGE_EXTRACTOR", raising=False)
+        assert ner_extractor.default_extractor() == "skillner"
+
+    def test_ner(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_EXTRACTOR", " NER ")
+        assert ner_extractor.default_extractor() == "ner"
+
+    def test_unknown(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_EXTRACTOR", "regex")
+        with pytest.raises(ValueError):
+            ner_extractor.default_extractor()
+
+    def test_loaded_on_demand_unless_default(self):
+        assert models.status()["ner"]["preload"] is False
+
+
+class TestSkillContext:
+    def test_normalize_document(self):
+        assert normalize_document("  • Python\t\tand  SQL \r\n\r\n\r\n\r\nDocker  ") == "Python and SQL\n\nDocker"
+
+    def test_keywords_within_the_window(self, nlp):
+        doc = nlp.make_doc("python is required")
+        assert skill_weight(doc, [0]) == 3.0
+        assert skill_weight(doc, 0) == 3.0
+        assert skill_weight(nlp.make_doc("python would be a plus"), [0]) == 2.0
+        far = nlp.make_doc("python " + "x " * 6 + "required")
+        assert skill_weight(far, [0]) == 1.0
+        assert skill_weight(doc, []) == 1.0
+
+    def test_hyphenated_keyword(self, nlp):
+        # SkillNER weights the punctuation-stripped sentence, the NER extractor the raw one
+        assert skill_weight(nlp.make_doc("docker is nice to have"), [0]) == 2.0
+        assert skill_weight(nlp.make_doc("docker is nice-to-have"), [0]) == 2.0
+        assert skill_weight(nlp.make_doc("docker is nice, to have"), [0]) == 2.0
+        assert skill_weight(nlp.make_doc("docker is nice and good to have"), [0]) == 1.0
@@ -0,0 +1,203 @@
+"""
+Tests for services/onnx_embedding.py and EmbeddingService's onnx backend.
+
+Pooling, the accuracy check and export metadata are pure NumPy. The
+round trip exports a tiny randomly initialised BERT, so it needs torch,
+onnx and onnxruntime but no downloaded model.
+"""
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from services import onnx_embedding
+from services.embedding_cache import EmbeddingCache
+from services.embedding_service import EmbeddingService, embedding_vectors_id
+from services.onnx_embedding import OnnxSentenceEncoder, check_accuracy, normalize, pool
+from services.skill_index import build_index
+
+HIDDEN = np.array([
+    [[1.0, 0.0], [3.0, 2.0], [100.0, 100.0]],   # last token is padding
+    [[0.0, 4.0], [2.0, 0.0], [4.0, -2.0]],
+], dtype=np.float32)
+MASK = np.array([[1, 1, 0], [1, 1, 1]])
+
+
+class TestPooling:
+    def test_mean_ignores_padding(self):
+        assert np.allclose(pool(HIDDEN, MASK, "mean"), [[2.0, 1.0], [2.0, 2.0 / 3]])
+
+    def test_cls(self):
+        assert pool(HIDDEN, MASK, "cls").tolist() == [[1.0, 0.0], [0.0, 4.0]]
+
+    def test_max_ignores_padding(self):
+        assert pool(HIDDEN, MASK, "max").tolist() == [[3.0, 2.0], [4.0, 4.0]]
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            pool(HIDDEN, MASK, "weightedmean")
+
+    def test_normalize(self):
+        out = normalize(np.array([[3.0, 4.0], [0.0, 0.0]], dtype=np.float32))
+        assert np.allclose(out, [[0.6, 0.8], [0.0, 0.0]])
+
+
+class FixedModel:
+    def __init__(self, vectors):
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+
+    def encode(self, texts, **kwargs):
+        return self.vectors[:len(texts)]
+
+
+class TestAccuracyCheck:
+    def test_identical_embeddings_pass(self):
+        vectors = np.random.default_rng(0).normal(size=(3, 8))
+        report = check_accuracy(FixedModel(vectors), FixedModel(vectors * 2), ["a", "b", "c"])
+        assert report["passed"] is True
+        assert report["min_cosine"] == pytest.approx(1.0)
+
+    def test_reports_the_worst_text(self):
+        reference = FixedModel([[1.0, 0.0], [0.0, 1.0]])
+        candidate = FixedModel([[1.0, 0.0], [0.5, 1.0]])
+        report = check_accuracy(reference, candidate, ["python", "docker"])
+        assert report["passed"] is False
+        assert report["worst"] == "docker"
+        assert report["min_cosine"] == pytest.approx(1 / np.sqrt(1.25), abs=1e-6)
+
+    def test_accuracy_texts_cover_skills_and_sentences(self):
+        texts = onnx_embedding.accuracy_texts(limit=20)
+        assert len(texts) == 20 + len(onnx_embedding.ACCURACY_SENTENCES)
+
+
+class TestExportDirectory:
+    def test_default_directory_per_model(self, monkeypatch):
+        monkeypatch.delenv("SKILLBRIDGE_ONNX_DIR", raising=False)
+        assert onnx_embedding.model_dir("models/fine_tuned_sentence_transformer/", "/x") == \
+            "/x/fine_tuned_sentence_transformer"
+        monkeypatch.setenv("SKILLBRIDGE_ONNX_DIR", "/exported")
+        assert onnx_embedding.model_dir("all-MiniLM-L6-v2") == "/exported"
+
+    def test_missing_export(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            OnnxSentenceEncoder(str(tmp_path))
+
+    def test_export_of_another_model_is_refused(self, tmp_path):
+        (tmp_path / "onnx.json").write_text(json.dumps({"model_id": "other", "quantized": True}))
+        with pytest.raises(ValueError):
+            OnnxSentenceEncoder(str(tmp_path), model_id="all-MiniLM-L6-v2")
+
+    def test_quantized_model_must_have_been_exported(self, tmp_path):
+        (tmp_path / "onnx.json").write_text(json.dumps({"model_id": "m", "quantized": False}))
+        with pytest.raises(FileNotFoundError):
+            OnnxSentenceEncoder(str(tmp_path), model_id="m", quantized=True)
+
+
+class FakeEncoder:
+    quantized = True
+
+    def encode(self, texts, **kwargs):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+class TestEmbeddingServiceBackend:
+    def test_onnx_backend_does_not_load_torch_model(self):
+        with patch("services.onnx_embedding.encoder_from_env", return_value=FakeEncoder()) as load, \
+             patch("sentence_transformers.SentenceTransformer") as torch_model:
+            svc = EmbeddingService(model_name="m", backend="onnx")
+        load.assert_called_once_with("m")
+        torch_model.assert_not_called()
+        assert svc.cache.model_id == "m:int8"
+        assert svc.get_embeddings(["python"]).shape == (1, 4)
+
+    def test_fp32_skill_index_is_not_used_for_int8_vectors(self, tmp_path, monkeypatch):
+        build_index(FakeEncoder(), "m", ["python"], str(tmp_path))
+        monkeypatch.setenv("SKILLBRIDGE_SKILL_INDEX", str(tmp_path))
+
+        quantized = FakeEncoder()
+        with patch("services.onnx_embedding.encoder_from_env", return_value=quantized):
+            svc = EmbeddingService(model_name="m", backend="onnx", cache=EmbeddingCache("m:int8"))
+        assert svc.skill_index is None
+
+        full_precision = FakeEncoder()
+        full_precision.quantized = False
+        with patch("services.onnx_embedding.encoder_from_env", return_value=full_precision):
+            svc = EmbeddingService(model_name="m", backend="onnx", cache=EmbeddingCache("m"))
+        assert svc.skill_index is not None
+
+    def test_vectors_id_is_known_before_loading(self, monkeypatch):
+        monkeypatch.delenv("SKILLBRIDGE_EMBEDDING_BACKEND", raising=False)
+        assert embedding_vectors_id("m") == "m"
+        monkeypatch.setenv("SKILLBRIDGE_EMBEDDING_BACKEND", "onnx")
+        monkeypatch.delenv("SKILLBRIDGE_ONNX_QUANTIZED", raising=False)
+        assert embedding_vectors_id("m") == "m:int8"
+        monkeypatch.setenv("SKILLBRIDGE_ONNX_QUANTIZED", "false")
+        assert embedding_vectors_id("m") == "m"
+
+    def test_service_exposes_vectors_id(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_EMBEDDING_BACKEND", "onnx")
+        monkeypatch.delenv("SKILLBRIDGE_ONNX_QUANTIZED", raising=False)
+        with patch("services.onnx_embedding.encoder_from_env", return_value=FakeEncoder()):
+            svc = EmbeddingService(model_name="m", cache=EmbeddingCache("m:int8"))
+        assert svc.vectors_id == embedding_vectors_id("m") == "m:int8"
+
+    def test_backend_from_env(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_EMBEDDING_BACKEND", "ONNX")
+        with patch("services.onnx_embedding.encoder_from_env", return_value=FakeEncoder()):
+            svc = EmbeddingService(cache=EmbeddingCache("m"))
+        assert svc.backend == "onnx"
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            EmbeddingService(backend="tensorrt")
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """A 2-layer BERT with a 17-word vocabulary, saved as a sentence-transformers model."""
+    pytest.importorskip("torch")
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    path = tmp_path_factory.mktemp("tiny")
+    words = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "python", "docker", "kubernetes", "sql",
+             "data", "machine", "learning", "with", "experience", "in", "and", "the"]
+    (path / "vocab.txt").write_text("\n".join(words))
+    BertTokenizerFast(str(path / "vocab.txt")).save_pretrained(str(path / "bert"))
+    config = BertConfig(vocab_size=len(words), hidden_size=32, num_hidden_layers=2,
+                        num_attention_heads=2, intermediate_size=64)
+    BertModel(config).save_pretrained(str(path / "bert"))
+
+    modules = [models.Transformer(str(path / "bert"), max_seq_length=32), models.Pooling(32), models.Normalize()]
+    SentenceTransformer(modules=modules, device="cpu").save(str(path / "st"))
+    return str(path / "st")
+
+
+class TestRoundTrip:
+    TEXTS = ["python", "machine learning with python and sql", "experience in docker and kubernetes",
+             "data", "the unknown words"]
+
+    def test_export_matches_pytorch(self, tiny_model, tmp_path):
+        from sentence_transformers import SentenceTransformer
+
+        onnx_embedding.export(tiny_model, str(tmp_path), quantize=True)
+        meta = json.loads((tmp_path / "onnx.json").read_text())
+        assert (meta["model_id"], meta["pooling"], meta["normalize"], meta["dimension"]) == \
+            (tiny_model, "mean", True, 32)
+
+        reference = SentenceTransformer(tiny_model, device="cpu")
+        fp32 = OnnxSentenceEncoder(str(tmp_path), model_id=tiny_model, quantized=False, threads=1)
+        assert check_accuracy(reference, fp32, self.TEXTS, min_cosine=0.9999)["passed"]
+
+        int8 = OnnxSentenceEncoder(str(tmp_path), quantized=True, threads=1)
+        assert check_accuracy(reference, int8, self.TEXTS)["passed"]
+
+    def test_encode_keeps_input_order_across_batches(self, tiny_model, tmp_path):
+        onnx_embedding.export(tiny_model, str(tmp_path), quantize=False)
+        encoder = OnnxSentenceEncoder(str(tmp_path), quantized=False)
+        batched = encoder.encode(self.TEXTS, batch_size=2)
+        one_by_one = np.stack([encoder.encode(t) for t in self.TEXTS])
+        assert np.allclose(batched, one_by_one, atol=1e-5)
@@ -0,0 +1,67 @@
+"""
+Tests for services/optimized_job_analyzer.py — parity of _ParsedText, the
+SkillNER Text built from an already-tagged Doc, with SkillNER's own Text.
+
+A blank SpaCy pipeline with an attribute ruler stands in for
+en_core_web_lg, so lemmas and stop words are deterministic. Importing the
+analyzer imports SkillNER, which needs its skill database (downloaded on
+first use), so the module is skipped where that is unavailable.
+"""
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+try:
+    from services.optimized_job_analyzer import _ParsedText, _skillner_cleaner
+except Exception as exc:  # SkillNER fetches SKILL_DB when first imported
+    pytest.skip(f"services.optimized_job_analyzer is unavailable: {exc}", allow_module_level=True)
+
+from skillNer.text_class import Text  # noqa: E402
+
+SENTENCES = [
+    "Strong experience in Python, SQL & Docker (must-have).",
+    "You have built REST APIs in the cloud; Kubernetes is a plus!",
+    "Developing data pipelines -- nice-to-have: Airflow, dbt.",
+    "no no   extra   spaces\tand tabs",
+]
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("attribute_ruler")
+    for text, lemma in [("developing", "develop"), ("pipelines", "pipeline"), ("built", "build"),
+                        ("apis", "api"), ("spaces", "space"), ("tabs", "tab")]:
+        ruler.add([[{"LOWER": text}]], {"LEMMA": lemma})
+    return nlp
+
+
+def word_attributes(text: Text) -> list:
+    """Everything SkillNER's matchers read from a Text's words."""
+    return [
+        (word.word, word.lemmed, word.stemmed, word.is_stop_word, word.is_matchable)
+        for word in text.list_words
+    ]
+
+
+@pytest.mark.parametrize("sentence", SENTENCES)
+def test_parsed_text_matches_skillner_text(nlp, sentence):
+    expected = Text(sentence, nlp)
+
+    # As _sentence_annotations does: the key is the cleaned sentence, tagged lowercased
+    key = _skillner_cleaner(sentence)
+    parsed = _ParsedText(key, nlp(key.lower()))
+
+    assert parsed.transformed_text == expected.transformed_text
+    assert parsed.abv_text == expected.abv_text
+    assert word_attributes(parsed) == word_attributes(expected)
+    assert parsed.stemmed() == expected.stemmed()
+    assert parsed.lemmed() == expected.lemmed()
+
+
+def test_redundant_phrases_are_unmatchable(nlp):
+    key = _skillner_cleaner("Experience in Rust and you have shipped it")
+    parsed = _ParsedText(key, nlp(key.lower()))
+    unmatchable = [word.word for word in parsed.list_words if not word.is_matchable]
+    assert {"experience", "in", "you", "have"} <= set(unmatchable)
+    assert "rust" not in unmatchable
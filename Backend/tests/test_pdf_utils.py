@@ -0,0 +1,212 @@
+"""
+Tests for utils/pdf_utils.py — in-memory PDF text extraction.
+
+Parity is checked against pdfminer's own extract_text() on the sample
+resume in Backend/assets, and on small multi-page PDFs assembled by
+make_pdf() for the parallel path.
+"""
+import io
+import os
+import zipfile
+
+import pytest
+
+pytest.importorskip("pdfminer")
+
+from pdfminer.high_level import extract_text
+
+from utils import pdf_utils
+from utils.pdf_utils import (
+    LAYOUT_MODES,
+    PDFExtractionError,
+    PDFTooLargeError,
+    extract_pdf_pages,
+    extract_text_from_bytes,
+    extract_text_from_pdf,
+    iter_pdf_pages,
+    layout_params,
+    read_pdfs_from_zip,
+    shutdown_page_pool,
+)
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "assets", "Jake_s_Resume.pdf")
+
+
+def make_pdf(pages: list) -> bytes:
+    """Build a minimal Helvetica PDF with one page per list of text lines."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        ops = ["BT /F1 12 Tf 72 720 Td 14 TL"] + [f"({line}) Tj T*" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids),
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref,
+    )
+    return bytes(out)
+
+
+@pytest.fixture(scope="module")
+def pdf_bytes():
+    with open(SAMPLE_PDF, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def reference_text():
+    return extract_text(SAMPLE_PDF)
+
+
+class TestExtractTextFromBytes:
+    def test_bytes_match_pdfminer(self, pdf_bytes, reference_text):
+        assert extract_text_from_bytes(pdf_bytes) == reference_text
+
+    def test_memoryview_matches_pdfminer(self, pdf_bytes, reference_text):
+        assert extract_text_from_bytes(memoryview(pdf_bytes)) == reference_text
+
+    def test_stream_matches_pdfminer(self, pdf_bytes, reference_text):
+        assert extract_text_from_bytes(io.BytesIO(pdf_bytes)) == reference_text
+
+    def test_pages_join_to_full_text(self, pdf_bytes, reference_text):
+        pages = list(iter_pdf_pages(pdf_bytes))
+        assert len(pages) == 1
+        assert "".join(pages) == reference_text
+
+    def test_byte_limit(self, pdf_bytes):
+        with pytest.raises(PDFTooLargeError):
+            extract_text_from_bytes(pdf_bytes, max_bytes=len(pdf_bytes) - 1)
+
+    def test_byte_limit_on_stream(self, pdf_bytes):
+        with pytest.raises(PDFTooLargeError):
+            extract_text_from_bytes(io.BytesIO(pdf_bytes), max_bytes=1024)
+
+    def test_page_limit(self, pdf_bytes):
+        with pytest.raises(PDFTooLargeError):
+            extract_text_from_bytes(pdf_bytes, max_pages=0)
+
+    def test_limits_not_hit(self, pdf_bytes, reference_text):
+        text = extract_text_from_bytes(pdf_bytes, max_pages=1, max_bytes=len(pdf_bytes))
+        assert text == reference_text
+
+    def test_garbage_raises(self):
+        with pytest.raises(PDFExtractionError):
+            extract_text_from_bytes(b"this is not a pdf")
+
+    def test_too_large_is_extraction_error(self):
+        assert issubclass(PDFTooLargeError, PDFExtractionError)
+
+
+@pytest.fixture(scope="module")
+def multi_page_pdf():
+    yield make_pdf([
+        [f"Page {i} Python Docker Kubernetes", "Skills: SQL, AWS, Terraform"]
+        for i in range(5)
+    ])
+    shutdown_page_pool()
+
+
+class TestParallelExtraction:
+    @pytest.mark.parametrize("workers", [1, 2, 3, 8])
+    def test_exact_mode_matches_pdfminer(self, multi_page_pdf, workers):
+        reference = extract_text(io.BytesIO(multi_page_pdf))
+        assert reference.count("\f") == 5
+        assert extract_text_from_bytes(multi_page_pdf, workers=workers) == reference
+
+    def test_pages_come_back_in_order_with_timings(self, multi_page_pdf):
+        pages = extract_pdf_pages(multi_page_pdf, workers=3)
+        assert [p["page"] for p in pages] == [1, 2, 3, 4, 5]
+        assert all(p["text"].startswith(f"Page {p['page'] - 1} ") for p in pages)
+        assert all(p["seconds"] >= 0 for p in pages)
+
+    def test_page_limit_checked_before_dispatch(self, multi_page_pdf):
+        with pytest.raises(PDFTooLargeError):
+            extract_pdf_pages(multi_page_pdf, workers=2, max_pages=4)
+
+    @pytest.mark.parametrize("layout", ["fast", "none"])
+    def test_other_layouts_keep_the_words(self, multi_page_pdf, layout):
+        text = extract_text_from_bytes(multi_page_pdf, layout=layout, workers=2)
+        assert text.count("\f") == 5
+        for word in ("Python", "Docker", "Kubernetes", "Terraform"):
+            assert text.count(word) == 5
+
+    def test_workers_are_not_forked(self, multi_page_pdf):
+        extract_pdf_pages(multi_page_pdf, workers=2)
+        assert pdf_utils._page_pool._mp_context.get_start_method() in ("forkserver", "spawn")
+
+    def test_layout_modes(self):
+        assert layout_params("exact") is not None
+        assert layout_params("fast").boxes_flow is None
+        assert layout_params("none") is None
+        assert set(LAYOUT_MODES) == {"exact", "fast", "none"}
+        with pytest.raises(ValueError):
+            layout_params("bogus")
+
+
+def make_zip(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+class TestReadPdfsFromZip:
+    def test_reads_only_pdfs_in_order(self, pdf_bytes):
+        data = make_zip({
+            "a.pdf": pdf_bytes,
+            "notes.txt": b"not a resume",
+            "__MACOSX/._a.pdf": b"resource fork",
+            "nested/B.PDF": pdf_bytes,
+        })
+        pdfs = read_pdfs_from_zip(data)
+        assert [name for name, _ in pdfs] == ["a.pdf", "nested/B.PDF"]
+        assert all(content == pdf_bytes for _, content in pdfs)
+
+    def test_file_limit(self, pdf_bytes):
+        data = make_zip({f"{i}.pdf": pdf_bytes for i in range(3)})
+        with pytest.raises(PDFTooLargeError):
+            read_pdfs_from_zip(data, max_files=2)
+
+    def test_member_size_limit(self):
+        data = make_zip({"big.pdf": b"0" * 10_000})
+        with pytest.raises(PDFTooLargeError):
+            read_pdfs_from_zip(data, max_bytes=1_000)
+
+    def test_not_a_zip(self):
+        with pytest.raises(PDFExtractionError):
+            read_pdfs_from_zip(b"definitely not a zip")
+
+
+class TestLegacyExtractTextFromPdf:
+    def test_path(self, reference_text):
+        assert extract_text_from_pdf(SAMPLE_PDF) == reference_text
+
+    def test_bytes(self, pdf_bytes, reference_text):
+        assert extract_text_from_pdf(pdf_bytes) == reference_text
+
+    def test_dict_wrapped_stream(self, pdf_bytes, reference_text):
+        assert extract_text_from_pdf({"file": io.BytesIO(pdf_bytes)}) == reference_text
+
+    def test_errors_are_returned_as_strings(self):
+        assert extract_text_from_pdf(b"this is not a pdf").startswith("Error")
@@ -0,0 +1,200 @@
+"""
+Tests for services/pipe_batcher.py — cross-request micro-batching of
+nlp.pipe calls.
+
+The pipeline is a stand-in that records every pipe() call and can be held
+mid-batch with a threading.Event, so the tests control which callers end
+up sharing a batch.
+"""
+import threading
+import time
+
+import pytest
+
+from services.pipe_batcher import PipeBatcher, batcher_from_env
+
+
+class RecordingPipeline:
+    """Returns each text upper-cased as its "Doc"; records (texts, batch_size, n_process) per call."""
+
+    def __init__(self, gate: threading.Event | None = None, fail_on: str | None = None):
+        self.calls = []
+        self.gate = gate
+        self.fail_on = fail_on
+        self.entered = threading.Event()
+
+    def pipe(self, texts, batch_size, n_process):
+        texts = list(texts)
+        self.calls.append((texts, batch_size, n_process))
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail_on in texts:
+            raise ValueError(f"cannot tag {self.fail_on!r}")
+        return (t.upper() for t in texts)
+
+
+def in_thread(fn, *args):
+    """Run fn(*args) in a thread; returns (thread, result list)."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn(*args)))
+    thread.start()
+    return thread, result
+
+
+def wait_for_queue(batcher, size: int):
+    deadline = time.monotonic() + 5
+    while batcher._queue.qsize() < size:
+        assert time.monotonic() < deadline, "callers never queued"
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def gated():
+    """A pipeline held inside its first call until the gate opens."""
+    gate = threading.Event()
+    nlp = RecordingPipeline(gate)
+    batcher = PipeBatcher(nlp, batch_size=8)
+    yield nlp, batcher, gate
+    gate.set()
+    batcher.close()
+
+
+class TestBatching:
+    def test_single_caller(self):
+        nlp = RecordingPipeline()
+        batcher = PipeBatcher(nlp, batch_size=8)
+        assert batcher.pipe(["python", "sql"]) == ["PYTHON", "SQL"]
+        assert nlp.calls == [(["python", "sql"], 8, 1)]
+        batcher.close()
+
+    def test_empty_input_skips_the_pipeline(self):
+        nlp = RecordingPipeline()
+        assert PipeBatcher(nlp).pipe([]) == []
+        assert nlp.calls == []
+
+    def test_waiting_callers_share_the_next_batch(self, gated):
+        nlp, batcher, gate = gated
+        first, first_result = in_thread(batcher.pipe, ["a"])
+        assert nlp.entered.wait(5)
+
+        waiting = [in_thread(batcher.pipe, texts) for texts in (["b", "c"], ["d"], ["e", "f", "g"])]
+        wait_for_queue(batcher, 3)
+        gate.set()
+        for thread, _ in [(first, first_result)] + waiting:
+            thread.join(5)
+
+        assert first_result == [["A"]]
+        assert sorted(result[0] for _, result in waiting) == [["B", "C"], ["D"], ["E", "F", "G"]]
+        assert len(nlp.calls) == 2
+        assert sorted(nlp.calls[1][0]) == ["b", "c", "d", "e", "f", "g"]
+
+    def test_max_batch_splits_the_queue(self):
+        gate = threading.Event()
+        nlp = RecordingPipeline(gate)
+        batcher = PipeBatcher(nlp, max_batch=3)
+        first, _ = in_thread(batcher.pipe, ["a"])
+        assert nlp.entered.wait(5)
+        waiting = [in_thread(batcher.pipe, [t, t]) for t in "bcd"]
+        wait_for_queue(batcher, 3)
+        gate.set()
+        for thread, _ in [(first, None)] + waiting:
+            thread.join(5)
+        batcher.close()
+
+        # 2 + 2 reaches max_batch, so the third caller gets a batch of its own
+        assert [len(texts) for texts, _, _ in nlp.calls] == [1, 4, 2]
+
+    def test_wait_window_collects_stragglers(self):
+        nlp = RecordingPipeline()
+        batcher = PipeBatcher(nlp, max_wait_ms=500)
+        first, first_result = in_thread(batcher.pipe, ["a"])
+        time.sleep(0.05)
+        assert batcher.pipe(["b"]) == ["B"]
+        first.join(5)
+        batcher.close()
+        assert first_result == [["A"]]
+        assert nlp.calls == [(["a", "b"], 64, 1)]
+
+
+class TestProcesses:
+    def test_large_batches_use_worker_processes(self):
+        nlp = RecordingPipeline()
+        batcher = PipeBatcher(nlp, batch_size=2, n_process=4)
+        batcher.pipe(["x"] * 7)
+        batcher.pipe(["x"] * 8)
+        batcher.close()
+        assert [n_process for _, _, n_process in nlp.calls] == [1, 4]
+
+
+class TestErrors:
+    def test_failure_reaches_every_caller_in_the_batch_only(self, gated):
+        nlp, batcher, gate = gated
+        nlp.fail_on = "bad"
+        errors = []
+
+        def call(texts):
+            try:
+                return batcher.pipe(texts)
+            except ValueError as exc:
+                errors.append(exc)
+
+        first, _ = in_thread(call, ["a"])
+        assert nlp.entered.wait(5)
+        waiting = [in_thread(call, texts) for texts in (["bad"], ["c"])]
+        wait_for_queue(batcher, 2)
+        gate.set()
+        for thread, _ in [(first, None)] + waiting:
+            thread.join(5)
+
+        assert len(errors) == 2
+        # The batcher keeps serving after a failed batch
+        nlp.fail_on = None
+        assert batcher.pipe(["d"]) == ["D"]
+
+    def test_closed(self):
+        batcher = PipeBatcher(RecordingPipeline())
+        batcher.pipe(["a"])
+        batcher.close()
+        batcher.close()
+        with pytest.raises(RuntimeError):
+            batcher.pipe(["a"])
+
+    def test_invalid_sizes(self):
+        with pytest.raises(ValueError):
+            PipeBatcher(RecordingPipeline(), batch_size=0)
+
+
+class TestFromEnv:
+    def test_settings(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_NLP_BATCH_SIZE", "128")
+        monkeypatch.setenv("SKILLBRIDGE_NLP_N_PROCESS", "8")
+        monkeypatch.setenv("SKILLBRIDGE_NLP_MAX_BATCH", "4096")
+        monkeypatch.setenv("SKILLBRIDGE_NLP_BATCH_WAIT_MS", "2.5")
+        batcher = batcher_from_env(RecordingPipeline())
+        assert (batcher.batch_size, batcher.n_process, batcher.max_batch, batcher.max_wait) == (128, 8, 4096, 0.0025)
+
+    def test_defaults(self, monkeypatch):
+        for name in ("BATCH_SIZE", "N_PROCESS", "MAX_BATCH", "BATCH_WAIT_MS"):
+            monkeypatch.delenv(f"SKILLBRIDGE_NLP_{name}", raising=False)
+        batcher = batcher_from_env(RecordingPipeline())
+        assert (batcher.batch_size, batcher.n_process, batcher.max_batch, batcher.max_wait) == (64, 1, 1024, 0.0)
+
+
+class TestSpacy:
+    def test_docs_come_back_to_their_callers(self):
+        spacy = pytest.importorskip("spacy")
+        batcher = PipeBatcher(spacy.blank("en"), batch_size=4)
+        texts = [[f"doc {i} sentence {j}" for j in range(i % 3 + 1)] for i in range(12)]
+        results = [None] * len(texts)
+
+        def run(i):
+            results[i] = [doc.text for doc in batcher.pipe(texts[i])]
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(texts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        batcher.close()
+        assert results == texts
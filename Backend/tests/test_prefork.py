@@ -0,0 +1,154 @@
+"""
+Tests for services/prefork.py, ModelLifecycleManager.load_all() and the
+gunicorn config that ties them together.
+
+Models are plain Python objects held by a fresh ModelLifecycleManager.
+The fork test runs a real os.fork(), so it is skipped where fork is
+unavailable, and the memory report needs Linux's /proc.
+"""
+import gc
+import importlib.util
+import os
+import threading
+
+import pytest
+
+from services import prefork
+from services.model_lifecycle import FAILED, PENDING, READY, ModelLifecycleManager
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "src", "gunicorn.conf.py")
+
+
+@pytest.fixture
+def manager():
+    manager = ModelLifecycleManager()
+    manager.register("spacy", lambda: {"vectors": bytearray(1024)})
+    manager.register("skillner", lambda: ("matchers", manager.get("spacy")), depends_on=("spacy",))
+    manager.register("ner", lambda: "ner", preload=False)
+    return manager
+
+
+@pytest.fixture
+def unfreeze():
+    yield
+    gc.unfreeze()
+
+
+class TestLoadAll:
+    def test_loads_preloaded_models_in_the_calling_thread(self, manager):
+        loaded_in = []
+        manager.register("embeddings", lambda: loaded_in.append(threading.current_thread()) or "model")
+        threads = threading.active_count()
+
+        manager.load_all()
+
+        assert loaded_in == [threading.current_thread()]
+        assert threading.active_count() == threads
+        assert {name: s["state"] for name, s in manager.status().items()} == {
+            "spacy": READY, "skillner": READY, "ner": PENDING, "embeddings": READY,
+        }
+        assert manager.is_ready()
+
+    def test_skip_leaves_models_pending(self, manager):
+        manager.load_all(skip=("skillner",))
+        assert manager.status()["skillner"]["state"] == PENDING
+        assert not manager.is_ready()
+
+    def test_failures_are_recorded_not_raised(self, manager):
+        manager.register("embeddings", lambda: 1 / 0)
+        manager.load_all()
+        assert manager.status()["embeddings"]["state"] == FAILED
+        assert manager.status()["skillner"]["state"] == READY
+
+
+class TestPreload:
+    def test_freezes_the_heap(self, manager, unfreeze):
+        prefork.preload(manager)
+        assert gc.get_freeze_count() > 0
+        assert manager.is_ready()
+
+    def test_onnx_embeddings_load_after_the_fork(self, manager, monkeypatch, unfreeze):
+        monkeypatch.setenv("SKILLBRIDGE_EMBEDDING_BACKEND", "onnx")
+        manager.register("embeddings", lambda: "session")
+        prefork.preload(manager)
+        assert manager.status()["embeddings"]["state"] == PENDING
+        assert manager.status()["spacy"]["state"] == READY
+
+    def test_torch_embeddings_are_preloaded(self, monkeypatch):
+        monkeypatch.delenv("SKILLBRIDGE_EMBEDDING_BACKEND", raising=False)
+        assert prefork.fork_unsafe() == ()
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+    def test_forked_workers_start_with_the_models_loaded(self, manager, unfreeze):
+        calls = []
+        manager.register("embeddings", lambda: calls.append(1) or "model")
+        prefork.preload(manager)
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                ok = manager.is_ready() and manager.get("embeddings") == "model" and calls == [1]
+                os.write(write_end, b"1" if ok else b"0")
+            finally:
+                os._exit(0)
+        os.close(write_end)
+        assert os.read(read_end, 1) == b"1"
+        os.close(read_end)
+        os.waitpid(pid, 0)
+        assert calls == [1]
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc")
+class TestMemoryReport:
+    def test_own_process(self):
+        usage = prefork.process_memory()
+        assert 0 < usage["pss"] <= usage["rss"]
+        assert usage["shared"] + usage["private"] == usage["rss"]
+
+    def test_missing_process(self):
+        assert prefork.process_memory(2 ** 22 + 1) is None
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+    def test_master_and_workers(self):
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(write_end)
+            os.read(read_end, 1)  # wait until the parent has measured
+            os._exit(0)
+        try:
+            report = prefork.memory_report(os.getpid())
+            assert f"worker {pid}" in report["processes"]
+            assert report["total_pss"] <= report["total_rss"]
+        finally:
+            os.write(write_end, b"x")
+            os.close(write_end)
+            os.close(read_end)
+            os.waitpid(pid, 0)
+
+
+class TestGunicornConfig:
+    def load(self):
+        spec = importlib.util.spec_from_file_location("gunicorn_conf", CONFIG_PATH)
+        config = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(config)
+        return config
+
+    def test_settings(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_WORKERS", "8")
+        monkeypatch.setenv("SKILLBRIDGE_BIND", "unix:/run/skillbridge.sock")
+        config = self.load()
+        assert config.workers == 8
+        assert config.bind == "unix:/run/skillbridge.sock"
+        assert config.preload_app is True
+
+    def test_when_ready_preloads(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(prefork, "preload", lambda: calls.append(1))
+        monkeypatch.delenv("SKILLBRIDGE_PRELOAD_MODELS", raising=False)
+        config = self.load()
+        config.when_ready(None)
+        monkeypatch.setenv("SKILLBRIDGE_PRELOAD_MODELS", "false")
+        config.when_ready(None)
+        assert calls == [1]
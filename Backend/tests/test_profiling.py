@@ -0,0 +1,164 @@
+"""
+Tests for services/profiling.py — per-request stack sampling, input-size
+annotations, output formats, the token allowlist / sample rate and the
+profile store.
+
+Work is a busy loop run through a real StageExecutor, so the sampler sees
+the same worker-thread stacks it would in production.
+"""
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from services import profiling
+from services.profiling import Profiler, RequestProfile, to_collapsed, to_speedscope
+from services.stage_executor import StageExecutor
+
+
+def busy_work(seconds: float) -> str:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(200))
+    profiling.annotate("resume", characters=1234, sentences=12)
+    return "done"
+
+
+def _profile_stage(profile, stage="skills", seconds=0.2):
+    executor = StageExecutor()
+
+    async def scenario():
+        token = profiling.activate(profile)
+        try:
+            return await executor.run(stage, busy_work, seconds)
+        finally:
+            profiling.deactivate(token)
+
+    profile.start()
+    try:
+        return asyncio.run(scenario())
+    finally:
+        profile.stop()
+        executor.shutdown()
+
+
+class TestRequestProfile:
+    def test_samples_the_worker_running_the_stage(self):
+        profile = RequestProfile("requested", "POST", "/jobs/jobAnalyzer", interval=0.002)
+        assert _profile_stage(profile) == "done"
+
+        assert profile.samples > 0
+        top_stack = next(iter(profile.stacks.most_common()))[0]
+        assert top_stack.startswith("stage:skills;")
+        assert "busy_work (" in top_stack
+        assert "concurrent/futures" not in top_stack
+
+    def test_annotations_from_the_worker_thread(self):
+        profile = RequestProfile("requested", "POST", "/jobs/jobAnalyzer")
+        _profile_stage(profile, seconds=0.01)
+        assert profile.inputs == {"resume": [{"characters": 1234, "sentences": 12}]}
+
+    def test_unprofiled_requests_are_untouched(self):
+        fn = lambda: None  # noqa: E731
+        assert profiling.bind(fn) is fn
+        profiling.annotate("resume", characters=1)   # no profile: nothing to record
+
+    def test_record(self):
+        profile = RequestProfile("sampled", "GET", "/x", interval=0.002)
+        _profile_stage(profile, seconds=0.05)
+        record = profile.record(200)
+        assert record["trigger"] == "sampled"
+        assert record["status"] == 200
+        assert record["duration_seconds"] >= 0.05
+        assert sum(record["stacks"].values()) == record["samples"]
+
+
+class TestFormats:
+    RECORD = {
+        "id": "a" * 32, "method": "POST", "path": "/jobs/jobAnalyzer", "interval_seconds": 0.005,
+        "stacks": {
+            "stage:skills;analyze (services/a.py:10);score (skillNer/utils.py:20)": 30,
+            "stage:skills;analyze (services/a.py:10)": 10,
+        },
+    }
+
+    def test_collapsed(self):
+        lines = to_collapsed(self.RECORD).splitlines()
+        assert lines == [
+            "stage:skills;analyze (services/a.py:10);score (skillNer/utils.py:20) 30",
+            "stage:skills;analyze (services/a.py:10) 10",
+        ]
+
+    def test_speedscope(self):
+        doc = to_speedscope(self.RECORD)
+        frames = doc["shared"]["frames"]
+        assert frames[0] == {"name": "stage:skills"}
+        assert frames[2] == {"name": "score", "file": "skillNer/utils.py", "line": 20}
+
+        profile = doc["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert profile["samples"] == [[0, 1, 2], [0, 1]]
+        assert profile["weights"] == [0.15, 0.05]
+        assert profile["endValue"] == pytest.approx(0.2)
+
+
+class TestTrigger:
+    def test_allowlisted_token(self):
+        profiler = Profiler(tokens=["secret"])
+        assert profiler.enabled
+        assert profiler.trigger("secret") == "requested"
+        assert profiler.trigger("wrong") is None
+        assert profiler.trigger(None) is None
+
+    def test_disabled_by_default(self):
+        profiler = Profiler(tokens=[""])
+        assert not profiler.enabled
+        assert not profiler.is_allowed("")
+
+    def test_sample_rate(self):
+        profiler = Profiler(sample_rate=0.25)
+        with patch("services.profiling.random.random", side_effect=[0.1, 0.9]):
+            assert profiler.trigger(None) == "sampled"
+            assert profiler.trigger(None) is None
+
+    def test_from_env(self):
+        env = {"SKILLBRIDGE_PROFILE_TOKENS": "a, b", "SKILLBRIDGE_PROFILE_SAMPLE_RATE": "0.01",
+               "SKILLBRIDGE_PROFILE_INTERVAL_MS": "10", "SKILLBRIDGE_PROFILE_KEEP": "5"}
+        with patch.dict("os.environ", env):
+            profiler = profiling.profiler_from_env()
+        assert profiler.is_allowed("b")
+        assert (profiler.sample_rate, profiler.interval, profiler.keep) == (0.01, 0.01, 5)
+
+
+class TestStore:
+    def test_finish_saves_and_loads(self, tmp_path):
+        profiler = Profiler(tokens=["t"], interval=0.002, directory=str(tmp_path))
+        profile = profiler.start("requested", "POST", "/jobs/jobAnalyzer")
+        profile.annotate("request", pdf_bytes=10)
+        record = profiler.finish(profile, 200)
+
+        assert profiler.load(profile.id) == record
+        assert profiler.summaries()[0]["inputs"] == {"request": [{"pdf_bytes": 10}]}
+        assert "stacks" not in profiler.summaries()[0]
+
+    def test_keeps_only_the_newest(self, tmp_path):
+        profiler = Profiler(directory=str(tmp_path), keep=2)
+        ids = []
+        for i in range(3):
+            profile = profiler.start("sampled", "GET", f"/{i}")
+            profiler.finish(profile, 200)
+            os.utime(tmp_path / f"{profile.id}.json", (i, i))
+            ids.append(profile.id)
+        profiler._prune()
+
+        assert profiler.load(ids[0]) is None
+        assert [s["path"] for s in profiler.summaries()] == ["/2", "/1"]
+
+    def test_rejects_ids_that_are_not_profile_ids(self, tmp_path):
+        profiler = Profiler(directory=str(tmp_path))
+        (tmp_path / "secrets.json").write_text("{}")
+        assert profiler.load("../secrets") is None
+        assert profiler.load("secrets") is None
+        assert profiler.summaries() == []
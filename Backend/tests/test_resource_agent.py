@@ -0,0 +1,336 @@
+"""
+Tests for agents/resource_agent.py — catalog-first recommendations with
+per-skill learning plans from an OpenAI-compatible API.
+
+The API is a local stub server speaking the chat-completions protocol, so
+the real AsyncOpenAI client, connection pool and timeouts are exercised.
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from agents import resource_agent
+from agents.resource_agent import LearningResourceClient, get_learning_resources
+from services.resource_catalog import ResourceCatalog
+from services.result_cache import DiskBackend, MemoryBackend, ResultCache, result_cache_from_env
+
+
+class StubOpenAI:
+    """Minimal /v1/chat/completions server that records the skills it is asked about."""
+
+    def __init__(self):
+        self.requests = []
+        self.delay = 0.0
+        self.failing = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body["messages"][-1]["content"]
+                skill = re.search(r"jobs I am applying to: (.+)\.", prompt).group(1)
+                stub.requests.append(skill)
+                time.sleep(stub.delay)
+
+                if skill in stub.failing:
+                    self._reply(500, {"error": {"message": "boom", "type": "server_error"}})
+                    return
+                self._reply(200, {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": f"Plan for {skill}"},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 50, "completion_tokens": 4, "total_tokens": 54},
+                })
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubOpenAI()
+    yield server
+    server.close()
+
+
+def _client(stub, cache=None, **kwargs) -> LearningResourceClient:
+    return LearningResourceClient(
+        "sk-test", base_url=stub.base_url, max_retries=0,
+        cache=cache if cache is not None else ResultCache(MemoryBackend()), **kwargs,
+    )
+
+
+def _run(client, coro_fn):
+    async def scenario():
+        try:
+            return await coro_fn(client)
+        finally:
+            await client.close()
+    return asyncio.run(scenario())
+
+
+async def _settle(client):
+    """Wait for the background requests a call left running."""
+    while client._inflight:
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def catalog():
+    catalog = ResourceCatalog()
+    catalog.add_entries({"skills": {
+        "docker": {"courses": [{"title": "Docker Get Started"}], "projects": ["Compose an app"]},
+    }})
+    return catalog
+
+
+class TestAvailablePlans:
+    def test_waits_for_plans_within_budget(self, stub):
+        plans = _run(_client(stub), lambda c: c.available_plans(["python", "sql"], wait=5))
+        assert plans == {"python": "Plan for python", "sql": "Plan for sql"}
+
+    def test_prompt_does_not_depend_on_the_job(self, stub):
+        _run(_client(stub), lambda c: c.available_plans(["kubernetes"], wait=5))
+        assert stub.requests == ["kubernetes"]
+
+    def test_no_wait_returns_immediately_and_fills_cache(self, stub):
+        stub.delay = 0.2
+
+        async def scenario(client):
+            first = await client.available_plans(["go"])
+            await _settle(client)
+            return first, await client.available_plans(["go"])
+
+        first, second = _run(_client(stub), scenario)
+        assert first == {}
+        assert second == {"go": "Plan for go"}
+        assert stub.requests == ["go"]
+
+    def test_failures_are_left_out(self, stub):
+        stub.failing = {"docker"}
+        plans = _run(_client(stub), lambda c: c.available_plans(["python", "docker"], wait=5))
+        assert plans == {"python": "Plan for python"}
+
+    def test_records_latency_and_tokens(self, stub):
+        def sample(name, **labels):
+            return REGISTRY.get_sample_value(name, labels) or 0.0
+
+        calls = sample("skillbridge_stage_seconds_count", stage="llm")
+        tokens = sample("skillbridge_llm_tokens_total", type="prompt")
+        _run(_client(stub), lambda c: c.available_plans(["python", "sql"], wait=5))
+        assert sample("skillbridge_stage_seconds_count", stage="llm") == calls + 2
+        assert sample("skillbridge_llm_tokens_total", type="prompt") == tokens + 100
+
+    def test_timeout_is_a_failure(self, stub):
+        stub.delay = 1.0
+
+        async def scenario(client):
+            plans = await client.available_plans(["go"], wait=5)
+            return plans, client.api_calls
+
+        assert _run(_client(stub, timeout=0.2), scenario) == ({}, 1)
+
+
+class TestCaching:
+    def test_plans_are_cached_per_skill(self, stub):
+        async def two_requests(client):
+            await client.available_plans(["kubernetes", "python"], wait=5)
+            return await client.available_plans(["Kubernetes", "terraform"], wait=5)
+
+        client = _client(stub)
+        plans = _run(client, two_requests)
+
+        assert sorted(stub.requests) == ["kubernetes", "python", "terraform"]
+        assert client.api_calls == 3
+        assert plans["Kubernetes"] == "Plan for kubernetes"
+
+    def test_cache_survives_a_new_client(self, stub):
+        cache = ResultCache(MemoryBackend())
+        _run(_client(stub, cache), lambda c: c.available_plans(["sql"], wait=5))
+        _run(_client(stub, cache), lambda c: c.available_plans(["sql"], wait=5))
+        assert stub.requests == ["sql"]
+
+    def test_failures_are_not_cached(self, stub):
+        cache = ResultCache(MemoryBackend())
+        stub.failing = {"rust"}
+        _run(_client(stub, cache), lambda c: c.available_plans(["rust"], wait=5))
+        stub.failing = set()
+        plans = _run(_client(stub, cache), lambda c: c.available_plans(["rust"], wait=5))
+        assert stub.requests == ["rust", "rust"]
+        assert plans == {"rust": "Plan for rust"}
+
+
+class TestPlanCacheSettings:
+    def test_result_cache_off_keeps_plans(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_RESULT_CACHE", "off")
+        monkeypatch.delenv("SKILLBRIDGE_LEARNING_CACHE", raising=False)
+        cache = resource_agent.plan_cache_from_env()
+        cache.set("plan", "sql", "Plan for sql")
+        assert cache.get("plan", "sql") == "Plan for sql"
+        assert cache.ttl_seconds == 7 * 24 * 3600
+
+    def test_disk_caches_get_their_own_directories(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("SKILLBRIDGE_RESULT_CACHE", "disk")
+        monkeypatch.setenv("SKILLBRIDGE_LEARNING_CACHE", "disk")
+        monkeypatch.delenv("SKILLBRIDGE_RESULT_CACHE_DIR", raising=False)
+        monkeypatch.delenv("SKILLBRIDGE_LEARNING_CACHE_DIR", raising=False)
+        plans = resource_agent.plan_cache_from_env()
+        results = result_cache_from_env()
+        assert isinstance(plans.backend, DiskBackend)
+
+        plans.set("plan", "sql", "Plan for sql")
+        results.clear()
+        assert plans.get("plan", "sql") == "Plan for sql"
+        assert sorted(p.name for p in (tmp_path / "workspace").iterdir()) == ["learning_cache", "result_cache"]
+
+    def test_learning_cache_settings(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("SKILLBRIDGE_LEARNING_CACHE", "disk")
+        monkeypatch.setenv("SKILLBRIDGE_LEARNING_CACHE_DIR", str(tmp_path / "plans"))
+        monkeypatch.setenv("SKILLBRIDGE_LEARNING_CACHE_TTL", "60")
+        cache = resource_agent.plan_cache_from_env()
+        assert cache.ttl_seconds == 60
+        cache.set("plan", "sql", "Plan for sql")
+        assert (tmp_path / "plans").is_dir()
+
+
+class TestCoalescing:
+    def test_concurrent_requests_share_calls(self, stub):
+        stub.delay = 0.2
+
+        async def burst(client):
+            return await asyncio.gather(*(
+                client.available_plans(["kubernetes", "python"], wait=5) for _ in range(10)
+            ))
+
+        client = _client(stub)
+        results = _run(client, burst)
+
+        assert sorted(stub.requests) == ["kubernetes", "python"]
+        assert client.api_calls == 2
+        assert all(plans == results[0] for plans in results)
+
+    def test_waiting_caller_joins_background_request(self, stub):
+        stub.delay = 0.2
+
+        async def scenario(client):
+            await client.available_plans(["java"])
+            return await client.available_plans(["java"], wait=5)
+
+        assert _run(_client(stub), scenario) == {"java": "Plan for java"}
+        assert stub.requests == ["java"]
+
+    def test_cancelled_caller_leaves_the_call_running(self, stub):
+        stub.delay = 0.2
+
+        async def scenario(client):
+            waiting = asyncio.ensure_future(client.available_plans(["rust"], wait=5))
+            await asyncio.sleep(0.05)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            await _settle(client)
+            return await client.available_plans(["rust"])
+
+        assert _run(_client(stub), scenario) == {"rust": "Plan for rust"}
+        assert stub.requests == ["rust"]
+
+
+class TestSharedClient:
+    def test_replaced_client_is_closed(self, stub):
+        async def shared():
+            return resource_agent._shared_client("sk-test")
+
+        async def replace():
+            client = resource_agent._shared_client("sk-test")
+            await asyncio.gather(*resource_agent._retiring)
+            return client
+
+        try:
+            with patch.dict("os.environ", {"OPENAI_BASE_URL": stub.base_url}):
+                first = asyncio.run(shared())
+                second = asyncio.run(replace())
+            assert second is not first
+            assert first._client.is_closed()
+            assert not second._client.is_closed()
+        finally:
+            asyncio.run(resource_agent.close_learning_client())
+
+
+class TestGetLearningResources:
+    @pytest.fixture(autouse=True)
+    def isolated(self, catalog):
+        with patch.object(resource_agent.models, "get", return_value=catalog), \
+                patch.object(resource_agent, "plan_cache", ResultCache(MemoryBackend())):
+            yield
+
+    def _call(self, missing, **env):
+        async def scenario():
+            try:
+                text = await get_learning_resources(missing)
+                if resource_agent._client is not None:
+                    await _settle(resource_agent._client)
+                return text
+            finally:
+                await resource_agent.close_learning_client()
+
+        with patch.dict("os.environ", env):
+            return asyncio.run(scenario())
+
+    def test_no_missing_skills(self):
+        assert self._call({}).startswith("No skill gaps identified")
+
+    def test_catalog_without_api_key(self):
+        text = self._call({"docker": 2.0, "cobol": 1.0}, OPENAI_API_KEY="")
+        assert text.startswith("docker:\nCourses:\n- Docker Get Started")
+        assert text.endswith("Also worth developing: cobol.")
+
+    def test_nothing_known_without_api_key(self):
+        text = self._call({"cobol": 1.0}, OPENAI_API_KEY="")
+        assert text.startswith("Skills to develop: cobol.")
+
+    def test_catalog_first_then_llm_override(self, stub):
+        env = {"OPENAI_API_KEY": "sk-test", "OPENAI_BASE_URL": stub.base_url}
+        stub.delay = 0.1
+
+        first = self._call({"docker": 1.0}, **env)
+        second = self._call({"docker": 1.0}, **env)
+
+        assert "Docker Get Started" in first
+        assert second == "docker:\nPlan for docker"
+        assert stub.requests == ["docker"]
+
+    def test_llm_wait_budget(self, stub):
+        env = {"OPENAI_API_KEY": "sk-test", "OPENAI_BASE_URL": stub.base_url}
+        with patch.object(resource_agent, "LLM_WAIT", 5.0):
+            text = self._call({"docker": 1.0, "cobol": 1.0}, **env)
+        assert text == "docker:\nPlan for docker\n\ncobol:\nPlan for cobol"
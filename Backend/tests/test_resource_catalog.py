@@ -0,0 +1,125 @@
+"""
+Tests for services/resource_catalog.py — the offline learning-resource
+catalog: seeding, JSON and SQLite extension files, and lookup fallbacks.
+"""
+import json
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from services.resource_catalog import DEFAULT_SKILLS_JSON, ResourceCatalog, catalog_from_env
+
+
+@pytest.fixture
+def taxonomy(tmp_path):
+    path = tmp_path / "skills.json"
+    path.write_text(json.dumps({"skills": [
+        {"name": "Docker", "category": "containerization", "related_terms": ["docker compose"]},
+        {"name": "podman", "category": "containerization", "related_terms": []},
+    ]}))
+    return str(path)
+
+
+@pytest.fixture
+def catalog(taxonomy):
+    catalog = ResourceCatalog()
+    catalog.add_taxonomy(taxonomy)
+    catalog.add_entries({
+        "skills": {"docker": {
+            "courses": [{"title": "Docker Get Started", "url": "https://docs.docker.com/get-started/"}],
+            "books": [{"title": "Docker Deep Dive", "author": "Nigel Poulton"}],
+            "projects": ["Containerise a web app"],
+        }},
+        "categories": {"containerization": {"courses": [{"title": "Containers 101"}]}},
+    })
+    return catalog
+
+
+class TestLookup:
+    def test_canonical_skill(self, catalog):
+        source, entry = catalog.lookup("  DOCKER ")
+        assert source == "docker"
+        assert entry["books"][0]["title"] == "Docker Deep Dive"
+
+    def test_related_term_resolves_to_its_skill(self, catalog):
+        source, _ = catalog.lookup("Docker Compose")
+        assert source == "docker"
+
+    def test_known_skill_without_resources_uses_category(self, catalog):
+        source, entry = catalog.lookup("podman")
+        assert source == "containerization"
+        assert entry["courses"] == [{"title": "Containers 101"}]
+
+    def test_unknown_skill(self, catalog):
+        assert catalog.lookup("cobol") is None
+        assert catalog.plan("cobol") is None
+
+
+class TestPlan:
+    def test_lists_courses_book_and_project(self, catalog):
+        assert catalog.plan("docker") == (
+            "Courses:\n"
+            "- Docker Get Started — https://docs.docker.com/get-started/\n"
+            "Book: Docker Deep Dive by Nigel Poulton\n"
+            "Project idea: Containerise a web app"
+        )
+
+    def test_names_the_source_when_it_differs(self, catalog):
+        assert catalog.plan("podman").startswith("(Resources for containerization)\n")
+
+
+class TestExtension:
+    def test_json_file_adds_and_dedupes(self, catalog, tmp_path):
+        path = tmp_path / "extra.json"
+        path.write_text(json.dumps({"skills": {
+            "docker": {"courses": [{"title": "docker get started"}, {"title": "Play with Docker"}]},
+            "kubernetes": {"aliases": ["k8s"], "projects": ["Deploy to minikube"]},
+        }}))
+        catalog.load(str(path))
+
+        _, entry = catalog.lookup("docker")
+        assert [c["title"] for c in entry["courses"]] == ["Docker Get Started", "Play with Docker"]
+        assert catalog.plan("k8s") == "(Resources for kubernetes)\nProject idea: Deploy to minikube"
+
+    def test_sqlite_file(self, catalog, tmp_path):
+        path = str(tmp_path / "extra.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE resources (skill TEXT, kind TEXT, title TEXT, url TEXT, author TEXT)")
+        conn.executemany("INSERT INTO resources VALUES (?, ?, ?, ?, ?)", [
+            ("Terraform", "course", "Terraform tutorials", "https://developer.hashicorp.com/terraform/tutorials", None),
+            ("terraform", "book", "Terraform: Up & Running", None, "Yevgeniy Brikman"),
+            ("terraform", "project", "Provision a VM", None, None),
+            ("category:containerization", "book", "Container Security", None, None),
+            ("terraform", "video", "ignored", None, None),
+        ])
+        conn.commit()
+        conn.close()
+
+        catalog.load(path)
+        assert catalog.plan("terraform") == (
+            "Courses:\n"
+            "- Terraform tutorials — https://developer.hashicorp.com/terraform/tutorials\n"
+            "Book: Terraform: Up & Running by Yevgeniy Brikman\n"
+            "Project idea: Provision a VM"
+        )
+        _, entry = catalog.lookup("podman")
+        assert entry["books"] == [{"title": "Container Security"}]
+
+
+class TestFromEnv:
+    def test_seeded_from_repo_data(self):
+        with patch.dict("os.environ", {"SKILLBRIDGE_RESOURCE_CATALOG": ""}):
+            catalog = catalog_from_env()
+        # Every canonical skill in data/skills.json has resources
+        with open(DEFAULT_SKILLS_JSON, encoding="utf-8") as f:
+            names = [skill["name"] for skill in json.load(f)["skills"]]
+        assert all(catalog.lookup(name) is not None for name in names)
+        assert catalog.lookup("helm")[0] == "kubernetes"
+
+    def test_extra_files(self, tmp_path):
+        path = tmp_path / "extra.json"
+        path.write_text(json.dumps({"skills": {"rust": {"projects": ["Write a CLI"]}}}))
+        with patch.dict("os.environ", {"SKILLBRIDGE_RESOURCE_CATALOG": f" {path} ,"}):
+            catalog = catalog_from_env()
+        assert catalog.plan("rust") == "Project idea: Write a CLI"
@@ -0,0 +1,151 @@
+"""
+Tests for services/result_cache.py — the TTL result cache behind
+/jobs/jobAnalyzer and its memory and disk backends.
+"""
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from services.result_cache import (
+    DiskBackend,
+    MemoryBackend,
+    ResultCache,
+    content_hash,
+    make_key,
+    result_cache_from_env,
+)
+
+
+@pytest.fixture(params=["memory", "disk"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(max_entries=100)
+    return DiskBackend(str(tmp_path / "cache"), max_entries=100)
+
+
+class TestKeys:
+    def test_content_hash_is_stable(self):
+        assert content_hash(b"%PDF-1.4") == content_hash(b"%PDF-1.4")
+        assert content_hash(b"%PDF-1.4") != content_hash(b"%PDF-1.5")
+
+    def test_every_part_changes_the_key(self):
+        base = make_key("response", "v1", "pdfhash", "jd", True, 0.7)
+        assert make_key("response", "v1", "pdfhash", "jd", True, 0.7) == base
+        assert make_key("response", "v2", "pdfhash", "jd", True, 0.7) != base
+        assert make_key("response", "v1", "pdfhash", "jd", False, 0.7) != base
+        assert make_key("response", "v1", "pdfhash", "jd", True, 0.8) != base
+        assert make_key("resume", "v1", "pdfhash", "jd", True, 0.7) != base
+
+
+class TestResultCache:
+    def test_round_trip(self, backend):
+        cache = ResultCache(backend)
+        cache.set("job", "k", {"python": 3.0})
+        assert cache.get("job", "k") == {"python": 3.0}
+
+    def test_miss(self, backend):
+        assert ResultCache(backend).get("job", "absent") is None
+
+    def test_empty_results_are_cached(self, backend):
+        cache = ResultCache(backend)
+        cache.set("resume", "k", {})
+        assert cache.get("resume", "k") == {}
+
+    def test_expired_entries_are_dropped(self, backend):
+        cache = ResultCache(backend, ttl_seconds=60)
+        cache.set("job", "k", {"python": 3.0})
+        with patch("services.result_cache.time.time", return_value=time.time() + 61):
+            assert cache.get("job", "k") is None
+        assert len(backend) == 0
+
+    def test_stats_per_kind(self, backend):
+        cache = ResultCache(backend)
+        cache.set("job", "k", {"python": 3.0})
+        cache.get("job", "k")
+        cache.get("job", "other")
+        cache.get("resume", "k2")
+        stats = cache.stats()
+        assert stats["job"] == {"hits": 1, "misses": 1}
+        assert stats["resume"] == {"hits": 0, "misses": 1}
+        assert stats["entries"] == 1
+
+
+class TestMemoryBackend:
+    def test_lru_eviction(self):
+        cache = ResultCache(MemoryBackend(max_entries=2))
+        cache.set("job", "a", 1)
+        cache.set("job", "b", 2)
+        cache.get("job", "a")          # a is now most recent
+        cache.set("job", "c", 3)
+        assert cache.get("job", "b") is None
+        assert cache.get("job", "a") == 1
+        assert cache.get("job", "c") == 3
+
+    def test_zero_capacity_stores_nothing(self):
+        cache = ResultCache(MemoryBackend(max_entries=0))
+        cache.set("job", "a", 1)
+        assert cache.get("job", "a") is None
+
+
+class TestDiskBackend:
+    def test_survives_a_new_instance(self, tmp_path):
+        ResultCache(DiskBackend(str(tmp_path))).set("job", "k", {"python": 3.0})
+        backend = DiskBackend(str(tmp_path))
+        assert len(backend) == 1
+        assert ResultCache(backend).get("job", "k") == {"python": 3.0}
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        backend = DiskBackend(str(tmp_path), max_entries=10)
+        cache = ResultCache(backend)
+        for i in range(10):
+            cache.set("job", f"key{i:02d}", i)
+            path = backend._path(f"key{i:02d}")
+            os.utime(path, (1000 + i, 1000 + i))
+        cache.get("job", "key00")      # refreshes key00's mtime
+        cache.set("job", "key10", 10)
+        assert len(backend) <= 10
+        assert cache.get("job", "key00") == 0
+        assert cache.get("job", "key01") is None
+
+    def test_unreadable_entry_is_a_miss(self, tmp_path):
+        backend = DiskBackend(str(tmp_path))
+        cache = ResultCache(backend)
+        cache.set("job", "k", 1)
+        with open(backend._path("k"), "w") as f:
+            f.write("{not json")
+        assert cache.get("job", "k") is None
+
+    def test_clear(self, tmp_path):
+        backend = DiskBackend(str(tmp_path))
+        cache = ResultCache(backend)
+        cache.set("job", "a", 1)
+        cache.clear()
+        assert len(backend) == 0
+        assert cache.get("job", "a") is None
+
+
+class TestFromEnv:
+    def test_default_is_memory(self, monkeypatch):
+        monkeypatch.delenv("SKILLBRIDGE_RESULT_CACHE", raising=False)
+        assert isinstance(result_cache_from_env().backend, MemoryBackend)
+
+    def test_disk(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("SKILLBRIDGE_RESULT_CACHE", "disk")
+        monkeypatch.setenv("SKILLBRIDGE_RESULT_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("SKILLBRIDGE_RESULT_CACHE_TTL", "5")
+        cache = result_cache_from_env()
+        assert isinstance(cache.backend, DiskBackend)
+        assert cache.ttl_seconds == 5
+
+    def test_off(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_RESULT_CACHE", "off")
+        cache = result_cache_from_env()
+        cache.set("job", "a", 1)
+        assert cache.get("job", "a") is None
+
+    def test_unknown_mode(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_RESULT_CACHE", "redis")
+        with pytest.raises(ValueError):
+            result_cache_from_env()
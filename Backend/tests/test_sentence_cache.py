@@ -0,0 +1,200 @@
+"""
+Tests for services/sentence_cache.py — the per-sentence memo of SkillNER
+annotations used by SkillExtractorSingleton.
+"""
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from services.sentence_cache import SentenceAnnotationCache, sentence_cache_from_env
+
+PYTHON = [("python", [2], 3.0)]
+
+
+class TestLRU:
+    def test_hit_and_miss(self):
+        cache = SentenceAnnotationCache(capacity=10)
+        assert cache.get("Strong Python skills required") is None
+        cache.put("Strong Python skills required", PYTHON)
+        assert cache.get("Strong Python skills required") == PYTHON
+
+    def test_keys_are_case_sensitive(self):
+        cache = SentenceAnnotationCache(capacity=10)
+        cache.put("Go experience", [("go", [0], 1.0)])
+        assert cache.get("go experience") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = SentenceAnnotationCache(capacity=2, policy="lru")
+        cache.put("a", [])
+        cache.put("b", [])
+        cache.get("a")
+        cache.put("c", [])
+        assert cache.get("b") is None
+        assert cache.get("a") == [] and cache.get("c") == []
+        assert cache.stats()["evictions"] == 1
+
+    def test_zero_capacity_stores_nothing(self):
+        cache = SentenceAnnotationCache(capacity=0)
+        cache.put("a", PYTHON)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            SentenceAnnotationCache(policy="fifo")
+
+
+class TestLFU:
+    def test_evicts_least_frequently_used(self):
+        cache = SentenceAnnotationCache(capacity=2, policy="lfu")
+        cache.put("boilerplate", [])
+        for _ in range(3):
+            cache.get("boilerplate")
+        cache.put("one-off", [])
+        cache.put("another", [])
+        assert cache.get("one-off") is None
+        assert cache.get("boilerplate") == []
+
+    def test_ties_evict_the_oldest(self):
+        cache = SentenceAnnotationCache(capacity=2, policy="lfu")
+        cache.put("a", [])
+        cache.put("b", [])
+        cache.put("c", [])
+        assert cache.get("a") is None
+        assert cache.get("b") == [] and cache.get("c") == []
+
+    def test_overwrite_counts_as_use(self):
+        cache = SentenceAnnotationCache(capacity=2, policy="lfu")
+        cache.put("a", [])
+        cache.put("a", PYTHON)
+        cache.put("b", [])
+        cache.put("c", [])
+        assert cache.get("a") == PYTHON
+        assert cache.get("b") is None
+
+
+class TestStats:
+    def test_hit_ratio(self):
+        cache = SentenceAnnotationCache(capacity=10)
+        cache.put("a", [])
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["hit_ratio"] == pytest.approx(2 / 3)
+        assert stats["entries"] == 1
+
+    @pytest.mark.parametrize("policy", ["lru", "lfu"])
+    def test_memory_tracks_entries(self, policy):
+        cache = SentenceAnnotationCache(capacity=1, policy=policy)
+        assert cache.stats()["memory_bytes"] == 0
+        cache.put("a", PYTHON)
+        one = cache.stats()["memory_bytes"]
+        assert one > 0
+        cache.put("a", PYTHON)
+        assert cache.stats()["memory_bytes"] == one
+        empty = SentenceAnnotationCache(capacity=1)
+        empty.put("x", [])
+        cache.put("b", [])
+        # "a" was evicted, so only an entry the size of "x" remains
+        assert len(cache) == 1
+        assert cache.stats()["memory_bytes"] == empty.stats()["memory_bytes"] < one
+
+
+class TestThreadSafety:
+    @pytest.mark.parametrize("policy", ["lru", "lfu"])
+    def test_concurrent_access(self, policy):
+        cache = SentenceAnnotationCache(capacity=50, policy=policy)
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(2000):
+                    key = f"sentence {(i * 7 + offset) % 120}"
+                    if cache.get(key) is None:
+                        cache.put(key, [("skill", [i % 5], 1.0)])
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not errors
+        stats = cache.stats()
+        assert stats["entries"] == len(cache) <= 50
+        assert stats["hits"] + stats["misses"] == 8 * 2000
+
+
+class TestPersistence:
+    @pytest.mark.parametrize("policy", ["lru", "lfu"])
+    def test_round_trip(self, tmp_path, policy):
+        path = str(tmp_path / "sentences.json")
+        cache = SentenceAnnotationCache(capacity=10, policy=policy)
+        cache.put("Strong Python skills required", PYTHON)
+        cache.put("Docker preferred", [("docker", [0], 2.0)])
+        assert cache.save(path, "v1") == 2
+
+        restored = SentenceAnnotationCache(capacity=10, policy=policy)
+        assert restored.load(path, "v1") == 2
+        assert restored.get("Strong Python skills required") == PYTHON
+        assert restored.get("Docker preferred") == [("docker", [0], 2.0)]
+
+    def test_other_version_is_ignored(self, tmp_path):
+        path = str(tmp_path / "sentences.json")
+        cache = SentenceAnnotationCache(capacity=10)
+        cache.put("a", PYTHON)
+        cache.save(path, "v1")
+
+        restored = SentenceAnnotationCache(capacity=10)
+        assert restored.load(path, "v2") == 0
+        assert len(restored) == 0
+
+    def test_load_keeps_most_valuable_entries(self, tmp_path):
+        path = str(tmp_path / "sentences.json")
+        cache = SentenceAnnotationCache(capacity=10, policy="lfu")
+        for key in ("rare", "common", "medium"):
+            cache.put(key, [])
+        for _ in range(3):
+            cache.get("common")
+        cache.get("medium")
+        cache.save(path, "v1")
+
+        restored = SentenceAnnotationCache(capacity=2, policy="lfu")
+        restored.load(path, "v1")
+        assert restored.get("rare") is None
+        assert restored.get("common") == [] and restored.get("medium") == []
+
+    def test_missing_or_corrupt_file(self, tmp_path):
+        cache = SentenceAnnotationCache(capacity=10)
+        assert cache.load(str(tmp_path / "missing.json"), "v1") == 0
+        corrupt = tmp_path / "corrupt.json"
+        corrupt.write_text("{not json")
+        assert cache.load(str(corrupt), "v1") == 0
+
+    def test_snapshot_is_json(self, tmp_path):
+        path = tmp_path / "sentences.json"
+        cache = SentenceAnnotationCache(capacity=10)
+        cache.put("a", PYTHON)
+        cache.save(str(path), "v1")
+        payload = json.loads(path.read_text())
+        assert payload["version"] == "v1"
+        assert payload["entries"] == [["a", [["python", [2], 3.0]]]]
+
+
+class TestFromEnv:
+    def test_defaults(self):
+        with patch.dict("os.environ", {}, clear=True):
+            cache = sentence_cache_from_env()
+        assert (cache.capacity, cache.policy) == (20_000, "lru")
+
+    def test_overrides(self):
+        env = {"SKILLBRIDGE_SENTENCE_CACHE_SIZE": "500", "SKILLBRIDGE_SENTENCE_CACHE_POLICY": "LFU"}
+        with patch.dict("os.environ", env, clear=True):
+            cache = sentence_cache_from_env()
+        assert (cache.capacity, cache.policy) == (500, "lfu")
@@ -0,0 +1,144 @@
+"""
+Tests for services/skill_automaton.py — the Aho–Corasick core against a
+brute-force scan, overlap resolution, abbreviations, stop words and
+building from a SKILL_DB-shaped dict plus data/skills.json.
+
+Documents are tokenised with a blank SpaCy pipeline, so no model is needed.
+"""
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("nltk")
+spacy = pytest.importorskip("spacy")
+
+from services import skill_automaton  # noqa: E402
+from services.skill_automaton import SkillAutomaton, build_automaton, token_key  # noqa: E402
+
+SKILL_DB = {
+    "KS1": {"skill_name": "Machine Learning", "skill_len": 2, "match_on_tokens": False,
+            "high_surfce_forms": {"full": "machine learning", "abv": "ML"},
+            "low_surface_forms": ["machine learn"]},
+    "KS2": {"skill_name": "Machine Learning Algorithms", "skill_len": 3, "match_on_tokens": True,
+            "high_surfce_forms": {"full": "machine learning algorithm"}, "low_surface_forms": []},
+    "KS3": {"skill_name": "Python (Programming Language)", "skill_len": 1, "match_on_tokens": False,
+            "high_surfce_forms": {"full": "python"}, "low_surface_forms": ["python programming"]},
+    "KS4": {"skill_name": "IT", "skill_len": 1, "match_on_tokens": False,
+            "high_surfce_forms": {"full": "it", "abv": "IT"}, "low_surface_forms": []},
+    "KS5": {"skill_name": "Amazon Web Services", "skill_len": 3, "match_on_tokens": False,
+            "high_surfce_forms": {"full": "amazon web service", "abv": "AWS"}, "low_surface_forms": []},
+}
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    return spacy.blank("en")
+
+
+@pytest.fixture(scope="module")
+def automaton(nlp, tmp_path_factory):
+    skills_json = tmp_path_factory.mktemp("data") / "skills.json"
+    skills_json.write_text(json.dumps({"skills": [
+        {"name": "javascript", "related_terms": ["node.js", "vue.js"]},
+        {"name": "python", "related_terms": ["numpy", "python 3"]},
+    ]}))
+    return build_automaton(SKILL_DB, nlp.make_doc, clean=lambda t: t.replace(".", " "),
+                           skills_json=str(skills_json))
+
+
+def skills(automaton, nlp, text):
+    return automaton.match(nlp(text))
+
+
+class TestAutomatonCore:
+    def test_finds_every_occurrence_like_a_brute_force_scan(self):
+        rng = random.Random(3)
+        alphabet = ["a", "b", "c", "d"]
+        patterns = {tuple(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(40)}
+        automaton = SkillAutomaton()
+        for pattern in patterns:
+            automaton.add(list(pattern), "full", "".join(pattern))
+        automaton.compile()
+
+        for _ in range(20):
+            text = [rng.choice(alphabet) for _ in range(30)]
+            keys = [token_key(t) for t in text]
+            found = {(s, e, automaton.patterns[p][2]) for s, e, p in automaton.find(keys)}
+            expected = {(s, s + len(p), "".join(p)) for p in patterns
+                        for s in range(len(text) - len(p) + 1) if tuple(text[s:s + len(p)]) == p}
+            assert found == expected
+
+    def test_duplicates_and_empty_patterns_are_ignored(self):
+        automaton = SkillAutomaton()
+        assert automaton.add(["Python"], "full", "a")
+        assert not automaton.add(["python"], "full", "b")
+        assert not automaton.add(["  "], "low", "c")
+        assert len(automaton) == 1
+
+    def test_frozen_after_compile(self):
+        automaton = SkillAutomaton().compile()
+        with pytest.raises(RuntimeError):
+            automaton.add(["python"], "full", "a")
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            SkillAutomaton().add(["python"], "fuzzy", "a")
+
+
+class TestMatch:
+    def test_spans_are_token_indices(self, automaton, nlp):
+        assert skills(automaton, nlp, "strong python and machine learning skills") == [
+            ("python", [1]), ("machine learning", [3, 4]),
+        ]
+
+    def test_longest_span_wins(self, automaton, nlp):
+        assert skills(automaton, nlp, "machine learning algorithms") == [
+            ("machine learning algorithms", [0, 1, 2]),
+        ]
+
+    def test_inflections_share_a_key(self, automaton, nlp):
+        assert skills(automaton, nlp, "amazon web services") == [("amazon web services", [0, 1, 2])]
+
+    def test_full_names_report_the_lemmatised_span(self, automaton):
+        doc = [SimpleNamespace(lower_=w, lemma_=l, is_stop=False)
+               for w, l in [("machine", "machine"), ("learnings", "learning")]]
+        assert automaton.match(doc) == [("machine learning", [0, 1])]
+
+    def test_abbreviations_need_the_exact_token(self, automaton, nlp):
+        assert skills(automaton, nlp, "aws and ml") == [("aws", [0]), ("ml", [2])]
+        # "ml" stems like "mls", but an abbreviation must match as written
+        assert skills(automaton, nlp, "mls") == []
+
+    def test_single_stop_words_are_not_skills(self, automaton, nlp):
+        assert skills(automaton, nlp, "it is required") == []
+
+    def test_related_terms_from_skills_json(self, automaton, nlp):
+        assert skills(automaton, nlp, "node js and numpy") == [("node js", [0, 1]), ("numpy", [3])]
+
+    def test_empty_sentence(self, automaton, nlp):
+        assert skills(automaton, nlp, "") == []
+
+
+class TestSelection:
+    def test_default_is_skillner(self, monkeypatch):
+        monkeypatch.delenv("SKILLBRIDGE_SKILL_MATCHER", raising=False)
+        assert skill_automaton.matcher_name() == "skillner"
+
+    def test_automaton(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_SKILL_MATCHER", " Automaton ")
+        assert skill_automaton.matcher_name() == "automaton"
+
+    def test_unknown(self, monkeypatch):
+        monkeypatch.setenv("SKILLBRIDGE_SKILL_MATCHER", "regex")
+        with pytest.raises(ValueError):
+            skill_automaton.matcher_name()
+
+    def test_vocabulary_version_tracks_skills_json(self, tmp_path):
+        path = tmp_path / "skills.json"
+        path.write_text('{"skills": []}')
+        before = skill_automaton.vocabulary_version(str(path))
+        path.write_text('{"skills": [{"name": "rust"}]}')
+        assert skill_automaton.vocabulary_version(str(path)) != before
+        assert skill_automaton.vocabulary_version(str(tmp_path / "missing.json")) == "none"
@@ -0,0 +1,98 @@
+"""
+Tests for services/skill_index.py — the precomputed skill embedding index.
+
+Indexes are built into tmp_path with a fake model that encodes a string as
+[len(text)] * 4, so lookups can be checked without sentence-transformers.
+"""
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from services.embedding_cache import EmbeddingCache
+from services.embedding_service import EmbeddingService
+from services.skill_index import (
+    SkillEmbeddingIndex,
+    build_index,
+    collect_skill_strings,
+    load_index,
+)
+
+FAKE_SKILL_DB = {
+    "KS1": {
+        "skill_name": "Machine Learning",
+        "high_surfce_forms": {"full": "machine learning", "abv": "ml"},
+        "low_surface_forms": ["machine learn"],
+    },
+    "KS2": {
+        "skill_name": "Python (Programming Language)",
+        "high_surfce_forms": {"full": "python"},
+        "low_surface_forms": [],
+    },
+}
+
+
+class LengthModel:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t))] * 4 for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    build_index(LengthModel(), "fake-model", ["python", "ml", "machine learning"], str(tmp_path))
+    return str(tmp_path)
+
+
+class TestCollect:
+    def test_gathers_db_forms_and_skills_json(self, tmp_path):
+        skills_json = tmp_path / "skills.json"
+        skills_json.write_text(json.dumps({"skills": [
+            {"name": "python", "related_terms": ["NumPy", "pandas"]},
+        ]}))
+        strings = collect_skill_strings(FAKE_SKILL_DB, str(skills_json))
+        assert strings[:4] == ["machine learning", "ml", "machine learn", "python (programming language)"]
+        assert {"python", "numpy", "pandas"} <= set(strings)
+        assert len(strings) == len(set(strings))
+
+
+class TestIndex:
+    def test_lookup_hits_and_misses(self, index_dir):
+        index = SkillEmbeddingIndex(index_dir)
+        found, missing = index.lookup(["ML", "rust", "python"])
+        assert missing == [1]
+        assert found[0].tolist() == [2.0] * 4
+        assert found[2].dtype == np.float32
+
+    def test_float16_is_default_storage(self, index_dir):
+        assert SkillEmbeddingIndex(index_dir).dtype == "float16"
+
+    def test_load_index_rejects_other_model(self, index_dir):
+        assert load_index("other-model", index_dir) is None
+        assert load_index("fake-model", index_dir) is not None
+
+    def test_load_index_missing_directory(self, tmp_path):
+        assert load_index("fake-model", str(tmp_path / "nope")) is None
+
+    def test_invalid_dtype(self, tmp_path):
+        with pytest.raises(ValueError):
+            build_index(LengthModel(), "m", ["a"], str(tmp_path), dtype="int8")
+
+
+class TestEmbeddingServiceUsesIndex:
+    def test_only_out_of_vocabulary_strings_are_encoded(self, index_dir):
+        model = LengthModel()
+        with patch("sentence_transformers.SentenceTransformer", return_value=model):
+            svc = EmbeddingService(
+                model_name="fake-model",
+                cache=EmbeddingCache("fake-model"),
+                skill_index=SkillEmbeddingIndex(index_dir),
+            )
+        out = svc.get_embeddings(["python", "kubernetes", "machine learning"])
+        assert model.calls == [["kubernetes"]]
+        assert out[:, 0].tolist() == [6.0, 10.0, 16.0]
+        assert svc.cache_stats()["index_hits"] == 2
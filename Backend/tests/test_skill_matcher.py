@@ -0,0 +1,76 @@
+"""
+Tests for services/skill_matcher.py — batched embedding matching.
+
+Embeddings are tiny hand-written 2-D/3-D vectors so every expected
+similarity can be worked out by hand.
+"""
+import numpy as np
+import pytest
+
+from services import skill_matcher
+
+
+class TestNormalizeRows:
+    def test_rows_have_unit_length(self):
+        out = skill_matcher.normalize_rows([[3.0, 4.0], [0.0, 2.0]])
+        assert np.linalg.norm(out, axis=1) == pytest.approx([1.0, 1.0])
+
+    def test_zero_rows_stay_zero(self):
+        out = skill_matcher.normalize_rows([[0.0, 0.0], [1.0, 0.0]])
+        assert out[0].tolist() == [0.0, 0.0]
+        assert not np.isnan(out).any()
+
+
+class TestSimilarityMatrix:
+    def test_matches_pairwise_cosine(self):
+        q = np.array([[1.0, 0.0], [1.0, 1.0]])
+        c = np.array([[2.0, 0.0], [0.0, 5.0], [1.0, 1.0]])
+        sim = skill_matcher.similarity_matrix(q, c)
+        assert sim.shape == (2, 3)
+        assert sim[0] == pytest.approx([1.0, 0.0, 1 / np.sqrt(2)], abs=1e-6)
+        assert sim[1, 2] == pytest.approx(1.0, abs=1e-6)
+
+
+class TestBestMode:
+    def test_picks_highest_candidate_per_row(self):
+        sim = np.array([[0.2, 0.9, 0.8], [0.1, 0.3, 0.2]])
+        assert skill_matcher.best_matches(sim, 0.7) == {0: [(1, pytest.approx(0.9))]}
+
+    def test_tie_goes_to_first_candidate(self):
+        sim = np.array([[0.8, 0.8]])
+        assert skill_matcher.best_matches(sim, 0.5)[0][0][0] == 0
+
+    def test_empty_inputs(self):
+        assert skill_matcher.match([], [[1.0]], 0.5) == {}
+        assert skill_matcher.match([[1.0]], [], 0.5) == {}
+
+
+class TestTopKMode:
+    def test_returns_ranked_candidates_above_threshold(self):
+        sim = np.array([[0.75, 0.95, 0.1, 0.85]])
+        result = skill_matcher.top_k_matches(sim, threshold=0.7, k=3)
+        assert [col for col, _ in result[0]] == [1, 3, 0]
+
+    def test_k_larger_than_candidates(self):
+        sim = np.array([[0.9, 0.8]])
+        result = skill_matcher.top_k_matches(sim, threshold=0.0, k=10)
+        assert [col for col, _ in result[0]] == [0, 1]
+
+
+class TestOneToOneMode:
+    def test_each_candidate_used_once(self):
+        # Greedy "best" would give both rows candidate 0
+        sim = np.array([[0.95, 0.90], [0.93, 0.10]])
+        greedy = skill_matcher.best_matches(sim, 0.5)
+        assert greedy[0][0][0] == greedy[1][0][0] == 0
+        result = skill_matcher.one_to_one_matches(sim, 0.5)
+        assert result == {0: [(1, pytest.approx(0.90))], 1: [(0, pytest.approx(0.93))]}
+
+    def test_pairs_below_threshold_dropped(self):
+        sim = np.array([[0.9, 0.0], [0.0, 0.2]])
+        assert set(skill_matcher.one_to_one_matches(sim, 0.5)) == {0}
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        skill_matcher.match([[1.0]], [[1.0]], 0.5, mode="fuzzy")
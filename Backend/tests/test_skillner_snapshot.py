@@ -0,0 +1,120 @@
+"""
+Tests for services/skillner_snapshot.py.
+
+Matchers are built the way SkillNER's Matchers class builds them (LOWER
+PhraseMatchers keyed by skill id) from a tiny SKILL_DB over a blank SpaCy
+pipeline, so neither en_core_web_lg nor SkillNER's downloaded skill
+database is needed.
+"""
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from spacy.attrs import LOWER  # noqa: E402
+from spacy.matcher import PhraseMatcher  # noqa: E402
+
+from services import skillner_snapshot  # noqa: E402
+
+SKILL_DB = {
+    "KS1": {"skill_name": "Python", "high_surfce_forms": {"full": "python"}},
+    "KS2": {"skill_name": "Machine Learning", "high_surfce_forms": {"full": "machine learning", "abv": "ml"}},
+    "KS3": {"skill_name": "Amazon Web Services", "high_surfce_forms": {"full": "amazon web services", "abv": "aws"}},
+}
+
+TEXT = "Python and ML on Amazon Web Services (AWS); machine learning a plus."
+
+
+def build_matchers(nlp, skill_db: dict) -> dict:
+    """A two-matcher stand-in for Matchers(nlp, skill_db, PhraseMatcher).load_matchers()."""
+    matchers = {
+        "full_matcher": PhraseMatcher(nlp.vocab, attr="LOWER"),
+        "abv_matcher": PhraseMatcher(nlp.vocab, attr="LOWER"),
+    }
+    for skill_id, skill in skill_db.items():
+        forms = skill["high_surfce_forms"]
+        matchers["full_matcher"].add(skill_id, [nlp.make_doc(forms["full"])])
+        if "abv" in forms:
+            matchers["abv_matcher"].add(skill_id, [nlp.make_doc(forms["abv"])])
+    return matchers
+
+
+def run_matchers(nlp, matchers: dict) -> dict:
+    """{matcher name: [(skill id, start, end)]} for TEXT."""
+    doc = nlp.make_doc(TEXT)
+    return {
+        name: sorted((nlp.vocab.strings[match_id], start, end) for match_id, start, end in matcher(doc))
+        for name, matcher in matchers.items()
+    }
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    nlp = spacy.blank("en")
+    matchers = build_matchers(nlp, SKILL_DB)
+    version = skillner_snapshot.snapshot_version(nlp, SKILL_DB)
+    path = skillner_snapshot.save_snapshot(matchers, version, str(tmp_path / "matchers.msgpack"))
+    return path, version, run_matchers(nlp, matchers)
+
+
+class TestRoundTrip:
+    def test_reloaded_matchers_find_the_same_matches(self, snapshot):
+        path, version, expected = snapshot
+        # A fresh pipeline has never seen the skill names, so nothing leaks
+        # over from the vocab the snapshot was built with
+        fresh = spacy.blank("en")
+        loaded = skillner_snapshot.load_snapshot(fresh.vocab, version, path)
+
+        assert loaded is not None
+        assert set(loaded) == {"full_matcher", "abv_matcher"}
+        assert run_matchers(fresh, loaded) == expected
+        assert expected["abv_matcher"] == [("KS2", 2, 3), ("KS3", 8, 9)]
+
+    def test_reloaded_matchers_keep_their_attr(self, snapshot):
+        path, version, _ = snapshot
+        loaded = skillner_snapshot.load_snapshot(spacy.blank("en").vocab, version, path)
+        assert all(m.__reduce__()[1][3] == LOWER for m in loaded.values())
+
+
+class TestVersionCheck:
+    def test_changed_skill_db_is_stale(self, snapshot):
+        path, _, _ = snapshot
+        nlp = spacy.blank("en")
+        changed = dict(SKILL_DB, KS4={"skill_name": "Rust", "high_surfce_forms": {"full": "rust"}})
+        version = skillner_snapshot.snapshot_version(nlp, changed)
+        assert skillner_snapshot.load_snapshot(nlp.vocab, version, path) is None
+
+    def test_changed_pipeline_is_stale(self, snapshot):
+        path, version, _ = snapshot
+        nlp = spacy.blank("en")
+        nlp.meta["version"] = "9.9.9"
+        assert skillner_snapshot.snapshot_version(nlp, SKILL_DB) != version
+
+    def test_stale_snapshot_is_rebuilt(self, snapshot):
+        # What _build_skill_extractor does: fall back to building, then the
+        # next start loads the rewritten snapshot
+        path, _, _ = snapshot
+        nlp = spacy.blank("en")
+        changed = dict(SKILL_DB, KS4={"skill_name": "Rust", "high_surfce_forms": {"full": "rust"}})
+        version = skillner_snapshot.snapshot_version(nlp, changed)
+        assert skillner_snapshot.load_snapshot(nlp.vocab, version, path) is None
+
+        skillner_snapshot.save_snapshot(build_matchers(nlp, changed), version, path)
+        loaded = skillner_snapshot.load_snapshot(spacy.blank("en").vocab, version, path)
+        assert "KS4" in {key for m in loaded.values() for key in m.__reduce__()[1][1]}
+
+
+class TestFallback:
+    def test_missing_snapshot(self, tmp_path):
+        nlp = spacy.blank("en")
+        version = skillner_snapshot.snapshot_version(nlp, SKILL_DB)
+        assert skillner_snapshot.load_snapshot(nlp.vocab, version, str(tmp_path / "absent")) is None
+
+    @pytest.mark.parametrize("content", [b"", b"\xc1\xff not msgpack", b"\x92\x01", b"\x92\x01\x02"])
+    def test_corrupt_snapshot(self, snapshot, content):
+        path, version, _ = snapshot
+        with open(path, "wb") as f:
+            f.write(content)
+        assert skillner_snapshot.load_snapshot(spacy.blank("en").vocab, version, path) is None
+
+    def test_save_leaves_no_temp_file(self, snapshot, tmp_path):
+        assert [p.name for p in tmp_path.iterdir()] == ["matchers.msgpack"]
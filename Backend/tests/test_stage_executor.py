@@ -0,0 +1,148 @@
+"""
+Tests for services/stage_executor.py — bounded off-loop stage execution.
+
+Only the thread mode is exercised; the stage functions are tiny and use a
+threading.Event so the tests control exactly when a call finishes.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from services.stage_executor import StageBusyError, StageExecutor
+
+
+def _blocking(event: threading.Event, value):
+    event.wait(timeout=5)
+    return value
+
+
+class TestRun:
+    def test_returns_function_result(self):
+        executor = StageExecutor(stage_limits={"skills": 1})
+
+        async def scenario():
+            return await executor.run("skills", lambda a, b=0: a + b, 2, b=3)
+
+        assert asyncio.run(scenario()) == 5
+        executor.shutdown()
+
+    def test_runs_off_the_event_loop_thread(self):
+        executor = StageExecutor()
+
+        async def scenario():
+            return await executor.run("pdf", threading.get_ident)
+
+        assert asyncio.run(scenario()) != threading.get_ident()
+        executor.shutdown()
+
+    def test_exceptions_propagate_and_release_slot(self):
+        executor = StageExecutor(stage_limits={"gaps": 1})
+
+        def boom():
+            raise RuntimeError("bad")
+
+        async def scenario():
+            with pytest.raises(RuntimeError):
+                await executor.run("gaps", boom)
+            return executor.queue_depths()["gaps"]
+
+        assert asyncio.run(scenario()) == 0
+        executor.shutdown()
+
+    def test_unknown_stage_raises(self):
+        executor = StageExecutor()
+
+        async def scenario():
+            await executor.run("nope", lambda: None)
+
+        with pytest.raises(KeyError):
+            asyncio.run(scenario())
+
+    def test_invalid_mode_rejected(self):
+        with pytest.raises(ValueError):
+            StageExecutor(mode="fibers")
+
+
+class TestBackpressure:
+    def test_rejects_when_queue_is_full(self):
+        executor = StageExecutor(stage_limits={"skills": 1}, max_queue=1, retry_after=7)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(executor.run("skills", _blocking, release, "a"))
+            queued = asyncio.ensure_future(executor.run("skills", _blocking, release, "b"))
+            await asyncio.sleep(0.05)
+            assert executor.queue_depths()["skills"] == 2
+
+            with pytest.raises(StageBusyError) as info:
+                await executor.run("skills", _blocking, release, "c")
+
+            release.set()
+            return info.value, await asyncio.gather(running, queued)
+
+        error, results = asyncio.run(scenario())
+        assert error.stage == "skills"
+        assert error.retry_after == 7
+        assert results == ["a", "b"]
+        assert executor.queue_depths()["skills"] == 0
+        executor.shutdown()
+
+    def test_cancelled_call_holds_its_slot_until_the_worker_finishes(self):
+        executor = StageExecutor(stage_limits={"skills": 1}, max_queue=0)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(executor.run("skills", _blocking, release, "a"))
+            await asyncio.sleep(0.05)
+            running.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await running
+
+            # The worker thread is still busy, so the stage is still full
+            assert executor.queue_depths()["skills"] == 1
+            with pytest.raises(StageBusyError):
+                await executor.run("skills", lambda: "b")
+
+            release.set()
+            for _ in range(100):
+                if executor.queue_depths()["skills"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            return await executor.run("skills", lambda: "b")
+
+        assert asyncio.run(scenario()) == "b"
+        assert executor.queue_depths()["skills"] == 0
+        executor.shutdown()
+
+    def test_cancelled_while_queued_frees_its_place(self):
+        executor = StageExecutor(stage_limits={"skills": 1}, max_queue=1)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(executor.run("skills", _blocking, release, "a"))
+            queued = asyncio.ensure_future(executor.run("skills", _blocking, release, "b"))
+            await asyncio.sleep(0.05)
+            queued.cancel()
+            await asyncio.sleep(0)
+            depth = executor.queue_depths()["skills"]
+            release.set()
+            return depth, await running
+
+        assert asyncio.run(scenario()) == (1, "a")
+        executor.shutdown()
+
+    def test_stages_have_independent_limits(self):
+        executor = StageExecutor(stage_limits={"skills": 1, "pdf": 1}, max_queue=0)
+        release = threading.Event()
+
+        async def scenario():
+            busy = asyncio.ensure_future(executor.run("skills", _blocking, release, 1))
+            await asyncio.sleep(0.05)
+            other = await executor.run("pdf", lambda: "free")
+            release.set()
+            await busy
+            return other
+
+        assert asyncio.run(scenario()) == "free"
+        executor.shutdown()
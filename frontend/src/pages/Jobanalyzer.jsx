@@ -1,5 +1,15 @@
 import React, { useState } from 'react';
-import axios from 'axios';
+
+const API_URL = 'http://127.0.0.1:8000/jobs/jobAnalyzer';
+
+// Progress events streamed by the analyzer, in pipeline order
+const STAGE_LABELS = {
+  pdf_extracted: 'Resume text extracted',
+  job_skills: 'Job description skills identified',
+  resume_skills: 'Resume skills identified',
+  gap_analysis: 'Skill gaps analysed',
+  learning_resources: 'Learning recommendations ready',
+};
 
 const Jobanalyzer = () => {
   const [file, setFile] = useState(null);
@@ -8,6 +18,7 @@ const Jobanalyzer = () => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [useSemanticMatching, setUseSemanticMatching] = useState(true);
+  const [stages, setStages] = useState([]);
 
   const handleFileChange = (event) => {
     setFile(event.target.files[0]);
@@ -27,26 +38,67 @@ const Jobanalyzer = () => {
     }
 
     setLoading(true);
+    setResults(null);
+    setStages([]);
 
     const formData = new FormData();
     formData.append('file', file);
     formData.append('job_description', jobDescription);
     formData.append('use_semantic', useSemanticMatching);
+    formData.append('stream', 'ndjson');
+
+    // Apply one streamed event: record its stage, and show the gap
+    // breakdown as soon as it arrives rather than after the LLM call
+    const handleEvent = (event) => {
+      if (STAGE_LABELS[event.type]) {
+        setStages((prev) => [...prev, { type: event.type, seconds: event.elapsed_seconds }]);
+      }
+      if (event.type === 'gap_analysis') {
+        setResults({
+          analysis_type: event.analysis_type,
+          analysis: {
+            missing_skills: event.missing_skills,
+            matching_skills: event.matching_skills,
+            resume_only_skills: event.resume_only_skills,
+            similarity_threshold: event.similarity_threshold,
+          },
+          llm_output: null,
+        });
+      } else if (event.type === 'result') {
+        if (event.status === 'error') {
+          setError(event.message || 'Analysis failed. Please try again.');
+          setResults(null);
+        } else {
+          setResults(event);
+        }
+      } else if (event.type === 'error') {
+        setError(event.detail || 'An error occurred while processing your request. Please try again.');
+      }
+    };
 
     try {
-      const response = await axios.post('http://127.0.0.1:8000/jobs/jobAnalyzer', formData);
-      const data = response.data;
-      if (data.status === 'error') {
-        setError(data.message || 'Analysis failed. Please try again.');
-        setResults(null);
-      } else {
-        setResults(data);
+      const response = await fetch(API_URL, { method: 'POST', body: formData });
+      if (!response.ok) {
+        const body = await response.json().catch(() => ({}));
+        throw new Error(body.detail || `Request failed with status ${response.status}`);
       }
-      setLoading(false);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.filter((line) => line.trim()).forEach((line) => handleEvent(JSON.parse(line)));
+      }
+      if (buffer.trim()) handleEvent(JSON.parse(buffer));
     } catch (error) {
       console.error('Error uploading data:', error);
-      const detail = error.response?.data?.detail;
-      setError(detail || 'An error occurred while processing your request. Please try again.');
+      setError(error.message || 'An error occurred while processing your request. Please try again.');
+    } finally {
       setLoading(false);
     }
   };
@@ -140,6 +192,21 @@ const Jobanalyzer = () => {
         </button>
       </form>
 
+      {/* Stage Progress */}
+      {stages.length > 0 && (
+        <ul className="mt-4 space-y-1 text-sm text-gray-600">
+          {stages.map(({ type, seconds }) => (
+            <li key={type}>
+              ✓ {STAGE_LABELS[type]}
+              {typeof seconds === 'number' && (
+                <span className="ml-1 text-gray-400">({seconds.toFixed(1)}s)</span>
+              )}
+            </li>
+          ))}
+          {loading && <li className="text-gray-400">…</li>}
+        </ul>
+      )}
+
       {/* Error Message */}
       {error && (
         <div className="mt-4 p-4 bg-red-100 text-red-700 rounded">
@@ -210,6 +277,8 @@ const Jobanalyzer = () => {
               <div className="prose prose-sm">
                 {results.llm_output ? (
                   <div dangerouslySetInnerHTML={{ __html: results.llm_output.replace(/\n/g, '<br/>') }} />
+                ) : loading ? (
+                  <p className="text-gray-500">Generating recommendations…</p>
                 ) : (
                   <p>No recommendations available</p>
                 )}